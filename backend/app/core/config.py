@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     ENVIRONMENT: str = "development"
+    # /metrics* 조회 토큰 (Authorization: Bearer <토큰>, 비어 있으면 /metrics* 비활성화)
+    METRICS_TOKEN: str = ""
 
     # CORS 설정 (allow_credentials=True와 함께 사용 시 "*" 사용 불가)
     # 환경변수로 쉼표 또는 세미콜론 구분 문자열 지원
@@ -42,23 +44,30 @@ class Settings(BaseSettings):
 
     # OpenAI API 설정 (주식 분석용)
     OPENAI_API_KEY: str = ""
+    OPENAI_API_KEYS: str = ""  # 추가 키 (쉼표 구분, OPENAI_API_KEY와 함께 키 풀 구성)
     OPENAI_DEFAULT_MODEL: str = "gpt-5-mini"
 
     # Anthropic API 설정 (주식 분석용)
     ANTHROPIC_API_KEY: str = ""
+    ANTHROPIC_API_KEYS: str = ""  # 추가 키 (쉼표 구분)
     ANTHROPIC_DEFAULT_MODEL: str = "claude-3-5-sonnet-20241022"
 
     # Google AI API 설정 (향후 지원)
     GOOGLE_AI_API_KEY: str = ""
     GOOGLE_DEFAULT_MODEL: str = "gemini-1.5-pro"
 
-    # Azure OpenAI 설정 (향후 지원)
+    # Azure OpenAI 설정 (openai 키 풀에 포함, 배포는 OPENAI_DEFAULT_MODEL을 서비스하는 것으로 간주)
     AZURE_OPENAI_API_KEY: str = ""
     AZURE_OPENAI_ENDPOINT: str = ""
-    AZURE_OPENAI_DEPLOYMENT: str = ""
+    AZURE_OPENAI_DEPLOYMENT: str = ""  # 배포 이름 (쉼표 구분, 배포별 rate limit)
+    AZURE_OPENAI_API_VERSION: str = "2024-10-21"
+    # 추가 엔드포인트 (';' 구분, '엔드포인트|API 키|배포1,배포2')
+    AZURE_OPENAI_EXTRA_ENDPOINTS: str = ""
 
     # Finnhub API 설정 (주식 데이터)
     FINNHUB_API: str = ""
+    US_LISTING_EXCHANGE: str = "US"  # stock/symbol 일괄 조회 거래소 코드
+    US_LISTING_FILE: str = ""  # 미국 종목 목록 스냅샷 파일 (지정 시 Finnhub 대신 사용)
 
     # PortOne 결제 설정
     PORTONE_API_KEY: str = ""
@@ -69,15 +78,97 @@ class Settings(BaseSettings):
     ANALYSIS_PRICE_KRW: int = 3900
 
     # LLM 파이프라인 설정
-    LLM_PRIMARY_PROVIDER: str = "openai"  # openai, anthropic, google, azure_openai
+    LLM_PRIMARY_PROVIDER: str = "openai"  # openai, anthropic, fake (부하 테스트), replay (아카이브 재생)
     LLM_FALLBACK_ORDER: str = "openai,anthropic"  # 쉼표 구분 폴백 순서
-    LLM_MAX_RETRIES: int = 3
+    LLM_MAX_RETRIES: int = 3  # 프로바이더별 일시적 오류(429, 5xx, 타임아웃) 재시도 횟수
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5  # 재시도 백오프 기본 대기 (지수 증가, full jitter)
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 8.0  # 재시도 백오프 최대 대기
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 120.0  # SDK 요청 1회 타임아웃 (SDK 자체 재시도는 끄고 엔진 재시도만 사용)
     LLM_CIRCUIT_BREAKER_THRESHOLD: int = 3
     LLM_CIRCUIT_BREAKER_RECOVERY_MINUTES: int = 5
+    LLM_KEY_DRAIN_SECONDS: float = 30.0  # 429 응답 키 제외 시간 (retry-after 헤더가 없을 때)
+
+    # LLM 프롬프트/출력 토큰 설정
+    LLM_PROMPT_MODE: str = "full"  # full, compact (값이 없는 시장 데이터 생략 + 투자 기간별 출력 토큰 상한)
+    LLM_MAX_TOKENS: int = 4000  # full 모드 출력 토큰 상한
+    LLM_MAX_TOKENS_SHORT: int = 3000  # compact 모드 단기 분석 출력 토큰 상한
+    LLM_MAX_TOKENS_MID: int = 3500
+    LLM_MAX_TOKENS_LONG: int = 4000
+    # 출력 토큰 상한으로 잘린 응답은 완성된 필드를 살리고 빠진 필드만 이어서 요청
+    LLM_CONTINUATION_ENABLED: bool = True
+    # 복잡도 기반 모델 라우팅 (비어 있으면 프로바이더 기본 모델만 사용)
+    # 낮은 티어부터 ';' 구분, 티어별 '프로바이더=모델' 쉼표 구분 (마지막 티어가 품질 기준)
+    # 예: "light:openai=gpt-5-nano,anthropic=claude-3-5-haiku-latest;standard:openai=gpt-5-mini;top:openai=gpt-5"
+    LLM_MODEL_TIERS: str = ""
+    LLM_MODEL_PRICES: str = ""  # 티어 비용 리포트용 '모델=입력/출력' (100만 토큰당 USD, 예: gpt-5-mini=0.25/2.0)
+    LLM_ROUTING_SPARSE_DATA_THRESHOLD: float = 0.5  # 시장 데이터 완성도가 이보다 낮으면 상위 티어
+    LLM_ROUTING_RECENT_ANALYSIS_HOURS: float = 24.0  # 이 시간 내 같은 종목/기간 분석이 있으면 하위 티어
+    LLM_ROUTING_QUALITY_SAMPLE_RATE: float = 0.02  # 하위 티어 응답을 최상위 티어와 비교하는 비율
+    # 프로바이더 프롬프트 캐시 (고정 시스템 프롬프트 재사용)
+    # Anthropic은 cache_control 블록, OpenAI는 고정 접두부 + prompt_cache_key로 자동 캐시
+    # (두 프로바이더 모두 1024 토큰 미만 접두부는 캐시하지 않음)
+    LLM_PROMPT_CACHE_ENABLED: bool = True
+
+    # 부하 테스트용 가짜 LLM 프로바이더 (LLM_PRIMARY_PROVIDER=fake, production에서는 무시)
+    LLM_FAKE_SEED: int = 42
+    LLM_FAKE_TTFT_MEDIAN_SECONDS: float = 1.0  # 첫 토큰까지 지연 중앙값 (로그정규 분포)
+    LLM_FAKE_TTFT_SIGMA: float = 0.5  # 로그정규 분포 표준편차 (클수록 꼬리 지연 증가)
+    LLM_FAKE_TOKENS_PER_SECOND: float = 80.0  # 출력 생성 속도
+    LLM_FAKE_ERROR_RATE: float = 0.0  # 일시적 오류(503) 비율
+    LLM_FAKE_MALFORMED_RATE: float = 0.0  # 잘린 JSON 응답 비율
+
+    # LLM 입장 제어 (프로바이더별 동시 호출 제한, 우선순위 대기열)
+    LLM_PROVIDER_CONCURRENCY: str = "openai=8,anthropic=8"  # 프로바이더별 동시 호출 수
+    LLM_ADMISSION_MAX_WAIT_SECONDS: float = 30.0  # 예상 대기 시간이 이를 넘으면 즉시 503 (비동기 작업은 대기)
+
+    # LLM 헤지 요청 (응답이 느리면 보조 요청을 추가로 보내 먼저 온 유효 응답 사용)
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_LATENCY_PERCENTILE: float = 95.0  # 이 백분위 지연 시간을 넘기면 보조 요청 시작
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # 백분위 계산에 필요한 최소 응답 수 (미만이면 기본 지연 사용)
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 30.0
+    LLM_HEDGE_MAX_RATIO: float = 0.1  # 전체 호출 대비 보조 요청 비율 상한 (비용 제한)
+
+    # 한국 종목 테이블 스냅샷 (워커 간 mmap 공유)
+    KR_TICKER_SNAPSHOT_ENABLED: bool = True
+    KR_TICKER_SNAPSHOT_PATH: str = ""  # 비어 있으면 backend/data/kr_ticker_table.bin
+
+    # 시작 시 워밍업 설정
+    WARMUP_ON_STARTUP: bool = True  # 시작 시 종목 테이블 등 참조 데이터 미리 로드
+    WARMUP_TIMEOUT_SECONDS: int = 180  # 워밍업 최대 대기 시간 (초과 시 degraded 상태로 ready)
+
+    # 비동기 분석 작업 큐 설정
+    ANALYSIS_JOB_WORKERS: int = 4  # 프로세스당 동시 실행 작업 수 (0이면 워커 비활성화)
+    ANALYSIS_JOB_POLL_INTERVAL_SECONDS: float = 2.0  # 대기 작업 폴링 간격 (다른 프로세스가 넣은 작업 감지)
+    ANALYSIS_JOB_STALE_MINUTES: int = 10  # 진행 상태로 멈춘 작업 회수 기준 (워커 비정상 종료 대비)
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = 2  # 회수 후 재시도 포함 최대 실행 횟수
+
+    # 오프라인 일괄 분석 (Batch API, run_batch_analysis.py)
+    # 배치 분석/투자 기간 일괄 생성 결과 소유자 (공유 캐시 원본)
+    ANALYSIS_BATCH_USER_ID: str = "00000000-0000-4000-8000-000000000000"
+    ANALYSIS_BATCH_POLL_INTERVAL_SECONDS: float = 60.0
+    ANALYSIS_BATCH_TIMEOUT_HOURS: float = 24.0
+    ANALYSIS_BATCH_FETCH_CONCURRENCY: int = 8  # 제출 전 주식 데이터 동시 수집 수
 
     # 주식 분석 설정
     ANALYSIS_MAX_HISTORY: int = 100  # 최대 분석 히스토리 개수
     ANALYSIS_CACHE_TTL: int = 3600  # 분석 캐시 TTL (초)
+    ANALYSIS_SINGLE_FLIGHT_BACKEND: str = "local"  # 동일 분석 중복 호출 방지: local (프로세스 내), database (프로세스 간)
+    ANALYSIS_SINGLE_FLIGHT_TIMEOUT_SECONDS: int = 180  # 다른 프로세스의 분석 대기 최대 시간 (점유 만료)
+    ANALYSIS_ARCHIVE_RAW_RESPONSE: bool = True  # LLM 원본 응답 압축 저장 (run_reparse_archive.py 재파싱, replay 프로바이더)
+    # 델타 재분석 (같은 사용자의 최근 분석에서 변하지 않은 섹션 재사용)
+    ANALYSIS_DELTA_ENABLED: bool = False
+    ANALYSIS_DELTA_MAX_AGE_DAYS: float = 14.0  # 이보다 오래된 분석은 전체 재분석
+    ANALYSIS_DELTA_MAX_PRICE_MOVE: float = 0.10  # 현재가 변동률이 이보다 크면 전체 재분석
+    ANALYSIS_DELTA_FUNDAMENTAL_TOLERANCE: float = 0.20  # 펀더멘털 지표 변동률이 이보다 크면 전체 재분석
+    ANALYSIS_DELTA_MAX_TOKENS: int = 1500  # 델타 재분석 출력 토큰 상한
+    # 투자 기간 일괄 생성 (단기/중기/장기를 한 번에 생성하고 요청하지 않은 기간은 공유 캐시로 저장)
+    # 공유 캐시(ANALYSIS_CACHE_TTL)가 꺼져 있으면 사용하지 않음
+    ANALYSIS_MULTI_TIMEFRAME_ENABLED: bool = False
+    ANALYSIS_MULTI_TIMEFRAME_MAX_TOKENS: int = 10000  # 일괄 생성 출력 토큰 상한 (투자 기간 3개 분량)
+    # 요청 처리 시간 예산 (라우터에서 설정, 각 단계는 남은 예산을 타임아웃으로 사용, 0이면 비활성화)
+    ANALYSIS_REQUEST_DEADLINE_SECONDS: float = 120.0
+    ANALYSIS_DEADLINE_LLM_MIN_SECONDS: float = 10.0  # LLM 호출 시작에 필요한 최소 남은 예산 (지연 중앙값이 더 크면 중앙값)
+    ANALYSIS_DEADLINE_SAVE_GRACE_SECONDS: float = 5.0  # 예산이 다 되어도 생성된 분석 저장에 허용하는 시간
 
     class Config:
         env_file = ".env"
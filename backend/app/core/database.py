@@ -6,6 +6,7 @@ SQLite (기본) 또는 PostgreSQL 지원
 import logging
 import os
 from typing import AsyncGenerator
+from sqlalchemy import inspect, text
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
@@ -80,6 +81,27 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def _add_missing_columns(sync_conn) -> None:
+    """
+    기존 테이블에 없는 nullable 컬럼 추가
+
+    create_all은 기존 테이블을 변경하지 않으므로, 모델에 추가된 선택 컬럼을
+    ALTER TABLE로 보완합니다 (별도 마이그레이션 도구 없이 배포 가능하도록).
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            logger.info(f"컬럼 추가: {table.name}.{column.name} ({column_type})")
+
+
 async def init_db():
     """
     데이터베이스 초기화 - 모든 테이블 생성
@@ -87,9 +109,10 @@ async def init_db():
     """
     async with engine.begin() as conn:
         # 모든 모델을 임포트하여 Base.metadata에 등록
-        from app.models import StockInsight  # noqa: F401
+        from app.models import StockInsight, AnalysisJob, AnalysisFlight  # noqa: F401
 
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
         logger.info("데이터베이스 테이블 생성 완료")
 
 
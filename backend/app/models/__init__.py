@@ -2,7 +2,11 @@
 SQLAlchemy 모델들
 """
 from app.models.stock_insight import StockInsight
+from app.models.analysis_job import AnalysisJob
+from app.models.analysis_flight import AnalysisFlight
 
 __all__ = [
     "StockInsight",
+    "AnalysisJob",
+    "AnalysisFlight",
 ]
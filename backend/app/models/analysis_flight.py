@@ -0,0 +1,18 @@
+"""
+진행 중인 LLM 분석 점유 모델 (프로세스 간 중복 호출 방지)
+"""
+from sqlalchemy import Column, String, DateTime, JSON
+from app.core.database import Base
+
+
+class AnalysisFlight(Base):
+    """같은 입력 지문의 LLM 분석을 한 프로세스만 실행하도록 점유 (single-flight)"""
+    __tablename__ = "analysis_flights"
+
+    key = Column(String(64), primary_key=True)  # 분석 입력 지문
+    owner = Column(String(64), nullable=False)  # 점유한 프로세스
+    expires_at = Column(DateTime, nullable=False)  # 점유 만료 시각 (UTC, 비정상 종료 대비)
+    result = Column(JSON)  # 완료된 분석 결과 (대기 중인 다른 프로세스가 사용)
+
+    def __repr__(self):
+        return f"<AnalysisFlight(key={self.key}, owner={self.owner})>"
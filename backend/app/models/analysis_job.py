@@ -0,0 +1,39 @@
+"""
+비동기 주식 분석 작업 모델
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class AnalysisJob(Base):
+    """비동기 주식 분석 작업 (작업 큐)"""
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String(36), primary_key=True)  # UUID v4
+
+    # 사용자 식별
+    user_id = Column(String(36), nullable=False, index=True)  # UUID v4
+
+    # 분석 요청
+    stock_code = Column(String(100), nullable=False)  # 종목코드 또는 회사명 (요청 원문)
+    timeframe = Column(String(20), nullable=False)  # short, mid, long
+    merchant_uid = Column(String(100))  # 결제 검증된 주문번호 (실패 시 수동 환불용)
+
+    # 진행 상태
+    status = Column(String(20), nullable=False, index=True)  # queued, fetching_data, calling_llm, parsing, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(64))  # 작업을 점유한 워커 (프로세스/태스크)
+    claimed_at = Column(DateTime)  # 점유 시각 (UTC, 중단된 작업 회수용)
+    heartbeat_at = Column(DateTime)  # 마지막 진행 시각 (UTC)
+
+    # 결과
+    insight_id = Column(Integer)
+    error = Column(Text)
+
+    # 메타데이터
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<AnalysisJob(id={self.id}, stock_code={self.stock_code}, status={self.status})>"
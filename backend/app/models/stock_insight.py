@@ -1,7 +1,7 @@
 """
 주식 AI 딥리서치 분석 결과 모델
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, LargeBinary
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -56,6 +56,15 @@ class StockInsight(Base):
     # 메타데이터
     ai_model = Column(String(50))
     processing_time_ms = Column(Integer)
+    prompt_version = Column(String(50))  # 분석 생성 시 프롬프트 버전
+    input_fingerprint = Column(String(64))  # 분석 입력(종목 데이터) 지문 (결과 캐시 키)
+    prompt_tokens = Column(Integer)  # LLM 입력 토큰 (재시도/헤지 포함, 공유/캐시 결과는 없음)
+    completion_tokens = Column(Integer)  # LLM 출력 토큰
+    cached_prompt_tokens = Column(Integer)  # 프로바이더 프롬프트 캐시에서 읽은 입력 토큰
+    stage_timings = Column(JSON)  # 단계별 소요 시간 [{"stage", "start_ms", "duration_ms"}] (저장 단계 제외)
+    input_data = Column(JSON)  # 분석 입력 종목 데이터 (StockData)
+    delta_source_id = Column(Integer)  # 델타 재분석 시 섹션을 이어받은 이전 분석 ID
+    raw_response = Column(LargeBinary)  # LLM 원본 응답 (zlib 압축, 재파싱/재생용)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     def __repr__(self):
@@ -3,15 +3,27 @@
 AI 생성 주식 분석 결과를 조회하고 생성하는 엔드포인트 제공
 """
 import re
+import json
 import logging
-from typing import Annotated
+from typing import Annotated, Any, AsyncIterator, Dict
 from fastapi import APIRouter, Depends, Query, HTTPException, Body, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.config import settings
 from app.models.stock_insight import StockInsight
+from app.models.analysis_job import AnalysisJob
+from app.services.analysis_jobs import analysis_job_queue
+from app.services.llm_resilience import LLMUnavailableError
+from app.services.deadline import DeadlineExceeded, set_deadline
+from app.services.llm_admission import (
+    AdmissionContext,
+    AdmissionRejected,
+    admission_context,
+    priority_for,
+)
 from app.services.payment_service import payment_service
 from app.schemas.analysis import (
     StockAnalysisRequest,
@@ -19,6 +31,8 @@ from app.schemas.analysis import (
     StockInsightListResponse,
     StockInsightSummary,
     AnalysisTriggerResponse,
+    AnalysisJobResponse,
+    AnalysisJobStatus,
     InvestmentTimeframe,
     RiskAnalysis,
     MarketOverview,
@@ -113,6 +127,61 @@ def _build_summary(insight: StockInsight) -> StockInsightSummary:
     )
 
 
+def _verify_payment(merchant_uid: str | None) -> bool:
+    """
+    분석 요청 결제 검증
+
+    Returns:
+        결제 검증 여부 (결제 미설정 또는 데모 모드면 False)
+
+    Raises:
+        HTTPException 402: 결제 정보 없음
+    """
+    # 데모 모드 확인 (마케팅/테스트용)
+    demo_mode = settings.ENVIRONMENT == "demo"
+
+    # 결제 검증 (PortOne이 설정된 경우, 데모 모드가 아닐 때만)
+    if payment_service.is_configured() and not demo_mode:
+        if not merchant_uid:
+            raise HTTPException(
+                status_code=402,
+                detail="결제가 필요합니다. 먼저 결제를 진행해주세요."
+            )
+
+        expectation = payment_service.get_expectation(merchant_uid)
+        if not expectation or expectation.expected_amount is None:
+            raise HTTPException(
+                status_code=402,
+                detail="결제 정보를 찾을 수 없습니다."
+            )
+
+        logger.info(f"결제 검증 완료: {merchant_uid}")
+        return True
+
+    if demo_mode:
+        logger.info("데모 모드: 결제 검증 건너뜀")
+    return False
+
+
+def _build_job_response(job: AnalysisJob) -> AnalysisJobResponse:
+    """AnalysisJob 모델을 작업 상태 스키마로 변환"""
+    return AnalysisJobResponse(
+        job_id=job.id,
+        status=AnalysisJobStatus(job.status),
+        stock_code=job.stock_code,
+        timeframe=InvestmentTimeframe(job.timeframe),
+        insight_id=job.insight_id,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 메시지 포맷"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.post("/stock", response_model=AnalysisTriggerResponse)
 async def analyze_stock(
     request: StockAnalysisRequest = Body(...),
@@ -135,31 +204,16 @@ async def analyze_stock(
     payment_verified = False
 
     try:
-        # 데모 모드 확인 (마케팅/테스트용)
-        demo_mode = settings.ENVIRONMENT == "demo"
-
-        # 결제 검증 (PortOne이 설정된 경우, 데모 모드가 아닐 때만)
-        if payment_service.is_configured() and not demo_mode:
-            if not merchant_uid:
-                raise HTTPException(
-                    status_code=402,
-                    detail="결제가 필요합니다. 먼저 결제를 진행해주세요."
-                )
-
-            expectation = payment_service.get_expectation(merchant_uid)
-            if not expectation or expectation.expected_amount is None:
-                raise HTTPException(
-                    status_code=402,
-                    detail="결제 정보를 찾을 수 없습니다."
-                )
-
-            payment_verified = True
-            logger.info(f"결제 검증 완료: {merchant_uid}")
-        elif demo_mode:
-            logger.info("데모 모드: 결제 검증 건너뜀")
+        payment_verified = _verify_payment(merchant_uid)
 
         from app.services.stock_insight_engine import stock_insight_engine
 
+        # LLM 대기열 우선순위 (결제 > 일반 > 데모) 및 과부하 시 조기 거절
+        admission_context.set(AdmissionContext(priority=priority_for(payment_verified)))
+        stock_insight_engine.check_admission()
+        # 요청 처리 시간 예산 (심볼 변환, 데이터 수집, LLM 호출, 저장이 남은 예산을 나눠 사용)
+        set_deadline(settings.ANALYSIS_REQUEST_DEADLINE_SECONDS)
+
         insight = await stock_insight_engine.generate_insight(
             stock_code=request.stock_code,
             timeframe=request.timeframe.value,
@@ -195,6 +249,33 @@ async def analyze_stock(
 
     except HTTPException:
         raise
+    except AdmissionRejected as e:
+        # 대기열 과부하 - 분석을 시작하지 않았거나 LLM 호출 전 거절
+        if payment_verified and merchant_uid:
+            logger.warning(f"LLM 대기열 과부하로 거절 - 재시도 필요: {merchant_uid}, 종목: {request.stock_code}")
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except LLMUnavailableError as e:
+        # 모든 프로바이더 회로 차단 - 복구 후 재시도 안내
+        if payment_verified and merchant_uid:
+            logger.error(f"LLM 사용 불가 - 수동 환불 필요: {merchant_uid}, 종목: {request.stock_code}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"{str(e)} 환불은 고객센터로 문의해주세요.",
+            headers={"Retry-After": str(settings.LLM_CIRCUIT_BREAKER_RECOVERY_MINUTES * 60)},
+        )
+    except DeadlineExceeded as e:
+        # 요청 처리 시간 예산 초과 - 남은 단계를 진행하지 않고 즉시 실패
+        if payment_verified and merchant_uid:
+            logger.error(f"처리 시간 초과 - 수동 환불 필요: {merchant_uid}, 종목: {request.stock_code}, 단계: {e.stage}")
+        logger.warning(f"주식 분석 시간 초과: {request.stock_code} - {str(e)}")
+        raise HTTPException(
+            status_code=504,
+            detail=f"분석 처리 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.{' 환불은 고객센터로 문의해주세요.' if payment_verified else ''}",
+        )
     except Exception as e:
         # 예외 발생 시 로깅 (환불은 수동 처리)
         if payment_verified and merchant_uid:
@@ -207,6 +288,168 @@ async def analyze_stock(
         )
 
 
+@router.post("/stock/stream")
+async def analyze_stock_stream(
+    request: StockAnalysisRequest = Body(...),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    주식 딥리서치 분석 실행 (SSE 스트리밍)
+
+    - **stock_code**: 종목코드 또는 회사명 (예: AAPL, 삼성전자, 005930.KS)
+    - **timeframe**: 투자 기간 (short, mid, long)
+    - **merchant_uid**: PortOne 주문 고유번호 (결제 검증용)
+
+    `/stock`과 동일한 분석을 수행하되, 진행 단계와 AI 응답을 생성되는 즉시
+    text/event-stream으로 전달합니다.
+
+    이벤트 종류:
+    - **stage**: 진행 단계 (fetching_data, calling_llm, parsing, saving)
+    - **delta**: AI 응답 텍스트 조각
+    - **field**: 완성되어 검증된 분석 필드 (name, value; 예: recommendation, risk_score, key_summary)
+    - **done**: 분석 완료 (AnalysisTriggerResponse와 동일한 필드)
+    - **error**: 분석 실패 (detail)
+    """
+    merchant_uid = request.merchant_uid
+
+    # 결제 검증은 스트림 시작 전에 수행 (실패 시 일반 HTTP 오류 응답)
+    payment_verified = _verify_payment(merchant_uid)
+    refund_notice = " 환불은 고객센터로 문의해주세요." if payment_verified else ""
+
+    from app.services.stock_insight_engine import stock_insight_engine
+
+    # 과부하 시 스트림 시작 전 503 응답
+    priority = priority_for(payment_verified)
+    admission_context.set(AdmissionContext(priority=priority))
+    try:
+        stock_insight_engine.check_admission()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        # 스트림은 별도 태스크에서 실행될 수 있으므로 입장 조건과 처리 시간 예산을 다시 설정
+        admission_context.set(AdmissionContext(priority=priority))
+        set_deadline(settings.ANALYSIS_REQUEST_DEADLINE_SECONDS)
+        try:
+            async for event in stock_insight_engine.generate_insight_stream(
+                stock_code=request.stock_code,
+                timeframe=request.timeframe.value,
+                user_id=user_id
+            ):
+                if event["event"] == "done":
+                    insight = event["data"]["insight"]
+                    logger.info(
+                        f"주식 분석 완료 (스트리밍): {insight.stock_code} ({insight.stock_name}), "
+                        f"추천: {insight.recommendation}"
+                    )
+                    response = AnalysisTriggerResponse(
+                        message="분석이 성공적으로 완료되었습니다",
+                        insight_id=insight.id,
+                        stock_code=insight.stock_code,
+                        stock_name=insight.stock_name,
+                        recommendation=insight.recommendation,
+                    )
+                    yield _sse("done", response.model_dump())
+                elif event["event"] == "error":
+                    if payment_verified and merchant_uid:
+                        logger.error(f"분석 실패 - 수동 환불 필요: {merchant_uid}, 종목: {request.stock_code}")
+                    yield _sse("error", {
+                        "detail": f"종목 '{request.stock_code}'을(를) 찾을 수 없거나 분석에 실패했습니다.{refund_notice}"
+                    })
+                else:
+                    yield _sse(event["event"], event["data"])
+
+        except DeadlineExceeded as e:
+            if payment_verified and merchant_uid:
+                logger.error(f"처리 시간 초과 - 수동 환불 필요: {merchant_uid}, 종목: {request.stock_code}, 단계: {e.stage}")
+            logger.warning(f"주식 분석 시간 초과 (스트리밍): {request.stock_code} - {str(e)}")
+            yield _sse("error", {"detail": f"분석 처리 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.{refund_notice}"})
+        except Exception as e:
+            if payment_verified and merchant_uid:
+                logger.error(f"분석 중 예외 발생 - 수동 환불 필요: {merchant_uid}, 종목: {request.stock_code}, 오류: {str(e)}")
+
+            logger.error(f"주식 분석 실패 (스트리밍): {request.stock_code} - {str(e)}")
+            yield _sse("error", {"detail": f"분석 중 오류가 발생했습니다: {str(e)}.{refund_notice}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 프록시 버퍼링 비활성화
+        },
+    )
+
+
+@router.post("/jobs", response_model=AnalysisJobResponse, status_code=202)
+async def create_analysis_job(
+    request: StockAnalysisRequest = Body(...),
+    user_id: str = Depends(get_user_id),
+):
+    """
+    주식 딥리서치 분석 작업 등록 (비동기)
+
+    - **stock_code**: 종목코드 또는 회사명 (예: AAPL, 삼성전자, 005930.KS)
+    - **timeframe**: 투자 기간 (short, mid, long)
+    - **merchant_uid**: PortOne 주문 고유번호 (결제 검증용)
+
+    결제를 검증한 뒤 분석 작업을 대기열에 넣고 작업 ID를 즉시 반환합니다.
+    진행 상태와 결과는 `GET /jobs/{job_id}`로 조회합니다.
+    """
+    payment_verified = _verify_payment(request.merchant_uid)
+
+    try:
+        job = await analysis_job_queue.enqueue(
+            user_id=user_id,
+            stock_code=request.stock_code,
+            timeframe=request.timeframe.value,
+            merchant_uid=request.merchant_uid if payment_verified else None,
+        )
+        return _build_job_response(job)
+
+    except Exception as e:
+        if payment_verified:
+            logger.error(f"분석 작업 등록 실패 - 수동 환불 필요: {request.merchant_uid}, 오류: {str(e)}")
+        logger.error(f"분석 작업 등록 실패: {request.stock_code} - {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"분석 작업 등록 중 오류가 발생했습니다: {str(e)}. 환불은 고객센터로 문의해주세요."
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(
+    job_id: str,
+    user_id: str = Depends(get_user_id),
+):
+    """
+    분석 작업 상태 조회
+
+    - **job_id**: 작업 ID
+
+    상태: queued, fetching_data, calling_llm, parsing, done, failed.
+    완료(done) 시 insight_id로 분석 결과를 조회합니다.
+    사용자 본인의 작업만 조회 가능합니다.
+    """
+    try:
+        job = await analysis_job_queue.get(job_id, user_id)
+    except Exception as e:
+        logger.error(f"분석 작업 조회 실패: {job_id} - {str(e)}")
+        raise HTTPException(status_code=500, detail=f"분석 작업 조회 중 오류가 발생했습니다: {str(e)}")
+
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=f"분석 작업 {job_id}를 찾을 수 없습니다"
+        )
+
+    return _build_job_response(job)
+
+
 @router.get("/latest", response_model=StockInsightResponse)
 async def get_latest_analysis(
     stock_code: str = Query(..., description="종목코드 (예: AAPL, 005930.KS)"),
@@ -7,6 +7,7 @@ from app.schemas.analysis import (
     ConfidenceLevel,
     MarketSentiment,
     InvestmentTimeframe,
+    AnalysisJobStatus,
     # Requests
     StockAnalysisRequest,
     # Responses
@@ -19,6 +20,7 @@ from app.schemas.analysis import (
     StockInsightListResponse,
     StockInsightSummary,
     AnalysisTriggerResponse,
+    AnalysisJobResponse,
 )
 
 __all__ = [
@@ -27,6 +29,7 @@ __all__ = [
     "ConfidenceLevel",
     "MarketSentiment",
     "InvestmentTimeframe",
+    "AnalysisJobStatus",
     # Requests
     "StockAnalysisRequest",
     # Responses
@@ -39,4 +42,5 @@ __all__ = [
     "StockInsightListResponse",
     "StockInsightSummary",
     "AnalysisTriggerResponse",
+    "AnalysisJobResponse",
 ]
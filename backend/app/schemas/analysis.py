@@ -38,6 +38,16 @@ class InvestmentTimeframe(str, Enum):
     LONG = "long"     # 장기 (1년+)
 
 
+class AnalysisJobStatus(str, Enum):
+    """비동기 분석 작업 상태"""
+    QUEUED = "queued"                # 대기
+    FETCHING_DATA = "fetching_data"  # 주식 데이터 수집
+    CALLING_LLM = "calling_llm"      # AI 분석 호출
+    PARSING = "parsing"              # 응답 파싱/저장
+    DONE = "done"                    # 완료
+    FAILED = "failed"                # 실패
+
+
 # Request Schemas
 class StockAnalysisRequest(BaseModel):
     """주식 분석 요청"""
@@ -167,3 +177,15 @@ class AnalysisTriggerResponse(BaseModel):
     stock_code: str
     stock_name: str
     recommendation: str
+
+
+class AnalysisJobResponse(BaseModel):
+    """비동기 분석 작업 상태 응답"""
+    job_id: str
+    status: AnalysisJobStatus
+    stock_code: str
+    timeframe: InvestmentTimeframe
+    insight_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,207 @@
+"""
+공유 분석 결과 캐시
+
+- 같은 종목/투자 기간/프롬프트 버전/입력 데이터로 생성된 최근 분석을 사용자 간 재사용
+- 캐시 저장소는 stock_insights 테이블 자체 (여러 프로세스가 별도 저장소 없이 공유)
+- 적중 시 LLM 호출 없이 요청 사용자 소유의 새 StockInsight로 복제
+- ANALYSIS_CACHE_TTL 이내에 생성된 분석만 사용 (0이면 비활성화)
+"""
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import asdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, desc
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.stock_insight import StockInsight
+from app.services.prompts import PROMPT_VERSION
+from app.services.response_parser import DEFAULT_STOCK_ANALYSIS
+from app.services.stock_data_service import StockData
+
+logger = logging.getLogger(__name__)
+
+# 지문 계산 시 실수 반올림 자릿수 (부동소수점 표현 차이로 캐시가 갈라지지 않도록)
+FINGERPRINT_FLOAT_DIGITS = 4
+
+# 복제 대상 분석 필드 (LLM 생성 결과)
+ANALYSIS_FIELDS = (
+    "deep_research",
+    "recommendation",
+    "confidence_level",
+    "recommendation_reason",
+    "risk_score",
+    "risk_analysis",
+    "market_overview",
+    "market_sentiment",
+    "sentiment_details",
+    "key_summary",
+    "current_drivers",
+    "future_catalysts",
+    "ai_model",
+)
+
+# 파싱 실패로 기본값이 저장된 분석 (공유 캐시 원본에서 제외)
+PLACEHOLDER_DEEP_RESEARCH = DEFAULT_STOCK_ANALYSIS["deep_research"]
+
+
+def fingerprint_stock_data(stock_data: StockData, timeframe: str, prompt_version: str = PROMPT_VERSION) -> str:
+    """
+    분석 입력 지문 계산
+
+    프롬프트에 들어가는 종목 데이터, 투자 기간, 프롬프트 버전이 모두 같으면 같은 지문을 반환합니다.
+    """
+    values: Dict[str, Any] = {}
+    for key, value in asdict(stock_data).items():
+        if isinstance(value, float):
+            value = round(value, FINGERPRINT_FLOAT_DIGITS)
+        values[key] = value
+
+    payload = json.dumps(
+        {"prompt_version": prompt_version, "timeframe": timeframe, "stock_data": values},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    """DB 시각을 UTC aware datetime으로 변환 (SQLite는 naive UTC로 반환)"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class AnalysisResultCache:
+    """stock_insights 테이블 기반 공유 분석 결과 캐시"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, ttl_seconds: Optional[int] = None):
+        self._session_factory = session_factory
+        self._ttl_seconds = ttl_seconds
+        # 적중률/절약 시간 통계
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._saved_ms = 0
+
+    @property
+    def ttl_seconds(self) -> int:
+        """캐시 TTL (생성자 인자 우선, 없으면 settings)"""
+        return self._ttl_seconds if self._ttl_seconds is not None else settings.ANALYSIS_CACHE_TTL
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    async def lookup(self, symbol: str, timeframe: str, fingerprint: str) -> Optional[StockInsight]:
+        """
+        TTL 이내의 같은 입력 분석 조회 (파싱 실패로 기본값이 저장된 분석, 델타 재분석 제외)
+
+        Returns:
+            원본 StockInsight 또는 None
+        """
+        if not self.enabled:
+            return None
+
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(StockInsight)
+                .where(
+                    StockInsight.stock_code == symbol,
+                    StockInsight.timeframe == timeframe,
+                    StockInsight.prompt_version == PROMPT_VERSION,
+                    StockInsight.input_fingerprint == fingerprint,
+                    StockInsight.deep_research != PLACEHOLDER_DEEP_RESEARCH,
+                    StockInsight.delta_source_id.is_(None),
+                )
+                .order_by(desc(StockInsight.created_at))
+                .limit(1)
+            )
+            source = result.scalar_one_or_none()
+
+        if source is not None and source.created_at is not None:
+            age = datetime.now(timezone.utc) - _as_utc(source.created_at)
+            if age > timedelta(seconds=self.ttl_seconds):
+                source = None
+
+        if source is None:
+            with self._lock:
+                self._misses += 1
+        return source
+
+    async def latest(self, symbol: str, timeframe: str, max_age_seconds: float) -> Optional[StockInsight]:
+        """입력 데이터와 무관하게 max_age_seconds 이내의 같은 종목/투자 기간 최신 분석 조회 (기본값 분석, 델타 재분석 제외)"""
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(StockInsight)
+                .where(
+                    StockInsight.stock_code == symbol,
+                    StockInsight.timeframe == timeframe,
+                    StockInsight.prompt_version == PROMPT_VERSION,
+                    StockInsight.created_at >= datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds),
+                    StockInsight.deep_research != PLACEHOLDER_DEEP_RESEARCH,
+                    StockInsight.delta_source_id.is_(None),
+                )
+                .order_by(desc(StockInsight.created_at))
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    def clone_for_user(
+        self,
+        source: StockInsight,
+        stock_data: StockData,
+        user_id: str,
+        fingerprint: str,
+        processing_time_ms: int,
+    ) -> StockInsight:
+        """캐시된 분석을 요청 사용자 소유의 새 StockInsight로 복제"""
+        clone = StockInsight(
+            user_id=user_id,
+            stock_code=source.stock_code,
+            stock_name=stock_data.name,
+            market=source.market,
+            timeframe=source.timeframe,
+            current_price=source.current_price,
+            price_change_1d=source.price_change_1d,
+            price_change_1w=source.price_change_1w,
+            price_change_1m=source.price_change_1m,
+            processing_time_ms=processing_time_ms,
+            prompt_version=PROMPT_VERSION,
+            input_fingerprint=fingerprint,
+            input_data=asdict(stock_data),
+            **{field: getattr(source, field) for field in ANALYSIS_FIELDS},
+        )
+
+        saved_ms = max((source.processing_time_ms or 0) - processing_time_ms, 0)
+        with self._lock:
+            self._hits += 1
+            self._saved_ms += saved_ms
+
+        logger.info(
+            f"분석 캐시 적중: {source.stock_code} ({source.timeframe}), "
+            f"원본 ID={source.id}, 절약 시간={saved_ms}ms"
+        )
+        return clone
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중률 및 절약 시간 통계"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "saved_ms": self._saved_ms,
+            }
+
+
+# 싱글톤 인스턴스
+analysis_result_cache = AnalysisResultCache()
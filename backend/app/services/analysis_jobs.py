@@ -0,0 +1,391 @@
+"""
+비동기 주식 분석 작업 큐
+
+- 분석 요청을 DB(analysis_jobs)에 저장하고 작업 ID를 즉시 반환
+- 프로세스별 제한된 워커 풀이 대기 작업을 점유하여 generate_insight 실행
+- 점유는 조건부 UPDATE(status='queued')로 수행하여 여러 프로세스가 같은 DB를 폴링해도 한 번만 실행
+- 실행 중에는 주기적으로 heartbeat를 기록하여 LLM 대기가 길어도 멈춘 작업으로 회수되지 않음
+- 진행 상태로 멈춘 작업(워커 비정상 종료)은 주기적으로 회수하여 재시도
+- 회수되어 점유를 잃은 실행은 즉시 중단 (같은 작업의 중복 LLM 호출/분석 저장 방지)
+"""
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.analysis_job import AnalysisJob
+from app.services.llm_admission import AdmissionContext, admission_context, priority_for
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태 (AnalysisJobStatus 스키마와 동일)
+JOB_QUEUED = "queued"
+JOB_FETCHING_DATA = "fetching_data"
+JOB_CALLING_LLM = "calling_llm"
+JOB_PARSING = "parsing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+ACTIVE_STATUSES = (JOB_FETCHING_DATA, JOB_CALLING_LLM, JOB_PARSING)
+MAX_CLAIM_RETRIES = 5  # 다른 워커와 점유 경합 시 재시도 횟수
+STALE_CHECK_INTERVAL_SECONDS = 60  # 멈춘 작업 회수 주기
+HEARTBEAT_FRACTION = 4  # 멈춘 작업 판정 시간의 1/4마다 heartbeat 기록
+
+
+class JobOwnershipLost(Exception):
+    """실행 중인 작업이 회수되어 다른 워커에 넘어감"""
+
+
+class AnalysisJobQueue:
+    """DB 기반 비동기 분석 작업 큐 및 워커 풀"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        workers: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        stale_minutes: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        heartbeat_seconds: Optional[float] = None,
+    ):
+        self._session_factory = session_factory
+        self.workers = workers if workers is not None else settings.ANALYSIS_JOB_WORKERS
+        self.poll_interval = poll_interval if poll_interval is not None else settings.ANALYSIS_JOB_POLL_INTERVAL_SECONDS
+        self.stale_after = timedelta(
+            minutes=stale_minutes if stale_minutes is not None else settings.ANALYSIS_JOB_STALE_MINUTES
+        )
+        self.max_attempts = max_attempts if max_attempts is not None else settings.ANALYSIS_JOB_MAX_ATTEMPTS
+        self.heartbeat_seconds = (
+            heartbeat_seconds if heartbeat_seconds is not None
+            else self.stale_after.total_seconds() / HEARTBEAT_FRACTION
+        )
+
+        # 워커 식별자: 호스트:PID:일련번호 (점유한 워커만 상태를 갱신)
+        self._worker_prefix = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._worker_seq = itertools.count(1)
+
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        # 이벤트 루프 바인딩 방지를 위해 start()에서 생성
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._last_stale_check: Optional[datetime] = None
+
+    # ------------------------------------------------------------------
+    # 작업 등록/조회
+    # ------------------------------------------------------------------
+
+    async def enqueue(
+        self,
+        user_id: str,
+        stock_code: str,
+        timeframe: str,
+        merchant_uid: Optional[str] = None,
+    ) -> AnalysisJob:
+        """분석 작업 등록 (대기 상태)"""
+        job = AnalysisJob(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            stock_code=stock_code,
+            timeframe=timeframe,
+            merchant_uid=merchant_uid,
+            status=JOB_QUEUED,
+            attempts=0,
+        )
+        async with self._session_factory() as session:
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+
+        logger.info(f"분석 작업 등록: {job.id} ({stock_code}, {timeframe})")
+
+        # 같은 프로세스의 대기 중인 디스패처를 즉시 깨움
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str, user_id: str) -> Optional[AnalysisJob]:
+        """작업 조회 (사용자 본인 작업만)"""
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(AnalysisJob).where(
+                    AnalysisJob.id == job_id,
+                    AnalysisJob.user_id == user_id,
+                )
+            )
+            return result.scalar_one_or_none()
+
+    # ------------------------------------------------------------------
+    # 점유/상태 갱신
+    # ------------------------------------------------------------------
+
+    async def claim_next(self) -> Optional[AnalysisJob]:
+        """
+        가장 오래된 대기 작업 점유
+
+        status='queued' 조건부 UPDATE로 점유하므로 여러 워커/프로세스가
+        같은 작업을 동시에 선택해도 하나만 성공합니다.
+        """
+        worker_id = f"{self._worker_prefix}:{next(self._worker_seq)}"
+
+        async with self._session_factory() as session:
+            for _ in range(MAX_CLAIM_RETRIES):
+                candidate = await session.scalar(
+                    select(AnalysisJob.id)
+                    .where(AnalysisJob.status == JOB_QUEUED)
+                    .order_by(AnalysisJob.created_at, AnalysisJob.id)
+                    .limit(1)
+                )
+                if candidate is None:
+                    return None
+
+                now = datetime.utcnow()
+                result = await session.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id == candidate, AnalysisJob.status == JOB_QUEUED)
+                    .values(
+                        status=JOB_FETCHING_DATA,
+                        worker_id=worker_id,
+                        claimed_at=now,
+                        heartbeat_at=now,
+                        attempts=AnalysisJob.attempts + 1,
+                    )
+                )
+                await session.commit()
+
+                if result.rowcount == 1:
+                    return await session.get(AnalysisJob, candidate, populate_existing=True)
+                # 다른 워커가 먼저 점유함 - 다음 후보 조회
+
+        return None
+
+    async def _update_owned(self, job: AnalysisJob, **values) -> bool:
+        """점유한 워커인 경우에만 작업 갱신 (회수된 작업 덮어쓰기 방지)"""
+        async with self._session_factory() as session:
+            result = await session.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.id == job.id, AnalysisJob.worker_id == job.worker_id)
+                .values(heartbeat_at=datetime.utcnow(), **values)
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+    async def requeue_stale(self) -> int:
+        """
+        진행 상태로 멈춘 작업 회수
+
+        최대 실행 횟수 미만이면 대기 상태로 되돌리고, 초과하면 실패 처리합니다.
+
+        Returns:
+            회수한 작업 수
+        """
+        cutoff = datetime.utcnow() - self.stale_after
+        stale = (
+            AnalysisJob.status.in_(ACTIVE_STATUSES),
+            AnalysisJob.heartbeat_at < cutoff,
+        )
+
+        async with self._session_factory() as session:
+            failed = await session.execute(
+                update(AnalysisJob)
+                .where(*stale, AnalysisJob.attempts >= self.max_attempts)
+                .values(
+                    status=JOB_FAILED,
+                    error="분석 작업 시간이 초과되었습니다",
+                    finished_at=datetime.utcnow(),
+                )
+            )
+            requeued = await session.execute(
+                update(AnalysisJob)
+                .where(*stale)
+                .values(status=JOB_QUEUED, worker_id=None)
+            )
+            await session.commit()
+
+        count = failed.rowcount + requeued.rowcount
+        if count:
+            logger.warning(f"멈춘 분석 작업 회수: 재시도 {requeued.rowcount}개, 실패 {failed.rowcount}개")
+        return count
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+
+    async def _heartbeat(self, job: AnalysisJob, work: asyncio.Task) -> None:
+        """실행 중 heartbeat 기록, 점유를 잃으면 실행 취소"""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                owned = await self._update_owned(job)
+            except Exception as e:
+                logger.warning(f"분석 작업 heartbeat 기록 실패: {job.id} - {e}")
+                continue
+            if not owned:
+                logger.warning(f"분석 작업이 회수됨 - 실행 중단: {job.id}")
+                work.cancel()
+                return
+
+    async def run_job(self, job: AnalysisJob) -> None:
+        """점유한 작업 실행 (generate_insight 호출 및 결과 기록, 점유를 잃으면 중단)"""
+        from app.services.stock_insight_engine import stock_insight_engine
+
+        async def on_stage(stage: str) -> None:
+            if not await self._update_owned(job, status=stage):
+                raise JobOwnershipLost(job.id)
+
+        # 비동기 작업은 LLM 대기열에서 거절하지 않고 기다림 (결제 작업 우선)
+        admission_context.set(AdmissionContext(priority=priority_for(bool(job.merchant_uid)), max_wait=-1))
+
+        work = asyncio.create_task(stock_insight_engine.generate_insight(
+            stock_code=job.stock_code,
+            timeframe=job.timeframe,
+            user_id=job.user_id,
+            on_stage=on_stage,
+        ))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work))
+        try:
+            insight = await work
+        except JobOwnershipLost:
+            logger.warning(f"점유를 잃은 분석 작업 중단: {job.id}")
+            return
+        except asyncio.CancelledError:
+            # heartbeat가 점유 상실로 취소한 경우만 조용히 종료 (stop()에 의한 취소는 전파)
+            if not (heartbeat.done() and not heartbeat.cancelled()):
+                raise
+            return
+        except Exception as e:
+            if job.merchant_uid:
+                logger.error(f"분석 작업 예외 발생 - 수동 환불 필요: {job.merchant_uid}, 작업: {job.id}, 오류: {str(e)}")
+            logger.error(f"분석 작업 실패: {job.id} - {str(e)}")
+            await self._update_owned(
+                job,
+                status=JOB_FAILED,
+                error=f"분석 중 오류가 발생했습니다: {str(e)}",
+                finished_at=datetime.utcnow(),
+            )
+            return
+        finally:
+            heartbeat.cancel()
+            work.cancel()
+
+        if not insight:
+            if job.merchant_uid:
+                logger.error(f"분석 작업 실패 - 수동 환불 필요: {job.merchant_uid}, 종목: {job.stock_code}")
+            await self._update_owned(
+                job,
+                status=JOB_FAILED,
+                error=f"종목 '{job.stock_code}'을(를) 찾을 수 없거나 분석에 실패했습니다",
+                finished_at=datetime.utcnow(),
+            )
+            return
+
+        if not await self._update_owned(
+            job,
+            status=JOB_DONE,
+            insight_id=insight.id,
+            finished_at=datetime.utcnow(),
+        ):
+            logger.warning(f"회수된 분석 작업의 완료 기록 생략: {job.id} (insight ID: {insight.id})")
+            return
+        logger.info(f"분석 작업 완료: {job.id} (insight ID: {insight.id})")
+
+    async def _run_and_release(self, job: AnalysisJob) -> None:
+        """작업 실행 후 워커 슬롯 반환"""
+        try:
+            await self.run_job(job)
+        except Exception as e:
+            logger.error(f"분석 작업 처리 오류: {job.id} - {e}", exc_info=True)
+        finally:
+            self._slots.release()
+            # 슬롯이 비었으므로 대기 작업을 바로 확인
+            self._wakeup.set()
+
+    async def _maybe_requeue_stale(self) -> None:
+        """주기적으로 멈춘 작업 회수"""
+        now = datetime.utcnow()
+        if self._last_stale_check and (now - self._last_stale_check).total_seconds() < STALE_CHECK_INTERVAL_SECONDS:
+            return
+        self._last_stale_check = now
+        try:
+            await self.requeue_stale()
+        except Exception as e:
+            logger.error(f"멈춘 분석 작업 회수 실패: {e}")
+
+    async def _dispatch_loop(self) -> None:
+        """빈 워커 슬롯마다 대기 작업을 점유하여 실행"""
+        while True:
+            await self._slots.acquire()
+
+            job = None
+            try:
+                await self._maybe_requeue_stale()
+                job = await self.claim_next()
+            except Exception as e:
+                logger.error(f"분석 작업 점유 실패: {e}")
+
+            if job is None:
+                self._slots.release()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            task = asyncio.create_task(self._run_and_release(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """워커 풀 시작 (workers가 0이면 작업 등록만 가능)"""
+        if self.workers <= 0:
+            logger.info("분석 작업 워커 비활성화 (ANALYSIS_JOB_WORKERS=0)")
+            return None
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return self._dispatcher
+
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        logger.info(f"분석 작업 워커 시작: {self.workers}개")
+        return self._dispatcher
+
+    async def stop(self) -> None:
+        """워커 풀 종료 (실행 중인 작업은 대기 상태로 되돌려 다른 프로세스가 이어서 처리)"""
+        tasks = list(self._running)
+        if self._dispatcher is not None:
+            tasks.append(self._dispatcher)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+
+        try:
+            async with self._session_factory() as session:
+                result = await session.execute(
+                    update(AnalysisJob)
+                    .where(
+                        AnalysisJob.status.in_(ACTIVE_STATUSES),
+                        AnalysisJob.worker_id.like(f"{self._worker_prefix}:%"),
+                    )
+                    .values(status=JOB_QUEUED, worker_id=None)
+                )
+                await session.commit()
+            if result.rowcount:
+                logger.info(f"실행 중이던 분석 작업 {result.rowcount}개를 대기 상태로 반환")
+        except Exception as e:
+            logger.error(f"분석 작업 반환 실패: {e}")
+
+
+# 싱글톤 인스턴스
+analysis_job_queue = AnalysisJobQueue()
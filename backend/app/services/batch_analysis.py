@@ -0,0 +1,374 @@
+"""
+오프라인 일괄 분석 (프로바이더 Batch API)
+
+인기 종목 야간 갱신처럼 응답 지연이 중요하지 않은 분석을 Batch API로 처리합니다.
+(동기 API 대비 약 50% 비용, 결과는 최대 24시간 내 반환)
+
+- 종목 목록의 주식 데이터를 수집하고 get_stock_analysis_user_prompt로 프롬프트 생성
+- OpenAI(/v1/batches) 또는 Anthropic(/v1/messages/batches)에 일괄 제출
+- 완료될 때까지 폴링 후 결과를 파싱하여 stock_insights에 한 번에 저장
+- 저장된 분석은 배치 사용자(ANALYSIS_BATCH_USER_ID) 소유이며,
+  입력 지문이 같은 사용자 요청은 공유 분석 캐시(analysis_result_cache)로 재사용
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.stock_insight import StockInsight
+from app.services.analysis_cache import fingerprint_stock_data
+from app.services.llm_usage import TokenUsage, token_usage_stats, usage_from_response
+from app.services.prompts import STOCK_ANALYSIS_SYSTEM_PROMPT
+from app.services.response_parser import is_valid_stock_analysis_response, parse_stock_analysis_response
+from app.services.stock_data_service import StockData, stock_data_service
+from app.services.stock_insight_engine import StockInsightEngine, stock_insight_engine
+
+logger = logging.getLogger(__name__)
+
+# OpenAI 배치 종료 상태 (completed 외에는 실패)
+OPENAI_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchFailedError(Exception):
+    """배치가 실패/만료/취소되었거나 제한 시간 내에 끝나지 않음"""
+
+
+@dataclass
+class BatchRequest:
+    """배치 요청 1건 (종목 1개)"""
+    custom_id: str
+    stock_data: StockData
+    timeframe: str
+    fingerprint: str
+    user_prompt: str
+    max_tokens: int
+
+
+@dataclass
+class BatchResult:
+    """배치 결과 1건"""
+    custom_id: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    usage: TokenUsage = field(default_factory=TokenUsage)
+
+
+@dataclass
+class BatchReport:
+    """일괄 분석 실행 결과"""
+    provider: str
+    batch_id: Optional[str] = None
+    submitted: int = 0
+    insight_ids: List[int] = field(default_factory=list)
+    not_found: List[str] = field(default_factory=list)  # 주식 데이터를 찾지 못한 종목
+    failed: Dict[str, str] = field(default_factory=dict)  # 종목코드 -> 실패 사유
+    elapsed_seconds: float = 0.0
+
+
+class _Attrs:
+    """JSONL usage 딕셔너리를 SDK usage 객체처럼 속성으로 접근"""
+
+    def __init__(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            setattr(self, key, _Attrs(value) if isinstance(value, dict) else value)
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API (/v1/chat/completions 요청 JSONL 업로드)"""
+
+    provider = "openai"
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+
+    def _line(self, request: BatchRequest) -> str:
+        return json.dumps({
+            "custom_id": request.custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": STOCK_ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": request.user_prompt},
+                ],
+                "max_completion_tokens": request.max_tokens,
+                "response_format": {"type": "json_object"},
+            },
+        }, ensure_ascii=False)
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        payload = "\n".join(self._line(request) for request in requests).encode("utf-8")
+        input_file = await self.client.files.create(
+            file=("stock_analysis_batch.jsonl", payload),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def is_done(self, batch_id: str) -> bool:
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status not in OPENAI_TERMINAL_STATUSES:
+            return False
+        if batch.status != "completed":
+            raise BatchFailedError(f"OpenAI 배치 {batch_id} 종료 상태: {batch.status}")
+        return True
+
+    async def results(self, batch_id: str) -> List[BatchResult]:
+        batch = await self.client.batches.retrieve(batch_id)
+        results: List[BatchResult] = []
+        # 성공 응답(output_file)과 요청 단위 오류(error_file)를 모두 수집
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if line.strip():
+                    results.append(self._parse_line(json.loads(line)))
+        return results
+
+    def _parse_line(self, line: Dict[str, Any]) -> BatchResult:
+        result = BatchResult(custom_id=line["custom_id"])
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or response.get("body", {}).get("error") or {}
+            result.error = error.get("message") or f"HTTP {response.get('status_code')}"
+            return result
+
+        body = response["body"]
+        result.text = body["choices"][0]["message"]["content"]
+        usage = _Attrs(body.get("usage") or {})
+        result.usage.add(*usage_from_response(self.provider, usage))
+        return result
+
+
+class AnthropicBatchBackend:
+    """Anthropic Message Batches API"""
+
+    provider = "anthropic"
+
+    def __init__(self, client, model: str):
+        self.client = client
+        self.model = model
+
+    async def submit(self, requests: List[BatchRequest]) -> str:
+        batch = await self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request.custom_id,
+                    "params": {
+                        "model": self.model,
+                        "max_tokens": request.max_tokens,
+                        # 배치 안에서도 고정 시스템 프롬프트 캐시 적용
+                        "system": StockInsightEngine._anthropic_system(STOCK_ANALYSIS_SYSTEM_PROMPT),
+                        "messages": [{"role": "user", "content": request.user_prompt}],
+                    },
+                }
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    async def is_done(self, batch_id: str) -> bool:
+        batch = await self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def results(self, batch_id: str) -> List[BatchResult]:
+        results: List[BatchResult] = []
+        async for entry in await self.client.messages.batches.results(batch_id):
+            result = BatchResult(custom_id=entry.custom_id)
+            if entry.result.type == "succeeded":
+                message = entry.result.message
+                result.text = message.content[0].text
+                result.usage.add(*usage_from_response(self.provider, message.usage))
+            elif entry.result.type == "errored":
+                result.error = entry.result.error.error.message
+            else:
+                result.error = entry.result.type  # canceled, expired
+            results.append(result)
+        return results
+
+
+class BatchAnalysisRunner:
+    """종목 목록 일괄 분석 실행"""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        poll_interval: Optional[float] = None,
+        timeout_hours: Optional[float] = None,
+        user_id: Optional[str] = None,
+    ):
+        self._session_factory = session_factory
+        self.poll_interval = poll_interval if poll_interval is not None else settings.ANALYSIS_BATCH_POLL_INTERVAL_SECONDS
+        self.timeout_seconds = (timeout_hours if timeout_hours is not None else settings.ANALYSIS_BATCH_TIMEOUT_HOURS) * 3600
+        self.user_id = user_id or settings.ANALYSIS_BATCH_USER_ID
+
+    @staticmethod
+    def create_backend(provider: Optional[str] = None):
+        """엔진에 설정된 클라이언트로 배치 백엔드 생성"""
+        provider = provider or stock_insight_engine.primary_provider
+        client, model = stock_insight_engine._provider_client(provider)
+        if client is None or provider not in ("openai", "anthropic"):
+            raise ValueError(f"배치를 지원하는 LLM 클라이언트가 없습니다: {provider}")
+        if provider == "anthropic":
+            return AnthropicBatchBackend(client, model)
+        return OpenAIBatchBackend(client, model)
+
+    async def prepare(self, symbols: Iterable[str], timeframe: str) -> tuple[List[BatchRequest], List[str]]:
+        """
+        주식 데이터 수집 및 요청 생성 (동시 수집 수 ANALYSIS_BATCH_FETCH_CONCURRENCY)
+
+        Returns:
+            (요청 목록, 데이터를 찾지 못한 종목 목록)
+        """
+        semaphore = asyncio.Semaphore(max(settings.ANALYSIS_BATCH_FETCH_CONCURRENCY, 1))
+
+        async def fetch(symbol: str) -> Optional[StockData]:
+            async with semaphore:
+                try:
+                    return await stock_data_service.get_stock_data(symbol)
+                except Exception as e:
+                    logger.warning(f"배치 주식 데이터 수집 실패: {symbol} - {e}")
+                    return None
+
+        symbols = list(dict.fromkeys(symbols))  # 순서 유지 중복 제거
+        stock_data_list = await asyncio.gather(*(fetch(symbol) for symbol in symbols))
+
+        requests: List[BatchRequest] = []
+        not_found: List[str] = []
+        seen = set()
+        for symbol, stock_data in zip(symbols, stock_data_list):
+            if stock_data is None:
+                not_found.append(symbol)
+                continue
+            # 회사명/코드가 같은 종목으로 해석되면 한 번만 요청
+            if stock_data.symbol in seen:
+                continue
+            seen.add(stock_data.symbol)
+            requests.append(BatchRequest(
+                custom_id=f"{len(requests)}-{stock_data.symbol}",
+                stock_data=stock_data,
+                timeframe=timeframe,
+                fingerprint=fingerprint_stock_data(stock_data, timeframe),
+                user_prompt=StockInsightEngine._build_user_prompt(stock_data, timeframe),
+                max_tokens=StockInsightEngine._max_tokens(timeframe),
+            ))
+        return requests, not_found
+
+    async def wait(self, backend, batch_id: str) -> None:
+        """배치 완료 대기"""
+        deadline = time.monotonic() + self.timeout_seconds
+        while not await backend.is_done(batch_id):
+            if time.monotonic() >= deadline:
+                raise BatchFailedError(f"배치 {batch_id} 제한 시간 초과")
+            await asyncio.sleep(self.poll_interval)
+
+    def build_insights(
+        self,
+        backend,
+        requests: List[BatchRequest],
+        results: List[BatchResult],
+        report: BatchReport,
+    ) -> List[StockInsight]:
+        """배치 결과 파싱 (파싱 불가 응답은 저장하지 않고 실패로 기록)"""
+        by_id = {request.custom_id: request for request in requests}
+        insights: List[StockInsight] = []
+        for result in results:
+            request = by_id.get(result.custom_id)
+            if request is None:
+                continue
+            symbol = request.stock_data.symbol
+            token_usage_stats.record(
+                backend.model,
+                result.usage.prompt_tokens,
+                result.usage.completion_tokens,
+                result.usage.cached_tokens,
+            )
+            if result.error:
+                report.failed[symbol] = result.error
+                continue
+            if not is_valid_stock_analysis_response(result.text or ""):
+                report.failed[symbol] = "응답 파싱 실패"
+                continue
+
+            insights.append(StockInsightEngine._build_insight(
+                request.stock_data,
+                request.timeframe,
+                self.user_id,
+                parse_stock_analysis_response(result.text),
+                backend.model,
+                processing_time_ms=0,
+                input_fingerprint=request.fingerprint,
+                usage=result.usage,
+                raw_response=result.text,
+            ))
+
+        returned = {result.custom_id for result in results}
+        for request in requests:
+            if request.custom_id not in returned:
+                report.failed[request.stock_data.symbol] = "결과 없음"
+        return insights
+
+    async def save_all(self, insights: List[StockInsight]) -> List[int]:
+        """분석 결과 일괄 저장 (단일 트랜잭션)"""
+        if not insights:
+            return []
+        async with self._session_factory() as session:
+            session.add_all(insights)
+            await session.commit()
+            return [insight.id for insight in insights]
+
+    async def run(
+        self,
+        symbols: Iterable[str],
+        timeframe: str = "mid",
+        provider: Optional[str] = None,
+        backend=None,
+    ) -> BatchReport:
+        """
+        일괄 분석 실행 (제출 → 완료 대기 → 파싱 → 일괄 저장)
+
+        Args:
+            symbols: 종목코드 또는 회사명 목록
+            timeframe: 투자 기간 (short, mid, long)
+            provider: openai, anthropic (없으면 LLM_PRIMARY_PROVIDER)
+            backend: 배치 백엔드 (테스트/직접 지정용)
+        """
+        started = time.monotonic()
+        backend = backend or self.create_backend(provider)
+        report = BatchReport(provider=backend.provider)
+
+        requests, report.not_found = await self.prepare(symbols, timeframe)
+        if not requests:
+            logger.warning("배치 분석할 종목이 없습니다")
+            return report
+
+        report.batch_id = await backend.submit(requests)
+        report.submitted = len(requests)
+        logger.info(f"배치 분석 제출: {backend.provider} {report.batch_id} ({len(requests)}개 종목, {timeframe})")
+
+        await self.wait(backend, report.batch_id)
+        results = await backend.results(report.batch_id)
+
+        insights = self.build_insights(backend, requests, results, report)
+        report.insight_ids = await self.save_all(insights)
+        report.elapsed_seconds = time.monotonic() - started
+
+        logger.info(
+            f"배치 분석 완료: {report.batch_id} 저장 {len(report.insight_ids)}개, "
+            f"실패 {len(report.failed)}개, 데이터 없음 {len(report.not_found)}개 "
+            f"({report.elapsed_seconds:.0f}초)"
+        )
+        return report
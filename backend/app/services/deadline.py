@@ -0,0 +1,178 @@
+"""
+요청 처리 시간 예산 (deadline) 전파
+
+- 라우터가 분석 요청마다 ANALYSIS_REQUEST_DEADLINE_SECONDS 예산을 ContextVar로 설정
+  (비동기 작업/배치 분석은 기다리는 클라이언트가 없으므로 예산 없음)
+- 각 단계(심볼 변환, 주식 데이터 수집, LLM 호출, 저장)는 남은 예산을 타임아웃으로 사용하고,
+  남은 예산이 단계의 예상 소요 시간보다 적으면 시작하지 않고 DeadlineExceeded로 즉시 실패
+- 선택 단계(부가 종목 정보 조회, 이어쓰기 요청)는 예산이 부족하면 생략 (degrade)
+- 예상 소요 시간은 단계별 지연 히스토그램(/metrics)의 중앙값 (표본이 부족하면 설정 최소값)
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from app.core.config import settings
+from app.services.latency_spans import stage_histograms
+
+T = TypeVar("T")
+
+# 외부 HTTP 호출 기본 타임아웃 (예산이 없거나 더 많이 남은 경우)
+DEFAULT_HTTP_TIMEOUT_SECONDS = 30.0
+# 예상 소요 시간 계산에 필요한 최소 표본 수
+EXPECTED_LATENCY_MIN_SAMPLES = 20
+
+
+class DeadlineExceeded(Exception):
+    """요청 처리 시간 예산 초과 (단계 시작 전 예산 부족 포함)"""
+
+    def __init__(self, stage: str, remaining: float):
+        self.stage = stage
+        self.remaining = remaining
+        super().__init__(f"요청 처리 시간 초과: {stage} 단계 (남은 시간 {max(remaining, 0.0):.1f}초)")
+
+
+@dataclass
+class Deadline:
+    """요청 1건의 처리 기한"""
+    expires_at: float
+    clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    def remaining(self) -> float:
+        return self.expires_at - self.clock()
+
+
+# 현재 요청의 처리 기한 (없으면 예산 제한 없음)
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def _new_deadline(seconds: Optional[float]) -> Optional[Deadline]:
+    return Deadline(time.monotonic() + seconds) if seconds and seconds > 0 else None
+
+
+def set_deadline(seconds: Optional[float]) -> Optional[Deadline]:
+    """현재 컨텍스트(요청 태스크)에 seconds 예산 설정 (None 또는 0 이하면 예산 없음)"""
+    deadline = _new_deadline(seconds)
+    current_deadline.set(deadline)
+    return deadline
+
+
+@contextmanager
+def use_deadline(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """블록 안에서 seconds 예산 적용 (None 또는 0 이하면 예산 없음)"""
+    deadline = _new_deadline(seconds)
+    token = current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """남은 예산 (초, 예산이 없으면 None)"""
+    deadline = current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def expected_seconds(stage: str, minimum: float = 0.0) -> float:
+    """단계 예상 소요 시간 (지연 히스토그램 중앙값과 minimum 중 큰 값)"""
+    observed = stage_histograms.quantile(stage, 0.5, min_samples=EXPECTED_LATENCY_MIN_SAMPLES)
+    return max(observed or 0.0, minimum)
+
+
+def llm_expected_seconds() -> float:
+    """LLM 호출 예상 소요 시간 (LLM 이전 단계가 남겨 두어야 할 예산)"""
+    return expected_seconds("llm", settings.ANALYSIS_DEADLINE_LLM_MIN_SECONDS)
+
+
+def can_afford(seconds: float) -> bool:
+    """남은 예산으로 seconds가 걸리는 작업을 할 수 있는지 (예산이 없으면 True)"""
+    remaining = remaining_budget()
+    return remaining is None or remaining >= seconds
+
+
+def check_deadline(stage: str, expected: float = 0.0) -> Optional[float]:
+    """
+    단계 시작 전 남은 예산 확인
+
+    Returns:
+        남은 예산 (초, 예산이 없으면 None)
+
+    Raises:
+        DeadlineExceeded: 남은 예산이 없거나 expected보다 적음
+    """
+    remaining = remaining_budget()
+    if remaining is not None and (remaining <= 0 or remaining < expected):
+        raise DeadlineExceeded(stage, remaining)
+    return remaining
+
+
+def raise_if_expired(stage: str) -> None:
+    """예산이 다 되었으면 DeadlineExceeded (하위 호출의 타임아웃 오류를 예산 초과로 구분)"""
+    remaining = remaining_budget()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(stage, remaining)
+
+
+def http_timeout(default: float = DEFAULT_HTTP_TIMEOUT_SECONDS) -> float:
+    """외부 HTTP 호출 타임아웃 (기본값과 남은 예산 중 작은 값)"""
+    remaining = remaining_budget()
+    if remaining is None:
+        return default
+    return max(min(default, remaining), 0.001)
+
+
+def _discard(awaitable: Awaitable) -> None:
+    """실행하지 않은 awaitable 정리 (코루틴 미실행 경고 방지)"""
+    if asyncio.iscoroutine(awaitable):
+        awaitable.close()
+    elif isinstance(awaitable, asyncio.Future):
+        awaitable.cancel()
+
+
+async def run_with_deadline(awaitable: Awaitable[T], stage: str, expected: float = 0.0, grace: float = 0.0) -> T:
+    """
+    남은 예산을 타임아웃으로 실행
+
+    Args:
+        expected: 단계 예상 소요 시간 (남은 예산이 이보다 적으면 시작하지 않음)
+        grace: 예산이 다 되어도 허용하는 최소 실행 시간 (이미 비용을 들인 결과 저장 등)
+
+    Raises:
+        DeadlineExceeded: 시작 전 예산 부족 또는 실행 중 예산 소진
+    """
+    remaining = remaining_budget()
+    if remaining is None:
+        return await awaitable
+    if grace <= 0:
+        try:
+            check_deadline(stage, expected)
+        except DeadlineExceeded:
+            _discard(awaitable)
+            raise
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=max(remaining, grace))
+    except asyncio.TimeoutError:
+        # 하위 호출 자체의 타임아웃은 그대로 전파
+        if grace <= 0 and remaining_budget() > 0:
+            raise
+        raise DeadlineExceeded(stage, remaining_budget()) from None
+
+
+async def iterate_with_deadline(iterator: AsyncIterator[T], stage: str) -> AsyncIterator[T]:
+    """스트리밍 응답의 조각마다 남은 예산을 타임아웃으로 대기"""
+    try:
+        while True:
+            try:
+                item = await run_with_deadline(iterator.__anext__(), stage)
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,215 @@
+"""
+델타 재분석
+
+같은 사용자가 같은 종목/투자 기간을 다시 분석할 때, 최근 분석 이후 바뀐 입력이
+시세/기술 지표뿐이면 영향을 받는 섹션(market_overview, current_drivers, 투자 의견)만
+LLM에 다시 요청하고 나머지 섹션은 이전 분석에서 이어받습니다.
+
+다음 경우에는 전체 재분석합니다.
+- 이전 분석이 없거나 입력 데이터(input_data)가 저장되지 않은 분석, 프롬프트 버전이 다른 분석
+- 마지막 전체 분석이 ANALYSIS_DELTA_MAX_AGE_DAYS보다 오래됨
+- 현재가 변동률이 ANALYSIS_DELTA_MAX_PRICE_MOVE 초과
+- 마지막 전체 분석 대비 펀더멘털 지표 변동률이 ANALYSIS_DELTA_FUNDAMENTAL_TOLERANCE 초과, 섹터/산업 변경
+- 델타 응답에서 다시 생성된 섹션을 하나도 복구할 수 없음
+
+이전 분석이 델타 재분석 결과이면 delta_source_id를 따라 마지막 전체 분석을 찾아
+경과 시간과 펀더멘털 변화를 그 분석 기준으로 판정합니다 (이어받은 섹션이 무한히 이어지지 않도록).
+델타 재분석 결과는 사용자 이전 분석의 섹션을 포함하므로 공유 캐시 원본이 되지 않습니다 (입력 지문 미저장).
+"""
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import desc, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.stock_insight import StockInsight
+from app.services.analysis_cache import ANALYSIS_FIELDS, _as_utc
+from app.services.prompts import PROMPT_VERSION
+from app.services.response_parser import repair_stock_analysis_response
+from app.services.stock_data_service import StockData
+
+logger = logging.getLogger(__name__)
+
+# 델타 재분석으로 다시 생성하는 필드 (투자 의견은 신뢰도/근거 포함)
+DELTA_FIELDS = (
+    "market_overview",
+    "current_drivers",
+    "recommendation",
+    "confidence_level",
+    "recommendation_reason",
+)
+
+# 시세/기술 지표 (변경되어도 델타 재분석)
+MARKET_INPUTS = (
+    "current_price",
+    "price_change_1d_pct",
+    "price_change_1w_pct",
+    "price_change_1m_pct",
+    "price_change_ytd",
+    "volume",
+    "avg_volume",
+    "market_cap",
+    "fifty_two_week_high",
+    "fifty_two_week_low",
+    "rsi_14",
+    "ma_50",
+    "ma_200",
+)
+
+# 펀더멘털 입력 (허용 범위를 넘어 바뀌면 전체 재분석)
+FUNDAMENTAL_INPUTS = ("pe_ratio", "pb_ratio", "dividend_yield", "beta", "sector", "industry")
+
+# 변경 판정 시 실수 반올림 자릿수
+CHANGE_FLOAT_DIGITS = 4
+# 마지막 전체 분석을 찾을 때 따라가는 최대 델타 단계 (순환 참조 방지)
+MAX_DELTA_CHAIN = 50
+
+
+@dataclass
+class InputChange:
+    """이전 분석 이후 바뀐 입력"""
+    name: str
+    previous: Any
+    current: Any
+
+
+@dataclass
+class DeltaPlan:
+    """델타 재분석 계획"""
+    previous: StockInsight
+    changes: List[InputChange] = field(default_factory=list)
+
+    def carried_sections(self) -> Dict[str, Any]:
+        """이전 분석에서 이어받는 섹션"""
+        return {
+            name: getattr(self.previous, name)
+            for name in ANALYSIS_FIELDS
+            if name not in DELTA_FIELDS and name != "ai_model"
+        }
+
+    def previous_sections(self) -> Dict[str, Any]:
+        """다시 생성할 섹션의 이전 값 (참고용)"""
+        return {name: getattr(self.previous, name) for name in DELTA_FIELDS}
+
+    def merge(self, regenerated: Dict[str, Any]) -> Dict[str, Any]:
+        """이어받은 섹션과 새로 생성된 섹션을 합친 분석 결과 (생성되지 않은 섹션은 이전 값)"""
+        result = {**self.carried_sections(), **self.previous_sections()}
+        result.update({name: value for name, value in regenerated.items() if name in DELTA_FIELDS})
+        return result
+
+
+def regenerated_sections(response_text: str) -> Dict[str, Any]:
+    """델타 응답에서 복구된 다시 생성 섹션 (없으면 빈 dict)"""
+    repaired = repair_stock_analysis_response(response_text)
+    if repaired is None:
+        return {}
+    return {name: repaired.result[name] for name in repaired.recovered if name in DELTA_FIELDS}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, float):
+        return round(value, CHANGE_FLOAT_DIGITS)
+    return value
+
+
+def _relative_change(previous: Any, current: Any) -> Optional[float]:
+    """수치 변동률 (계산할 수 없으면 None)"""
+    if not isinstance(previous, (int, float)) or not isinstance(current, (int, float)) or previous == 0:
+        return None
+    return abs(current / previous - 1)
+
+
+class DeltaAnalyzer:
+    """사용자 최근 분석 조회 및 델타 재분석 가능 여부 판정"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+
+    async def latest_for_user(self, user_id: str, symbol: str, timeframe: str) -> Optional[StockInsight]:
+        """사용자의 같은 종목/투자 기간 최신 분석"""
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(StockInsight)
+                .where(
+                    StockInsight.user_id == user_id,
+                    StockInsight.stock_code == symbol,
+                    StockInsight.timeframe == timeframe,
+                )
+                .order_by(desc(StockInsight.created_at))
+                .limit(1)
+            )
+            return result.scalar_one_or_none()
+
+    async def full_source(self, insight: StockInsight) -> Optional[StockInsight]:
+        """delta_source_id를 따라 마지막 전체 분석 조회 (중간 분석이 삭제되었거나 순환하면 None)"""
+        if insight.delta_source_id is None:
+            return insight
+        seen = set()
+        async with self._session_factory() as session:
+            while insight is not None and insight.delta_source_id is not None:
+                if insight.id in seen or len(seen) >= MAX_DELTA_CHAIN:
+                    return None
+                seen.add(insight.id)
+                insight = await session.get(StockInsight, insight.delta_source_id)
+        return insight
+
+    @staticmethod
+    def plan(
+        previous: Optional[StockInsight],
+        stock_data: StockData,
+        base: Optional[StockInsight] = None,
+    ) -> Optional[DeltaPlan]:
+        """
+        델타 재분석 계획 수립
+
+        Args:
+            previous: 사용자의 최신 분석 (섹션을 이어받을 분석)
+            base: previous가 델타 재분석 결과일 때 마지막 전체 분석 (경과 시간/펀더멘털 변화 기준)
+
+        Returns:
+            DeltaPlan, 전체 재분석이 필요하면 None
+        """
+        if previous is None or not previous.input_data or previous.prompt_version != PROMPT_VERSION:
+            return None
+        if base is None:
+            if previous.delta_source_id is not None:
+                return None
+            base = previous
+        if not base.input_data:
+            return None
+
+        if base.created_at is not None:
+            age = datetime.now(timezone.utc) - _as_utc(base.created_at)
+            if age > timedelta(days=settings.ANALYSIS_DELTA_MAX_AGE_DAYS):
+                return None
+
+        before, now = previous.input_data, asdict(stock_data)
+        fundamentals = base.input_data
+
+        price_move = _relative_change(before.get("current_price"), now.get("current_price"))
+        if price_move is None or price_move > settings.ANALYSIS_DELTA_MAX_PRICE_MOVE:
+            logger.info(f"델타 재분석 불가 - 현재가 변동 큼: {stock_data.symbol} ({price_move})")
+            return None
+
+        for name in FUNDAMENTAL_INPUTS:
+            old, new = _normalize(fundamentals.get(name)), _normalize(now.get(name))
+            if old == new:
+                continue
+            change = _relative_change(old, new)
+            if change is None or change > settings.ANALYSIS_DELTA_FUNDAMENTAL_TOLERANCE:
+                logger.info(f"델타 재분석 불가 - 펀더멘털 변경: {stock_data.symbol} {name} {old} → {new}")
+                return None
+
+        changes = [
+            InputChange(name, before.get(name), now.get(name))
+            for name in MARKET_INPUTS
+            if _normalize(before.get(name)) != _normalize(now.get(name))
+        ]
+        return DeltaPlan(previous=previous, changes=changes)
+
+
+# 싱글톤 인스턴스
+delta_analyzer = DeltaAnalyzer()
@@ -0,0 +1,157 @@
+"""
+부하 테스트용 가짜 LLM 프로바이더 (LLM_PRIMARY_PROVIDER=fake)
+
+실제 토큰을 쓰지 않고 POST /api/analysis/stock 전체 경로(대기열, 폴백, DB 저장)를
+현실적인 지연 시간으로 측정하기 위한 프로바이더입니다.
+
+- 응답: 사용자 프롬프트 해시로 결정되는 스키마 유효 분석 JSON (같은 프롬프트 → 같은 응답)
+- 지연: 첫 토큰까지 로그정규 분포(중앙값 LLM_FAKE_TTFT_MEDIAN_SECONDS) + 출력 토큰 / 초당 토큰 수
+- 오류: LLM_FAKE_ERROR_RATE 비율로 일시적 오류(503, 재시도/폴백 대상)
+- 잘못된 출력: LLM_FAKE_MALFORMED_RATE 비율로 중간에 잘린 JSON
+- 난수는 LLM_FAKE_SEED로 고정 (호출 순서가 같으면 같은 결과)
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.services.response_parser import (
+    VALID_CONFIDENCE_LEVELS,
+    VALID_RECOMMENDATIONS,
+    VALID_SENTIMENTS,
+)
+
+FAKE_MODEL = "fake-llm"
+# 스트리밍 조각당 토큰 수
+STREAM_CHUNK_TOKENS = 8
+
+
+class FakeLLMError(Exception):
+    """가짜 프로바이더 일시적 오류 (status_code로 재시도 대상 판정)"""
+
+    def __init__(self, status_code: int = 503):
+        self.status_code = status_code
+        super().__init__(f"가짜 LLM 오류 (HTTP {status_code})")
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (UTF-8 3바이트당 1토큰: 한글 1자 ≈ 1토큰, 영문 3자 ≈ 1토큰)"""
+    return max(len(text.encode("utf-8")) // 3, 1)
+
+
+def build_fake_analysis(user_prompt: str) -> str:
+    """프롬프트 해시로 결정되는 스키마 유효 분석 JSON"""
+    digest = hashlib.sha256(user_prompt.encode("utf-8")).digest()
+    recommendation = VALID_RECOMMENDATIONS[digest[0] % len(VALID_RECOMMENDATIONS)]
+    sentiment = VALID_SENTIMENTS[digest[1] % len(VALID_SENTIMENTS)]
+    sentence = "가짜 프로바이더가 생성한 부하 테스트용 분석입니다. 실제 투자 판단에 사용하지 마세요. "
+
+    return json.dumps({
+        "deep_research": sentence * 12,
+        "recommendation": recommendation,
+        "confidence_level": VALID_CONFIDENCE_LEVELS[digest[2] % len(VALID_CONFIDENCE_LEVELS)],
+        "recommendation_reason": "부하 테스트용 근거",
+        "risk_score": digest[3] % 10 + 1,
+        "risk_analysis": {
+            key: "부하 테스트" for key in
+            ("volatility", "company_specific", "industry", "macro", "liquidity", "regulatory")
+        },
+        "market_overview": {
+            key: "부하 테스트" for key in
+            ("price_movement", "volume_trend", "support_resistance", "relative_performance")
+        },
+        "market_sentiment": sentiment,
+        "sentiment_details": {
+            key: "부하 테스트" for key in
+            ("overall", "social_media", "options_activity", "insider_trading", "institutional", "short_interest")
+        },
+        "key_summary": ["부하 테스트 요약 1", "부하 테스트 요약 2", "부하 테스트 요약 3"],
+        "current_drivers": {key: "부하 테스트" for key in ("news_based", "technical", "fundamental")},
+        "future_catalysts": {key: "부하 테스트" for key in ("short_term", "mid_term", "long_term")},
+    }, ensure_ascii=False)
+
+
+class FakeLLMClient:
+    """설정 가능한 지연/오류 분포를 가진 가짜 LLM 클라이언트"""
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        ttft_median: Optional[float] = None,
+        ttft_sigma: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        malformed_rate: Optional[float] = None,
+    ):
+        self._random = random.Random(seed if seed is not None else settings.LLM_FAKE_SEED)
+        self._lock = threading.Lock()
+        self.ttft_median = ttft_median if ttft_median is not None else settings.LLM_FAKE_TTFT_MEDIAN_SECONDS
+        self.ttft_sigma = ttft_sigma if ttft_sigma is not None else settings.LLM_FAKE_TTFT_SIGMA
+        self.tokens_per_second = tokens_per_second if tokens_per_second is not None else settings.LLM_FAKE_TOKENS_PER_SECOND
+        self.error_rate = error_rate if error_rate is not None else settings.LLM_FAKE_ERROR_RATE
+        self.malformed_rate = malformed_rate if malformed_rate is not None else settings.LLM_FAKE_MALFORMED_RATE
+
+    def _plan(self, user_prompt: str, max_tokens: int) -> tuple[float, bool, str]:
+        """호출 1회의 (첫 토큰 지연, 오류 여부, 응답 텍스트) 결정"""
+        with self._lock:
+            ttft = self.ttft_median * math.exp(self._random.gauss(0, self.ttft_sigma)) if self.ttft_median > 0 else 0.0
+            failed = self._random.random() < self.error_rate
+            malformed = self._random.random() < self.malformed_rate
+            cut = self._random.uniform(0.3, 0.9)
+
+        text = build_fake_analysis(user_prompt)
+        if malformed:
+            text = text[:int(len(text) * cut)]
+        # 출력 토큰 상한 초과 시 실제 모델처럼 잘림 (estimate_tokens 기준 바이트 단위)
+        if estimate_tokens(text) > max_tokens:
+            text = text.encode("utf-8")[:max_tokens * 3].decode("utf-8", errors="ignore")
+        return ttft, failed, text
+
+    def _generation_seconds(self, text: str) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return estimate_tokens(text) / self.tokens_per_second
+
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> tuple[str, int, int]:
+        """
+        응답 생성
+
+        Returns:
+            (응답 텍스트, 입력 토큰, 출력 토큰)
+
+        Raises:
+            FakeLLMError: 오류 비율에 따른 일시적 오류
+        """
+        ttft, failed, text = self._plan(user_prompt, max_tokens)
+        await asyncio.sleep(ttft)
+        if failed:
+            raise FakeLLMError()
+        await asyncio.sleep(self._generation_seconds(text))
+        return text, estimate_tokens(system_prompt + user_prompt), estimate_tokens(text)
+
+    async def stream(
+        self, system_prompt: str, user_prompt: str, max_tokens: int
+    ) -> AsyncIterator[tuple[str, Optional[tuple[int, int]]]]:
+        """
+        스트리밍 응답 생성 (초당 토큰 수에 맞춰 조각 전달)
+
+        Yields:
+            (텍스트 조각, 마지막 조각이면 (입력 토큰, 출력 토큰) 아니면 None)
+        """
+        ttft, failed, text = self._plan(user_prompt, max_tokens)
+        await asyncio.sleep(ttft)
+        if failed:
+            raise FakeLLMError()
+
+        chunk_chars = max(len(text) * STREAM_CHUNK_TOKENS // estimate_tokens(text), 1)
+        interval = self._generation_seconds(text[:chunk_chars])
+        for start in range(0, len(text), chunk_chars):
+            if start:
+                await asyncio.sleep(interval)
+            last = start + chunk_chars >= len(text)
+            usage = (estimate_tokens(system_prompt + user_prompt), estimate_tokens(text)) if last else None
+            yield text[start:start + chunk_chars], usage
@@ -1,19 +1,33 @@
 """
 pykrx 기반 한국 종목 캐시 서비스
 
-- KOSPI/KOSDAQ 전체 종목 목록 캐시
+- KOSPI/KOSDAQ 전체 종목 목록 캐시 (컬럼형 TickerTable)
 - 종목코드 ↔ 종목명 매핑
 - 24시간 TTL 자동 갱신
+- 스냅샷 파일 mmap 공유 (여러 워커가 pykrx를 한 번만 조회)
+- 갱신 시 이전 테이블 대비 변경분(TickerDiff)을 구독자에게 발행
 """
 import logging
 import asyncio
 import threading
 import ssl
 import urllib3
-from typing import Dict, List, Optional, Any
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Any, Mapping
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 락 없이 동작
+    fcntl = None
+
+from app.core.config import settings
+from app.services.ticker_table import TickerTable, TickerDiff, diff_tables
+from app.services.latency_spans import span
+
 # SSL 경고 비활성화 (회사 네트워크 환경)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -24,16 +38,36 @@ CACHE_TTL_HOURS = 24  # 한국 시장은 일일 업데이트
 MAX_PYKRX_WORKERS = 2  # pykrx는 I/O 바운드, 동시성 제한
 MAX_QUERY_LENGTH = 100  # 검색어 최대 길이
 MAX_SEARCH_LIMIT = 100  # 검색 결과 최대 개수
+DEFAULT_SNAPSHOT_PATH = Path(__file__).resolve().parents[2] / "data" / "kr_ticker_table.bin"
+MAX_DIFF_HISTORY = 30  # 보관할 최근 변경분 개수
+
+# 변경분 구독자: TickerDiff를 받아 파생 캐시를 무효화하는 함수
+TickerDiffListener = Callable[[TickerDiff], None]
+
+
+@contextmanager
+def _snapshot_build_lock(snapshot_path: Path):
+    """스냅샷 생성 파일 락 (한 워커만 pykrx 로드, 나머지는 대기 후 mmap)"""
+    if fcntl is None:
+        yield
+        return
+
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = snapshot_path.with_name(f"{snapshot_path.name}.lock")
+    with lock_path.open("w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 class KRStockCacheService:
     """한국 주식 종목 캐시 서비스 (pykrx 기반)"""
 
     def __init__(self):
-        # 종목 캐시: code -> (name, market)
-        self._code_to_info: Dict[str, tuple[str, str]] = {}
-        # 역방향 매핑: name -> code
-        self._name_to_code: Dict[str, str] = {}
+        # 종목 캐시: 컬럼형 테이블 (code -> (name, market), 종목명 역방향 조회 포함)
+        self._table: TickerTable = TickerTable.empty()
         # 캐시 타임스탬프
         self._cache_timestamp: Optional[datetime] = None
         # 캐시 TTL: 24시간
@@ -46,6 +80,9 @@ class KRStockCacheService:
         self._executor = ThreadPoolExecutor(max_workers=MAX_PYKRX_WORKERS)
         # 초기화 완료 여부
         self._initialized = False
+        # 변경분 구독자 및 최근 변경분 이력
+        self._listeners: List[TickerDiffListener] = []
+        self._recent_diffs: deque[TickerDiff] = deque(maxlen=MAX_DIFF_HISTORY)
 
     def shutdown(self) -> None:
         """리소스 정리"""
@@ -62,6 +99,72 @@ class KRStockCacheService:
             return False
         return datetime.now() - self._cache_timestamp < self._cache_ttl
 
+    @property
+    def snapshot_path(self) -> Optional[Path]:
+        """공유 스냅샷 파일 경로 (비활성화 시 None)"""
+        if not settings.KR_TICKER_SNAPSHOT_ENABLED:
+            return None
+        if settings.KR_TICKER_SNAPSHOT_PATH:
+            return Path(settings.KR_TICKER_SNAPSHOT_PATH)
+        return DEFAULT_SNAPSHOT_PATH
+
+    def _open_fresh_snapshot(self, path: Path) -> Optional[TickerTable]:
+        """TTL 이내에 생성된 스냅샷 파일이 있으면 mmap으로 열기"""
+        if not path.exists():
+            return None
+        try:
+            table = TickerTable.open(str(path))
+        except Exception as e:
+            logger.warning(f"종목 테이블 스냅샷 열기 실패: {e}")
+            return None
+        if datetime.now() - table.built_at >= self._cache_ttl or len(table) == 0:
+            return None
+        return table
+
+    def _load_table_sync(self) -> Optional[TickerTable]:
+        """
+        종목 테이블 로드 (동기)
+
+        1. TTL 이내 스냅샷 파일이 있으면 mmap으로 공유
+        2. 없으면 파일 락을 잡고 pykrx에서 로드 후 스냅샷 저장
+        """
+        path = self.snapshot_path
+        if path is None:
+            stocks = self._load_stocks_sync()
+            return TickerTable.from_mapping(stocks) if stocks else None
+
+        table = self._open_fresh_snapshot(path)
+        if table is not None:
+            logger.info(f"한국 종목 테이블 스냅샷 사용: {path} ({len(table)}개)")
+            return table
+
+        with _snapshot_build_lock(path):
+            # 락 대기 중 다른 워커가 생성했을 수 있음
+            table = self._open_fresh_snapshot(path)
+            if table is not None:
+                logger.info(f"한국 종목 테이블 스냅샷 사용: {path} ({len(table)}개)")
+                return table
+
+            stocks = self._load_stocks_sync()
+            if not stocks:
+                return None
+
+            table = TickerTable.from_mapping(stocks)
+            try:
+                table.write(str(path))
+                logger.info(f"한국 종목 테이블 스냅샷 저장: {path}")
+                return TickerTable.open(str(path))
+            except Exception as e:
+                logger.warning(f"종목 테이블 스냅샷 저장 실패, 메모리 테이블 사용: {e}")
+                return table
+
+    def _refresh_sync(self, previous: TickerTable) -> tuple[Optional[TickerTable], Optional[TickerDiff]]:
+        """새 테이블 로드 및 이전 테이블 대비 변경분 계산 (동기)"""
+        table = self._load_table_sync()
+        if table is None or len(table) == 0:
+            return None, None
+        return table, diff_tables(previous, table, generation=table.built_at)
+
     def _load_stocks_sync(self) -> Dict[str, tuple[str, str]]:
         """pykrx에서 전체 종목 목록 로드 (동기)"""
         try:
@@ -142,28 +245,87 @@ class KRStockCacheService:
             loop = asyncio.get_running_loop()
 
             try:
-                stocks = await loop.run_in_executor(
-                    self._executor,
-                    self._load_stocks_sync
-                )
-
-                if stocks:
+                with span("kr_cache_load"):
+                    table, diff = await loop.run_in_executor(
+                        self._executor,
+                        self._refresh_sync,
+                        self._table,
+                    )
+
+                if table is not None:
                     # Thread-safe assignment
                     with self._data_lock:
-                        self._code_to_info = stocks
-                        # 역방향 매핑 생성
-                        self._name_to_code = {
-                            info[0]: code for code, info in stocks.items()
-                        }
-                        self._cache_timestamp = datetime.now()
+                        self._table = table
+                        self._cache_timestamp = table.built_at
                         self._initialized = True
-                    logger.info(f"한국 종목 캐시 초기화 완료: {len(stocks)}개 종목")
+                    logger.info(
+                        f"한국 종목 캐시 초기화 완료: {len(table)}개 종목 "
+                        f"({table.nbytes / 1024:.0f}KB), 변경분: {diff.summary()}"
+                    )
+                    self._publish(diff)
                 else:
                     logger.warning("한국 종목 캐시 초기화 실패: 데이터 없음")
 
             except Exception as e:
                 logger.error(f"한국 종목 캐시 초기화 실패: {e}")
 
+    def _publish(self, diff: TickerDiff) -> None:
+        """변경분을 구독자에게 전달 (빈 변경분도 세대 갱신을 위해 전달)"""
+        self._recent_diffs.append(diff)
+        for listener in list(self._listeners):
+            try:
+                listener(diff)
+            except Exception as e:
+                logger.error(f"종목 테이블 변경분 구독자 처리 실패: {e}")
+
+    def subscribe(self, listener: TickerDiffListener) -> Callable[[], None]:
+        """
+        종목 테이블 변경분 구독
+
+        Args:
+            listener: 테이블이 갱신될 때마다 TickerDiff를 받는 함수
+
+        Returns:
+            구독 해지 함수
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
+
+    def diffs_since(self, generation: Optional[datetime]) -> List[TickerDiff]:
+        """주어진 세대 이후의 변경분 (구독하지 않은 소비자의 폴링용)"""
+        return [
+            diff for diff in self._recent_diffs
+            if generation is None or (diff.generation is not None and diff.generation > generation)
+        ]
+
+    async def warm_up(self) -> bool:
+        """
+        시작 시 종목 테이블 미리 로드 (첫 요청 지연 방지)
+
+        Returns:
+            캐시가 정상적으로 로드되었으면 True
+        """
+        await self._ensure_initialized()
+        return self.is_healthy
+
+    async def get_snapshot(self) -> tuple[Optional[datetime], Mapping[str, tuple[str, str]]]:
+        """
+        전체 종목 테이블 스냅샷 조회 (인덱스 구축용)
+
+        Returns:
+            (로드 시각, code -> (name, market) 매핑) 튜플
+            로드 시각은 테이블이 갱신될 때마다 바뀌므로 파생 인덱스의 세대 키로 사용
+        """
+        await self._ensure_initialized()
+
+        with self._data_lock:
+            return self._cache_timestamp, self._table
+
     async def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """
         한국 종목 검색
@@ -184,12 +346,13 @@ class KRStockCacheService:
         await self._ensure_initialized()
 
         results: List[Dict[str, Any]] = []
-        query_lower = query.lower()
         query_upper = query.upper()
+        table = self._table
 
         # 코드로 직접 검색
-        if query_upper in self._code_to_info:
-            name, market = self._code_to_info[query_upper]
+        info = table.get(query_upper)
+        if info:
+            name, market = info
             suffix = ".KS" if market == "KOSPI" else ".KQ"
             results.append({
                 "symbol": f"{query_upper}{suffix}",
@@ -197,23 +360,22 @@ class KRStockCacheService:
                 "market": "KR",
             })
 
-        # 이름으로 검색 (부분 일치)
-        for code, (name, market) in self._code_to_info.items():
+        # 이름으로 검색 (부분 일치, 압축 문자열 검색)
+        for row in table.search_rows(query, limit + 1):
             if len(results) >= limit:
                 break
 
+            code = table.code_at(row)
             # 이미 코드로 추가된 경우 스킵
             if code == query_upper:
                 continue
 
-            # 이름에 검색어가 포함된 경우
-            if query_lower in name.lower():
-                suffix = ".KS" if market == "KOSPI" else ".KQ"
-                results.append({
-                    "symbol": f"{code}{suffix}",
-                    "name": name,
-                    "market": "KR",
-                })
+            suffix = ".KS" if table.market_at(row) == "KOSPI" else ".KQ"
+            results.append({
+                "symbol": f"{code}{suffix}",
+                "name": table.name_at(row),
+                "market": "KR",
+            })
 
         return results[:limit]
 
@@ -232,8 +394,9 @@ class KRStockCacheService:
         # .KS, .KQ 접미사 제거
         clean_code = code.replace(".KS", "").replace(".KQ", "").strip()
 
-        if clean_code in self._code_to_info:
-            return self._code_to_info[clean_code][0]
+        info = self._table.get(clean_code)
+        if info:
+            return info[0]
 
         return None
 
@@ -252,8 +415,9 @@ class KRStockCacheService:
         # .KS, .KQ 접미사 제거
         clean_code = code.replace(".KS", "").replace(".KQ", "").strip()
 
-        if clean_code in self._code_to_info:
-            return self._code_to_info[clean_code][1]
+        info = self._table.get(clean_code)
+        if info:
+            return info[1]
 
         # 기본값: 코스피
         return "KOSPI"
@@ -272,27 +436,28 @@ class KRStockCacheService:
         await self._ensure_initialized()
 
         query = query.strip()
+        table = self._table
 
         # 이미 .KS, .KQ 접미사가 있는 경우
         if query.endswith(".KS") or query.endswith(".KQ"):
             clean_code = query.replace(".KS", "").replace(".KQ", "")
-            if clean_code in self._code_to_info:
+            if clean_code in table:
                 return query, "KR"
             return None
 
         # 숫자로만 구성된 경우 (종목코드)
         if query.isdigit():
             code = query.zfill(6)
-            if code in self._code_to_info:
-                market = self._code_to_info[code][1]
-                suffix = ".KS" if market == "KOSPI" else ".KQ"
+            info = table.get(code)
+            if info:
+                suffix = ".KS" if info[1] == "KOSPI" else ".KQ"
                 return f"{code}{suffix}", "KR"
             return None
 
         # 종목명으로 검색
-        if query in self._name_to_code:
-            code = self._name_to_code[query]
-            market = self._code_to_info[code][1]
+        code = table.find_name(query)
+        if code:
+            market = table[code][1]
             suffix = ".KS" if market == "KOSPI" else ".KQ"
             return f"{code}{suffix}", "KR"
 
@@ -314,7 +479,7 @@ class KRStockCacheService:
     @property
     def stock_count(self) -> int:
         """캐시된 종목 수"""
-        return len(self._code_to_info)
+        return len(self._table)
 
     @property
     def is_initialized(self) -> bool:
@@ -324,7 +489,7 @@ class KRStockCacheService:
     @property
     def is_healthy(self) -> bool:
         """캐시가 정상적으로 초기화되었는지 확인"""
-        return self._initialized and len(self._code_to_info) > 0
+        return self._initialized and len(self._table) > 0
 
 
 # 싱글톤 인스턴스
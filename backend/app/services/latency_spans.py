@@ -0,0 +1,126 @@
+"""
+분석 단계별 지연 시간 측정 (span)
+
+- 단계: resolution(심볼 변환), kr_cache_load(한국 종목 캐시 로드), data_fetch(주식 데이터 수집, 변환 포함),
+  cache_lookup(공유 분석 캐시 조회), llm(LLM 호출, 공유 대기 포함), parse(응답 파싱), db_commit(저장)
+- 분석 1건의 span은 ContextVar로 전달되는 SpanRecorder에 기록되어 StockInsight.stage_timings(JSON)에 저장
+  (하위 서비스의 시그니처 변경 없이 측정, db_commit은 저장 이후라 히스토그램에만 반영)
+- 모든 span은 단계별 히스토그램에 누적되어 /metrics(Prometheus 텍스트 형식)로 노출
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 히스토그램 버킷 상한 (초)
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+METRIC_NAME = "stock_analysis_stage_seconds"
+
+
+class SpanRecorder:
+    """분석 1건의 단계별 span 기록"""
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        # (시작 시점, span) - 하위 span이 먼저 끝나므로 시작 시점으로 정렬
+        self.spans: List[Tuple[float, Dict[str, object]]] = []
+
+    def add(self, stage: str, started: float, seconds: float, error: bool = False) -> None:
+        span: Dict[str, object] = {
+            "stage": stage,
+            "start_ms": round((started - self._origin) * 1000, 1),
+            "duration_ms": round(seconds * 1000, 1),
+        }
+        if error:
+            span["error"] = True
+        self.spans.append((started, span))
+
+    def as_json(self) -> List[Dict[str, object]]:
+        """StockInsight.stage_timings 저장용 (시작 순서)"""
+        return [span for _, span in sorted(self.spans, key=lambda item: item[0])]
+
+
+# 현재 분석의 span 기록 대상 (없으면 히스토그램만 기록)
+current_spans: ContextVar[Optional[SpanRecorder]] = ContextVar("analysis_spans", default=None)
+
+
+class StageHistograms:
+    """단계별 누적 히스토그램 (프로세스 내)"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # 단계 -> (버킷별 개수(+Inf 포함), 합계, 개수)
+        self._counts: Dict[str, List[int]] = {}
+        self._sums: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts = self._counts.setdefault(stage, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[stage] = self._sums.get(stage, 0.0) + seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """단계별 누적 버킷 개수, 합계, 개수"""
+        with self._lock:
+            result = {}
+            for stage, counts in self._counts.items():
+                cumulative, total = [], 0
+                for count in counts:
+                    total += count
+                    cumulative.append(total)
+                result[stage] = {"buckets": cumulative, "sum": self._sums[stage], "count": total}
+            return result
+
+    def quantile(self, stage: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """단계 지연 분위수 근사값 (해당 버킷 상한, +Inf 버킷은 마지막 상한), 표본이 부족하면 None"""
+        with self._lock:
+            counts = list(self._counts.get(stage, ()))
+        total = sum(counts)
+        if total < max(min_samples, 1):
+            return None
+        target, cumulative = q * total, 0
+        for index, count in enumerate(counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[min(index, len(self.buckets) - 1)]
+        return self.buckets[-1]
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 형식"""
+        lines = [
+            f"# HELP {METRIC_NAME} Stock analysis latency by stage",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        for stage, data in sorted(self.snapshot().items()):
+            for bound, count in zip(bounds, data["buckets"]):
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {data["sum"]:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {data["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """블록 소요 시간을 현재 분석 span과 히스토그램에 기록 (예외 발생 시에도 기록)"""
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        recorder = current_spans.get()
+        if recorder is not None:
+            recorder.add(stage, started, seconds, error=error)
+        stage_histograms.observe(stage, seconds)
+
+
+# 싱글톤 인스턴스
+stage_histograms = StageHistograms()
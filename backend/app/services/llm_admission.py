@@ -0,0 +1,239 @@
+"""
+LLM 호출 입장 제어 (우선순위 대기열, 프로바이더별 동시 실행 제한)
+
+- 프로바이더별 동시 호출 수 제한 (LLM_PROVIDER_CONCURRENCY)
+- 대기 중에는 결제 검증 요청 > 일반 요청 > 데모 요청 순으로 입장
+- 예상 대기 시간이 지연 예산(LLM_ADMISSION_MAX_WAIT_SECONDS)을 넘으면
+  대기열에 넣지 않고 즉시 거절 (라우터에서 503 + Retry-After)
+- 요청 우선순위/예산은 ContextVar로 전달 (엔진 호출 경로의 시그니처 변경 없이)
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.services.llm_hedging import percentile
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (작을수록 먼저 입장)
+PRIORITY_PAID = 0
+PRIORITY_STANDARD = 1
+PRIORITY_DEMO = 2
+
+# 서비스 시간 추정 초기값 (초) 및 지수 이동 평균 가중치
+DEFAULT_SERVICE_SECONDS = 20.0
+SERVICE_TIME_ALPHA = 0.2
+# 대기 시간 통계 보관 개수
+WAIT_WINDOW_SIZE = 200
+# 제한이 설정되지 않은 프로바이더의 기본 동시 호출 수
+DEFAULT_PROVIDER_CONCURRENCY = 8
+
+
+class AdmissionRejected(Exception):
+    """예상 대기 시간이 지연 예산을 초과하여 LLM 호출을 거절"""
+
+    def __init__(self, provider: str, estimated_wait: float):
+        self.provider = provider
+        self.estimated_wait = estimated_wait
+        super().__init__(
+            f"분석 요청이 많아 잠시 후 다시 시도해주세요. (예상 대기 {estimated_wait:.0f}초)"
+        )
+
+    @property
+    def retry_after(self) -> int:
+        """Retry-After 헤더 값 (초)"""
+        return max(1, math.ceil(self.estimated_wait))
+
+
+@dataclass(frozen=True)
+class AdmissionContext:
+    """요청별 입장 조건"""
+    priority: int = PRIORITY_STANDARD
+    max_wait: Optional[float] = None  # None이면 LLM_ADMISSION_MAX_WAIT_SECONDS, 음수면 무제한 대기
+
+
+# 현재 요청의 입장 조건 (라우터/작업 워커에서 설정)
+admission_context: ContextVar[AdmissionContext] = ContextVar(
+    "llm_admission_context", default=AdmissionContext()
+)
+
+
+def priority_for(payment_verified: bool) -> int:
+    """요청 우선순위 결정 (결제 검증 > 일반 > 데모)"""
+    if payment_verified:
+        return PRIORITY_PAID
+    if settings.ENVIRONMENT == "demo":
+        return PRIORITY_DEMO
+    return PRIORITY_STANDARD
+
+
+class PriorityLimiter:
+    """우선순위 대기열이 있는 동시 실행 제한 (단일 이벤트 루프용)"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(limit, 1)
+        self._in_use = 0
+        # (우선순위, 순번, Future) 힙 - 취소된 항목은 꺼낼 때 건너뜀
+        self._waiters: List[tuple] = []
+        self._seq = itertools.count()
+        self._service_seconds = DEFAULT_SERVICE_SECONDS
+        self._waits: Deque[float] = deque(maxlen=WAIT_WINDOW_SIZE)
+        self._admitted = 0
+        self._rejected = 0
+
+    @property
+    def queue_length(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def estimate_wait(self, priority: int) -> float:
+        """해당 우선순위로 지금 대기열에 들어갈 때 예상 대기 시간 (초)"""
+        if self._in_use < self.limit and not self.queue_length:
+            return 0.0
+        ahead = sum(1 for p, _, future in self._waiters if p <= priority and not future.done())
+        rounds = ahead // self.limit + 1
+        return rounds * self._service_seconds
+
+    async def acquire(self, priority: int, max_wait: Optional[float]) -> None:
+        """
+        실행 슬롯 획득
+
+        Raises:
+            AdmissionRejected: 예상 대기 시간이 max_wait 초과
+        """
+        if self._in_use < self.limit and not self.queue_length:
+            self._in_use += 1
+            self._record_admit(0.0)
+            return
+
+        estimated = self.estimate_wait(priority)
+        if max_wait is not None and estimated > max_wait:
+            self._rejected += 1
+            logger.warning(
+                f"{self.name} LLM 호출 거절: 예상 대기 {estimated:.1f}초 > 예산 {max_wait:.1f}초 "
+                f"(대기 {self.queue_length}건)"
+            )
+            raise AdmissionRejected(self.name, estimated)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        started = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 슬롯을 넘겨받은 직후 취소되면 반환
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+        waited = time.monotonic() - started
+        self._record_admit(waited)
+        if waited >= 1.0:
+            logger.info(f"{self.name} LLM 호출 대기: {waited:.1f}초 (우선순위 {priority})")
+
+    def release(self) -> None:
+        """슬롯 반환 (대기 중인 최우선 요청에 바로 넘김)"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_use = max(self._in_use - 1, 0)
+
+    def record_service_time(self, seconds: float) -> None:
+        """슬롯 점유 시간으로 서비스 시간 추정 갱신"""
+        self._service_seconds += SERVICE_TIME_ALPHA * (seconds - self._service_seconds)
+
+    def _record_admit(self, waited: float) -> None:
+        self._admitted += 1
+        self._waits.append(waited)
+
+    def stats(self) -> Dict[str, float]:
+        waits = list(self._waits)
+        return {
+            "limit": self.limit,
+            "in_use": self._in_use,
+            "queued": self.queue_length,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "service_seconds": round(self._service_seconds, 2),
+            "wait_p50_seconds": round(percentile(waits, 50), 3) if waits else 0.0,
+            "wait_p95_seconds": round(percentile(waits, 95), 3) if waits else 0.0,
+        }
+
+
+def _parse_concurrency(raw: str) -> Dict[str, int]:
+    """'openai=8,anthropic=4' 형식 파싱"""
+    limits: Dict[str, int] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        if name.strip() and value.strip().isdigit():
+            limits[name.strip()] = int(value.strip())
+    return limits
+
+
+class LLMAdmissionController:
+    """프로바이더별 우선순위 제한 관리"""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self._limits = limits if limits is not None else _parse_concurrency(settings.LLM_PROVIDER_CONCURRENCY)
+        self._limiters: Dict[str, PriorityLimiter] = {}
+
+    def limiter(self, provider: str) -> PriorityLimiter:
+        if provider not in self._limiters:
+            limit = self._limits.get(provider, DEFAULT_PROVIDER_CONCURRENCY)
+            self._limiters[provider] = PriorityLimiter(provider, limit)
+        return self._limiters[provider]
+
+    @staticmethod
+    def _max_wait(context: AdmissionContext) -> Optional[float]:
+        if context.max_wait is None:
+            return settings.LLM_ADMISSION_MAX_WAIT_SECONDS
+        return None if context.max_wait < 0 else context.max_wait
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """현재 요청의 우선순위로 프로바이더 실행 슬롯 점유"""
+        context = admission_context.get()
+        limiter = self.limiter(provider)
+        await limiter.acquire(context.priority, self._max_wait(context))
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            limiter.record_service_time(time.monotonic() - started)
+            limiter.release()
+
+    def precheck(self, providers: Iterable[str]) -> None:
+        """
+        분석 시작 전 조기 거절 확인 (데이터 수집 전에 503 응답)
+
+        Raises:
+            AdmissionRejected: 모든 프로바이더의 예상 대기가 예산 초과
+        """
+        context = admission_context.get()
+        max_wait = self._max_wait(context)
+        if max_wait is None:
+            return
+
+        best: Optional[AdmissionRejected] = None
+        for provider in providers:
+            estimated = self.limiter(provider).estimate_wait(context.priority)
+            if estimated <= max_wait:
+                return
+            if best is None or estimated < best.estimated_wait:
+                best = AdmissionRejected(provider, estimated)
+        if best is not None:
+            raise best
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
@@ -0,0 +1,88 @@
+"""
+LLM 헤지 요청 정책
+
+- 프로바이더별 최근 응답 지연 시간으로 헤지 시작 시점(백분위) 계산
+- 헤지 예산: 기본 요청마다 LLM_HEDGE_MAX_RATIO만큼 적립, 보조 요청마다 1 차감
+  (보조 요청 비율이 상한을 넘지 않도록 비용 제한)
+"""
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.core.config import settings
+
+# 프로바이더별 보관하는 최근 지연 시간 개수
+LATENCY_WINDOW_SIZE = 200
+# 헤지 예산 최대 적립량 (짧은 장애 구간에 몰아서 사용할 수 있는 보조 요청 수)
+HEDGE_BUDGET_BURST = 5.0
+
+
+def percentile(values, pct: float) -> float:
+    """선형 보간 백분위 (pct: 0-100)"""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("값이 없습니다")
+    rank = (len(ordered) - 1) * max(0.0, min(pct, 100.0)) / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class HedgePolicy:
+    """헤지 시작 지연 시간 및 예산 관리 (프로세스 내)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._credits = 0.0
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LLM_HEDGE_ENABLED
+
+    def record_latency(self, provider: str, seconds: float) -> None:
+        """성공한 호출의 지연 시간 기록"""
+        with self._lock:
+            self._latencies.setdefault(provider, deque(maxlen=LATENCY_WINDOW_SIZE)).append(seconds)
+
+    def hedge_delay(self, provider: str) -> float:
+        """보조 요청 시작까지 대기 시간 (초)"""
+        with self._lock:
+            samples = list(self._latencies.get(provider, ()))
+        if len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return percentile(samples, settings.LLM_HEDGE_LATENCY_PERCENTILE)
+
+    def record_call(self) -> None:
+        """기본 요청 1회 - 헤지 예산 적립"""
+        with self._lock:
+            self._calls += 1
+            self._credits = min(HEDGE_BUDGET_BURST, self._credits + settings.LLM_HEDGE_MAX_RATIO)
+
+    def try_acquire(self) -> bool:
+        """보조 요청 예산 사용 (부족하면 False)"""
+        with self._lock:
+            if self._credits < 1.0 - 1e-9:  # 부동소수점 누적 오차 허용
+                return False
+            self._credits -= 1.0
+            self._hedges += 1
+            return True
+
+    def record_hedge_win(self) -> None:
+        """보조 요청이 먼저 유효 응답을 반환함"""
+        with self._lock:
+            self._hedge_wins += 1
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """헤지 통계"""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "hedge_ratio": round(self._hedges / self._calls, 4) if self._calls else 0.0,
+                "credits": round(self._credits, 2),
+            }
@@ -0,0 +1,324 @@
+"""
+LLM API 키 풀 (프로바이더별 여러 키/배포에 호출 분산)
+
+- 프로바이더마다 여러 자격 증명(API 키, Azure OpenAI 배포)을 두고 처리 중 요청 수가 가장 적은 키로 호출
+- 응답의 rate limit 헤더(남은 요청/토큰 수, 재설정 시각)를 키별로 기록하여 소진된 키는 재설정 시각까지 제외
+- 429 응답을 받은 키는 retry-after(없으면 LLM_KEY_DRAIN_SECONDS) 동안 제외 (drain)
+- 모든 키가 제외되면 KeyPoolExhausted로 다음 프로바이더에 폴백
+
+헤더는 SDK 클라이언트의 httpx 응답 훅에서 기록하므로 일반/스트리밍 호출 모두에 적용됩니다.
+Azure OpenAI 배포는 OpenAI와 같은 API를 사용하므로 openai 풀에 포함되며, 기본 모델(OPENAI_DEFAULT_MODEL)을
+서비스하는 것으로 간주합니다 (모델 라우팅으로 다른 모델을 요청하면 OpenAI 키만 사용하고,
+그 모델을 처리할 키가 없으면 다른 모델로 호출하지 않고 KeyPoolExhausted로 다음 프로바이더에 폴백).
+"""
+import contextlib
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient as AnthropicHttpxClient
+from openai import AsyncAzureOpenAI, AsyncOpenAI, DefaultAsyncHttpxClient as OpenAIHttpxClient
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OpenAI 재설정 시간 형식 (예: "1s", "6m0s", "20ms", "1h2m3.5s")
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+# (남은 수 헤더, 재설정 시각 헤더) - OpenAI/Azure, Anthropic
+RATE_LIMIT_HEADERS = (
+    ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+    ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+    ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-reset"),
+    ("anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-reset"),
+    ("anthropic-ratelimit-input-tokens-remaining", "anthropic-ratelimit-input-tokens-reset"),
+    ("anthropic-ratelimit-output-tokens-remaining", "anthropic-ratelimit-output-tokens-reset"),
+)
+
+# 재설정 시각을 알 수 없는 소진 키의 기본 제외 시간 (초)
+DEFAULT_RESET_SECONDS = 1.0
+
+
+class KeyPoolExhausted(Exception):
+    """프로바이더의 모든 키가 rate limit으로 제외되었거나 요청 모델을 처리할 키가 없음 (재시도하지 않고 다음 프로바이더로 폴백)"""
+
+
+def parse_reset_seconds(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    rate limit 재설정 헤더를 남은 초로 변환
+
+    OpenAI는 기간 문자열("6m0s"), Anthropic은 RFC 3339 시각, retry-after는 초 단위 숫자입니다.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max((reset_at - now).total_seconds(), 0.0)
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    """429 응답의 재시도 대기 시간 (retry-after-ms 우선)"""
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+    return parse_reset_seconds(headers.get("retry-after"))
+
+
+def mask_key(api_key: str) -> str:
+    """로그/지표용 키 표시 (마지막 4자리만)"""
+    return f"...{api_key[-4:]}" if len(api_key) > 4 else "..."
+
+
+@dataclass
+class ProviderCredential:
+    """키 풀의 자격 증명 1개 (API 키 또는 Azure 배포)"""
+    provider: str
+    name: str  # 로그/지표용 이름 (키는 마스킹)
+    client: Any = None
+    deployment: Optional[str] = None  # Azure 배포 이름 (요청 model 값)
+    outstanding: int = 0  # 처리 중 요청 수
+    remaining: Optional[int] = None  # 헤더 기준 남은 요청/토큰 수 중 최소값
+    blocked_until: float = 0.0  # 이 시각(monotonic)까지 제외 (소진 또는 429)
+    rate_limited: int = 0  # 429 응답 횟수
+    _clock: Callable[[], float] = field(default=time.monotonic, repr=False)
+
+    def available(self, now: float) -> bool:
+        return now >= self.blocked_until
+
+    def serves(self, model: Optional[str], default_model: Optional[str]) -> bool:
+        """요청 모델을 처리할 수 있는지 (Azure 배포는 기본 모델만)"""
+        return self.deployment is None or model is None or model == default_model
+
+    def request_model(self, model: str) -> str:
+        """API 요청에 넣을 model 값 (Azure는 배포 이름)"""
+        return self.deployment or model
+
+    def drain(self, seconds: float) -> None:
+        """seconds 동안 새 요청에서 제외"""
+        self.blocked_until = max(self.blocked_until, self._clock() + seconds)
+
+    async def observe_response(self, response: Any) -> None:
+        """httpx 응답 훅: rate limit 헤더 기록, 429 응답 키 제외"""
+        self.record_headers(response.status_code, response.headers)
+
+    def record_headers(self, status_code: int, headers: Any) -> None:
+        if status_code == 429:
+            seconds = retry_after_seconds(headers)
+            if seconds is None:
+                seconds = settings.LLM_KEY_DRAIN_SECONDS
+            self.rate_limited += 1
+            self.drain(seconds)
+            logger.warning(f"{self.provider} 키 {self.name} 429 응답 - {seconds:.1f}초 동안 제외")
+            return
+
+        remaining: List[int] = []
+        for remaining_header, reset_header in RATE_LIMIT_HEADERS:
+            value = headers.get(remaining_header)
+            if value is None:
+                continue
+            try:
+                count = int(float(value))
+            except ValueError:
+                continue
+            remaining.append(count)
+            if count <= 0:
+                seconds = parse_reset_seconds(headers.get(reset_header))
+                self.drain(DEFAULT_RESET_SECONDS if seconds is None else seconds)
+                logger.info(f"{self.provider} 키 {self.name} 한도 소진 ({remaining_header}) - 재설정까지 제외")
+        if remaining:
+            self.remaining = min(remaining)
+
+
+# 현재 호출에 임대된 자격 증명 (API 호출 메서드가 클라이언트/모델 선택에 사용)
+current_credential: ContextVar[Optional[ProviderCredential]] = ContextVar("current_credential", default=None)
+
+
+class KeyPool:
+    """프로바이더 키 풀 (처리 중 요청 수가 가장 적은 키 선택)"""
+
+    def __init__(
+        self,
+        provider: str,
+        credentials: Optional[List[ProviderCredential]] = None,
+        default_model: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.default_model = default_model
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.credentials: List[ProviderCredential] = []
+        for credential in credentials or []:
+            self.add(credential)
+
+    def add(self, credential: ProviderCredential) -> None:
+        credential._clock = self._clock
+        self.credentials.append(credential)
+
+    def __len__(self) -> int:
+        return len(self.credentials)
+
+    def choose(self, model: Optional[str] = None) -> ProviderCredential:
+        """
+        호출할 자격 증명 선택
+
+        처리 중 요청 수가 적은 키, 같으면 헤더 기준 남은 한도가 많은 키를 선택합니다.
+
+        Raises:
+            KeyPoolExhausted: 요청 모델을 처리할 키가 없거나 모든 키가 rate limit으로 제외됨
+        """
+        now = self._clock()
+        candidates = [c for c in self.credentials if c.serves(model, self.default_model)]
+        if not candidates:
+            # 다른 모델의 배포로 호출하면 라우팅한 모델과 실제 모델이 달라지므로 폴백
+            raise KeyPoolExhausted(f"{self.provider} 키 중 모델 {model}을 처리할 수 있는 키 없음")
+        available = [c for c in candidates if c.available(now)]
+        if not available:
+            wait = min(c.blocked_until for c in candidates) - now
+            raise KeyPoolExhausted(f"{self.provider} 키 {len(candidates)}개 모두 rate limit 제외 중 ({wait:.1f}초 후 재개)")
+        # min은 같은 값이면 앞의 키를 고르므로 남은 한도를 모르는 키(None)는 한도가 많은 것으로 취급
+        return min(
+            available,
+            key=lambda c: (c.outstanding, -(c.remaining if c.remaining is not None else float("inf"))),
+        )
+
+    @contextlib.contextmanager
+    def lease(self, model: Optional[str] = None) -> Iterator[Optional[ProviderCredential]]:
+        """자격 증명 임대 (처리 중 요청 수 집계, 키가 없으면 None)"""
+        if not self.credentials:
+            yield None
+            return
+
+        with self._lock:
+            credential = self.choose(model)
+            credential.outstanding += 1
+        token = current_credential.set(credential)
+        try:
+            yield credential
+        finally:
+            current_credential.reset(token)
+            with self._lock:
+                credential.outstanding -= 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        키별 처리 중 요청 수/남은 한도/제외 상태
+
+        /metrics/llm-keys로 노출되므로 키/엔드포인트/배포 이름 대신 등록 순서와 종류만 포함합니다.
+        """
+        now = self._clock()
+        return [
+            {
+                "index": index,
+                "kind": "azure" if c.deployment else "api_key",
+                "outstanding": c.outstanding,
+                "remaining": c.remaining,
+                "rate_limited": c.rate_limited,
+                "blocked_seconds": round(max(c.blocked_until - now, 0.0), 3),
+            }
+            for index, c in enumerate(self.credentials)
+        ]
+
+
+def _split(raw: str, separator: str = ",") -> List[str]:
+    return [item.strip() for item in raw.split(separator) if item.strip()]
+
+
+def parse_azure_endpoints(raw: str) -> List[tuple]:
+    """
+    추가 Azure 엔드포인트 설정 파싱
+
+    ';' 구분, 항목은 '엔드포인트|API 키|배포1,배포2' 형식
+
+    Returns:
+        (엔드포인트, API 키, [배포 이름]) 목록
+    """
+    endpoints = []
+    for entry in _split(raw, ";"):
+        parts = [part.strip() for part in entry.split("|")]
+        if len(parts) != 3 or not all(parts):
+            logger.warning("잘못된 AZURE_OPENAI_EXTRA_ENDPOINTS 항목 무시")
+            continue
+        endpoints.append((parts[0], parts[1], _split(parts[2])))
+    return endpoints
+
+
+def build_key_pools() -> Dict[str, KeyPool]:
+    """설정의 API 키/Azure 배포로 프로바이더별 키 풀 생성"""
+    openai_keys = list(dict.fromkeys(_split(settings.OPENAI_API_KEY) + _split(settings.OPENAI_API_KEYS)))
+    anthropic_keys = list(dict.fromkeys(_split(settings.ANTHROPIC_API_KEY) + _split(settings.ANTHROPIC_API_KEYS)))
+    azure = []
+    if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
+        azure.append((
+            settings.AZURE_OPENAI_ENDPOINT,
+            settings.AZURE_OPENAI_API_KEY,
+            _split(settings.AZURE_OPENAI_DEPLOYMENT),
+        ))
+    azure.extend(parse_azure_endpoints(settings.AZURE_OPENAI_EXTRA_ENDPOINTS))
+
+    pools = {
+        "openai": KeyPool("openai", default_model=settings.OPENAI_DEFAULT_MODEL),
+        "anthropic": KeyPool("anthropic", default_model=settings.ANTHROPIC_DEFAULT_MODEL),
+    }
+    # SDK 내부 재시도는 끄고 엔진 재시도(지터 백오프, 회로 차단기, 다른 키 재임대)만 사용
+    client_options = {"max_retries": 0, "timeout": settings.LLM_REQUEST_TIMEOUT_SECONDS}
+
+    for api_key in openai_keys:
+        credential = ProviderCredential("openai", f"openai:{mask_key(api_key)}")
+        credential.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=OpenAIHttpxClient(event_hooks={"response": [credential.observe_response]}),
+            **client_options,
+        )
+        pools["openai"].add(credential)
+
+    for endpoint, api_key, deployments in azure:
+        for deployment in deployments:
+            credential = ProviderCredential("openai", f"azure:{endpoint}/{deployment}", deployment=deployment)
+            credential.client = AsyncAzureOpenAI(
+                azure_endpoint=endpoint,
+                api_key=api_key,
+                api_version=settings.AZURE_OPENAI_API_VERSION,
+                http_client=OpenAIHttpxClient(event_hooks={"response": [credential.observe_response]}),
+                **client_options,
+            )
+            pools["openai"].add(credential)
+
+    for api_key in anthropic_keys:
+        credential = ProviderCredential("anthropic", f"anthropic:{mask_key(api_key)}")
+        credential.client = AsyncAnthropic(
+            api_key=api_key,
+            http_client=AnthropicHttpxClient(event_hooks={"response": [credential.observe_response]}),
+            **client_options,
+        )
+        pools["anthropic"].add(credential)
+
+    for pool in pools.values():
+        if len(pool) > 1:
+            logger.info(f"{pool.provider} 키 풀: {[c.name for c in pool.credentials]}")
+    return pools
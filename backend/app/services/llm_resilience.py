@@ -0,0 +1,138 @@
+"""
+LLM 호출 복원력 (재시도, 회로 차단기)
+
+- 일시적 오류(429, 5xx, 타임아웃, 연결 오류)는 지터가 있는 지수 백오프로 재시도
+- 프로바이더별 회로 차단기: 연속 실패가 임계값에 도달하면 차단(open),
+  복구 시간 후 한 요청만 시험(half-open)하여 성공 시 복구(closed)
+- 차단된 프로바이더는 호출 없이 즉시 건너뛰고 다음 폴백 프로바이더 사용
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import openai
+import anthropic
+
+logger = logging.getLogger(__name__)
+
+# 회로 차단기 상태
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class LLMUnavailableError(Exception):
+    """사용 가능한 LLM 프로바이더가 없음 (모두 미설정 또는 회로 차단)"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """같은 프로바이더로 재시도할 만한 일시적 오류인지 확인"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    if isinstance(error, (openai.APIConnectionError, anthropic.APIConnectionError)):
+        # APITimeoutError 포함
+        return True
+    status_code = getattr(error, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    return False
+
+
+def retry_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    재시도 대기 시간 (full jitter 지수 백오프)
+
+    Args:
+        attempt: 재시도 순번 (1부터)
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """프로바이더별 회로 차단기 (프로세스 내)"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        recovery_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_seconds = recovery_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """복구 시간이 지난 open 상태는 half-open으로 간주"""
+        if self._state == BREAKER_OPEN and self._clock() - self._opened_at >= self.recovery_seconds:
+            return BREAKER_HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        호출 허용 여부
+
+        half-open 상태에서는 시험 요청 하나만 허용합니다.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == BREAKER_CLOSED:
+                return True
+            if state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+                self._state = BREAKER_HALF_OPEN
+                self._probe_in_flight = True
+                logger.info(f"{self.name} 회로 차단기 half-open: 시험 요청 허용")
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != BREAKER_CLOSED:
+                logger.info(f"{self.name} 회로 차단기 복구 (closed)")
+            self._state = BREAKER_CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == BREAKER_HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != BREAKER_OPEN:
+                    logger.warning(
+                        f"{self.name} 회로 차단기 open: 연속 실패 {self._failures}회, "
+                        f"{self.recovery_seconds:.0f}초 후 재시도"
+                    )
+                self._state = BREAKER_OPEN
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+    def abandon(self) -> None:
+        """결과 없이 끝난 호출 (취소 등) - 시험 요청 슬롯만 반환"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, object]:
+        """상태 조회 (모니터링용)"""
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+            }
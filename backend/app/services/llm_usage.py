@@ -0,0 +1,99 @@
+"""
+LLM 토큰 사용량 집계
+
+- 프로바이더 응답의 usage(입력/출력 토큰)를 호출마다 기록
+- 프로바이더 프롬프트 캐시에서 읽은 입력 토큰(cached_tokens)을 따로 기록
+- 분석 1건의 사용량은 ContextVar로 전달되는 TokenUsage에 누적
+  (재시도/헤지/폴백 호출 포함, 엔진 호출 경로의 시그니처 변경 없이)
+- 모델별 누적 사용량은 프로세스 통계로 집계 (모니터링/비용 추정용)
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class TokenUsage:
+    """LLM 토큰 사용량"""
+    prompt_tokens: int = 0  # 캐시 적중분 포함 전체 입력 토큰
+    completion_tokens: int = 0
+    cached_tokens: int = 0  # 프롬프트 캐시에서 읽은 입력 토큰
+    calls: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cached_tokens += cached_tokens
+        self.calls += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+# 현재 분석의 사용량 누적 대상 (없으면 프로세스 통계만 기록)
+current_usage: ContextVar[Optional[TokenUsage]] = ContextVar("llm_token_usage", default=None)
+
+
+def usage_from_response(provider: str, usage: Any) -> tuple[int, int, int]:
+    """
+    프로바이더 응답의 usage 객체에서 (입력 토큰, 출력 토큰, 캐시 적중 입력 토큰) 추출
+
+    - OpenAI: prompt_tokens(캐시 포함), completion_tokens, prompt_tokens_details.cached_tokens
+    - Anthropic: input_tokens는 캐시 읽기/쓰기분을 제외하므로 합산하여 전체 입력 토큰으로 기록
+    """
+    if usage is None:
+        return 0, 0, 0
+    if provider == "anthropic":
+        cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+        cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        prompt = (getattr(usage, "input_tokens", 0) or 0) + cache_read + cache_write
+        return prompt, getattr(usage, "output_tokens", 0) or 0, cache_read
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0, cached
+
+
+class TokenUsageStats:
+    """모델별 누적 토큰 사용량 (프로세스 내)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, TokenUsage] = {}
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> None:
+        with self._lock:
+            self._models.setdefault(model, TokenUsage()).add(prompt_tokens, completion_tokens, cached_tokens)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {model: usage.as_dict() for model, usage in self._models.items()}
+
+
+def record_usage(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> None:
+    """호출 1회의 토큰 사용량 기록 (현재 분석 + 프로세스 통계)"""
+    usage = current_usage.get()
+    if usage is not None:
+        usage.add(prompt_tokens, completion_tokens, cached_tokens)
+    token_usage_stats.record(model, prompt_tokens, completion_tokens, cached_tokens)
+
+
+@contextmanager
+def track_usage() -> Iterator[TokenUsage]:
+    """블록 안의 LLM 호출 토큰 사용량 누적"""
+    usage = TokenUsage()
+    token = current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        current_usage.reset(token)
+
+
+# 싱글톤 인스턴스
+token_usage_stats = TokenUsageStats()
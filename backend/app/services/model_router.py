@@ -0,0 +1,244 @@
+"""
+복잡도 기반 모델 라우팅
+
+분석마다 이미 가진 신호로 복잡도 점수를 계산하여 모델 티어를 고릅니다.
+- 투자 기간: short 0, mid 1, long 2 (기간이 길수록 펀더멘털 추론 비중 증가)
+- 데이터 완성도: 시장 데이터 항목 중 값이 있는 비율이 LLM_ROUTING_SPARSE_DATA_THRESHOLD 미만이면 +1
+  (주어진 데이터보다 모델 지식에 의존)
+- 최근 분석: 같은 종목/투자 기간의 분석이 LLM_ROUTING_RECENT_ANALYSIS_HOURS 이내에 있으면 -1
+  (기존 결론을 다듬는 수준)
+점수를 티어 범위(0 ~ 티어 수 - 1)로 잘라 LLM_MODEL_TIERS의 해당 티어를 사용합니다.
+
+티어별 지연 시간/비용과, 하위 티어 응답을 LLM_ROUTING_QUALITY_SAMPLE_RATE 비율로
+최상위 티어 응답과 비교한 품질 점검 결과를 report()로 제공합니다.
+"""
+import asyncio
+import logging
+import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Set
+
+from app.core.config import settings
+from app.services.llm_hedging import percentile
+from app.services.llm_usage import TokenUsage
+from app.services.prompts import MARKET_DATA_FIELDS
+from app.services.stock_data_service import StockData
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAME_COMPLEXITY = {"short": 0, "mid": 1, "long": 2}
+# 티어별 지연 시간 백분위 계산에 쓰는 최근 표본 수
+LATENCY_WINDOW = 500
+
+
+@dataclass
+class ModelTier:
+    """모델 티어 (프로바이더별 모델, 없는 프로바이더는 기본 모델 사용)"""
+    name: str
+    models: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class RoutingDecision:
+    """라우팅 결과"""
+    tier: ModelTier
+    score: int
+    completeness: float
+    has_recent_analysis: bool
+
+
+# 현재 호출에 적용할 모델 티어 (없으면 프로바이더 기본 모델)
+current_tier: ContextVar[Optional[ModelTier]] = ContextVar("llm_model_tier", default=None)
+
+
+@contextmanager
+def use_tier(tier: Optional[ModelTier]) -> Iterator[None]:
+    """블록 안의 LLM 호출에 모델 티어 적용"""
+    token = current_tier.set(tier)
+    try:
+        yield
+    finally:
+        current_tier.reset(token)
+
+
+def parse_model_tiers(raw: str) -> List[ModelTier]:
+    """'light:openai=gpt-5-nano,anthropic=claude-3-5-haiku-latest;top:openai=gpt-5' 형식 파싱 (낮은 티어부터)"""
+    tiers: List[ModelTier] = []
+    for item in raw.split(";"):
+        name, _, models = item.partition(":")
+        if not name.strip():
+            continue
+        tier = ModelTier(name=name.strip())
+        for entry in models.split(","):
+            provider, _, model = entry.partition("=")
+            if provider.strip() and model.strip():
+                tier.models[provider.strip()] = model.strip()
+        tiers.append(tier)
+    return tiers
+
+
+def parse_model_prices(raw: str) -> Dict[str, tuple[float, float]]:
+    """'gpt-5-mini=0.25/2.0,gpt-5=1.25/10' 형식 파싱 (100만 토큰당 입력/출력 USD)"""
+    prices: Dict[str, tuple[float, float]] = {}
+    for entry in raw.split(","):
+        model, _, price = entry.partition("=")
+        input_price, _, output_price = price.partition("/")
+        try:
+            prices[model.strip()] = (float(input_price), float(output_price))
+        except ValueError:
+            continue
+    return prices
+
+
+def data_completeness(stock_data: StockData) -> float:
+    """시장 데이터 항목 중 값이 있는 비율 (0-1)"""
+    values = [getattr(stock_data, key, None) for _, key, _ in MARKET_DATA_FIELDS]
+    present = [value for value in values if value is not None and not (isinstance(value, str) and not value.strip())]
+    return len(present) / len(values) if values else 1.0
+
+
+@dataclass
+class _TierStats:
+    """티어별 누적 통계"""
+    requests: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    cost_usd: float = 0.0
+    quality_samples: int = 0
+    recommendation_matches: int = 0
+    risk_score_diff_total: int = 0
+
+
+class ModelRouter:
+    """복잡도 점수 기반 모델 티어 선택 및 티어별 리포트"""
+
+    def __init__(
+        self,
+        tiers: Optional[List[ModelTier]] = None,
+        prices: Optional[Dict[str, tuple[float, float]]] = None,
+        sample_rate: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.tiers = tiers if tiers is not None else parse_model_tiers(settings.LLM_MODEL_TIERS)
+        self.prices = prices if prices is not None else parse_model_prices(settings.LLM_MODEL_PRICES)
+        self.sample_rate = sample_rate if sample_rate is not None else settings.LLM_ROUTING_QUALITY_SAMPLE_RATE
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _TierStats] = {}
+        # 실행 중인 품질 점검 작업 (GC로 취소되지 않도록 참조 유지)
+        self._checks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tiers)
+
+    @property
+    def top_tier(self) -> Optional[ModelTier]:
+        return self.tiers[-1] if self.tiers else None
+
+    def route(self, stock_data: StockData, timeframe: str, has_recent_analysis: bool) -> Optional[RoutingDecision]:
+        """
+        분석 1건의 모델 티어 선택
+
+        Returns:
+            RoutingDecision, 라우팅 비활성화 시 None
+        """
+        if not self.enabled:
+            return None
+
+        completeness = data_completeness(stock_data)
+        score = TIMEFRAME_COMPLEXITY.get(timeframe, 1)
+        if completeness < settings.LLM_ROUTING_SPARSE_DATA_THRESHOLD:
+            score += 1
+        if has_recent_analysis:
+            score -= 1
+
+        tier = self.tiers[max(0, min(score, len(self.tiers) - 1))]
+        logger.info(
+            f"모델 라우팅: {stock_data.symbol} ({timeframe}) → {tier.name} "
+            f"(점수 {score}, 데이터 완성도 {completeness:.0%}, 최근 분석 {'있음' if has_recent_analysis else '없음'})"
+        )
+        return RoutingDecision(tier, score, completeness, has_recent_analysis)
+
+    def _tier_stats(self, tier: ModelTier) -> _TierStats:
+        return self._stats.setdefault(tier.name, _TierStats())
+
+    def record(self, tier: ModelTier, model: str, latency_seconds: float, usage: TokenUsage) -> None:
+        """티어 호출 1건의 지연 시간/토큰/비용 기록"""
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        cost = (usage.prompt_tokens * input_price + usage.completion_tokens * output_price) / 1_000_000
+        with self._lock:
+            stats = self._tier_stats(tier)
+            stats.requests += 1
+            stats.latencies.append(latency_seconds)
+            stats.usage.add(usage.prompt_tokens, usage.completion_tokens, usage.cached_tokens)
+            stats.cost_usd += cost
+
+    def should_sample(self, tier: ModelTier) -> bool:
+        """하위 티어 응답을 최상위 티어와 비교할지 여부"""
+        if tier is self.top_tier or self.sample_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.sample_rate
+
+    def schedule_quality_check(
+        self,
+        tier: ModelTier,
+        parsed_response: Dict[str, Any],
+        call_top: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> None:
+        """최상위 티어 응답과의 비교를 백그라운드로 실행 (분석 응답 지연 없음)"""
+        task = asyncio.create_task(self._quality_check(tier, parsed_response, call_top))
+        self._checks.add(task)
+        task.add_done_callback(self._checks.discard)
+
+    async def _quality_check(
+        self,
+        tier: ModelTier,
+        parsed_response: Dict[str, Any],
+        call_top: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> None:
+        try:
+            reference = await call_top()
+        except Exception as e:
+            logger.warning(f"모델 품질 점검 실패 ({tier.name}): {e}")
+            return
+
+        matched = parsed_response.get("recommendation") == reference.get("recommendation")
+        risk_diff = abs(int(parsed_response.get("risk_score", 5)) - int(reference.get("risk_score", 5)))
+        with self._lock:
+            stats = self._tier_stats(tier)
+            stats.quality_samples += 1
+            stats.recommendation_matches += int(matched)
+            stats.risk_score_diff_total += risk_diff
+
+    def report(self) -> Dict[str, Any]:
+        """티어별 지연 시간/비용/품질 점검 리포트"""
+        with self._lock:
+            tiers = {}
+            for tier in self.tiers:
+                stats = self._stats.get(tier.name, _TierStats())
+                latencies = list(stats.latencies)
+                tiers[tier.name] = {
+                    "models": dict(tier.models),
+                    "requests": stats.requests,
+                    "latency_p50_seconds": round(percentile(latencies, 50), 3) if latencies else None,
+                    "latency_p95_seconds": round(percentile(latencies, 95), 3) if latencies else None,
+                    "tokens": stats.usage.as_dict(),
+                    "cost_usd": round(stats.cost_usd, 6),
+                    "cost_per_request_usd": round(stats.cost_usd / stats.requests, 6) if stats.requests else None,
+                    "quality_samples": stats.quality_samples,
+                    "recommendation_agreement": (
+                        round(stats.recommendation_matches / stats.quality_samples, 4)
+                        if stats.quality_samples else None
+                    ),
+                    "mean_risk_score_diff": (
+                        round(stats.risk_score_diff_total / stats.quality_samples, 3)
+                        if stats.quality_samples else None
+                    ),
+                }
+            return {"enabled": self.enabled, "quality_sample_rate": self.sample_rate, "tiers": tiers}
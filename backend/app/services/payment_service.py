@@ -11,6 +11,7 @@ from datetime import datetime
 import httpx
 
 from app.core.config import settings
+from app.services.deadline import http_timeout
 from app.services.payment_store import payment_expectation_store, PaymentExpectation
 
 logger = logging.getLogger(__name__)
@@ -54,7 +55,7 @@ class PortOnePaymentService:
                 return self._access_token
 
         try:
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+            async with httpx.AsyncClient(timeout=http_timeout(), verify=False) as client:
                 response = await client.post(
                     f"{self.base_url}/users/getToken",
                     json={
@@ -156,7 +157,7 @@ class PortOnePaymentService:
         """결제 정보 조회"""
         try:
             headers = await self._get_headers()
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+            async with httpx.AsyncClient(timeout=http_timeout(), verify=False) as client:
                 response = await client.get(
                     f"{self.base_url}/payments/{imp_uid}",
                     headers=headers,
@@ -201,7 +202,7 @@ class PortOnePaymentService:
             if amount is not None:
                 payload["amount"] = amount
 
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
+            async with httpx.AsyncClient(timeout=http_timeout(), verify=False) as client:
                 response = await client.post(
                     f"{self.base_url}/payments/cancel",
                     headers=headers,
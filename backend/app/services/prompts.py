@@ -1,6 +1,10 @@
 """
 주식 딥리서치 분석 프롬프트
 """
+import json
+
+# 프롬프트 버전 (프롬프트/응답 형식 변경 시 올려서 이전 분석 캐시를 무효화)
+PROMPT_VERSION = "stock-analysis-v1"
 
 STOCK_ANALYSIS_SYSTEM_PROMPT = """You are a professional stock analyst providing deep research analysis.
 Your analysis must be thorough, data-driven, and actionable for investors.
@@ -79,12 +83,51 @@ CRITICAL:
 """
 
 
+# 사용자 프롬프트의 시장 데이터 항목 (라벨, stock_data 키, 접미사)
+MARKET_DATA_FIELDS = (
+    ("1-Day Change", "price_change_1d_pct", "%"),
+    ("1-Week Change", "price_change_1w_pct", "%"),
+    ("1-Month Change", "price_change_1m_pct", "%"),
+    ("Volume", "volume", ""),
+    ("Avg Volume", "avg_volume", ""),
+    ("Market Cap", "market_cap", ""),
+    ("P/E Ratio", "pe_ratio", ""),
+    ("P/B Ratio", "pb_ratio", ""),
+    ("Dividend Yield", "dividend_yield", ""),
+    ("52-Week High", "fifty_two_week_high", ""),
+    ("52-Week Low", "fifty_two_week_low", ""),
+    ("RSI (14)", "rsi_14", ""),
+    ("MA 50", "ma_50", ""),
+    ("MA 200", "ma_200", ""),
+    ("Beta", "beta", ""),
+    ("Sector", "sector", ""),
+    ("Industry", "industry", ""),
+)
+
+TIMEFRAME_LABELS = {
+    "short": "단기 (1-3개월)",
+    "mid": "중기 (3-12개월)",
+    "long": "장기 (1년+)",
+}
+
+MARKET_LABELS = {
+    "US": "미국",
+    "KR": "한국",
+}
+
+
+def _is_empty(value) -> bool:
+    """프롬프트에서 생략할 값 (없음/빈 문자열)"""
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
 def get_stock_analysis_user_prompt(
     stock_name: str,
     stock_code: str,
     market: str,
     timeframe: str,
-    stock_data: dict
+    stock_data: dict,
+    compact: bool = False,
 ) -> str:
     """
     주식 분석 사용자 프롬프트 생성
@@ -95,50 +138,145 @@ def get_stock_analysis_user_prompt(
         market: 시장 (US, KR)
         timeframe: 투자 기간 (short, mid, long)
         stock_data: 주식 데이터 딕셔너리
+        compact: 값이 없는 항목을 생략한 간결한 프롬프트 (입력 토큰 절감)
 
     Returns:
         사용자 프롬프트 문자열
     """
-    timeframe_map = {
-        "short": "단기 (1-3개월)",
-        "mid": "중기 (3-12개월)",
-        "long": "장기 (1년+)",
-    }
+    if compact:
+        return _get_compact_user_prompt(stock_name, stock_code, market, timeframe, stock_data)
 
-    market_map = {
-        "US": "미국",
-        "KR": "한국",
-    }
+    market_lines = "\n".join(
+        f"- {label}: {stock_data.get(key, 'N/A')}{suffix}"
+        for label, key, suffix in MARKET_DATA_FIELDS
+    )
 
     prompt = f"""Please analyze the following stock:
 
 ## Stock Information
 - Name: {stock_name}
 - Code: {stock_code}
-- Market: {market_map.get(market, market)}
-- Investment Timeframe: {timeframe_map.get(timeframe, timeframe)}
+- Market: {MARKET_LABELS.get(market, market)}
+- Investment Timeframe: {TIMEFRAME_LABELS.get(timeframe, timeframe)}
 
 ## Current Market Data
 - Current Price: {stock_data.get('current_price', 'N/A')} {stock_data.get('currency', '')}
-- 1-Day Change: {stock_data.get('price_change_1d_pct', 'N/A')}%
-- 1-Week Change: {stock_data.get('price_change_1w_pct', 'N/A')}%
-- 1-Month Change: {stock_data.get('price_change_1m_pct', 'N/A')}%
-- Volume: {stock_data.get('volume', 'N/A')}
-- Avg Volume: {stock_data.get('avg_volume', 'N/A')}
-- Market Cap: {stock_data.get('market_cap', 'N/A')}
-- P/E Ratio: {stock_data.get('pe_ratio', 'N/A')}
-- P/B Ratio: {stock_data.get('pb_ratio', 'N/A')}
-- Dividend Yield: {stock_data.get('dividend_yield', 'N/A')}
-- 52-Week High: {stock_data.get('fifty_two_week_high', 'N/A')}
-- 52-Week Low: {stock_data.get('fifty_two_week_low', 'N/A')}
-- RSI (14): {stock_data.get('rsi_14', 'N/A')}
-- MA 50: {stock_data.get('ma_50', 'N/A')}
-- MA 200: {stock_data.get('ma_200', 'N/A')}
-- Beta: {stock_data.get('beta', 'N/A')}
-- Sector: {stock_data.get('sector', 'N/A')}
-- Industry: {stock_data.get('industry', 'N/A')}
+{market_lines}
 
 Please provide a comprehensive deep research analysis based on the investment timeframe.
 Remember to respond in Korean and follow the exact JSON format specified."""
 
     return prompt
+
+
+def _get_compact_user_prompt(
+    stock_name: str,
+    stock_code: str,
+    market: str,
+    timeframe: str,
+    stock_data: dict,
+) -> str:
+    """간결한 사용자 프롬프트 (값이 없는 시장 데이터 항목 생략)"""
+    lines = [
+        f"Stock: {stock_name} ({stock_code}), {MARKET_LABELS.get(market, market)}",
+        f"Timeframe: {TIMEFRAME_LABELS.get(timeframe, timeframe)}",
+    ]
+
+    current_price = stock_data.get("current_price")
+    if not _is_empty(current_price):
+        lines.append(f"Current Price: {current_price} {stock_data.get('currency') or ''}".rstrip())
+
+    for label, key, suffix in MARKET_DATA_FIELDS:
+        value = stock_data.get(key)
+        if _is_empty(value):
+            continue
+        if isinstance(value, float):
+            value = round(value, 4)
+        lines.append(f"{label}: {value}{suffix}")
+
+    lines.append("Respond in Korean with the exact JSON format.")
+    return "\n".join(lines)
+
+
+def get_continuation_user_prompt(user_prompt: str, completed: dict, missing: list) -> str:
+    """
+    잘린 응답 이어쓰기 프롬프트 (빠진 필드만 요청)
+
+    Args:
+        user_prompt: 원래 사용자 프롬프트
+        completed: 이미 완성된 필드 (일관성 유지용)
+        missing: 생성할 필드 이름 목록
+
+    Returns:
+        사용자 프롬프트 문자열
+    """
+    return f"""{user_prompt}
+
+Your previous response was cut off. These fields are already complete:
+{json.dumps(completed, ensure_ascii=False)}
+
+Respond with a JSON object containing ONLY these missing fields, consistent with the completed ones:
+{", ".join(missing)}"""
+
+
+def get_delta_user_prompt(
+    user_prompt: str,
+    carried: dict,
+    previous: dict,
+    changes: list,
+    fields: tuple,
+) -> str:
+    """
+    델타 재분석 프롬프트 (바뀐 입력의 영향을 받는 섹션만 요청)
+
+    Args:
+        user_prompt: 현재 데이터로 만든 사용자 프롬프트
+        carried: 이전 분석에서 그대로 이어받는 섹션
+        previous: 다시 생성할 섹션의 이전 값
+        changes: 이전 분석 이후 바뀐 입력 (name, previous, current)
+        fields: 생성할 필드 이름 목록
+
+    Returns:
+        사용자 프롬프트 문자열
+    """
+    change_lines = "\n".join(
+        f"- {change.name}: {change.previous} -> {change.current}" for change in changes
+    ) or "- (no material changes)"
+
+    return f"""{user_prompt}
+
+## Previous Analysis (kept as is)
+{json.dumps(carried, ensure_ascii=False)}
+
+## Previous Values of Sections to Update
+{json.dumps(previous, ensure_ascii=False)}
+
+## Inputs Changed Since the Previous Analysis
+{change_lines}
+
+Update the analysis for the changed inputs. Respond with a JSON object containing ONLY these fields:
+{", ".join(fields)}"""
+
+
+def get_multi_timeframe_user_prompt(user_prompt: str, timeframes: tuple) -> str:
+    """
+    여러 투자 기간 일괄 분석 프롬프트 (한 번의 응답으로 투자 기간별 분석 생성)
+
+    Args:
+        user_prompt: 요청 투자 기간으로 만든 사용자 프롬프트
+        timeframes: 생성할 투자 기간 목록 (short, mid, long)
+
+    Returns:
+        사용자 프롬프트 문자열
+    """
+    timeframe_lines = "\n".join(
+        f"- \"{timeframe}\": {TIMEFRAME_LABELS.get(timeframe, timeframe)}" for timeframe in timeframes
+    )
+
+    return f"""{user_prompt}
+
+Analyze the stock for EACH of these investment timeframes, not only the one above:
+{timeframe_lines}
+
+Respond with a JSON object whose keys are exactly the timeframe keys above.
+Each value must be a complete analysis object in the specified JSON format for that timeframe."""
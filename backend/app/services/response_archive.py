@@ -0,0 +1,275 @@
+"""
+LLM 원본 응답 아카이브
+
+- 분석마다 프로바이더가 반환한 LLM 응답 원문을 복구/파싱 전에 zlib으로 압축하여 StockInsight.raw_response에 저장
+  (잘린 응답도 이어쓰기/기본값 보완 전 원문 그대로, 이어쓰기 응답은 저장하지 않음,
+  투자 기간 일괄 생성은 일괄 응답 전체를 저장)
+- 프롬프트 버전은 prompt_version, 입력 종목 데이터 스냅샷은 input_data 컬럼에 함께 저장
+  (input_data는 수 KB 이하이고 델타 재분석 판정/재생 색인이 JSON으로 바로 읽으므로 압축하지 않음)
+- ArchiveReparser: 파서 변경/버그 수정 후 LLM 재호출 없이 아카이브를 다시 파싱하여 분석 필드 갱신
+  (run_reparse_archive.py)
+- ReplayLLMClient: 같은 프롬프트에 아카이브된 응답을 그대로 반환하는 재생 프로바이더
+  (LLM_PRIMARY_PROVIDER=replay, 결정적 벤치마크용)
+"""
+import asyncio
+import hashlib
+import logging
+import zlib
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.stock_insight import StockInsight
+from app.services.analysis_cache import ANALYSIS_FIELDS
+from app.services.delta_analysis import DELTA_FIELDS
+from app.services.fake_llm import estimate_tokens
+from app.services.prompts import PROMPT_VERSION, TIMEFRAME_LABELS, get_multi_timeframe_user_prompt
+from app.services.response_parser import (
+    is_valid_stock_analysis_response,
+    parse_multi_timeframe_response,
+    parse_stock_analysis_response,
+    repair_stock_analysis_response,
+)
+from app.services.stock_data_service import StockData
+
+logger = logging.getLogger(__name__)
+
+REPLAY_MODEL = "replay"
+# 압축 수준 (응답 JSON은 6 이상에서 압축률 차이가 작음)
+ARCHIVE_COMPRESSION_LEVEL = 6
+# 재생 스트리밍 조각 크기 (문자)
+REPLAY_CHUNK_CHARS = 32
+# 일괄 재파싱 페이지 크기
+REPARSE_BATCH_SIZE = 200
+
+TIMEFRAMES = tuple(TIMEFRAME_LABELS)
+
+
+class ReplayMiss(LookupError):
+    """재생 아카이브에 없는 프롬프트 (재시도하지 않음)"""
+
+
+def compress_response(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), ARCHIVE_COMPRESSION_LEVEL)
+
+
+def decompress_response(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _is_multi_timeframe(text: str) -> bool:
+    return bool(parse_multi_timeframe_response(text, TIMEFRAMES))
+
+
+def reparse_archived(insight: StockInsight) -> Optional[Dict[str, Any]]:
+    """
+    아카이브된 응답 재파싱
+
+    Returns:
+        갱신할 분석 필드 (델타 재분석은 다시 생성한 필드만),
+        아카이브가 없거나 파싱할 수 없으면 None (기본값으로 대체되는 응답은 기존 분석을 덮어쓰지 않음)
+    """
+    if not insight.raw_response:
+        return None
+    text = decompress_response(insight.raw_response)
+
+    analyses = parse_multi_timeframe_response(text, TIMEFRAMES)
+    if analyses:
+        return analyses.get(insight.timeframe)
+
+    if insight.delta_source_id:
+        repaired = repair_stock_analysis_response(text)
+        if repaired is None:
+            return None
+        return {name: repaired.result[name] for name in repaired.recovered if name in DELTA_FIELDS}
+
+    if not is_valid_stock_analysis_response(text):
+        return None
+    return parse_stock_analysis_response(text)
+
+
+@dataclass
+class ReparseReport:
+    """일괄 재파싱 결과"""
+    scanned: int = 0
+    changed_ids: List[int] = field(default_factory=list)
+    failed_ids: List[int] = field(default_factory=list)
+
+
+class ArchiveReparser:
+    """아카이브된 응답을 현재 파서로 다시 파싱하여 분석 필드 갱신"""
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+
+    async def run(
+        self,
+        prompt_version: Optional[str] = None,
+        since: Optional[datetime] = None,
+        ids: Optional[Sequence[int]] = None,
+        dry_run: bool = False,
+        batch_size: int = REPARSE_BATCH_SIZE,
+    ) -> ReparseReport:
+        """
+        일괄 재파싱 (ID 순 페이지 단위, 페이지마다 커밋)
+
+        Args:
+            prompt_version: 지정 시 해당 프롬프트 버전 분석만
+            since: 지정 시 이 시각 이후 생성된 분석만
+            ids: 지정 시 해당 분석만
+            dry_run: 변경 대상만 집계하고 저장하지 않음
+        """
+        report = ReparseReport()
+        last_id = 0
+        while True:
+            query = (
+                select(StockInsight)
+                .where(StockInsight.raw_response.is_not(None), StockInsight.id > last_id)
+                .order_by(StockInsight.id)
+                .limit(batch_size)
+            )
+            if prompt_version:
+                query = query.where(StockInsight.prompt_version == prompt_version)
+            if since:
+                query = query.where(StockInsight.created_at >= since)
+            if ids:
+                query = query.where(StockInsight.id.in_(list(ids)))
+
+            async with self._session_factory() as session:
+                insights = (await session.execute(query)).scalars().all()
+                if not insights:
+                    break
+                for insight in insights:
+                    report.scanned += 1
+                    try:
+                        parsed = reparse_archived(insight)
+                    except Exception as e:
+                        logger.warning(f"아카이브 재파싱 실패: ID={insight.id} - {e}")
+                        parsed = None
+                    if parsed is None:
+                        report.failed_ids.append(insight.id)
+                        continue
+
+                    changes = {
+                        name: value for name, value in parsed.items()
+                        if name in ANALYSIS_FIELDS and getattr(insight, name) != value
+                    }
+                    if changes:
+                        report.changed_ids.append(insight.id)
+                        for name, value in changes.items():
+                            setattr(insight, name, value)
+                last_id = insights[-1].id
+                if not dry_run:
+                    await session.commit()
+
+        logger.info(
+            f"아카이브 재파싱 완료: 검사 {report.scanned}, 변경 {len(report.changed_ids)}, "
+            f"실패 {len(report.failed_ids)}{' (dry run)' if dry_run else ''}"
+        )
+        return report
+
+
+@dataclass
+class ArchivedCompletion:
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class ReplayLLMClient:
+    """
+    아카이브 재생 LLM 클라이언트
+
+    현재 프롬프트 버전으로 저장된 분석의 input_data로 사용자 프롬프트를 다시 만들어
+    프롬프트 해시 → 아카이브 응답 색인을 구성합니다 (첫 호출 시 1회 로드, 같은 프롬프트는 최신 분석).
+    델타 재분석의 응답은 델타 프롬프트에 대한 부분 응답이므로 색인하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        prompt_builder: Callable[[StockData, str], str],
+        session_factory=AsyncSessionLocal,
+    ):
+        self._prompt_builder = prompt_builder
+        self._session_factory = session_factory
+        self._index: Optional[Dict[str, ArchivedCompletion]] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _key(user_prompt: str) -> str:
+        return hashlib.sha256(user_prompt.encode("utf-8")).hexdigest()
+
+    async def load(self) -> int:
+        """아카이브 색인 로드 (이미 로드했으면 생략) 후 색인 크기 반환"""
+        async with self._lock:
+            if self._index is not None:
+                return len(self._index)
+
+            async with self._session_factory() as session:
+                result = await session.execute(
+                    select(StockInsight)
+                    .where(
+                        StockInsight.raw_response.is_not(None),
+                        StockInsight.input_data.is_not(None),
+                        StockInsight.prompt_version == PROMPT_VERSION,
+                        StockInsight.delta_source_id.is_(None),
+                    )
+                    .order_by(StockInsight.created_at, StockInsight.id)
+                )
+                insights = result.scalars().all()
+
+            stock_fields = {f.name for f in fields(StockData)}
+            index: Dict[str, ArchivedCompletion] = {}
+            for insight in insights:
+                stock_data = StockData(**{k: v for k, v in insight.input_data.items() if k in stock_fields})
+                user_prompt = self._prompt_builder(stock_data, insight.timeframe)
+                text = decompress_response(insight.raw_response)
+                if _is_multi_timeframe(text):
+                    user_prompt = get_multi_timeframe_user_prompt(user_prompt, TIMEFRAMES)
+                index[self._key(user_prompt)] = ArchivedCompletion(
+                    text=text,
+                    prompt_tokens=insight.prompt_tokens or estimate_tokens(user_prompt),
+                    completion_tokens=insight.completion_tokens or estimate_tokens(text),
+                )
+            self._index = index
+            logger.info(f"재생 아카이브 로드: 응답 {len(index)}개 (프롬프트 버전 {PROMPT_VERSION})")
+            return len(index)
+
+    async def _lookup(self, user_prompt: str) -> ArchivedCompletion:
+        await self.load()
+        completion = self._index.get(self._key(user_prompt))
+        if completion is None:
+            raise ReplayMiss("재생 아카이브에 없는 프롬프트입니다")
+        return completion
+
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> tuple[str, int, int]:
+        """
+        아카이브 응답 반환
+
+        Returns:
+            (응답 텍스트, 입력 토큰, 출력 토큰)
+
+        Raises:
+            ReplayMiss: 아카이브에 없는 프롬프트
+        """
+        completion = await self._lookup(user_prompt)
+        return completion.text, completion.prompt_tokens, completion.completion_tokens
+
+    async def stream(
+        self, system_prompt: str, user_prompt: str, max_tokens: int
+    ) -> AsyncIterator[tuple[str, Optional[tuple[int, int]]]]:
+        """
+        아카이브 응답 스트리밍 (지연 없이 고정 크기 조각)
+
+        Yields:
+            (텍스트 조각, 마지막 조각이면 (입력 토큰, 출력 토큰) 아니면 None)
+        """
+        completion = await self._lookup(user_prompt)
+        text = completion.text
+        for start in range(0, len(text), REPLAY_CHUNK_CHARS):
+            last = start + REPLAY_CHUNK_CHARS >= len(text)
+            usage = (completion.prompt_tokens, completion.completion_tokens) if last else None
+            yield text[start:start + REPLAY_CHUNK_CHARS], usage
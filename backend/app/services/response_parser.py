@@ -5,7 +5,8 @@ AI 응답 파서 모듈
 import json
 import logging
 import re
-from typing import Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +60,12 @@ DEFAULT_STOCK_ANALYSIS = {
 }
 
 
+NESTED_FIELDS = (
+    "risk_analysis", "market_overview", "sentiment_details",
+    "current_drivers", "future_catalysts"
+)
+
+
 def validate_recommendation(value: str) -> str:
     """투자 의사결정 값 검증"""
     value_lower = value.lower().replace(" ", "_")
@@ -105,11 +112,55 @@ def extract_json_from_text(text: str) -> str:
     raise ValueError("JSON 형식을 찾을 수 없습니다")
 
 
+def is_valid_stock_analysis_response(response_text: str) -> bool:
+    """응답이 기본값 대체 없이 파싱되는 분석 JSON인지 확인 (필수 필드 포함)"""
+    try:
+        parsed = json.loads(extract_json_from_text(response_text))
+    except (ValueError, TypeError):
+        return False
+    return isinstance(parsed, dict) and "deep_research" in parsed and "recommendation" in parsed
+
+
 def get_default_stock_response() -> Dict:
     """기본 주식 분석 응답 반환 (파싱 실패 시)"""
     return DEFAULT_STOCK_ANALYSIS.copy()
 
 
+def apply_analysis_field(result: Dict[str, Any], key: str, value: Any) -> bool:
+    """
+    최상위 필드 1개를 검증하여 결과에 반영
+
+    Args:
+        result: 기본값으로 시작한 분석 결과 (중첩 객체는 기본값과 병합)
+        key: 최상위 필드 이름
+        value: JSON 값
+
+    Returns:
+        반영 여부 (알 수 없는 필드, 목록/객체 타입 불일치는 무시)
+
+    Raises:
+        AttributeError: 문자열이어야 하는 값이 문자열이 아닌 경우
+    """
+    if key in ("deep_research", "recommendation_reason"):
+        result[key] = value
+    elif key == "recommendation":
+        result[key] = validate_recommendation(value)
+    elif key == "confidence_level":
+        result[key] = validate_confidence_level(value)
+    elif key == "risk_score":
+        result[key] = validate_risk_score(value)
+    elif key == "market_sentiment":
+        result[key] = validate_sentiment(value)
+    elif key == "key_summary" and isinstance(value, list):
+        result[key] = value
+    elif key in NESTED_FIELDS and isinstance(value, dict):
+        # 기존 기본값과 병합
+        result[key] = {**result[key], **value}
+    else:
+        return False
+    return True
+
+
 def parse_stock_analysis_response(response_text: str) -> Dict[str, Any]:
     """
     주식 딥리서치 분석 응답 파싱 및 검증
@@ -127,48 +178,258 @@ def parse_stock_analysis_response(response_text: str) -> Dict[str, Any]:
 
         # 필수 필드 검증 및 기본값 적용
         result = get_default_stock_response()
+        for key, value in parsed.items():
+            apply_analysis_field(result, key, value)
+
+        return result
+
+    except ValueError as e:
+        # 잘린 응답/뒤에 덧붙인 설명은 완성된 필드만이라도 복구
+        repaired = repair_stock_analysis_response(response_text)
+        if repaired:
+            logger.warning(f"응답 복구: 필드 {repaired.recovered}, 누락 {repaired.missing}")
+            return repaired.result
+        if isinstance(e, json.JSONDecodeError):
+            logger.error(f"JSON 파싱 오류: {e}")
+        else:
+            logger.error(f"JSON 추출 오류: {e}")
+        return get_default_stock_response()
+    except Exception as e:
+        logger.error(f"응답 파싱 오류: {e}")
+        return get_default_stock_response()
 
-        # 메인 필드 업데이트
-        if "deep_research" in parsed:
-            result["deep_research"] = parsed["deep_research"]
 
-        if "recommendation" in parsed:
-            result["recommendation"] = validate_recommendation(parsed["recommendation"])
+class IncrementalAnalysisParser:
+    """
+    스트리밍 응답 증분 파서
+
+    LLM 응답 조각을 받는 대로 스캔하여 최상위 필드 값이 끝나는 즉시
+    (같은 수준의 ',' 또는 닫는 '}') 검증하여 반환합니다.
+    첫 '{' 이전 텍스트(```json 등)와 닫는 '}' 이후 텍스트는 무시합니다.
+
+    사용 예:
+        parser = IncrementalAnalysisParser()
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                ...
+        if parser.complete and not parser.errors:
+            result = parser.result()
+    """
 
-        if "confidence_level" in parsed:
-            result["confidence_level"] = validate_confidence_level(parsed["confidence_level"])
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._result = get_default_stock_response()
+        # 완료된 필드 이름 (도착 순서)
+        self.fields: List[str] = []
+        # 파싱/검증 실패 (조기 실패 판정용)
+        self.errors: List[str] = []
+        # 최상위 객체가 닫혔는지 여부
+        self.complete = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        응답 조각 추가
+
+        Returns:
+            이번 조각으로 완료된 (필드 이름, 검증된 값) 목록
+        """
+        self._text += chunk
+        text = self._text
+        completed: List[Tuple[str, Any]] = []
+
+        while self._pos < len(text) and not self.complete:
+            ch = text[self._pos]
+
+            if self._depth == 0:
+                # 최상위 객체 시작 전 텍스트 무시
+                if ch == "{":
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None and self._key is None:
+                        self._key = json.loads(text[self._key_start:self._pos + 1])
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = self._pos
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_field(text, completed)
+                    self.complete = True
+            elif self._depth == 1:
+                if ch == ":" and self._key is not None and self._value_start is None:
+                    self._value_start = self._pos + 1
+                elif ch == ",":
+                    self._complete_field(text, completed)
+
+            self._pos += 1
+
+        return completed
+
+    def _complete_field(self, text: str, completed: List[Tuple[str, Any]]) -> None:
+        """현재 위치에서 끝난 최상위 필드 값 검증"""
+        key, value_start = self._key, self._value_start
+        self._key_start = self._key = self._value_start = None
+        if key is None or value_start is None:
+            return
+
+        try:
+            value = json.loads(text[value_start:self._pos])
+            applied = apply_analysis_field(self._result, key, value)
+        except (ValueError, AttributeError, TypeError) as e:
+            logger.warning(f"스트리밍 응답 필드 검증 실패: {key} - {e}")
+            self.errors.append(key)
+            return
+
+        if applied:
+            self.fields.append(key)
+            completed.append((key, self._result[key]))
+
+    def result(self) -> Dict[str, Any]:
+        """지금까지 완료된 필드를 기본값에 반영한 분석 결과"""
+        return {**self._result}
+
+
+def close_truncated_json(json_text: str) -> str:
+    """
+    잘린 JSON 닫기
 
-        if "recommendation_reason" in parsed:
-            result["recommendation_reason"] = parsed["recommendation_reason"]
+    마지막 구조 문자(',' '{' '[' '}' ']') 이후의 끝나지 않은 값(문자열, 숫자, 값 없는 키)을
+    버리고, 열린 배열/객체를 순서대로 닫습니다.
+    """
+    stack: List[str] = []
+    in_string = escape = False
+    # (자를 위치, 그 시점의 열린 괄호 목록)
+    cut = (0, [])
+
+    for pos, ch in enumerate(json_text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            cut = (pos + 1, list(stack))
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            cut = (pos + 1, list(stack))
+        elif ch == ",":
+            cut = (pos, list(stack))
+
+    end, open_brackets = cut
+    return json_text[:end] + "".join(reversed(open_brackets))
+
+
+@dataclass
+class RepairedAnalysis:
+    """복구된 분석 응답"""
+    result: Dict[str, Any]  # 복구된 필드를 기본값에 반영한 분석 결과
+    recovered: List[str] = field(default_factory=list)  # 결과에 반영된 필드
+    missing: List[str] = field(default_factory=list)  # 잘려서 완성되지 않은 필드 (이어쓰기 대상)
+
+
+def repair_stock_analysis_response(response_text: str) -> Optional[RepairedAnalysis]:
+    """
+    json.loads로 파싱되지 않는 응답 복구
 
-        if "risk_score" in parsed:
-            result["risk_score"] = validate_risk_score(parsed["risk_score"])
+    - 뒤에 설명을 덧붙인 응답: 닫힌 최상위 객체의 필드를 모두 사용
+    - 출력 토큰 상한으로 잘린 응답: 끝나지 않은 문자열/배열/객체를 닫아 완성된 필드를 살리고,
+      잘린 필드와 아직 생성되지 않은 필드는 missing으로 반환
+      (잘린 중첩 객체/배열은 완성된 항목만 임시로 반영)
 
-        if "market_sentiment" in parsed:
-            result["market_sentiment"] = validate_sentiment(parsed["market_sentiment"])
+    Returns:
+        RepairedAnalysis, 복구할 필드가 없으면 None
+    """
+    start = response_text.find("{")
+    if start < 0:
+        return None
 
-        if "key_summary" in parsed and isinstance(parsed["key_summary"], list):
-            result["key_summary"] = parsed["key_summary"]
+    parser = IncrementalAnalysisParser()
+    parser.feed(response_text[start:])
+    if parser.complete:
+        if not parser.fields:
+            return None
+        return RepairedAnalysis(result=parser.result(), recovered=list(parser.fields))
 
-        # 중첩 객체 업데이트
-        nested_fields = [
-            "risk_analysis", "market_overview", "sentiment_details",
-            "current_drivers", "future_catalysts"
-        ]
+    try:
+        repaired = json.loads(close_truncated_json(response_text[start:]))
+    except ValueError:
+        repaired = {}
+
+    result = get_default_stock_response()
+    recovered = []
+    for key, value in repaired.items():
+        try:
+            if apply_analysis_field(result, key, value):
+                recovered.append(key)
+        except (AttributeError, TypeError):
+            continue
+
+    if not recovered:
+        return None
+    missing = [key for key in DEFAULT_STOCK_ANALYSIS if key not in parser.fields]
+    return RepairedAnalysis(result=result, recovered=recovered, missing=missing)
+
+
+def parse_multi_timeframe_response(response_text: str, timeframes: Tuple[str, ...]) -> Dict[str, Dict[str, Any]]:
+    """
+    투자 기간 일괄 분석 응답 파싱
 
-        for field in nested_fields:
-            if field in parsed and isinstance(parsed[field], dict):
-                # 기존 기본값과 병합
-                result[field] = {**result[field], **parsed[field]}
+    응답은 투자 기간을 키로, 분석 객체를 값으로 갖는 JSON 객체입니다.
+    출력 토큰 상한으로 잘린 응답은 마지막(잘린) 투자 기간을 버리고 완성된 투자 기간만 사용합니다.
 
-        return result
+    Returns:
+        {투자 기간: 파싱된 분석 결과} (필수 필드가 없는 투자 기간은 제외)
+    """
+    start = response_text.find("{")
+    if start < 0:
+        return {}
 
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON 파싱 오류: {e}")
-        return get_default_stock_response()
-    except ValueError as e:
-        logger.error(f"JSON 추출 오류: {e}")
-        return get_default_stock_response()
-    except Exception as e:
-        logger.error(f"응답 파싱 오류: {e}")
-        return get_default_stock_response()
+    try:
+        parsed = json.loads(extract_json_from_text(response_text))
+    except ValueError:
+        try:
+            parsed = json.loads(close_truncated_json(response_text[start:]))
+        except ValueError:
+            return {}
+        if isinstance(parsed, dict) and parsed:
+            parsed.pop(list(parsed)[-1])
+
+    if not isinstance(parsed, dict):
+        return {}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for timeframe in timeframes:
+        analysis = parsed.get(timeframe)
+        if not isinstance(analysis, dict) or "deep_research" not in analysis or "recommendation" not in analysis:
+            continue
+        result = get_default_stock_response()
+        try:
+            for key, value in analysis.items():
+                apply_analysis_field(result, key, value)
+        except (AttributeError, TypeError) as e:
+            logger.warning(f"투자 기간 일괄 응답 필드 검증 실패: {timeframe} - {e}")
+            continue
+        results[timeframe] = result
+    return results
@@ -0,0 +1,262 @@
+"""
+동일 LLM 분석 중복 호출 방지 (single-flight)
+
+- 같은 입력 지문의 분석이 동시에 요청되면 LLM은 한 번만 호출하고 결과를 공유
+- 프로세스 내: 진행 중인 분석의 Future를 공유
+- 프로세스 간 (선택): analysis_flights 테이블 점유로 한 프로세스만 호출,
+  나머지는 점유 행에 기록되는 결과를 폴링
+  (점유 행은 진행 중 조정용이며 결과 저장소가 아님 - 결과는 대기 중이던 프로세스가 읽을 만큼만 유지하고,
+  완료 후 도착한 요청은 점유 행의 결과를 사용하지 않음 - 완료된 분석 재사용은 공유 분석 캐시가 담당)
+- 각 요청자는 공유된 결과로 자신의 StockInsight를 따로 저장
+"""
+import asyncio
+import copy
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.analysis_flight import AnalysisFlight
+from app.services.deadline import run_with_deadline
+
+logger = logging.getLogger(__name__)
+
+# 다른 프로세스의 결과 폴링 간격 (초)
+WAIT_POLL_INTERVAL_SECONDS = 0.5
+# 결과 기록 후 점유 행 유지 시간 (폴링 간격 배수, 대기 중인 프로세스가 읽어갈 시간)
+RESULT_LINGER_POLLS = 2
+
+FlightResult = Dict[str, Any]
+
+
+class LocalFlightBackend:
+    """프로세스 간 점유 없음 (프로세스 내 공유만 사용)"""
+
+    async def acquire(self, key: str) -> bool:
+        return True
+
+    async def publish(self, key: str, result: FlightResult) -> None:
+        return None
+
+    async def release(self, key: str) -> None:
+        return None
+
+    async def wait(self, key: str) -> Optional[FlightResult]:
+        return None
+
+
+class DatabaseFlightBackend:
+    """analysis_flights 테이블 기반 프로세스 간 점유"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, timeout_seconds: Optional[int] = None):
+        self._session_factory = session_factory
+        self._timeout_seconds = timeout_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+    @property
+    def timeout(self) -> timedelta:
+        seconds = self._timeout_seconds if self._timeout_seconds is not None else settings.ANALYSIS_SINGLE_FLIGHT_TIMEOUT_SECONDS
+        return timedelta(seconds=seconds)
+
+    async def acquire(self, key: str) -> bool:
+        """점유 시도 (만료된 점유는 정리 후 재점유, 기본키 충돌 시 실패)"""
+        now = datetime.utcnow()
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(AnalysisFlight).where(AnalysisFlight.expires_at < now)
+            )
+            session.add(AnalysisFlight(key=key, owner=self.owner, expires_at=now + self.timeout))
+            try:
+                await session.commit()
+                return True
+            except IntegrityError:
+                await session.rollback()
+                return False
+
+    async def publish(self, key: str, result: FlightResult) -> None:
+        """
+        완료된 결과 기록
+
+        대기 중인 프로세스가 폴링으로 읽어갈 시간만 남기고 점유를 만료시킵니다
+        (이후 요청은 만료된 행을 정리하고 새로 점유).
+        """
+        linger = timedelta(seconds=WAIT_POLL_INTERVAL_SECONDS * RESULT_LINGER_POLLS)
+        async with self._session_factory() as session:
+            await session.execute(
+                update(AnalysisFlight)
+                .where(AnalysisFlight.key == key, AnalysisFlight.owner == self.owner)
+                .values(result=result, expires_at=datetime.utcnow() + linger)
+            )
+            await session.commit()
+
+    async def release(self, key: str) -> None:
+        """실패 시 점유 해제 (대기 중인 프로세스가 직접 호출하도록)"""
+        async with self._session_factory() as session:
+            await session.execute(
+                delete(AnalysisFlight).where(
+                    AnalysisFlight.key == key,
+                    AnalysisFlight.owner == self.owner,
+                    AnalysisFlight.result.is_(None),
+                )
+            )
+            await session.commit()
+
+    async def wait(self, key: str) -> Optional[FlightResult]:
+        """
+        다른 프로세스의 결과 대기
+
+        진행 중인 점유를 본 뒤 기록된 결과만 사용합니다
+        (처음 조회 때 이미 결과가 있으면 완료 후 도착한 요청이므로 직접 실행).
+
+        Returns:
+            결과 또는 None (점유 해제/만료/시간 초과, 이미 완료된 점유)
+        """
+        deadline = datetime.utcnow() + self.timeout
+        in_progress_seen = False
+        while datetime.utcnow() < deadline:
+            async with self._session_factory() as session:
+                flight = await session.scalar(
+                    select(AnalysisFlight).where(AnalysisFlight.key == key)
+                )
+            if flight is None or flight.expires_at < datetime.utcnow():
+                return None
+            if flight.result is not None:
+                return flight.result if in_progress_seen else None
+            in_progress_seen = True
+            await asyncio.sleep(WAIT_POLL_INTERVAL_SECONDS)
+        return None
+
+
+def _create_backend():
+    """설정에 따른 프로세스 간 점유 백엔드 생성"""
+    if settings.ANALYSIS_SINGLE_FLIGHT_BACKEND == "database":
+        return DatabaseFlightBackend()
+    return LocalFlightBackend()
+
+
+class SingleFlight:
+    """입력 지문 단위 LLM 분석 중복 호출 방지"""
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else _create_backend()
+        # 입력 지문 -> 진행 중인 분석 Future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 통계
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._shared_local = 0
+        self._shared_remote = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[FlightResult]],
+        shareable: Optional[Callable[[FlightResult], bool]] = None,
+    ) -> tuple[FlightResult, bool]:
+        """
+        같은 key의 진행 중인 분석이 있으면 결과를 공유, 없으면 fn 실행
+        (공유 중 리더가 취소되면 대기자가 다시 시도하여 fn 실행)
+
+        Args:
+            shareable: 지정 시 True인 결과만 다른 프로세스에 공유 (아니면 점유만 해제)
+
+        Returns:
+            (결과, 공유 여부) 튜플 - 공유된 결과는 호출자별 사본
+        """
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                # 대기자의 요청 예산이 먼저 끝나도 진행 중인 분석은 취소하지 않음
+                result = await run_with_deadline(asyncio.shield(inflight), "llm")
+            except asyncio.CancelledError:
+                # 리더가 취소된 경우(연결 종료, 워커 종료)는 대기자가 다시 시도하여 직접 리더가 됨
+                if not inflight.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                if self._inflight.get(key) is inflight:
+                    self._inflight.pop(key, None)
+                logger.info(f"진행 중이던 동일 분석이 취소됨, 다시 시도: {key[:12]}")
+                continue
+            with self._lock:
+                self._shared_local += 1
+            return copy.deepcopy(result), True
+
+        future = asyncio.get_running_loop().create_future()
+        # 대기자가 없을 때 예외 미조회 경고 방지
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+
+        try:
+            result, shared = await self._lead(key, fn, shareable)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, shared
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _lead(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[FlightResult]],
+        shareable: Optional[Callable[[FlightResult], bool]] = None,
+    ) -> tuple[FlightResult, bool]:
+        """프로세스 간 점유 후 실행 (다른 프로세스가 점유 중이면 결과 대기)"""
+        try:
+            acquired = await self.backend.acquire(key)
+        except Exception as e:
+            logger.warning(f"분석 점유 실패, 단독 실행: {e}")
+            acquired = True
+
+        if not acquired:
+            result = await run_with_deadline(self.backend.wait(key), "llm")
+            if result is not None:
+                with self._lock:
+                    self._shared_remote += 1
+                logger.info(f"다른 프로세스의 분석 결과 공유: {key[:12]}")
+                return result, True
+            logger.info(f"다른 프로세스의 분석 대기 실패, 직접 실행: {key[:12]}")
+
+        with self._lock:
+            self._leaders += 1
+
+        try:
+            result = await fn()
+        except BaseException:
+            if acquired:
+                try:
+                    await self.backend.release(key)
+                except Exception as e:
+                    logger.warning(f"분석 점유 해제 실패: {e}")
+            raise
+
+        if acquired:
+            try:
+                if shareable is None or shareable(result):
+                    await self.backend.publish(key, result)
+                else:
+                    await self.backend.release(key)
+            except Exception as e:
+                logger.warning(f"분석 결과 공유 기록 실패: {e}")
+        return result, False
+
+    def stats(self) -> Dict[str, int]:
+        """LLM 호출/공유 통계"""
+        with self._lock:
+            return {
+                "in_flight": len(self._inflight),
+                "leaders": self._leaders,
+                "shared_local": self._shared_local,
+                "shared_remote": self._shared_remote,
+            }
@@ -8,6 +8,7 @@ from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 import asyncio
+import time
 from concurrent.futures import ThreadPoolExecutor
 
 import httpx
@@ -15,7 +16,19 @@ import yfinance as yf
 import pandas as pd
 
 from app.core.config import settings
+from app.services.deadline import (
+    DeadlineExceeded,
+    can_afford,
+    http_timeout,
+    llm_expected_seconds,
+    raise_if_expired,
+    run_with_deadline,
+)
 from app.services.kr_stock_cache import kr_stock_cache
+from app.services.latency_spans import span
+from app.services.us_stock_cache import us_stock_cache
+from app.services.symbol_resolver import SymbolResolver
+from app.services.ticker_table import TickerDiff
 
 logger = logging.getLogger(__name__)
 
@@ -141,6 +154,21 @@ class StockDataService:
         self.cache: Dict[str, tuple] = {}  # symbol -> (data, timestamp)
         self.cache_ttl = 300  # 5분
         self._executor = ThreadPoolExecutor(max_workers=4)  # yfinance는 동기 API
+        # 통합 심볼 리졸버 (하드코딩 매핑 + 별칭 + pykrx 종목 테이블)
+        self.resolver = SymbolResolver(
+            kr_mapping=KR_STOCK_MAPPING,
+            us_mapping=US_STOCK_MAPPING,
+        )
+        # KR 종목 테이블 변경분 구독 (변경된 종목의 데이터 캐시만 무효화)
+        kr_stock_cache.subscribe(self._on_kr_diff)
+
+    def _on_kr_diff(self, diff: TickerDiff) -> None:
+        """상장/폐지/종목명 변경/시장 이전된 종목의 캐시 제거"""
+        stale = diff.affected_symbols() & self.cache.keys()
+        for symbol in stale:
+            del self.cache[symbol]
+        if stale:
+            logger.info(f"종목 변경분으로 데이터 캐시 무효화: {len(stale)}개")
 
     @property
     def api_key(self) -> str:
@@ -149,7 +177,7 @@ class StockDataService:
 
     async def resolve_stock_code(self, query: str) -> tuple[str, str]:
         """
-        종목명/코드를 심볼로 변환 (pykrx 캐시 활용)
+        종목명/코드를 심볼로 변환 (통합 심볼 인덱스 + 메모이제이션)
 
         Args:
             query: 종목명 또는 코드 (예: "애플", "AAPL", "005930.KS", "현대글로비스")
@@ -157,42 +185,11 @@ class StockDataService:
         Returns:
             (symbol, market) 튜플
         """
-        query = query.strip()
-
-        # 한국 종목 형식인 경우 (.KS, .KQ 접미사)
-        if query.endswith(".KS") or query.endswith(".KQ"):
-            return query, "KR"
-
-        # 하드코딩된 한국 종목명 매핑 (빠른 조회용)
-        if query in KR_STOCK_MAPPING:
-            return KR_STOCK_MAPPING[query], "KR"
-
-        # 하드코딩된 미국 종목명 매핑
-        if query in US_STOCK_MAPPING:
-            return US_STOCK_MAPPING[query], "US"
-
-        # pykrx 캐시에서 한국 종목 검색 (이름 또는 코드)
-        kr_result = await kr_stock_cache.resolve_code(query)
-        if kr_result:
-            return kr_result
-
-        # 숫자로만 구성된 경우 한국 종목 코드로 판단
-        if query.isdigit():
-            code = query.zfill(6)
-            # pykrx 캐시에서 시장 구분 조회 (KOSPI/KOSDAQ)
-            market_type = await kr_stock_cache.get_market(code)
-            suffix = ".KS" if market_type == "KOSPI" else ".KQ"
-            return f"{code}{suffix}", "KR"
-
-        # 영문 대문자로만 구성된 경우 미국 종목으로 판단
-        if query.isupper() and query.isalpha():
-            return query, "US"
-
-        # 기타: 그대로 반환 (미국 종목으로 가정)
-        return query.upper(), "US"
+        resolved = await run_with_deadline(self.resolver.resolve(query), "resolution")
+        return resolved.symbol, resolved.market
 
     async def _fetch_finnhub(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict]:
-        """Finnhub API 호출"""
+        """Finnhub API 호출 (타임아웃은 남은 요청 예산 이내, 예산 소진 시 DeadlineExceeded)"""
         api_key = self.api_key
         if not api_key:
             logger.error("FINNHUB_API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
@@ -201,14 +198,18 @@ class StockDataService:
         url = f"{FINNHUB_BASE_URL}/{endpoint}"
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            raise_if_expired("data_fetch")
+            async with httpx.AsyncClient(timeout=http_timeout()) as client:
                 response = await client.get(url, params=params)
                 response.raise_for_status()
                 return response.json()
+        except DeadlineExceeded:
+            raise
         except httpx.HTTPStatusError as e:
             logger.error(f"Finnhub API HTTP 오류: {e.response.status_code} - {e.response.text}")
             return None
         except Exception as e:
+            raise_if_expired("data_fetch")
             logger.error(f"Finnhub API 호출 실패: {e}")
             return None
 
@@ -376,7 +377,7 @@ class StockDataService:
                     logger.warning(f"pykrx OHLCV 조회 실패 ({code}): {e}")
                     return None
 
-            result = await loop.run_in_executor(self._executor, fetch_pykrx_data)
+            result = await run_with_deadline(loop.run_in_executor(self._executor, fetch_pykrx_data), "data_fetch")
 
             if not result:
                 logger.warning(f"pykrx 데이터도 없음: {symbol}")
@@ -416,6 +417,8 @@ class StockDataService:
             logger.info(f"pykrx 폴백 데이터 조회 성공: {symbol} - KRW {result['current_price']:,.0f}")
             return stock_data
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"pykrx 폴백 데이터 조회 실패 ({symbol}): {e}")
             return None
@@ -432,10 +435,10 @@ class StockDataService:
         try:
             # 1차: yfinance 시도
             loop = asyncio.get_running_loop()
-            result = await loop.run_in_executor(
-                self._executor,
-                self._fetch_yfinance_sync,
-                symbol
+            # executor 스레드는 취소할 수 없으므로 남은 예산까지만 대기
+            result = await run_with_deadline(
+                loop.run_in_executor(self._executor, self._fetch_yfinance_sync, symbol),
+                "data_fetch",
             )
 
             if not result:
@@ -477,6 +480,8 @@ class StockDataService:
             logger.info(f"yfinance 데이터 조회 성공: {symbol} - {result['currency']} {result['current_price']:,.0f}")
             return stock_data
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"yfinance 조회 실패 ({symbol}): {e}, pykrx 폴백 시도")
             # 예외 발생 시에도 pykrx 폴백 시도
@@ -493,7 +498,8 @@ class StockDataService:
             StockData 또는 None
         """
         # 심볼 정규화 및 마켓 판별 (async)
-        resolved_symbol, market = await self.resolve_stock_code(symbol)
+        with span("resolution"):
+            resolved_symbol, market = await self.resolve_stock_code(symbol)
 
         # 한국 주식은 yfinance 사용
         if market == "KR":
@@ -509,11 +515,17 @@ class StockDataService:
 
         try:
             # 1. Quote 데이터 조회 (현재가, 변동)
+            started = time.monotonic()
             quote = await self._fetch_finnhub("quote", {"symbol": resolved_symbol})
             if not quote or quote.get("c", 0) == 0:
                 logger.warning(f"Quote 데이터 없음: {resolved_symbol}")
                 return None
 
+            # 남은 예산이 LLM 호출과 부가 조회 2건을 감당하지 못하면 현재가만으로 분석 (캐시하지 않음)
+            enrich = can_afford(llm_expected_seconds() + 2 * (time.monotonic() - started))
+            if not enrich:
+                logger.warning(f"요청 예산 부족으로 종목 프로필/재무 지표 조회 생략: {resolved_symbol}")
+
             current_price = quote.get("c", 0)  # Current price
             price_change_1d = quote.get("d", 0)  # Change
             price_change_1d_pct = quote.get("dp", 0)  # Percent change
@@ -523,7 +535,7 @@ class StockDataService:
             prev_close = quote.get("pc", 0)  # Previous close
 
             # 2. Company Profile 조회
-            profile = await self._fetch_finnhub("stock/profile2", {"symbol": resolved_symbol})
+            profile = await self._fetch_finnhub("stock/profile2", {"symbol": resolved_symbol}) if enrich else None
             company_name = resolved_symbol
             market_cap = None
             industry = None
@@ -534,7 +546,10 @@ class StockDataService:
                 industry = profile.get("finnhubIndustry")
 
             # 3. Basic Financials 조회 (PE, PB, Beta, 52주 고/저)
-            metrics = await self._fetch_finnhub("stock/metric", {"symbol": resolved_symbol, "metric": "all"})
+            metrics = (
+                await self._fetch_finnhub("stock/metric", {"symbol": resolved_symbol, "metric": "all"})
+                if enrich else None
+            )
 
             pe_ratio = None
             pb_ratio = None
@@ -580,18 +595,21 @@ class StockDataService:
             )
 
             # 캐시 저장
-            self.cache[resolved_symbol] = (stock_data, datetime.now().timestamp())
+            if enrich:
+                self.cache[resolved_symbol] = (stock_data, datetime.now().timestamp())
 
             logger.info(f"Finnhub 데이터 조회 성공: {resolved_symbol} - ${current_price}")
             return stock_data
 
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"주식 데이터 조회 실패 ({resolved_symbol}): {e}")
             return None
 
     async def search_stock(self, query: str) -> List[Dict[str, Any]]:
         """
-        종목 검색 (pykrx 캐시 + Finnhub API)
+        종목 검색 (pykrx 캐시 + 미국 종목 스냅샷, Finnhub search는 폴백)
 
         Args:
             query: 검색어
@@ -626,8 +644,19 @@ class StockDataService:
                     "market": "US",
                 })
 
-        # 3. Finnhub Symbol Search API 사용 (미국 주식 추가 검색)
-        if len([r for r in results if r["market"] == "US"]) < 5:
+        # 3. 로컬 미국 종목 목록 스냅샷에서 검색
+        us_count = len([r for r in results if r["market"] == "US"])
+        if us_count < 5:
+            try:
+                us_results = await us_stock_cache.search(query, limit=10)
+                results.extend(us_results)
+                us_count += len(us_results)
+            except Exception as e:
+                logger.warning(f"미국 종목 목록 검색 실패: {e}")
+
+        # 4. Finnhub Symbol Search API (드문 폴백)
+        # 로컬 스냅샷이 없거나, 영문 검색어인데 로컬에서 미국 종목을 찾지 못한 경우에만 호출
+        if not us_stock_cache.is_healthy or (us_count == 0 and query.isascii()):
             search_result = await self._fetch_finnhub("search", {"q": query})
             if search_result and "result" in search_result:
                 for item in search_result["result"][:10]:
@@ -2,23 +2,80 @@
 주식 딥리서치 분석 엔진
 OpenAI/Anthropic API를 사용하여 주식 분석을 생성합니다.
 """
+import asyncio
+import contextlib
+import hashlib
+import json
 import time
 import logging
-from typing import Optional
+from typing import Optional, AsyncIterator, Awaitable, Callable, Dict, Any, List, Set, Tuple
 from dataclasses import asdict
 
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
-
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
 from app.models.stock_insight import StockInsight
 from app.services.stock_data_service import stock_data_service, StockData
-from app.services.prompts import STOCK_ANALYSIS_SYSTEM_PROMPT, get_stock_analysis_user_prompt
-from app.services.response_parser import parse_stock_analysis_response
+from app.services.prompts import (
+    PROMPT_VERSION,
+    STOCK_ANALYSIS_SYSTEM_PROMPT,
+    TIMEFRAME_LABELS,
+    get_continuation_user_prompt,
+    get_delta_user_prompt,
+    get_multi_timeframe_user_prompt,
+    get_stock_analysis_user_prompt,
+)
+from app.services.analysis_cache import analysis_result_cache, fingerprint_stock_data
+from app.services.single_flight import SingleFlight
+from app.services.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    iterate_with_deadline,
+    llm_expected_seconds,
+    run_with_deadline,
+)
+from app.services.fake_llm import FAKE_MODEL, FakeLLMClient
+from app.services.response_archive import REPLAY_MODEL, ReplayLLMClient, ReplayMiss, compress_response
+from app.services.llm_hedging import HedgePolicy
+from app.services.llm_admission import (
+    PRIORITY_DEMO,
+    AdmissionContext,
+    AdmissionRejected,
+    LLMAdmissionController,
+    admission_context,
+)
+from app.services.llm_key_pool import KeyPoolExhausted, build_key_pools, current_credential
+from app.services.llm_usage import TokenUsage, record_usage, track_usage, usage_from_response
+from app.services.latency_spans import SpanRecorder, current_spans, span
+from app.services.model_router import ModelRouter, ModelTier, current_tier, use_tier
+from app.services.delta_analysis import DELTA_FIELDS, DeltaPlan, delta_analyzer, regenerated_sections
+from app.services.llm_resilience import (
+    BREAKER_OPEN,
+    CircuitBreaker,
+    LLMUnavailableError,
+    is_retryable,
+    retry_delay,
+)
+from app.services.response_parser import (
+    DEFAULT_STOCK_ANALYSIS,
+    IncrementalAnalysisParser,
+    is_valid_stock_analysis_response,
+    parse_multi_timeframe_response,
+    parse_stock_analysis_response,
+    repair_stock_analysis_response,
+)
 
 logger = logging.getLogger(__name__)
 
+# 엔진이 지원하는 LLM 프로바이더
+SUPPORTED_PROVIDERS = ("openai", "anthropic", "fake", "replay")
+
+# 투자 기간 일괄 생성 대상
+TIMEFRAMES = tuple(TIMEFRAME_LABELS)
+
+# 분석 진행 단계 콜백 (fetching_data, calling_llm, parsing)
+StageCallback = Callable[[str], Awaitable[None]]
+
 
 class StockInsightEngine:
     """
@@ -28,19 +85,22 @@ class StockInsightEngine:
 
     def __init__(self):
         """StockInsightEngine 초기화"""
-        # OpenAI 클라이언트 초기화
-        openai_key = getattr(settings, 'OPENAI_API_KEY', None)
-        if openai_key:
-            self.openai_client = AsyncOpenAI(api_key=openai_key)
+        # 프로바이더별 API 키 풀 (여러 키/Azure 배포에 호출 분산)
+        self.key_pools = build_key_pools()
+
+        # OpenAI 클라이언트 초기화 (키 풀의 첫 키, 호출마다 키 풀에서 임대한 클라이언트 사용)
+        openai_pool = self.key_pools["openai"]
+        if openai_pool.credentials:
+            self.openai_client = openai_pool.credentials[0].client
             self.openai_model = getattr(settings, 'OPENAI_DEFAULT_MODEL', 'gpt-4o-mini')
         else:
             self.openai_client = None
             logger.warning("OPENAI_API_KEY가 설정되지 않았습니다.")
 
         # Anthropic 클라이언트 초기화
-        anthropic_key = getattr(settings, 'ANTHROPIC_API_KEY', None)
-        if anthropic_key:
-            self.anthropic_client = AsyncAnthropic(api_key=anthropic_key)
+        anthropic_pool = self.key_pools["anthropic"]
+        if anthropic_pool.credentials:
+            self.anthropic_client = anthropic_pool.credentials[0].client
             self.anthropic_model = getattr(settings, 'ANTHROPIC_DEFAULT_MODEL', 'claude-3-5-sonnet-20241022')
         else:
             self.anthropic_client = None
@@ -49,89 +109,842 @@ class StockInsightEngine:
         # Primary provider 설정
         self.primary_provider = getattr(settings, 'LLM_PRIMARY_PROVIDER', 'openai')
 
+        # 부하 테스트용 가짜 프로바이더 (기본/폴백 프로바이더로 명시한 경우만)
+        self.fake_client = None
+        configured = {self.primary_provider} | {
+            provider.strip() for provider in settings.LLM_FALLBACK_ORDER.split(",")
+        }
+        if "fake" in configured:
+            if settings.ENVIRONMENT == "production":
+                logger.error("production 환경에서는 가짜 LLM 프로바이더를 사용할 수 없습니다.")
+            else:
+                self.fake_client = FakeLLMClient()
+                self.fake_model = FAKE_MODEL
+                logger.warning("가짜 LLM 프로바이더 사용 중 (부하 테스트 전용)")
+
+        # 아카이브 재생 프로바이더 (결정적 벤치마크, 기본/폴백 프로바이더로 명시한 경우만)
+        self.replay_client = None
+        if "replay" in configured:
+            if settings.ENVIRONMENT == "production":
+                logger.error("production 환경에서는 재생 LLM 프로바이더를 사용할 수 없습니다.")
+            else:
+                self.replay_client = ReplayLLMClient(self._build_user_prompt)
+                self.replay_model = REPLAY_MODEL
+                logger.warning("재생 LLM 프로바이더 사용 중 (아카이브된 응답 반환)")
+
+        # 동일 입력 분석 중복 호출 방지
+        self.single_flight = SingleFlight()
+
+        # 프로바이더별 회로 차단기
+        self.breakers = {
+            provider: CircuitBreaker(
+                provider,
+                failure_threshold=settings.LLM_CIRCUIT_BREAKER_THRESHOLD,
+                recovery_seconds=settings.LLM_CIRCUIT_BREAKER_RECOVERY_MINUTES * 60,
+            )
+            for provider in SUPPORTED_PROVIDERS
+        }
+
+        # 헤지 요청 정책 (LLM_HEDGE_ENABLED)
+        self.hedge = HedgePolicy()
+
+        # 프로바이더별 동시 호출 제한 및 우선순위 대기열
+        self.admission = LLMAdmissionController()
+
+        # 복잡도 기반 모델 라우팅 (LLM_MODEL_TIERS)
+        self.model_router = ModelRouter()
+
+        # 요청 경로 밖에서 실행하는 저장 작업 (일괄 생성된 나머지 투자 기간)
+        self._background: Set[asyncio.Task] = set()
+
+        # 투자 기간 일괄 생성 호출 수 / 요청 기간을 얻지 못해 단일 기간으로 다시 생성한 횟수
+        self._multi_timeframe_calls = 0
+        self._multi_timeframe_misses = 0
+
+    def _provider_client(self, provider: str):
+        """프로바이더의 (클라이언트, 모델) 반환 (미설정 시 (None, None))"""
+        if provider == 'openai' and self.openai_client:
+            return self.openai_client, self._model_for(provider)
+        if provider == 'anthropic' and self.anthropic_client:
+            return self.anthropic_client, self._model_for(provider)
+        if provider == 'fake' and self.fake_client:
+            return self.fake_client, self._model_for(provider)
+        if provider == 'replay' and self.replay_client:
+            return self.replay_client, self._model_for(provider)
+        return None, None
+
+    def _model_for(self, provider: str) -> str:
+        """현재 호출의 프로바이더 모델 (모델 라우팅 티어 우선, 없으면 기본 모델)"""
+        default = {
+            'openai': getattr(self, 'openai_model', None),
+            'anthropic': getattr(self, 'anthropic_model', None),
+            'fake': getattr(self, 'fake_model', None),
+            'replay': getattr(self, 'replay_model', None),
+        }[provider]
+        tier = current_tier.get()
+        if tier is None:
+            return default
+        return tier.models.get(provider, default)
+
+    def _lease(self, provider: str):
+        """프로바이더 키 풀에서 처리 중 요청이 가장 적은 키 임대 (키 풀이 없으면 기본 클라이언트)"""
+        pool = self.key_pools.get(provider)
+        if pool is None:
+            return contextlib.nullcontext()
+        return pool.lease(self._model_for(provider))
+
+    @staticmethod
+    def _leased_client(provider: str, client, model: str) -> tuple[Any, str]:
+        """현재 임대한 키의 (클라이언트, 요청 model 값) (Azure 배포는 배포 이름)"""
+        credential = current_credential.get()
+        if credential is None or credential.provider != provider:
+            return client, model
+        return credential.client, credential.request_model(model)
+
+    def _provider_chain(self) -> list[tuple[str, str]]:
+        """
+        호출 순서 (기본 프로바이더 → LLM_FALLBACK_ORDER)
+
+        Returns:
+            클라이언트가 설정된 (프로바이더, 모델) 목록
+        """
+        order = [self.primary_provider] + [
+            provider.strip() for provider in settings.LLM_FALLBACK_ORDER.split(",")
+        ]
+        chain: list[tuple[str, str]] = []
+        for provider in order:
+            if any(provider == existing for existing, _ in chain):
+                continue
+            client, model = self._provider_client(provider)
+            if client:
+                chain.append((provider, model))
+        return chain
+
     def _get_active_client(self):
         """활성화된 LLM 클라이언트 반환"""
-        if self.primary_provider == 'anthropic' and self.anthropic_client:
-            return ('anthropic', self.anthropic_client, self.anthropic_model)
-        elif self.openai_client:
-            return ('openai', self.openai_client, self.openai_model)
-        elif self.anthropic_client:
-            return ('anthropic', self.anthropic_client, self.anthropic_model)
-        return (None, None, None)
-
-    async def _call_openai_api(self, system_prompt: str, user_prompt: str) -> str:
+        chain = self._provider_chain()
+        if not chain:
+            return (None, None, None)
+        provider, model = chain[0]
+        client, _ = self._provider_client(provider)
+        return (provider, client, model)
+
+    def check_admission(self) -> None:
+        """
+        분석 시작 전 LLM 대기열 과부하 확인 (현재 요청의 입장 조건 기준)
+
+        Raises:
+            AdmissionRejected: 사용 가능한 모든 프로바이더의 예상 대기 시간이 예산 초과
+        """
+        providers = [
+            provider for provider, _ in self._provider_chain()
+            if self.breakers[provider].state != BREAKER_OPEN
+        ]
+        self.admission.precheck(providers)
+
+    @staticmethod
+    def _max_tokens(timeframe: str) -> int:
+        """출력 토큰 상한 (compact 모드는 투자 기간별 상한)"""
+        if settings.LLM_PROMPT_MODE != "compact":
+            return settings.LLM_MAX_TOKENS
+        return {
+            "short": settings.LLM_MAX_TOKENS_SHORT,
+            "mid": settings.LLM_MAX_TOKENS_MID,
+            "long": settings.LLM_MAX_TOKENS_LONG,
+        }.get(timeframe, settings.LLM_MAX_TOKENS)
+
+    @staticmethod
+    def _anthropic_system(system_prompt: str):
+        """Anthropic 시스템 프롬프트 (프롬프트 캐시 사용 시 cache_control 블록)"""
+        if not settings.LLM_PROMPT_CACHE_ENABLED:
+            return system_prompt
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    @staticmethod
+    def _openai_cache_options(system_prompt: str) -> Dict[str, Any]:
+        """
+        OpenAI 프롬프트 캐시 옵션
+
+        OpenAI는 요청 앞부분이 같으면 자동으로 캐시하므로 고정 시스템 프롬프트를 항상 첫 메시지로 두고,
+        같은 시스템 프롬프트 요청이 같은 캐시로 라우팅되도록 prompt_cache_key를 지정합니다.
+        """
+        if not settings.LLM_PROMPT_CACHE_ENABLED:
+            return {}
+        digest = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+        # SDK 버전과 무관하게 전달되도록 extra_body 사용
+        return {"extra_body": {"prompt_cache_key": f"{PROMPT_VERSION}:{digest}"}}
+
+    async def _call_openai_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
         """OpenAI API 호출"""
-        response = await self.openai_client.chat.completions.create(
-            model=self.openai_model,
+        model = self._model_for("openai")
+        client, request_model = self._leased_client("openai", self.openai_client, model)
+        response = await client.chat.completions.create(
+            model=request_model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            max_completion_tokens=4000,
-            response_format={"type": "json_object"}
+            max_completion_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            **self._openai_cache_options(system_prompt),
         )
+        record_usage(model, *usage_from_response("openai", response.usage))
         return response.choices[0].message.content
 
-    async def _call_anthropic_api(self, system_prompt: str, user_prompt: str) -> str:
+    async def _call_anthropic_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
         """Anthropic API 호출"""
-        response = await self.anthropic_client.messages.create(
-            model=self.anthropic_model,
-            max_tokens=4000,
-            system=system_prompt,
+        model = self._model_for("anthropic")
+        client, request_model = self._leased_client("anthropic", self.anthropic_client, model)
+        response = await client.messages.create(
+            model=request_model,
+            max_tokens=max_tokens,
+            system=self._anthropic_system(system_prompt),
             messages=[
                 {"role": "user", "content": user_prompt}
             ]
         )
+        record_usage(model, *usage_from_response("anthropic", response.usage))
         return response.content[0].text
 
-    async def _call_llm(self, system_prompt: str, user_prompt: str) -> tuple[str, str]:
+    async def _call_fake_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """가짜 프로바이더 호출 (부하 테스트)"""
+        model = self._model_for("fake")
+        text, prompt_tokens, completion_tokens = await self.fake_client.complete(
+            system_prompt, user_prompt, max_tokens
+        )
+        record_usage(model, prompt_tokens, completion_tokens)
+        return text
+
+    async def _call_replay_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """재생 프로바이더 호출 (아카이브된 응답)"""
+        model = self._model_for("replay")
+        text, prompt_tokens, completion_tokens = await self.replay_client.complete(
+            system_prompt, user_prompt, max_tokens
+        )
+        record_usage(model, prompt_tokens, completion_tokens)
+        return text
+
+    async def _stream_openai_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """OpenAI API 스트리밍 호출 (토큰 단위 텍스트 조각)"""
+        model = self._model_for("openai")
+        client, request_model = self._leased_client("openai", self.openai_client, model)
+        stream = await client.chat.completions.create(
+            model=request_model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_completion_tokens=max_tokens,
+            response_format={"type": "json_object"},
+            stream=True,
+            stream_options={"include_usage": True},
+            **self._openai_cache_options(system_prompt),
+        )
+        async for chunk in stream:
+            # 마지막 조각에만 usage가 포함됨 (choices 없음)
+            if chunk.usage:
+                record_usage(model, *usage_from_response("openai", chunk.usage))
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _stream_anthropic_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """Anthropic API 스트리밍 호출 (토큰 단위 텍스트 조각)"""
+        model = self._model_for("anthropic")
+        client, request_model = self._leased_client("anthropic", self.anthropic_client, model)
+        async with client.messages.stream(
+            model=request_model,
+            max_tokens=max_tokens,
+            system=self._anthropic_system(system_prompt),
+            messages=[
+                {"role": "user", "content": user_prompt}
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            message = await stream.get_final_message()
+            record_usage(model, *usage_from_response("anthropic", message.usage))
+
+    async def _stream_fake_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """가짜 프로바이더 스트리밍 호출 (부하 테스트)"""
+        model = self._model_for("fake")
+        async for text, usage in self.fake_client.stream(system_prompt, user_prompt, max_tokens):
+            if usage:
+                record_usage(model, *usage)
+            yield text
+
+    async def _stream_replay_api(self, system_prompt: str, user_prompt: str, max_tokens: int) -> AsyncIterator[str]:
+        """재생 프로바이더 스트리밍 호출 (아카이브된 응답)"""
+        model = self._model_for("replay")
+        async for text, usage in self.replay_client.stream(system_prompt, user_prompt, max_tokens):
+            if usage:
+                record_usage(model, *usage)
+            yield text
+
+    def _stream_provider(
+        self, provider: str, system_prompt: str, user_prompt: str, max_tokens: int
+    ) -> AsyncIterator[str]:
+        """프로바이더별 스트리밍 호출 선택"""
+        if provider == 'openai':
+            return self._stream_openai_api(system_prompt, user_prompt, max_tokens)
+        if provider == 'fake':
+            return self._stream_fake_api(system_prompt, user_prompt, max_tokens)
+        if provider == 'replay':
+            return self._stream_replay_api(system_prompt, user_prompt, max_tokens)
+        return self._stream_anthropic_api(system_prompt, user_prompt, max_tokens)
+
+    async def _drain_stream(
+        self, provider: str, system_prompt: str, user_prompt: str, max_tokens: int, queue: asyncio.Queue
+    ) -> None:
+        """
+        프로바이더 스트림을 끝까지 받아 queue로 전달
+
+        동시 호출 슬롯과 키 임대는 업스트림 응답이 끝나면 바로 반환합니다 (느린 SSE 클라이언트와 무관).
+        queue 항목은 텍스트 조각, 정상 종료 시 None, 실패 시 예외 객체입니다.
+        """
+        try:
+            async with self.admission.slot(provider):
+                with self._lease(provider):
+                    stream = self._stream_provider(provider, system_prompt, user_prompt, max_tokens)
+                    async for text in iterate_with_deadline(stream, "llm"):
+                        queue.put_nowait(text)
+        except Exception as e:
+            queue.put_nowait(e)
+            return
+        queue.put_nowait(None)
+
+    async def _stream_llm(
+        self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None
+    ) -> AsyncIterator[tuple[str, str]]:
+        """
+        LLM API 스트리밍 호출 (자동 폴백 지원)
+
+        첫 조각을 받기 전에 실패하면 다른 프로바이더로 폴백합니다.
+        스트리밍 도중 실패하면 이미 전송된 내용이 있으므로 예외를 그대로 전파합니다.
+        업스트림 응답은 별도 태스크가 받아 두므로 소비자가 느려도 슬롯/키 임대를 붙잡지 않으며,
+        소비자가 중단하면 업스트림 호출도 취소합니다.
+
+        Yields:
+            (사용된 모델명, 텍스트 조각) 튜플
+        """
+        chain = self._provider_chain()
+
+        if not chain:
+            raise ValueError("사용 가능한 LLM 클라이언트가 없습니다. API 키를 확인하세요.")
+
+        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
+        # 남은 요청 예산이 LLM 예상 소요 시간보다 적으면 시작하지 않음, 조각마다 남은 예산까지만 대기
+        check_deadline("llm", llm_expected_seconds())
+        last_error: Optional[Exception] = None
+        for provider, model in chain:
+            breaker = self.breakers[provider]
+            if not breaker.allow_request():
+                logger.warning(f"{provider} 회로 차단 중 - 건너뜀")
+                continue
+            if last_error:
+                logger.info(f"{provider}(으)로 폴백 시도...")
+
+            started = False
+            queue: asyncio.Queue = asyncio.Queue()
+            drain = asyncio.create_task(
+                self._drain_stream(provider, system_prompt, user_prompt, max_tokens, queue)
+            )
+            try:
+                while (item := await queue.get()) is not None:
+                    if isinstance(item, Exception):
+                        raise item
+                    if not started:
+                        started = True
+                        breaker.record_success()
+                    yield model, item
+                if not started:
+                    breaker.record_success()
+                return
+            except (asyncio.CancelledError, GeneratorExit, DeadlineExceeded):
+                # 예산 초과는 프로바이더 장애가 아니며 폴백할 시간도 없음
+                if not started:
+                    breaker.abandon()
+                raise
+            except (AdmissionRejected, KeyPoolExhausted, ReplayMiss) as e:
+                breaker.abandon()
+                last_error = e
+                continue
+            except Exception as e:
+                logger.error(f"{provider} 스트리밍 API 호출 실패: {e}")
+                # 이미 전송된 내용이 있으면 폴백하지 않음
+                if started:
+                    raise
+                breaker.record_failure()
+                last_error = e
+            finally:
+                # 소비자가 중단하면 업스트림 호출 취소 (이미 끝났으면 영향 없음)
+                drain.cancel()
+
+        if last_error:
+            raise last_error
+        raise LLMUnavailableError("모든 LLM 프로바이더가 일시적으로 차단되었습니다. 잠시 후 다시 시도해주세요.")
+
+    async def _call_provider(self, provider: str, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        """프로바이더별 API 호출 선택"""
+        if provider == 'openai':
+            return await self._call_openai_api(system_prompt, user_prompt, max_tokens)
+        if provider == 'fake':
+            return await self._call_fake_api(system_prompt, user_prompt, max_tokens)
+        if provider == 'replay':
+            return await self._call_replay_api(system_prompt, user_prompt, max_tokens)
+        return await self._call_anthropic_api(system_prompt, user_prompt, max_tokens)
+
+    async def _call_with_retries(
+        self, provider: str, system_prompt: str, user_prompt: str, max_tokens: int
+    ) -> tuple[str, float]:
         """
-        LLM API 호출 (자동 폴백 지원)
+        일시적 오류는 지터가 있는 지수 백오프로 최대 LLM_MAX_RETRIES회 재시도
+
+        시도마다 입장 제어 슬롯을 점유하고 키 풀에서 키를 다시 임대하므로,
+        재시도 대기 중에는 슬롯을 다른 요청에 넘기고 429로 제외된 키 대신 다른 키로 재시도합니다.
+
+        Returns:
+            (응답 텍스트, 성공한 시도의 소요 시간 (초, 슬롯 대기/재시도 대기 제외)) 튜플
+        """
+        attempts = max(settings.LLM_MAX_RETRIES, 0) + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                async with self.admission.slot(provider):
+                    with self._lease(provider):
+                        started = time.monotonic()
+                        response = await self._call_provider(provider, system_prompt, user_prompt, max_tokens)
+                        return response, time.monotonic() - started
+            except Exception as e:
+                if attempt == attempts or not is_retryable(e):
+                    raise
+                delay = retry_delay(
+                    attempt,
+                    settings.LLM_RETRY_BASE_DELAY_SECONDS,
+                    settings.LLM_RETRY_MAX_DELAY_SECONDS,
+                )
+                logger.warning(
+                    f"{provider} API 일시적 오류, {delay:.1f}초 후 재시도 "
+                    f"({attempt}/{attempts - 1}): {e}"
+                )
+                await asyncio.sleep(delay)
+
+    async def _call_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> tuple[str, str]:
+        """
+        LLM API 호출 (재시도, 회로 차단, 폴백 체인)
+
+        기본 프로바이더부터 LLM_FALLBACK_ORDER 순서로 시도하며,
+        회로가 차단된 프로바이더는 호출 없이 건너뜁니다.
+
+        Args:
+            max_tokens: 출력 토큰 상한 (없으면 LLM_MAX_TOKENS)
+            validate: 헤지 요청 시 응답 채택 기준 (프롬프트마다 유효한 응답 형식이 다름,
+                None이면 먼저 성공한 응답 사용)
 
         Returns:
             (응답 텍스트, 사용된 모델명) 튜플
+
+        Raises:
+            LLMUnavailableError: 모든 프로바이더의 회로가 차단됨
+            DeadlineExceeded: 남은 요청 예산이 LLM 예상 소요 시간보다 적거나 호출 중 예산 소진
         """
-        provider, client, model = self._get_active_client()
+        chain = self._provider_chain()
 
-        if not client:
+        if not chain:
             raise ValueError("사용 가능한 LLM 클라이언트가 없습니다. API 키를 확인하세요.")
 
+        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
+        if self.hedge.enabled:
+            call = self._call_llm_hedged(chain, system_prompt, user_prompt, max_tokens, validate)
+        else:
+            call = self._call_chain(chain, system_prompt, user_prompt, max_tokens)
+        # 재시도/폴백/헤지 요청을 포함한 전체 호출을 남은 예산 이내로 제한 (초과 시 진행 중인 호출 취소)
+        return await run_with_deadline(call, "llm", llm_expected_seconds())
+
+    async def _call_chain(
+        self,
+        chain: list[tuple[str, str]],
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        last_error: Optional[Exception] = None,
+    ) -> tuple[str, str]:
+        """프로바이더 체인을 순서대로 호출 (회로 차단된 프로바이더는 건너뜀)"""
+        for provider, model in chain:
+            breaker = self.breakers[provider]
+            if not breaker.allow_request():
+                logger.warning(f"{provider} 회로 차단 중 - 건너뜀")
+                continue
+            if last_error:
+                logger.info(f"{provider}(으)로 폴백 시도...")
+
+            try:
+                response, elapsed = await self._call_with_retries(provider, system_prompt, user_prompt, max_tokens)
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except (AdmissionRejected, KeyPoolExhausted, ReplayMiss) as e:
+                # 대기열 과부하/키 한도 소진/재생 아카이브 누락은 프로바이더 장애가 아님 - 회로 차단기에 반영하지 않음
+                breaker.abandon()
+                last_error = e
+                continue
+            except Exception as e:
+                logger.error(f"{provider} API 호출 실패: {e}")
+                breaker.record_failure()
+                last_error = e
+                continue
+
+            breaker.record_success()
+            self.hedge.record_latency(provider, elapsed)
+            return response, model
+
+        if last_error:
+            raise last_error
+        raise LLMUnavailableError("모든 LLM 프로바이더가 일시적으로 차단되었습니다. 잠시 후 다시 시도해주세요.")
+
+    async def _call_llm_hedged(
+        self,
+        chain: list[tuple[str, str]],
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> tuple[str, str]:
+        """
+        헤지 요청
+
+        기본 요청이 최근 지연 시간 백분위(LLM_HEDGE_LATENCY_PERCENTILE)를 넘기면
+        다음 프로바이더(없으면 같은 프로바이더)로 보조 요청을 보내고,
+        먼저 도착한 유효 응답(validate 통과, 없으면 먼저 성공한 응답)을 사용하며 나머지 요청은 취소합니다.
+        보조 요청 수는 헤지 예산(LLM_HEDGE_MAX_RATIO)으로 제한됩니다.
+        """
+        self.hedge.record_call()
+
+        primary_index = next(
+            (index for index, (provider, _) in enumerate(chain) if self.breakers[provider].allow_request()),
+            None,
+        )
+        if primary_index is None:
+            raise LLMUnavailableError("모든 LLM 프로바이더가 일시적으로 차단되었습니다. 잠시 후 다시 시도해주세요.")
+
+        primary = chain[primary_index]
+        primary_task = asyncio.create_task(self._call_with_retries(primary[0], system_prompt, user_prompt, max_tokens))
+        tasks = {primary_task: primary}
+        used = {primary[0]}
+
+        fallback: Optional[tuple[str, str]] = None
+        last_error: Optional[Exception] = None
+        # 요청 예산 초과로 취소되어도 진행 중인 요청이 남지 않도록 대기 전체를 try 안에서 수행
         try:
-            if provider == 'openai':
-                response = await self._call_openai_api(system_prompt, user_prompt)
+            done, _ = await asyncio.wait({primary_task}, timeout=self.hedge.hedge_delay(primary[0]))
+            if not done and self.hedge.try_acquire():
+                secondary = next(
+                    (
+                        (provider, model) for provider, model in chain[primary_index + 1:]
+                        if self.breakers[provider].allow_request()
+                    ),
+                    primary,
+                )
+                logger.info(f"{primary[0]} 응답 지연 - {secondary[0]} 헤지 요청 시작")
+                tasks[asyncio.create_task(self._call_with_retries(secondary[0], system_prompt, user_prompt, max_tokens))] = secondary
+                used.add(secondary[0])
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider, model = tasks[task]
+                    try:
+                        response, elapsed = task.result()
+                    except (AdmissionRejected, KeyPoolExhausted, ReplayMiss) as e:
+                        self.breakers[provider].abandon()
+                        last_error = e
+                        continue
+                    except Exception as e:
+                        logger.error(f"{provider} API 호출 실패: {e}")
+                        self.breakers[provider].record_failure()
+                        last_error = e
+                        continue
+
+                    self.breakers[provider].record_success()
+                    self.hedge.record_latency(provider, elapsed)
+                    if validate is None or validate(response):
+                        if task is not primary_task:
+                            self.hedge.record_hedge_win()
+                            logger.info(f"헤지 요청 승리: {provider} ({model})")
+                        return response, model
+                    # 파싱 불가 응답은 다른 요청이 모두 실패할 때만 사용
+                    fallback = fallback or (response, model)
+        finally:
+            for task, (provider, _) in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    self.breakers[provider].abandon()
+
+        if fallback:
+            return fallback
+
+        # 헤지 요청까지 모두 실패 - 남은 프로바이더로 순차 폴백
+        remaining = [(provider, model) for provider, model in chain[primary_index + 1:] if provider not in used]
+        if not remaining:
+            raise last_error
+        return await self._call_chain(remaining, system_prompt, user_prompt, max_tokens, last_error=last_error)
+
+    async def _save_insight(self, insight: StockInsight) -> StockInsight:
+        """분석 결과 저장 (요청 예산이 다 되어도 이미 생성한 분석은 유예 시간 동안 저장 시도)"""
+        async def save() -> StockInsight:
+            async with AsyncSessionLocal() as db:
+                db.add(insight)
+                await db.commit()
+                await db.refresh(insight)
+                logger.info(f"주식 분석 저장 완료: ID={insight.id}")
+                return insight
+
+        return await run_with_deadline(save(), "db_commit", grace=settings.ANALYSIS_DEADLINE_SAVE_GRACE_SECONDS)
+
+    @staticmethod
+    def _build_user_prompt(stock_data: StockData, timeframe: str) -> str:
+        """주식 데이터로 사용자 프롬프트 생성"""
+        return get_stock_analysis_user_prompt(
+            stock_name=stock_data.name,
+            stock_code=stock_data.symbol,
+            market=stock_data.market,
+            timeframe=timeframe,
+            stock_data=asdict(stock_data),
+            compact=settings.LLM_PROMPT_MODE == "compact",
+        )
+
+    async def _repair_truncated(self, response_text: str, user_prompt: str, max_tokens: int) -> Tuple[str, List[str]]:
+        """
+        잘린 응답 복구 (출력 토큰 상한 도달, 뒤에 덧붙인 설명)
+
+        완성된 필드는 그대로 두고 빠진 필드만 이어쓰기 요청으로 채운 JSON 텍스트를 반환합니다.
+        파싱되는 응답은 그대로 반환합니다.
+
+        Returns:
+            (응답 JSON 텍스트, 채우지 못해 기본값으로 남은 필드 목록 - 복구할 수 없으면 전체 필드)
+        """
+        if is_valid_stock_analysis_response(response_text):
+            return response_text, []
+        repaired = repair_stock_analysis_response(response_text)
+        if repaired is None:
+            return response_text, list(DEFAULT_STOCK_ANALYSIS)
+
+        result = repaired.result
+        missing = list(repaired.missing)
+        if missing and settings.LLM_CONTINUATION_ENABLED:
+            logger.warning(f"잘린 응답 이어쓰기 요청: 완성 {len(repaired.recovered)}개, 누락 {missing}")
+            completed = {key: result[key] for key in repaired.recovered if key not in missing}
+            try:
+                text, _ = await self._call_llm(
+                    STOCK_ANALYSIS_SYSTEM_PROMPT,
+                    get_continuation_user_prompt(user_prompt, completed, missing),
+                    max_tokens=max_tokens,
+                )
+            except Exception as e:
+                logger.warning(f"이어쓰기 요청 실패 - 복구된 필드만 사용: {e}")
             else:
-                response = await self._call_anthropic_api(system_prompt, user_prompt)
-            return response, model
+                continuation = repair_stock_analysis_response(text)
+                if continuation:
+                    for key in repaired.missing:
+                        if key in continuation.recovered and key not in continuation.missing:
+                            result[key] = continuation.result[key]
+                            missing.remove(key)
+
+        return json.dumps(result, ensure_ascii=False), missing
+
+    @staticmethod
+    def _build_insight(
+        stock_data: StockData,
+        timeframe: str,
+        user_id: str,
+        parsed_response: Dict[str, Any],
+        model_used: str,
+        processing_time_ms: int,
+        input_fingerprint: Optional[str] = None,
+        usage: Optional[TokenUsage] = None,
+        raw_response: Optional[str] = None,
+    ) -> StockInsight:
+        """파싱된 응답과 주식 데이터로 StockInsight 객체 생성 (raw_response는 압축하여 아카이브)"""
+        # 가격 변동률 (퍼센트) - pct 값 우선 사용
+        price_change_1d = stock_data.price_change_1d_pct if stock_data.price_change_1d_pct is not None else stock_data.price_change_1d
+        price_change_1w = stock_data.price_change_1w_pct if stock_data.price_change_1w_pct is not None else stock_data.price_change_1w
+        price_change_1m = stock_data.price_change_1m_pct if stock_data.price_change_1m_pct is not None else stock_data.price_change_1m
+
+        return StockInsight(
+            user_id=user_id,
+            stock_code=stock_data.symbol,
+            stock_name=stock_data.name,
+            market=stock_data.market,
+            timeframe=timeframe,
+            deep_research=parsed_response["deep_research"],
+            recommendation=parsed_response["recommendation"],
+            confidence_level=parsed_response["confidence_level"],
+            recommendation_reason=parsed_response["recommendation_reason"],
+            risk_score=parsed_response["risk_score"],
+            risk_analysis=parsed_response["risk_analysis"],
+            current_price=stock_data.current_price,
+            price_change_1d=price_change_1d,
+            price_change_1w=price_change_1w,
+            price_change_1m=price_change_1m,
+            market_overview=parsed_response["market_overview"],
+            market_sentiment=parsed_response["market_sentiment"],
+            sentiment_details=parsed_response["sentiment_details"],
+            key_summary=parsed_response["key_summary"],
+            current_drivers=parsed_response["current_drivers"],
+            future_catalysts=parsed_response["future_catalysts"],
+            ai_model=model_used,
+            processing_time_ms=processing_time_ms,
+            prompt_version=PROMPT_VERSION,
+            input_fingerprint=input_fingerprint,
+            input_data=asdict(stock_data),
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            cached_prompt_tokens=usage.cached_tokens if usage else None,
+            raw_response=(
+                compress_response(raw_response)
+                if raw_response and settings.ANALYSIS_ARCHIVE_RAW_RESPONSE else None
+            ),
+        )
 
+    @staticmethod
+    async def _find_cached(stock_data: StockData, timeframe: str, fingerprint: str) -> Optional[StockInsight]:
+        """공유 분석 캐시 조회 (조회 실패 시 캐시 없이 진행)"""
+        try:
+            return await analysis_result_cache.lookup(stock_data.symbol, timeframe, fingerprint)
         except Exception as e:
-            logger.error(f"{provider} API 호출 실패: {e}")
-
-            # 폴백 시도
-            if provider == 'openai' and self.anthropic_client:
-                logger.info("Anthropic으로 폴백 시도...")
-                response = await self._call_anthropic_api(system_prompt, user_prompt)
-                return response, self.anthropic_model
-            elif provider == 'anthropic' and self.openai_client:
-                logger.info("OpenAI로 폴백 시도...")
-                response = await self._call_openai_api(system_prompt, user_prompt)
-                return response, self.openai_model
+            logger.warning(f"분석 캐시 조회 실패: {stock_data.symbol} - {e}")
+            return None
 
-            raise
+    async def _route(self, stock_data: StockData, timeframe: str) -> Optional[ModelTier]:
+        """복잡도 기반 모델 티어 선택 (라우팅 비활성화 시 None)"""
+        if not self.model_router.enabled:
+            return None
+        try:
+            recent = await analysis_result_cache.latest(
+                stock_data.symbol, timeframe, settings.LLM_ROUTING_RECENT_ANALYSIS_HOURS * 3600
+            )
+        except Exception as e:
+            logger.warning(f"최근 분석 조회 실패 - 최근 분석 없음으로 라우팅: {stock_data.symbol} - {e}")
+            recent = None
+        return self.model_router.route(stock_data, timeframe, has_recent_analysis=recent is not None).tier
 
-    async def _save_insight(self, insight: StockInsight) -> StockInsight:
-        """분석 결과 저장"""
-        async with AsyncSessionLocal() as db:
-            db.add(insight)
-            await db.commit()
-            await db.refresh(insight)
-            logger.info(f"주식 분석 저장 완료: ID={insight.id}")
-            return insight
+    @staticmethod
+    async def _plan_delta(stock_data: StockData, timeframe: str, user_id: str) -> Optional[DeltaPlan]:
+        """델타 재분석 계획 (비활성화, 이전 분석 없음, 입력 변화가 큰 경우 None)"""
+        if not settings.ANALYSIS_DELTA_ENABLED or not user_id:
+            return None
+        try:
+            previous = await delta_analyzer.latest_for_user(user_id, stock_data.symbol, timeframe)
+            # 이전 분석이 델타 재분석이면 마지막 전체 분석 기준으로 경과 시간/펀더멘털 변화 판정
+            base = await delta_analyzer.full_source(previous) if previous is not None else None
+        except Exception as e:
+            logger.warning(f"이전 분석 조회 실패 - 전체 재분석: {stock_data.symbol} - {e}")
+            return None
+
+        plan = delta_analyzer.plan(previous, stock_data, base=base)
+        if plan:
+            logger.info(
+                f"델타 재분석: {stock_data.symbol} ({timeframe}), 이전 분석 ID={plan.previous.id}, "
+                f"변경 입력 {[change.name for change in plan.changes]}"
+            )
+        return plan
+
+    @staticmethod
+    def _use_multi_timeframe(timeframe: str, delta: Optional[DeltaPlan]) -> bool:
+        """투자 기간 일괄 생성 여부 (나머지 투자 기간을 저장할 공유 캐시가 꺼져 있으면 사용하지 않음)"""
+        return (
+            settings.ANALYSIS_MULTI_TIMEFRAME_ENABLED
+            and analysis_result_cache.enabled
+            and delta is None
+            and timeframe in TIMEFRAMES
+        )
+
+    async def _call_multi_timeframe(
+        self, user_prompt: str, timeframe: str
+    ) -> Tuple[Dict[str, Dict[str, Any]], str, str]:
+        """
+        세 투자 기간 일괄 생성 (헤지 요청은 요청 투자 기간이 포함된 응답을 우선)
+
+        Returns:
+            ({투자 기간: 파싱된 분석 결과}, 사용된 모델, 일괄 응답 원문)
+            (잘린 응답은 완성된 투자 기간만 포함하므로 요청 기간이 없을 수 있음)
+        """
+        text, model = await self._call_llm(
+            STOCK_ANALYSIS_SYSTEM_PROMPT,
+            get_multi_timeframe_user_prompt(user_prompt, TIMEFRAMES),
+            max_tokens=settings.ANALYSIS_MULTI_TIMEFRAME_MAX_TOKENS,
+            validate=lambda text: timeframe in parse_multi_timeframe_response(text, TIMEFRAMES),
+        )
+        self._multi_timeframe_calls += 1
+        return parse_multi_timeframe_response(text, TIMEFRAMES), model, text
+
+    def multi_timeframe_stats(self) -> Dict[str, int]:
+        """투자 기간 일괄 생성 호출 수 및 요청 기간 누락으로 단일 기간을 다시 생성한 횟수"""
+        return {"calls": self._multi_timeframe_calls, "misses": self._multi_timeframe_misses}
+
+    async def _save_prefetched(
+        self,
+        stock_data: StockData,
+        analyses: Dict[str, Dict[str, Any]],
+        model_used: str,
+        processing_time_ms: int,
+        raw_response: Optional[str] = None,
+    ) -> None:
+        """요청하지 않은 투자 기간 분석을 공유 캐시 원본으로 저장 (실패해도 요청 분석에는 영향 없음)"""
+        insights = [
+            self._build_insight(
+                stock_data, timeframe, settings.ANALYSIS_BATCH_USER_ID, parsed_response, model_used,
+                processing_time_ms, input_fingerprint=fingerprint_stock_data(stock_data, timeframe),
+                raw_response=raw_response,
+            )
+            for timeframe, parsed_response in analyses.items()
+        ]
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add_all(insights)
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"일괄 생성 투자 기간 저장 실패: {stock_data.symbol} {list(analyses)} - {e}")
+            return
+        logger.info(f"일괄 생성 투자 기간 캐시 저장: {stock_data.symbol} {list(analyses)}")
+
+    def _schedule_prefetched_save(self, *args: Any) -> None:
+        """일괄 생성된 나머지 투자 기간 저장을 백그라운드로 실행 (요청 분석 응답 지연 없음)"""
+        task = asyncio.create_task(self._save_prefetched(*args))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _sample_quality(
+        self, tier: ModelTier, parsed_response: Dict[str, Any], user_prompt: str, max_tokens: int
+    ) -> None:
+        """하위 티어 응답 일부를 최상위 티어 응답과 백그라운드로 비교"""
+        if not self.model_router.should_sample(tier):
+            return
+
+        async def call_top() -> Dict[str, Any]:
+            # 백그라운드 작업은 낮은 우선순위로 대기하며, 토큰은 분석 사용량과 별도로 집계
+            admission_context.set(AdmissionContext(priority=PRIORITY_DEMO, max_wait=-1))
+            current_deadline.set(None)
+            with track_usage(), use_tier(self.model_router.top_tier):
+                text, _ = await self._call_llm(
+                    STOCK_ANALYSIS_SYSTEM_PROMPT, user_prompt, max_tokens=max_tokens,
+                    validate=is_valid_stock_analysis_response,
+                )
+            return parse_stock_analysis_response(text)
+
+        self.model_router.schedule_quality_check(tier, parsed_response, call_top)
 
     async def generate_insight(
         self,
         stock_code: str,
         timeframe: str = "mid",
-        user_id: str = ""
+        user_id: str = "",
+        on_stage: Optional[StageCallback] = None
     ) -> Optional[StockInsight]:
         """
         주식 딥리서치 분석 생성
@@ -140,80 +953,183 @@ class StockInsightEngine:
             stock_code: 종목코드 또는 회사명 (예: "AAPL", "삼성전자", "005930.KS")
             timeframe: 투자 기간 (short, mid, long)
             user_id: 사용자 식별자 (UUID v4)
+            on_stage: 진행 단계 변경 시 호출할 콜백 (비동기 작업 상태 갱신용)
 
         Returns:
             StockInsight 객체 또는 None
         """
         start_time = time.time()
+        # 단계별 소요 시간 (하위 서비스의 심볼 변환/종목 캐시 로드 포함)
+        spans = SpanRecorder()
+        spans_token = current_spans.set(spans)
 
         try:
             logger.info(f"주식 분석 시작: {stock_code}, 기간: {timeframe}")
 
             # 1. 주식 데이터 수집
-            stock_data = await stock_data_service.get_stock_data(stock_code)
+            if on_stage:
+                await on_stage("fetching_data")
+            with span("data_fetch"):
+                stock_data = await stock_data_service.get_stock_data(stock_code)
             if not stock_data:
                 logger.error(f"주식 데이터를 찾을 수 없음: {stock_code}")
                 return None
 
             logger.info(f"주식 데이터 수집 완료: {stock_data.name} ({stock_data.symbol})")
 
-            # 2. 프롬프트 생성
-            stock_data_dict = asdict(stock_data)
-            user_prompt = get_stock_analysis_user_prompt(
-                stock_name=stock_data.name,
-                stock_code=stock_data.symbol,
-                market=stock_data.market,
-                timeframe=timeframe,
-                stock_data=stock_data_dict
-            )
+            # 2. 공유 분석 캐시 조회 (같은 입력의 최근 분석이 있으면 LLM 호출 생략)
+            fingerprint = fingerprint_stock_data(stock_data, timeframe)
+            with span("cache_lookup"):
+                cached = await self._find_cached(stock_data, timeframe, fingerprint)
+            if cached:
+                processing_time_ms = int((time.time() - start_time) * 1000)
+                insight = analysis_result_cache.clone_for_user(
+                    cached, stock_data, user_id, fingerprint, processing_time_ms
+                )
+                insight.stage_timings = spans.as_json()
+                with span("db_commit"):
+                    return await self._save_insight(insight)
 
-            # 3. LLM API 호출
-            response_text, model_used = await self._call_llm(
-                STOCK_ANALYSIS_SYSTEM_PROMPT,
-                user_prompt
-            )
-            logger.info(f"LLM API 응답 수신 완료 (모델: {model_used})")
+            # 3. 프롬프트 생성 및 모델 티어 선택
+            user_prompt = full_prompt = self._build_user_prompt(stock_data, timeframe)
+            tier = await self._route(stock_data, timeframe)
+            max_tokens = full_max_tokens = self._max_tokens(timeframe)
+            flight_key = fingerprint
 
-            # 4. 응답 파싱
-            parsed_response = parse_stock_analysis_response(response_text)
+            # 델타 재분석: 사용자의 최근 분석에서 바뀐 입력의 영향을 받는 섹션만 다시 생성
+            delta = await self._plan_delta(stock_data, timeframe, user_id)
+            if delta:
+                user_prompt = get_delta_user_prompt(
+                    user_prompt, delta.carried_sections(), delta.previous_sections(), delta.changes, DELTA_FIELDS
+                )
+                max_tokens = min(max_tokens, settings.ANALYSIS_DELTA_MAX_TOKENS)
+                flight_key = f"{fingerprint}:delta:{delta.previous.id}"
+
+            # 투자 기간 일괄 생성: 나머지 투자 기간은 공유 캐시로 저장하여 후속 요청에 즉시 응답
+            multi_timeframe = self._use_multi_timeframe(timeframe, delta)
+
+            # 4. LLM API 호출 (같은 입력의 분석이 진행 중이면 그 응답을 공유)
+            if on_stage:
+                await on_stage("calling_llm")
 
-            # 5. 처리 시간 계산
+            async def call_llm() -> Dict[str, Any]:
+                started = time.monotonic()
+                prefetched: Dict[str, Dict[str, Any]] = {}
+                prefetched_model = prefetched_raw = None
+                incomplete: List[str] = []
+                delta_applied = delta is not None
+                with track_usage() as call_usage, use_tier(tier):
+                    if multi_timeframe:
+                        prefetched, prefetched_model, prefetched_raw = await self._call_multi_timeframe(
+                            user_prompt, timeframe
+                        )
+                    if timeframe in prefetched:
+                        text = json.dumps(prefetched.pop(timeframe), ensure_ascii=False)
+                        model, raw = prefetched_model, prefetched_raw
+                    else:
+                        if multi_timeframe:
+                            # 완성된 나머지 투자 기간은 그대로 저장하고 요청 기간만 단일 기간으로 생성
+                            self._multi_timeframe_misses += 1
+                            logger.warning(
+                                f"투자 기간 일괄 응답에 요청 기간 없음 - 단일 기간 생성: {timeframe}, "
+                                f"응답 기간 {list(prefetched)} (누적 {self._multi_timeframe_misses}회)"
+                            )
+                        # 델타 응답은 다시 생성한 필드만 포함하므로 전체 분석 형식으로 검증하지 않음
+                        validate = (
+                            (lambda text: bool(regenerated_sections(text))) if delta else is_valid_stock_analysis_response
+                        )
+                        text, model = await self._call_llm(
+                            STOCK_ANALYSIS_SYSTEM_PROMPT, user_prompt, max_tokens=max_tokens, validate=validate
+                        )
+                        if delta and not regenerated_sections(text):
+                            # 다시 생성된 섹션이 없으면 이전 분석 복사본이 되므로 전체 재분석
+                            logger.warning(f"델타 응답에서 복구된 섹션 없음 - 전체 재분석: {stock_data.symbol}")
+                            text, model = await self._call_llm(
+                                STOCK_ANALYSIS_SYSTEM_PROMPT, full_prompt, max_tokens=full_max_tokens,
+                                validate=is_valid_stock_analysis_response,
+                            )
+                            delta_applied = False
+                        # 아카이브는 복구 전 원문 (파서/복구 로직 수정 후 다시 파싱할 수 있도록)
+                        raw = text
+                        # 잘린 응답은 공유 대상 모두를 위해 한 번만 복구 (델타 응답은 일부 필드만 포함)
+                        if not delta_applied:
+                            text, incomplete = await self._repair_truncated(text, full_prompt, full_max_tokens)
+                if tier:
+                    self.model_router.record(tier, model, time.monotonic() - started, call_usage)
+                return {
+                    "response_text": text,
+                    "model_used": model,
+                    "usage": call_usage.as_dict(),
+                    "prefetched": prefetched,
+                    "prefetched_model": prefetched_model,
+                    "prefetched_raw_response": prefetched_raw,
+                    "raw_response": raw,
+                    "delta": delta_applied,
+                    "incomplete": incomplete,
+                }
+
+            with span("llm"):
+                # 기본값이 남은 응답은 다른 프로세스에 공유하지 않음 (대기 프로세스가 직접 분석)
+                result, shared = await self.single_flight.do(
+                    flight_key, call_llm, shareable=lambda flight: not flight.get("incomplete")
+                )
+            response_text, model_used = result["response_text"], result["model_used"]
+            if delta and not result.get("delta", True):
+                delta, user_prompt, max_tokens = None, full_prompt, full_max_tokens
+            # 공유받은 응답은 토큰을 사용하지 않았으므로 기록하지 않음 (비용 중복 집계 방지)
+            usage = None
+            if shared:
+                logger.info(f"진행 중인 동일 분석의 LLM 응답 공유 (모델: {model_used})")
+            else:
+                usage = TokenUsage(**result["usage"])
+                logger.info(
+                    f"LLM API 응답 수신 완료 (모델: {model_used}, "
+                    f"토큰: 입력 {usage.prompt_tokens} (캐시 {usage.cached_tokens}), 출력 {usage.completion_tokens})"
+                )
+
+            # 5. 응답 파싱
+            if on_stage:
+                await on_stage("parsing")
+            with span("parse"):
+                if delta:
+                    parsed_response = delta.merge(regenerated_sections(response_text))
+                else:
+                    parsed_response = parse_stock_analysis_response(response_text)
+            # 기본값으로 대체된 분석(잘린 응답의 채우지 못한 필드 포함)과 이전 분석 섹션을 이어받은
+            # 델타 재분석은 공유 캐시 원본이 되지 않도록 입력 지문을 저장하지 않음
+            incomplete = result.get("incomplete") or []
+            cacheable = not delta and not incomplete and is_valid_stock_analysis_response(response_text)
+            if not delta and not cacheable:
+                logger.warning(
+                    f"파싱 실패 응답 - 공유 캐시 제외: {stock_data.symbol} (모델: {model_used}, 기본값 필드 {incomplete})"
+                )
+            if tier and not shared and not delta:
+                self._sample_quality(tier, parsed_response, user_prompt, max_tokens)
+
+            # 6. 처리 시간 계산
             processing_time_ms = int((time.time() - start_time) * 1000)
 
-            # 6. StockInsight 객체 생성
-            # 가격 변동률 (퍼센트) - pct 값 우선 사용
-            price_change_1d = stock_data.price_change_1d_pct if stock_data.price_change_1d_pct is not None else stock_data.price_change_1d
-            price_change_1w = stock_data.price_change_1w_pct if stock_data.price_change_1w_pct is not None else stock_data.price_change_1w
-            price_change_1m = stock_data.price_change_1m_pct if stock_data.price_change_1m_pct is not None else stock_data.price_change_1m
-
-            insight = StockInsight(
-                user_id=user_id,
-                stock_code=stock_data.symbol,
-                stock_name=stock_data.name,
-                market=stock_data.market,
-                timeframe=timeframe,
-                deep_research=parsed_response["deep_research"],
-                recommendation=parsed_response["recommendation"],
-                confidence_level=parsed_response["confidence_level"],
-                recommendation_reason=parsed_response["recommendation_reason"],
-                risk_score=parsed_response["risk_score"],
-                risk_analysis=parsed_response["risk_analysis"],
-                current_price=stock_data.current_price,
-                price_change_1d=price_change_1d,
-                price_change_1w=price_change_1w,
-                price_change_1m=price_change_1m,
-                market_overview=parsed_response["market_overview"],
-                market_sentiment=parsed_response["market_sentiment"],
-                sentiment_details=parsed_response["sentiment_details"],
-                key_summary=parsed_response["key_summary"],
-                current_drivers=parsed_response["current_drivers"],
-                future_catalysts=parsed_response["future_catalysts"],
-                ai_model=model_used,
-                processing_time_ms=processing_time_ms
+            # 7. StockInsight 객체 생성
+            insight = self._build_insight(
+                stock_data, timeframe, user_id, parsed_response, model_used, processing_time_ms,
+                input_fingerprint=fingerprint if cacheable else None,
+                usage=usage, raw_response=result.get("raw_response"),
             )
+            if delta:
+                insight.delta_source_id = delta.previous.id
+            # 저장 단계(db_commit)는 저장 이후에 끝나므로 히스토그램에만 기록
+            insight.stage_timings = spans.as_json()
+
+            # 8. 데이터베이스 저장
+            with span("db_commit"):
+                insight = await self._save_insight(insight)
 
-            # 7. 데이터베이스 저장
-            insight = await self._save_insight(insight)
+            # 일괄 생성된 나머지 투자 기간 저장 (공유받은 요청은 리더가 저장)
+            if not shared and result.get("prefetched"):
+                self._schedule_prefetched_save(
+                    stock_data, result["prefetched"], result["prefetched_model"], processing_time_ms,
+                    result["prefetched_raw_response"],
+                )
 
             logger.info(
                 f"주식 분석 완료: {stock_data.symbol}, "
@@ -227,6 +1143,136 @@ class StockInsightEngine:
             logger.error(f"주식 분석 오류: {e}", exc_info=True)
             raise
 
+        finally:
+            current_spans.reset(spans_token)
+
+    async def generate_insight_stream(
+        self,
+        stock_code: str,
+        timeframe: str = "mid",
+        user_id: str = ""
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        주식 딥리서치 분석 생성 (스트리밍)
+
+        LLM 응답을 기다리지 않고 단계 이벤트와 부분 응답을 즉시 전달합니다.
+
+        Yields:
+            {"event": "stage" | "delta" | "field" | "done" | "error", "data": {...}}
+            - stage: fetching_data, calling_llm, parsing, saving
+            - delta: LLM 응답 텍스트 조각
+            - field: 완성되어 검증된 최상위 필드 (name, value)
+            - done: 저장된 StockInsight (insight 키)
+            - error: 실패 사유 (데이터 없음)
+        """
+        start_time = time.time()
+        spans = SpanRecorder()
+        spans_token = current_spans.set(spans)
+        try:
+            logger.info(f"주식 분석 시작 (스트리밍): {stock_code}, 기간: {timeframe}")
+
+            # 1. 주식 데이터 수집
+            yield {"event": "stage", "data": {"stage": "fetching_data"}}
+            with span("data_fetch"):
+                stock_data = await stock_data_service.get_stock_data(stock_code)
+            if not stock_data:
+                logger.error(f"주식 데이터를 찾을 수 없음: {stock_code}")
+                yield {"event": "error", "data": {"reason": "stock_not_found"}}
+                return
+
+            # 2. 공유 분석 캐시 조회
+            fingerprint = fingerprint_stock_data(stock_data, timeframe)
+            with span("cache_lookup"):
+                cached = await self._find_cached(stock_data, timeframe, fingerprint)
+            if cached:
+                yield {"event": "stage", "data": {"stage": "saving", "cached": True}}
+                processing_time_ms = int((time.time() - start_time) * 1000)
+                insight = analysis_result_cache.clone_for_user(
+                    cached, stock_data, user_id, fingerprint, processing_time_ms
+                )
+                insight.stage_timings = spans.as_json()
+                with span("db_commit"):
+                    insight = await self._save_insight(insight)
+                yield {"event": "done", "data": {"insight": insight}}
+                return
+
+            # 3. 프롬프트 생성 및 LLM 스트리밍 호출
+            yield {
+                "event": "stage",
+                "data": {
+                    "stage": "calling_llm",
+                    "stock_code": stock_data.symbol,
+                    "stock_name": stock_data.name,
+                },
+            }
+            user_prompt = self._build_user_prompt(stock_data, timeframe)
+            tier = await self._route(stock_data, timeframe)
+
+            chunks: list[str] = []
+            model_used = ""
+            # 최상위 필드가 완성되는 즉시 검증하여 field 이벤트로 전달
+            field_parser = IncrementalAnalysisParser()
+            max_tokens = self._max_tokens(timeframe)
+            started = time.monotonic()
+            with track_usage() as usage, span("llm"), use_tier(tier):
+                async for model_used, text in self._stream_llm(
+                    STOCK_ANALYSIS_SYSTEM_PROMPT, user_prompt, max_tokens=max_tokens
+                ):
+                    chunks.append(text)
+                    yield {"event": "delta", "data": {"text": text}}
+                    error_count = len(field_parser.errors)
+                    for name, value in field_parser.feed(text):
+                        yield {"event": "field", "data": {"name": name, "value": value}}
+                    if error_count == 0 and field_parser.errors:
+                        logger.warning(f"스트리밍 응답 필드 검증 실패 감지: {field_parser.errors} (모델: {model_used})")
+                response_text = raw_response = "".join(chunks)
+                incomplete: List[str] = []
+                if not field_parser.complete:
+                    response_text, incomplete = await self._repair_truncated(response_text, user_prompt, max_tokens)
+            if tier:
+                self.model_router.record(tier, model_used, time.monotonic() - started, usage)
+            logger.info(
+                f"LLM 스트리밍 응답 수신 완료 (모델: {model_used}, "
+                f"토큰: 입력 {usage.prompt_tokens} (캐시 {usage.cached_tokens}), 출력 {usage.completion_tokens})"
+            )
+
+            # 4. 응답 파싱
+            yield {"event": "stage", "data": {"stage": "parsing"}}
+            with span("parse"):
+                if field_parser.complete and not field_parser.errors:
+                    parsed_response = field_parser.result()
+                else:
+                    parsed_response = parse_stock_analysis_response(response_text)
+            cacheable = not incomplete and is_valid_stock_analysis_response(response_text)
+            if not cacheable:
+                logger.warning(
+                    f"파싱 실패 응답 - 공유 캐시 제외 (스트리밍): {stock_data.symbol} "
+                    f"(모델: {model_used}, 기본값 필드 {incomplete})"
+                )
+            if tier:
+                self._sample_quality(tier, parsed_response, user_prompt, max_tokens)
+            processing_time_ms = int((time.time() - start_time) * 1000)
+
+            # 5. 데이터베이스 저장
+            yield {"event": "stage", "data": {"stage": "saving"}}
+            insight = self._build_insight(
+                stock_data, timeframe, user_id, parsed_response, model_used, processing_time_ms,
+                input_fingerprint=fingerprint if cacheable else None,
+                usage=usage, raw_response=raw_response,
+            )
+            insight.stage_timings = spans.as_json()
+            with span("db_commit"):
+                insight = await self._save_insight(insight)
+
+            logger.info(
+                f"주식 분석 완료 (스트리밍): {stock_data.symbol}, "
+                f"추천={insight.recommendation}, "
+                f"처리시간={processing_time_ms}ms"
+            )
+            yield {"event": "done", "data": {"insight": insight}}
+        finally:
+            current_spans.reset(spans_token)
+
 
 # 싱글톤 인스턴스
 stock_insight_engine = StockInsightEngine()
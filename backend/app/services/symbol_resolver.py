@@ -0,0 +1,370 @@
+"""
+통합 종목 심볼 리졸버
+
+- 접미사, 하드코딩 매핑, 별칭(영문명/한글명/구 티커), pykrx 종목 테이블,
+  미국 종목 목록 스냅샷을 하나의 인덱스로 병합하여 O(1) 조회
+- 조회 결과 메모이제이션 (LRU), KR 종목 변경분 구독으로 변경된 종목만 무효화
+- 결과에 응답한 소스 표시 (suffix, kr_mapping, us_mapping, alias, kr_listing, us_listing, heuristic)
+"""
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Mapping, Optional, Any
+
+from app.services.kr_stock_cache import kr_stock_cache, KRStockCacheService
+from app.services.us_stock_cache import us_stock_cache, USStockCacheService
+from app.services.ticker_table import TickerDiff
+
+logger = logging.getLogger(__name__)
+
+# 메모이제이션 최대 항목 수
+MAX_MEMO_SIZE = 10_000
+
+# 리졸버 소스 구분
+SOURCE_SUFFIX = "suffix"
+SOURCE_KR_MAPPING = "kr_mapping"
+SOURCE_US_MAPPING = "us_mapping"
+SOURCE_ALIAS = "alias"
+SOURCE_KR_LISTING = "kr_listing"
+SOURCE_US_LISTING = "us_listing"
+SOURCE_HEURISTIC = "heuristic"
+
+# 한국 종목 영문명 별칭
+KR_ENGLISH_ALIASES = {
+    "Samsung Electronics": "005930.KS",
+    "Samsung": "005930.KS",
+    "SK Hynix": "000660.KS",
+    "LG Energy Solution": "373220.KS",
+    "Samsung Biologics": "207940.KS",
+    "Hyundai Motor": "005380.KS",
+    "Hyundai": "005380.KS",
+    "Kia": "000270.KS",
+    "Celltrion": "068270.KS",
+    "KB Financial": "105560.KS",
+    "Shinhan Financial": "055550.KS",
+    "POSCO Holdings": "005490.KS",
+    "Naver": "035420.KS",
+    "Kakao": "035720.KS",
+    "LG Chem": "051910.KS",
+    "Samsung SDI": "006400.KS",
+    "Hyundai Mobis": "012330.KS",
+    "KakaoBank": "323410.KS",
+    "Krafton": "259960.KS",
+    "NCSoft": "036570.KS",
+    "Netmarble": "251270.KS",
+    "Samsung Electro-Mechanics": "009150.KS",
+    "Hana Financial": "086790.KS",
+    "Woori Financial": "316140.KS",
+    "KEPCO": "015760.KS",
+    "SK Innovation": "096770.KS",
+    "Samsung C&T": "028260.KS",
+    "Alteogen": "196170.KQ",
+    "Pearl Abyss": "263750.KQ",
+}
+
+# 미국 종목 한글명 별칭 (US_STOCK_MAPPING 보완)
+US_KOREAN_ALIASES = {
+    "알파벳": "GOOGL",
+    "페이스북": "META",
+    "버크셔": "BRK-B",
+    "에이엠디": "AMD",
+    "인텔": "INTC",
+    "브로드컴": "AVGO",
+    "퀄컴": "QCOM",
+    "오라클": "ORCL",
+    "어도비": "ADBE",
+    "세일즈포스": "CRM",
+    "팔란티어": "PLTR",
+    "코카콜라": "KO",
+    "스타벅스": "SBUX",
+    "디즈니": "DIS",
+    "나이키": "NKE",
+    "맥도날드": "MCD",
+    "월마트": "WMT",
+    "코스트코": "COST",
+    "비자": "V",
+    "마스터카드": "MA",
+    "보잉": "BA",
+    "우버": "UBER",
+    "에어비앤비": "ABNB",
+    "쿠팡": "CPNG",
+}
+
+# 구 티커/구 종목명 별칭
+OLD_TICKER_ALIASES = {
+    # 미국
+    "FB": "META",
+    "SQ": "XYZ",
+    "ANTM": "ELV",
+    "FISV": "FI",
+    "BRK.B": "BRK-B",
+    "BRKB": "BRK-B",
+    "BF.B": "BF-B",
+    # 한국
+    "포스코": "005490.KS",
+    "POSCO": "005490.KS",
+    "포스코케미칼": "003670.KS",
+    "셀트리온헬스케어": "068270.KS",
+}
+
+
+@dataclass(frozen=True)
+class ResolvedSymbol:
+    """심볼 변환 결과"""
+    symbol: str
+    market: str  # US, KR
+    source: str  # 응답한 소스
+
+
+def normalize_query(query: str) -> str:
+    """인덱스 키 정규화 (공백 제거 + 대소문자 무시)"""
+    return "".join(query.split()).casefold()
+
+
+def _market_of(symbol: str) -> str:
+    """심볼 접미사로 시장 구분"""
+    return "KR" if symbol.endswith(".KS") or symbol.endswith(".KQ") else "US"
+
+
+# 인덱스 레이어 (우선순위 낮음 -> 높음, 같은 키는 높은 레이어가 응답)
+LAYER_ORDER = (
+    "us_listing_name",
+    "alias",
+    "us_listing_symbol",  # 현재 상장 심볼이 구 티커 별칭보다 우선
+    "kr_listing",
+    "us_mapping",
+    "kr_mapping",
+)
+
+
+def _kr_listing_entries(code: str, name: str, market: str) -> Dict[str, ResolvedSymbol]:
+    """KR 종목 한 건의 인덱스 키 (종목코드, 정규화 종목명)"""
+    suffix = ".KS" if market == "KOSPI" else ".KQ"
+    resolved = ResolvedSymbol(f"{code}{suffix}", "KR", SOURCE_KR_LISTING)
+    return {code: resolved, normalize_query(name): resolved}
+
+
+class SymbolResolver:
+    """한국/미국 통합 심볼 리졸버"""
+
+    def __init__(
+        self,
+        kr_mapping: Optional[Dict[str, str]] = None,
+        us_mapping: Optional[Dict[str, str]] = None,
+        kr_cache: Optional[KRStockCacheService] = None,
+        us_cache: Optional[USStockCacheService] = None,
+    ):
+        self._kr_mapping = kr_mapping or {}
+        self._us_mapping = us_mapping or {}
+        self._kr_cache = kr_cache or kr_stock_cache
+        self._us_cache = us_cache or us_stock_cache
+        # 소스별 레이어: layer -> (정규화 키 -> 변환 결과)
+        self._layers: Dict[str, Dict[str, ResolvedSymbol]] = {layer: {} for layer in LAYER_ORDER}
+        # 병합 인덱스: 정규화 키 -> 변환 결과
+        self._index: Dict[str, ResolvedSymbol] = {}
+        # 인덱스 세대 (KR/US 종목 테이블 로드 시각)
+        self._kr_generation: Optional[datetime] = None
+        self._us_generation: Optional[datetime] = None
+        self._index_built = False
+        # 원본 쿼리 -> 변환 결과 (LRU)
+        self._memo: "OrderedDict[str, ResolvedSymbol]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        # KR 종목 테이블 변경분 구독 (변경된 종목만 인덱스/메모 갱신)
+        self._kr_cache.subscribe(self._on_kr_diff)
+
+    def _build_layers(
+        self,
+        kr_listing: Mapping[str, tuple[str, str]],
+        us_listing: Dict[str, str],
+    ) -> Dict[str, Dict[str, ResolvedSymbol]]:
+        """소스별 인덱스 레이어 구축"""
+        layers: Dict[str, Dict[str, ResolvedSymbol]] = {layer: {} for layer in LAYER_ORDER}
+
+        for symbol, name in us_listing.items():
+            resolved = ResolvedSymbol(symbol, "US", SOURCE_US_LISTING)
+            layers["us_listing_name"][normalize_query(name)] = resolved
+            layers["us_listing_symbol"][normalize_query(symbol)] = resolved
+
+        for aliases in (OLD_TICKER_ALIASES, US_KOREAN_ALIASES, KR_ENGLISH_ALIASES):
+            for alias, symbol in aliases.items():
+                layers["alias"][normalize_query(alias)] = ResolvedSymbol(symbol, _market_of(symbol), SOURCE_ALIAS)
+
+        for code, (name, market) in kr_listing.items():
+            layers["kr_listing"].update(_kr_listing_entries(code, name, market))
+
+        for name, symbol in self._us_mapping.items():
+            resolved = ResolvedSymbol(symbol, "US", SOURCE_US_MAPPING)
+            layers["us_mapping"][normalize_query(name)] = resolved
+            layers["us_mapping"][normalize_query(symbol)] = resolved
+
+        for name, symbol in self._kr_mapping.items():
+            layers["kr_mapping"][normalize_query(name)] = ResolvedSymbol(symbol, "KR", SOURCE_KR_MAPPING)
+
+        return layers
+
+    @staticmethod
+    def _merge_layers(layers: Dict[str, Dict[str, ResolvedSymbol]]) -> Dict[str, ResolvedSymbol]:
+        """
+        모든 소스를 하나의 인덱스로 병합
+
+        우선순위가 낮은 레이어부터 채워 높은 레이어가 덮어쓰도록 함
+        """
+        index: Dict[str, ResolvedSymbol] = {}
+        for layer in LAYER_ORDER:
+            index.update(layers[layer])
+        return index
+
+    def _resolve_key(self, key: str) -> Optional[ResolvedSymbol]:
+        """단일 키의 병합 결과 (가장 높은 레이어)"""
+        for layer in reversed(LAYER_ORDER):
+            resolved = self._layers[layer].get(key)
+            if resolved is not None:
+                return resolved
+        return None
+
+    async def _ensure_index(self) -> None:
+        """KR/US 종목 테이블 세대가 바뀌었으면 인덱스 재구축 및 메모 초기화"""
+        try:
+            kr_generation, kr_listing = await self._kr_cache.get_snapshot()
+        except Exception as e:
+            logger.warning(f"KR 종목 테이블 조회 실패, 정적 소스만 사용: {e}")
+            kr_generation, kr_listing = None, {}
+
+        try:
+            us_generation, us_listing = await self._us_cache.get_snapshot()
+        except Exception as e:
+            logger.warning(f"US 종목 목록 조회 실패, 정적 소스만 사용: {e}")
+            us_generation, us_listing = None, {}
+
+        # KR 갱신은 변경분 구독으로 반영되므로 세대가 어긋난 경우(변경분 누락)에만 재구축
+        if (
+            self._index_built
+            and kr_generation == self._kr_generation
+            and us_generation == self._us_generation
+        ):
+            return
+
+        self._layers = self._build_layers(kr_listing, us_listing)
+        self._index = self._merge_layers(self._layers)
+        self._kr_generation = kr_generation
+        self._us_generation = us_generation
+        self._index_built = True
+        self._memo.clear()
+        logger.info(f"심볼 인덱스 구축 완료: {len(self._index)}개 키")
+
+    def _on_kr_diff(self, diff: TickerDiff) -> None:
+        """KR 종목 테이블 변경분을 인덱스에 반영하고 영향받은 메모만 제거"""
+        if not self._index_built:
+            return
+
+        layer = self._layers["kr_listing"]
+        affected_keys = set()
+
+        for code, (old, new) in diff.changes.items():
+            if old is not None:
+                for key, resolved in _kr_listing_entries(code, *old).items():
+                    current = layer.get(key)
+                    # 같은 이름의 다른 종목 항목은 유지
+                    if current is not None and current.symbol[:6] == code:
+                        del layer[key]
+                    affected_keys.add(key)
+            if new is not None:
+                entries = _kr_listing_entries(code, *new)
+                layer.update(entries)
+                affected_keys.update(entries)
+
+        for key in affected_keys:
+            resolved = self._resolve_key(key)
+            if resolved is None:
+                self._index.pop(key, None)
+            else:
+                self._index[key] = resolved
+
+        affected_symbols = diff.affected_symbols()
+        stale = [
+            query for query, resolved in self._memo.items()
+            if resolved.symbol in affected_symbols
+            or (query.zfill(6) if query.isdigit() else normalize_query(query)) in affected_keys
+        ]
+        for query in stale:
+            del self._memo[query]
+
+        self._kr_generation = diff.generation
+        if not diff.is_empty:
+            logger.info(
+                f"심볼 인덱스 변경분 반영: {diff.summary()}, "
+                f"키 {len(affected_keys)}개, 메모 {len(stale)}개 무효화"
+            )
+
+    def _lookup(self, query: str) -> ResolvedSymbol:
+        """인덱스 조회 및 휴리스틱 폴백 (동기)"""
+        # 한국 종목 형식인 경우 (.KS, .KQ 접미사)
+        if query.endswith(".KS") or query.endswith(".KQ"):
+            return ResolvedSymbol(query, "KR", SOURCE_SUFFIX)
+
+        # 숫자로만 구성된 경우 6자리 종목코드로 정규화
+        if query.isdigit():
+            code = query.zfill(6)
+            resolved = self._index.get(code)
+            if resolved:
+                return resolved
+            # 테이블에 없는 코드는 코스피로 가정
+            return ResolvedSymbol(f"{code}.KS", "KR", SOURCE_HEURISTIC)
+
+        resolved = self._index.get(normalize_query(query))
+        if resolved:
+            return resolved
+
+        # 영문 대문자로만 구성된 경우 미국 종목으로 판단
+        if query.isupper() and query.isalpha():
+            return ResolvedSymbol(query, "US", SOURCE_HEURISTIC)
+
+        # 기타: 그대로 반환 (미국 종목으로 가정)
+        return ResolvedSymbol(query.upper(), "US", SOURCE_HEURISTIC)
+
+    async def resolve(self, query: str) -> ResolvedSymbol:
+        """
+        종목명/코드/별칭을 심볼로 변환
+
+        Args:
+            query: 종목명, 코드 또는 별칭 (예: "애플", "AAPL", "005930.KS", "Samsung Electronics")
+
+        Returns:
+            ResolvedSymbol (symbol, market, source)
+        """
+        query = query.strip()
+
+        await self._ensure_index()
+
+        cached = self._memo.get(query)
+        if cached is not None:
+            self._memo.move_to_end(query)
+            self._hits += 1
+            return cached
+
+        self._misses += 1
+        resolved = self._lookup(query)
+
+        self._memo[query] = resolved
+        if len(self._memo) > MAX_MEMO_SIZE:
+            self._memo.popitem(last=False)
+
+        logger.debug(f"심볼 변환: {query} -> {resolved.symbol} ({resolved.source})")
+        return resolved
+
+    def invalidate(self) -> None:
+        """메모이제이션 전체 초기화"""
+        self._memo.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """인덱스/메모 통계"""
+        total = self._hits + self._misses
+        return {
+            "index_size": len(self._index),
+            "memo_size": len(self._memo),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,382 @@
+"""
+컬럼형 한국 종목 테이블
+
+- 종목코드/시장/종목명을 배열과 하나의 문자열 blob으로 저장 (종목당 작은 튜플/문자열 객체 제거)
+- 바이너리 스냅샷 파일로 저장 후 mmap으로 여러 워커 프로세스가 zero-copy 공유
+- 읽기 전용 Mapping 인터페이스 (code -> (name, market))
+- 이전 스냅샷 대비 변경분 계산 (신규 상장, 상장 폐지, 종목명 변경, 시장 이전)
+
+파일 레이아웃 (리틀 엔디언):
+    header: magic(4s) version(H) reserved(H) count(I) names_len(I) built_at(d)
+    codes:        count * 6 bytes (코드 오름차순, ASCII)
+    markets:      count bytes (0=KOSPI, 1=KOSDAQ)
+    name_offsets: (count + 1) * uint32 (names blob 내 시작 오프셋)
+    name_order:   count * uint32 (종목명 정렬 순서의 행 번호)
+    names:        names_len bytes (UTF-8 종목명 연결)
+    names_lower:  names_len bytes (ASCII 소문자 변환, 검색용 - 오프셋 동일)
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"KRTT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIId")
+CODE_WIDTH = 6
+
+MARKETS = ("KOSPI", "KOSDAQ")
+_MARKET_IDS = {name: idx for idx, name in enumerate(MARKETS)}
+
+
+def _uint32_view(buffer, start: int, count: int):
+    """버퍼 구간을 uint32 시퀀스로 해석 (복사 없음)"""
+    view = memoryview(buffer)[start:start + count * 4]
+    if sys.byteorder == "little":
+        return view.cast("I")
+    # 빅 엔디언 플랫폼은 복사 후 변환
+    values = array("I", view.tobytes())
+    values.byteswap()
+    return values
+
+
+class TickerTable(Mapping):
+    """컬럼형 종목 테이블 (code -> (name, market))"""
+
+    def __init__(
+        self,
+        codes,
+        markets,
+        name_offsets,
+        name_order,
+        names,
+        search_buffer,
+        search_base: int,
+        built_at: datetime,
+    ):
+        self._codes = codes
+        self._markets = markets
+        self._name_offsets = name_offsets
+        self._name_order = name_order
+        self._names = names
+        # 검색용 소문자 종목명 (bytes 또는 mmap 전체 + 시작 오프셋, find를 복사 없이 사용)
+        self._search_buffer = search_buffer
+        self._search_base = search_base
+        self.built_at = built_at
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_mapping(
+        cls,
+        stocks: Dict[str, tuple[str, str]],
+        built_at: Optional[datetime] = None,
+    ) -> "TickerTable":
+        """code -> (name, market) 딕셔너리로 테이블 생성"""
+        rows = []
+        for code, (name, market) in stocks.items():
+            encoded = code.encode("ascii", errors="ignore")
+            if len(encoded) != CODE_WIDTH or market not in _MARKET_IDS:
+                logger.debug(f"종목 테이블에서 제외: {code} ({market})")
+                continue
+            rows.append((encoded, name, _MARKET_IDS[market]))
+        rows.sort(key=lambda row: row[0])
+
+        codes = b"".join(row[0] for row in rows)
+        markets = bytes(row[2] for row in rows)
+
+        name_offsets = array("I", [0])
+        encoded_names: List[bytes] = []
+        for _, name, _ in rows:
+            encoded = name.encode("utf-8")
+            encoded_names.append(encoded)
+            name_offsets.append(name_offsets[-1] + len(encoded))
+        names = b"".join(encoded_names)
+
+        name_order = array("I", sorted(range(len(rows)), key=lambda i: encoded_names[i]))
+
+        return cls(
+            codes=codes,
+            markets=markets,
+            name_offsets=name_offsets,
+            name_order=name_order,
+            names=names,
+            search_buffer=names.lower(),
+            search_base=0,
+            built_at=built_at or datetime.now(),
+        )
+
+    @classmethod
+    def empty(cls) -> "TickerTable":
+        """빈 테이블"""
+        return cls.from_mapping({}, built_at=datetime.fromtimestamp(0))
+
+    # ------------------------------------------------------------------
+    # 스냅샷 파일 (mmap 공유)
+    # ------------------------------------------------------------------
+    def to_bytes(self) -> bytes:
+        """바이너리 스냅샷으로 직렬화"""
+        count = len(self)
+        name_offsets = array("I", self._name_offsets)
+        name_order = array("I", self._name_order)
+        if sys.byteorder != "little":
+            name_offsets.byteswap()
+            name_order.byteswap()
+
+        return b"".join([
+            HEADER.pack(MAGIC, FORMAT_VERSION, 0, count, len(self._names), self.built_at.timestamp()),
+            bytes(self._codes),
+            bytes(self._markets),
+            name_offsets.tobytes(),
+            name_order.tobytes(),
+            bytes(self._names),
+            bytes(self._search_buffer[self._search_base:self._search_base + len(self._names)]),
+        ])
+
+    def write(self, path: str) -> None:
+        """스냅샷 파일 원자적 저장 (임시 파일 작성 후 교체)"""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(self.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+
+    @classmethod
+    def open(cls, path: str) -> "TickerTable":
+        """스냅샷 파일을 mmap으로 열기 (여러 프로세스가 같은 페이지 공유)"""
+        with Path(path).open("rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(mapped) < HEADER.size:
+            raise ValueError("종목 테이블 스냅샷이 손상되었습니다 (헤더 없음)")
+
+        magic, version, _, count, names_len, built_at = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 종목 테이블 스냅샷 형식: {magic!r} v{version}")
+
+        expected = HEADER.size + count * CODE_WIDTH + count + (count + 1) * 4 + count * 4 + names_len * 2
+        if len(mapped) != expected:
+            raise ValueError("종목 테이블 스냅샷 크기가 올바르지 않습니다")
+
+        view = memoryview(mapped)
+        position = HEADER.size
+        codes = view[position:position + count * CODE_WIDTH]
+        position += count * CODE_WIDTH
+        markets = view[position:position + count]
+        position += count
+        name_offsets = _uint32_view(mapped, position, count + 1)
+        position += (count + 1) * 4
+        name_order = _uint32_view(mapped, position, count)
+        position += count * 4
+        names = view[position:position + names_len]
+        position += names_len
+
+        return cls(
+            codes=codes,
+            markets=markets,
+            name_offsets=name_offsets,
+            name_order=name_order,
+            names=names,
+            search_buffer=mapped,
+            search_base=position,
+            built_at=datetime.fromtimestamp(built_at),
+        )
+
+    # ------------------------------------------------------------------
+    # 행 접근
+    # ------------------------------------------------------------------
+    def code_at(self, row: int) -> str:
+        """행 번호의 종목코드"""
+        start = row * CODE_WIDTH
+        return bytes(self._codes[start:start + CODE_WIDTH]).decode("ascii")
+
+    def name_at(self, row: int) -> str:
+        """행 번호의 종목명"""
+        return bytes(self._names[self._name_offsets[row]:self._name_offsets[row + 1]]).decode("utf-8")
+
+    def market_at(self, row: int) -> str:
+        """행 번호의 시장 구분"""
+        return MARKETS[self._markets[row]]
+
+    def find_code(self, code: str) -> int:
+        """종목코드의 행 번호 (없으면 -1, 이진 탐색)"""
+        encoded = code.encode("ascii", errors="ignore")
+        if len(encoded) != CODE_WIDTH:
+            return -1
+
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mid * CODE_WIDTH
+            current = bytes(self._codes[start:start + CODE_WIDTH])
+            if current < encoded:
+                lo = mid + 1
+            elif current > encoded:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def _name_bytes(self, row: int) -> bytes:
+        return bytes(self._names[self._name_offsets[row]:self._name_offsets[row + 1]])
+
+    def find_name(self, name: str) -> Optional[str]:
+        """종목명 정확히 일치하는 종목코드 (이진 탐색)"""
+        encoded = name.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._name_bytes(self._name_order[mid])
+            if current < encoded:
+                lo = mid + 1
+            elif current > encoded:
+                hi = mid
+            else:
+                return self.code_at(self._name_order[mid])
+        return None
+
+    def search_rows(self, query: str, limit: int) -> List[int]:
+        """종목명 부분 일치 행 번호 (대소문자 무시, 행 순서)"""
+        needle = query.lower().encode("utf-8")
+        if not needle:
+            return []
+
+        rows: List[int] = []
+        base = self._search_base
+        end_of_names = base + len(self._names)
+
+        def find(start: int) -> int:
+            found = self._search_buffer.find(needle, base + start, end_of_names)
+            return found - base if found != -1 else -1
+
+        position = find(0)
+        while position != -1 and len(rows) < limit:
+            row = bisect_right(self._name_offsets, position) - 1
+            end = self._name_offsets[row + 1]
+            # 종목명 경계를 넘는 일치는 무시
+            if position + len(needle) <= end:
+                rows.append(row)
+                position = find(end)
+            else:
+                position = find(position + 1)
+        return rows
+
+    # ------------------------------------------------------------------
+    # Mapping 인터페이스
+    # ------------------------------------------------------------------
+    def __getitem__(self, code: str) -> tuple[str, str]:
+        row = self.find_code(code)
+        if row < 0:
+            raise KeyError(code)
+        return self.name_at(row), self.market_at(row)
+
+    def __iter__(self) -> Iterator[str]:
+        for row in range(len(self)):
+            yield self.code_at(row)
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def items_by_row(self) -> Iterator[tuple[str, str, str]]:
+        """(code, name, market) 순회"""
+        for row in range(len(self)):
+            yield self.code_at(row), self.name_at(row), self.market_at(row)
+
+    @property
+    def nbytes(self) -> int:
+        """테이블 데이터 크기 (바이트)"""
+        return (
+            len(self._codes) + len(self._markets) + len(self._names) * 2
+            + (len(self._name_offsets) + len(self._name_order)) * 4
+        )
+
+
+@dataclass
+class TickerDiff:
+    """
+    종목 테이블 변경분 (이전 스냅샷 대비)
+
+    changes: code -> (이전 (name, market) 또는 None, 새 (name, market) 또는 None)
+    """
+    generation: Optional[datetime]
+    changes: Dict[str, tuple[Optional[tuple[str, str]], Optional[tuple[str, str]]]] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changes
+
+    @property
+    def listed(self) -> Dict[str, tuple[str, str]]:
+        """신규 상장: code -> (name, market)"""
+        return {code: new for code, (old, new) in self.changes.items() if old is None and new is not None}
+
+    @property
+    def delisted(self) -> Dict[str, tuple[str, str]]:
+        """상장 폐지: code -> (name, market)"""
+        return {code: old for code, (old, new) in self.changes.items() if old is not None and new is None}
+
+    @property
+    def renamed(self) -> Dict[str, tuple[str, str]]:
+        """종목명 변경: code -> (old_name, new_name)"""
+        return {
+            code: (old[0], new[0])
+            for code, (old, new) in self.changes.items()
+            if old is not None and new is not None and old[0] != new[0]
+        }
+
+    @property
+    def market_moved(self) -> Dict[str, tuple[str, str]]:
+        """시장 이전 (KOSPI <-> KOSDAQ): code -> (old_market, new_market)"""
+        return {
+            code: (old[1], new[1])
+            for code, (old, new) in self.changes.items()
+            if old is not None and new is not None and old[1] != new[1]
+        }
+
+    def affected_symbols(self) -> Set[str]:
+        """변경된 종목의 모든 심볼 (.KS/.KQ 양쪽)"""
+        return {f"{code}{suffix}" for code in self.changes for suffix in (".KS", ".KQ")}
+
+    def summary(self) -> Dict[str, int]:
+        """변경 유형별 건수"""
+        return {
+            "listed": len(self.listed),
+            "delisted": len(self.delisted),
+            "renamed": len(self.renamed),
+            "market_moved": len(self.market_moved),
+        }
+
+
+def diff_tables(
+    old: Mapping,
+    new: Mapping,
+    generation: Optional[datetime] = None,
+) -> TickerDiff:
+    """두 종목 테이블 (code -> (name, market)) 비교"""
+    old_items = dict(old.items())
+    new_items = dict(new.items())
+
+    changes: Dict[str, tuple[Optional[tuple[str, str]], Optional[tuple[str, str]]]] = {}
+    for code, info in new_items.items():
+        previous = old_items.get(code)
+        if previous != info:
+            changes[code] = (previous, info)
+    for code, info in old_items.items():
+        if code not in new_items:
+            changes[code] = (info, None)
+
+    return TickerDiff(generation=generation, changes=changes)
@@ -0,0 +1,226 @@
+"""
+미국 종목 목록 로컬 스냅샷 캐시
+
+- Finnhub stock/symbol 일괄 조회 (또는 파일 기반 스냅샷)로 전체 미국 상장 종목 로드
+- 심볼/종목명을 하나의 검색 문자열로 압축한 로컬 인덱스
+- 24시간 TTL 자동 갱신 (Finnhub search API는 드문 폴백으로만 사용)
+"""
+import asyncio
+import json
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 캐시 설정 상수
+CACHE_TTL_HOURS = 24  # 일일 갱신
+RETRY_AFTER_FAILURE_MINUTES = 10  # 로드 실패 후 재시도 간격 (검색마다 업스트림 호출 방지)
+FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+MAX_QUERY_LENGTH = 100  # 검색어 최대 길이
+MAX_SEARCH_LIMIT = 100  # 검색 결과 최대 개수
+
+
+class USStockCacheService:
+    """미국 종목 목록 캐시 서비스 (Finnhub stock/symbol 기반)"""
+
+    def __init__(self, listing_file: Optional[str] = None):
+        # 파일 기반 스냅샷 경로 (지정 시 Finnhub 대신 사용)
+        self._listing_file = listing_file
+        # 행 단위 컬럼: 심볼 정렬 순서
+        self._symbols: List[str] = []
+        self._names: List[str] = []
+        # 심볼 -> 행 번호
+        self._symbol_to_row: Dict[str, int] = {}
+        # 검색용 압축 문자열 ("symbol\tname\n" 소문자 연결) 및 행 시작 오프셋
+        self._search_blob: str = ""
+        self._row_offsets: List[int] = []
+        # 캐시 타임스탬프
+        self._cache_timestamp: Optional[datetime] = None
+        self._cache_ttl = timedelta(hours=CACHE_TTL_HOURS)
+        # 마지막 로드 실패 시각
+        self._last_failure: Optional[datetime] = None
+        # 초기화 락 (lazy initialization to avoid event loop binding issues)
+        self._init_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def listing_file(self) -> str:
+        """스냅샷 파일 경로 (생성자 인자 우선, 없으면 settings)"""
+        return self._listing_file if self._listing_file is not None else settings.US_LISTING_FILE
+
+    def _is_cache_valid(self) -> bool:
+        """캐시가 유효한지 확인"""
+        if not self._cache_timestamp:
+            return False
+        return datetime.now() - self._cache_timestamp < self._cache_ttl
+
+    def _in_failure_backoff(self) -> bool:
+        """최근 로드 실패 후 재시도 대기 중인지 확인"""
+        if not self._last_failure:
+            return False
+        return datetime.now() - self._last_failure < timedelta(minutes=RETRY_AFTER_FAILURE_MINUTES)
+
+    def _load_from_file(self, path: str) -> List[Dict[str, Any]]:
+        """파일 기반 스냅샷 로드 (Finnhub stock/symbol 응답과 동일한 JSON 배열)"""
+        with Path(path).open(encoding="utf-8") as f:
+            return json.load(f)
+
+    async def _load_from_finnhub(self) -> List[Dict[str, Any]]:
+        """Finnhub stock/symbol 일괄 조회"""
+        api_key = settings.FINNHUB_API
+        if not api_key:
+            logger.warning("FINNHUB_API 키가 없어 미국 종목 목록을 로드하지 않습니다")
+            return []
+
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            response = await client.get(
+                f"{FINNHUB_BASE_URL}/stock/symbol",
+                params={"exchange": settings.US_LISTING_EXCHANGE, "token": api_key},
+            )
+            response.raise_for_status()
+            return response.json() or []
+
+    def _build_index(self, listing: List[Dict[str, Any]]) -> None:
+        """원본 목록으로 압축 인덱스 구축"""
+        rows: Dict[str, str] = {}
+        for item in listing:
+            symbol = (item.get("symbol") or "").strip().upper()
+            # 미국 보통주 형식만 사용 (. 포함 심볼 제외, 기존 검색 필터와 동일)
+            if not symbol or "." in symbol:
+                continue
+            rows[symbol] = (item.get("description") or symbol).strip()
+
+        # 짧은 심볼 우선 정렬 (대표 종목이 먼저 검색되도록)
+        symbols = sorted(rows, key=lambda s: (len(s), s))
+        names = [rows[s] for s in symbols]
+
+        offsets: List[int] = []
+        parts: List[str] = []
+        position = 0
+        for symbol, name in zip(symbols, names):
+            line = f"{symbol}\t{name}\n".lower()
+            offsets.append(position)
+            parts.append(line)
+            position += len(line)
+
+        self._symbols = symbols
+        self._names = names
+        self._symbol_to_row = {symbol: row for row, symbol in enumerate(symbols)}
+        self._search_blob = "".join(parts)
+        self._row_offsets = offsets
+
+    async def _ensure_initialized(self) -> None:
+        """캐시 초기화 보장 (지연 로딩, 24시간마다 갱신)"""
+        if self._is_cache_valid() or self._in_failure_backoff():
+            return
+
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+
+        async with self._init_lock:
+            if self._is_cache_valid() or self._in_failure_backoff():
+                return
+
+            try:
+                if self.listing_file:
+                    loop = asyncio.get_running_loop()
+                    listing = await loop.run_in_executor(None, self._load_from_file, self.listing_file)
+                else:
+                    listing = await self._load_from_finnhub()
+            except Exception as e:
+                logger.error(f"미국 종목 목록 로드 실패: {e}")
+                self._last_failure = datetime.now()
+                return
+
+            if not listing:
+                logger.warning("미국 종목 목록 로드 실패: 데이터 없음")
+                self._last_failure = datetime.now()
+                return
+
+            self._build_index(listing)
+            self._cache_timestamp = datetime.now()
+            self._last_failure = None
+            logger.info(f"미국 종목 목록 로드 완료: {len(self._symbols)}개 종목")
+
+    async def warm_up(self) -> bool:
+        """시작 시 미국 종목 목록 미리 로드"""
+        await self._ensure_initialized()
+        return self.is_healthy
+
+    async def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        미국 종목 로컬 검색
+
+        Args:
+            query: 검색어 (심볼 또는 종목명 일부)
+            limit: 최대 결과 수
+
+        Returns:
+            검색 결과 리스트 [{"symbol": "AAPL", "name": "APPLE INC", "market": "US"}]
+        """
+        if not query or len(query) > MAX_QUERY_LENGTH:
+            return []
+        if limit < 1 or limit > MAX_SEARCH_LIMIT:
+            limit = 10
+
+        await self._ensure_initialized()
+
+        needle = query.strip().lower()
+        if not needle or "\t" in needle or "\n" in needle:
+            return []
+
+        rows: List[int] = []
+
+        # 심볼 정확히 일치
+        exact_row = self._symbol_to_row.get(needle.upper())
+        if exact_row is not None:
+            rows.append(exact_row)
+
+        # 압축 문자열에서 부분 일치 검색
+        blob = self._search_blob
+        position = blob.find(needle)
+        while position != -1 and len(rows) < limit:
+            row = bisect_right(self._row_offsets, position) - 1
+            if row not in rows:
+                rows.append(row)
+            # 같은 행의 나머지는 건너뜀
+            next_row = row + 1
+            position = blob.find(
+                needle,
+                self._row_offsets[next_row] if next_row < len(self._row_offsets) else len(blob),
+            )
+
+        return [
+            {"symbol": self._symbols[row], "name": self._names[row], "market": "US"}
+            for row in rows[:limit]
+        ]
+
+    async def get_snapshot(self) -> tuple[Optional[datetime], Dict[str, str]]:
+        """
+        전체 종목 스냅샷 조회 (인덱스 구축용)
+
+        Returns:
+            (로드 시각, symbol -> name 딕셔너리) 튜플
+        """
+        await self._ensure_initialized()
+        return self._cache_timestamp, dict(zip(self._symbols, self._names))
+
+    @property
+    def stock_count(self) -> int:
+        """캐시된 종목 수"""
+        return len(self._symbols)
+
+    @property
+    def is_healthy(self) -> bool:
+        """캐시가 정상적으로 로드되었는지 확인"""
+        return self._cache_timestamp is not None and len(self._symbols) > 0
+
+
+# 싱글톤 인스턴스
+us_stock_cache = USStockCacheService()
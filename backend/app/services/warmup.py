@@ -0,0 +1,136 @@
+"""
+시작 시 참조 데이터 워밍업 서비스
+
+- 애플리케이션 시작 시 종목 테이블 등 참조 데이터를 미리 로드
+- 워밍업 완료 전까지 /ready 엔드포인트가 not-ready 응답
+- 단계별 상태 추적 (pending, running, done, failed)
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# 워밍업 단계 상태
+STEP_PENDING = "pending"
+STEP_RUNNING = "running"
+STEP_DONE = "done"
+STEP_FAILED = "failed"
+
+# 워밍업 단계 함수: 성공 여부를 반환하는 코루틴
+WarmupStep = Callable[[], Awaitable[bool]]
+
+
+class WarmupService:
+    """참조 데이터 워밍업 서비스"""
+
+    def __init__(self):
+        # 등록된 워밍업 단계: (이름, 함수)
+        self._steps: List[tuple[str, WarmupStep]] = []
+        # 단계별 상태: name -> {"status": ..., "duration_ms": ...}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        # 백그라운드 워밍업 태스크
+        self._task: Optional[asyncio.Task] = None
+        # 워밍업 종료 여부 (성공/실패 무관)
+        self._finished = False
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+
+    def register(self, name: str, step: WarmupStep) -> None:
+        """워밍업 단계 등록 (등록 순서대로 실행)"""
+        if any(existing == name for existing, _ in self._steps):
+            return
+        self._steps.append((name, step))
+        self._status[name] = {"status": STEP_PENDING, "duration_ms": None}
+
+    async def _run_step(self, name: str, step: WarmupStep) -> None:
+        """단일 워밍업 단계 실행"""
+        self._status[name]["status"] = STEP_RUNNING
+        step_start = time.perf_counter()
+
+        try:
+            ok = await step()
+            self._status[name]["status"] = STEP_DONE if ok else STEP_FAILED
+        except asyncio.CancelledError:
+            self._status[name]["status"] = STEP_FAILED
+            raise
+        except Exception as e:
+            logger.error(f"워밍업 단계 실패: {name} - {e}")
+            self._status[name]["status"] = STEP_FAILED
+        finally:
+            duration_ms = int((time.perf_counter() - step_start) * 1000)
+            self._status[name]["duration_ms"] = duration_ms
+
+        logger.info(f"워밍업 단계 완료: {name} ({self._status[name]['status']}, {duration_ms}ms)")
+
+    async def _run(self, timeout: Optional[float]) -> None:
+        """모든 워밍업 단계를 병렬 실행"""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self._run_step(name, step) for name, step in self._steps)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"워밍업 시간 초과 ({timeout}s), 미완료 단계를 실패로 처리합니다")
+            for info in self._status.values():
+                if info["status"] in (STEP_PENDING, STEP_RUNNING):
+                    info["status"] = STEP_FAILED
+        finally:
+            self._finished = True
+            self._finished_at = time.perf_counter()
+
+        failed = [name for name, info in self._status.items() if info["status"] == STEP_FAILED]
+        if failed:
+            logger.warning(f"워밍업 완료 (실패 단계: {', '.join(failed)})")
+        else:
+            logger.info("워밍업 완료: 모든 참조 데이터 로드됨")
+
+    def start(self, timeout: Optional[float] = None) -> asyncio.Task:
+        """백그라운드 워밍업 시작 (이미 시작된 경우 기존 태스크 반환)"""
+        if self._task is None:
+            self._started_at = time.perf_counter()
+            self._task = asyncio.create_task(self._run(timeout))
+        return self._task
+
+    async def stop(self) -> None:
+        """진행 중인 워밍업 취소 (애플리케이션 종료 시)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def wait(self) -> None:
+        """워밍업 완료 대기"""
+        if self._task:
+            await asyncio.shield(self._task)
+
+    @property
+    def is_ready(self) -> bool:
+        """모든 워밍업 단계가 종료되었는지 여부"""
+        return self._finished
+
+    @property
+    def is_degraded(self) -> bool:
+        """실패한 워밍업 단계가 있는지 여부"""
+        return any(info["status"] == STEP_FAILED for info in self._status.values())
+
+    def status(self) -> Dict[str, Any]:
+        """워밍업 상태 요약"""
+        elapsed_ms = None
+        if self._started_at is not None:
+            end = self._finished_at if self._finished_at is not None else time.perf_counter()
+            elapsed_ms = int((end - self._started_at) * 1000)
+
+        return {
+            "ready": self.is_ready,
+            "degraded": self.is_degraded,
+            "elapsed_ms": elapsed_ms,
+            "steps": {name: dict(info) for name, info in self._status.items()},
+        }
+
+
+# 싱글톤 인스턴스
+warmup_service = WarmupService()
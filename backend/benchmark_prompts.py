@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+분석 프롬프트 벤치마크 (full vs compact)
+
+프롬프트 모드별 입력 크기, 실제 토큰 사용량, 응답 지연 시간, 비용을 비교합니다.
+
+사용법:
+1. 프롬프트 크기만 비교 (API 호출 없음):
+   python benchmark_prompts.py AAPL 005930.KS
+2. 실제 LLM 호출로 지연 시간/토큰/비용 비교 (API 키 필요, 과금 발생):
+   python benchmark_prompts.py AAPL --live --runs 3 --input-price 0.25 --output-price 2.0
+   (가격 단위: 100만 토큰당 USD)
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from app.core.config import settings
+from app.services.llm_usage import track_usage
+from app.services.prompts import STOCK_ANALYSIS_SYSTEM_PROMPT
+from app.services.response_parser import is_valid_stock_analysis_response
+from app.services.stock_data_service import stock_data_service
+from app.services.stock_insight_engine import stock_insight_engine
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+PROMPT_MODES = ("full", "compact")
+
+
+def build_prompt(stock_data, timeframe: str, mode: str) -> tuple[str, int]:
+    """모드별 (사용자 프롬프트, 출력 토큰 상한)"""
+    settings.LLM_PROMPT_MODE = mode
+    return (
+        stock_insight_engine._build_user_prompt(stock_data, timeframe),
+        stock_insight_engine._max_tokens(timeframe),
+    )
+
+
+async def run_live(stock_data, timeframe: str, mode: str, runs: int) -> dict:
+    """실제 LLM 호출 (모드별 runs회)"""
+    user_prompt, max_tokens = build_prompt(stock_data, timeframe, mode)
+    latencies, prompt_tokens, completion_tokens, cached_tokens, valid = [], [], [], [], 0
+
+    for _ in range(runs):
+        with track_usage() as usage:
+            started = time.perf_counter()
+            text, _ = await stock_insight_engine._call_llm(
+                STOCK_ANALYSIS_SYSTEM_PROMPT, user_prompt, max_tokens=max_tokens
+            )
+            latencies.append(time.perf_counter() - started)
+        prompt_tokens.append(usage.prompt_tokens)
+        completion_tokens.append(usage.completion_tokens)
+        cached_tokens.append(usage.cached_tokens)
+        valid += is_valid_stock_analysis_response(text)
+
+    return {
+        "latency_p50": statistics.median(latencies),
+        "latency_max": max(latencies),
+        "prompt_tokens": statistics.mean(prompt_tokens),
+        "completion_tokens": statistics.mean(completion_tokens),
+        "cached_tokens": statistics.mean(cached_tokens),
+        "valid": valid,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="분석 프롬프트 full/compact 벤치마크")
+    parser.add_argument("symbols", nargs="+", help="종목코드 또는 회사명")
+    parser.add_argument("--timeframe", default="mid", choices=("short", "mid", "long"))
+    parser.add_argument("--live", action="store_true", help="실제 LLM 호출 (과금 발생)")
+    parser.add_argument("--runs", type=int, default=3, help="모드별 호출 횟수")
+    parser.add_argument("--input-price", type=float, default=0.0, help="입력 100만 토큰당 USD")
+    parser.add_argument("--output-price", type=float, default=0.0, help="출력 100만 토큰당 USD")
+    args = parser.parse_args()
+
+    original_mode = settings.LLM_PROMPT_MODE
+    try:
+        for symbol in args.symbols:
+            stock_data = await stock_data_service.get_stock_data(symbol)
+            if not stock_data:
+                print(f"[{symbol}] 주식 데이터를 찾을 수 없음")
+                continue
+
+            print(f"\n[{stock_data.symbol}] {stock_data.name} ({args.timeframe})")
+            for mode in PROMPT_MODES:
+                user_prompt, max_tokens = build_prompt(stock_data, args.timeframe, mode)
+                print(
+                    f"  {mode:8s} 프롬프트 {len(user_prompt):5d}자 "
+                    f"(시스템 포함 {len(STOCK_ANALYSIS_SYSTEM_PROMPT) + len(user_prompt):5d}자), "
+                    f"max_tokens={max_tokens}"
+                )
+
+            if not args.live:
+                continue
+
+            for mode in PROMPT_MODES:
+                result = await run_live(stock_data, args.timeframe, mode, args.runs)
+                cost = (
+                    result["prompt_tokens"] * args.input_price
+                    + result["completion_tokens"] * args.output_price
+                ) / 1_000_000
+                print(
+                    f"  {mode:8s} 지연 p50 {result['latency_p50']:.1f}초 / 최대 {result['latency_max']:.1f}초, "
+                    f"토큰 입력 {result['prompt_tokens']:.0f} (캐시 {result['cached_tokens']:.0f}) / 출력 {result['completion_tokens']:.0f}, "
+                    f"건당 ${cost:.5f}, 유효 응답 {result['valid']}/{args.runs}"
+                )
+    finally:
+        settings.LLM_PROMPT_MODE = original_mode
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+분석 API 부하 테스트
+
+가짜 LLM 프로바이더로 실행한 서버에 동시 요청을 보내 처리량, 응답 지연,
+상태 코드(503 과부하 거절 포함)를 측정합니다.
+
+사용법:
+1. 가짜 프로바이더로 서버 실행 (토큰 비용 없음):
+   LLM_PRIMARY_PROVIDER=fake LLM_FALLBACK_ORDER=fake LLM_PROVIDER_CONCURRENCY=fake=16 \\
+   LLM_FAKE_TTFT_MEDIAN_SECONDS=2 LLM_FAKE_ERROR_RATE=0.02 ANALYSIS_CACHE_TTL=0 \\
+   uvicorn main:app --port 8000
+   (ANALYSIS_CACHE_TTL=0: 공유 분석 캐시를 끄고 매 요청 LLM 경로 측정)
+2. 부하 테스트 실행:
+   python load_test.py --concurrency 32 --requests 500 --symbols AAPL MSFT NVDA
+   python load_test.py --endpoint jobs --concurrency 64 --requests 1000
+
+주식 데이터 수집은 실제 데이터 소스를 사용하므로 캐시된 종목을 반복 사용하는 것을 권장합니다.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from app.services.llm_hedging import percentile
+
+TIMEFRAMES = ("short", "mid", "long")
+JOB_TERMINAL_STATUSES = {"done", "failed"}
+
+
+async def run_stock(client: httpx.AsyncClient, symbol: str, timeframe: str) -> int:
+    """동기 분석 요청 1건"""
+    response = await client.post(
+        "/api/analysis/stock",
+        json={"stock_code": symbol, "timeframe": timeframe},
+        headers={"X-User-Id": str(uuid.uuid4())},
+    )
+    return response.status_code
+
+
+async def run_job(client: httpx.AsyncClient, symbol: str, timeframe: str, poll_interval: float) -> int:
+    """비동기 작업 등록 후 완료까지 폴링 (완료 시 200, 실패 시 500)"""
+    user_id = str(uuid.uuid4())
+    headers = {"X-User-Id": user_id}
+    response = await client.post(
+        "/api/analysis/jobs", json={"stock_code": symbol, "timeframe": timeframe}, headers=headers
+    )
+    if response.status_code != 202:
+        return response.status_code
+
+    job_id = response.json()["job_id"]
+    while True:
+        await asyncio.sleep(poll_interval)
+        status = (await client.get(f"/api/analysis/jobs/{job_id}", headers=headers)).json()["status"]
+        if status in JOB_TERMINAL_STATUSES:
+            return 200 if status == "done" else 500
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="분석 API 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--endpoint", choices=("stock", "jobs"), default="stock")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--symbols", nargs="+", default=["AAPL", "MSFT", "NVDA"])
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="jobs 상태 폴링 간격")
+    args = parser.parse_args()
+
+    # 종목 x 투자 기간 조합을 순환하며 요청
+    targets = itertools.cycle(itertools.product(args.symbols, TIMEFRAMES))
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(next(targets))
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while not queue.empty():
+            symbol, timeframe = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                if args.endpoint == "jobs":
+                    status = await run_job(client, symbol, timeframe, args.poll_interval)
+                else:
+                    status = await run_stock(client, symbol, timeframe)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=600, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(f"요청 {args.requests}건 / 동시 {args.concurrency} / {args.endpoint}")
+    print(f"  소요 시간 {elapsed:.1f}초, 처리량 {args.requests / elapsed:.2f} req/s")
+    print(
+        f"  지연 평균 {statistics.mean(latencies):.2f}초, p50 {percentile(latencies, 50):.2f}초, "
+        f"p95 {percentile(latencies, 95):.2f}초, p99 {percentile(latencies, 99):.2f}초"
+    )
+    print(f"  상태 코드 {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
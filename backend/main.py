@@ -3,14 +3,23 @@ Stock Deep Research API - FastAPI 백엔드 진입점
 주식 AI 딥리서치 분석 앱
 """
 import logging
-from fastapi import FastAPI
+import secrets
+from typing import Annotated
+
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uvicorn
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import init_db, close_db
 from app.routers import analysis, payment
+from app.services.kr_stock_cache import kr_stock_cache
+from app.services.us_stock_cache import us_stock_cache
+from app.services.warmup import warmup_service
+from app.services.analysis_jobs import analysis_job_queue
+from app.services.latency_spans import stage_histograms
 
 # 로깅 설정
 logging.basicConfig(
@@ -20,11 +29,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _warm_up_llm_clients() -> bool:
+    """LLM SDK 임포트 및 클라이언트 생성 (첫 분석 요청 지연 방지)"""
+    from app.services.stock_insight_engine import stock_insight_engine
+
+    provider, _, _ = stock_insight_engine._get_active_client()
+    return provider is not None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     애플리케이션 생명주기 관리자 (시작/종료 이벤트 처리)
-    - 시작 시: DB 초기화
+    - 시작 시: DB 초기화, 참조 데이터 워밍업 시작 (백그라운드), 분석 작업 워커 시작
     - 종료 시: 모든 리소스 정리
     """
     # 시작 시 실행할 코드
@@ -34,11 +51,28 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("데이터베이스 초기화 완료")
 
+    # 참조 데이터 워밍업 (완료 전까지 /ready는 503 응답)
+    if settings.WARMUP_ON_STARTUP:
+        warmup_service.register("kr_stock_cache", kr_stock_cache.warm_up)
+        warmup_service.register("us_stock_cache", us_stock_cache.warm_up)
+        warmup_service.register("llm_clients", _warm_up_llm_clients)
+    warmup_service.start(timeout=settings.WARMUP_TIMEOUT_SECONDS)
+
+    # 비동기 분석 작업 워커 시작
+    analysis_job_queue.start()
+
     yield
 
     # 종료 시 실행할 코드
     logger.info("Stock Deep Research API 종료 중...")
 
+    # 분석 작업 워커 종료 (실행 중인 작업은 대기 상태로 반환)
+    await analysis_job_queue.stop()
+
+    # 진행 중인 워밍업 취소 및 종목 캐시 executor 정리
+    await warmup_service.stop()
+    kr_stock_cache.shutdown()
+
     # 데이터베이스 연결 종료
     await close_db()
 
@@ -72,6 +106,67 @@ async def health_check():
     return {"status": "healthy", "service": "Stock Deep Research API"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    레디니스 체크 엔드포인트
+
+    참조 데이터 워밍업이 끝나기 전에는 503을 반환하여
+    로드밸런서가 준비된 인스턴스로만 트래픽을 보내도록 합니다.
+    """
+    warmup_status = warmup_service.status()
+    if not warmup_service.is_ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "warmup": warmup_status},
+        )
+    return {"status": "ready", "warmup": warmup_status}
+
+
+def verify_metrics_token(
+    authorization: Annotated[str | None, Header()] = None
+) -> None:
+    """
+    /metrics* 조회 토큰 검증
+
+    키 상태/비용 등 운영 정보가 포함되므로 METRICS_TOKEN이 설정된 경우에만 노출합니다.
+
+    Raises:
+        HTTPException: 404 (METRICS_TOKEN 미설정), 401 (토큰 누락/불일치)
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="메트릭 조회 토큰이 올바르지 않습니다",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(verify_metrics_token)])
+async def metrics():
+    """분석 단계별 지연 시간 히스토그램 (Prometheus 텍스트 형식)"""
+    return stage_histograms.prometheus_text()
+
+
+@app.get("/metrics/model-routing", dependencies=[Depends(verify_metrics_token)])
+async def model_routing_metrics():
+    """모델 티어별 지연 시간/비용/품질 점검 리포트"""
+    from app.services.stock_insight_engine import stock_insight_engine
+
+    return stock_insight_engine.model_router.report()
+
+
+@app.get("/metrics/llm-keys", dependencies=[Depends(verify_metrics_token)])
+async def llm_key_metrics():
+    """LLM API 키별 처리 중 요청 수/남은 한도/429 제외 상태 (키/엔드포인트 식별 정보 제외)"""
+    from app.services.stock_insight_engine import stock_insight_engine
+
+    return {provider: pool.snapshot() for provider, pool in stock_insight_engine.key_pools.items()}
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
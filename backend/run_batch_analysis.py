@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+오프라인 일괄 분석 실행 (프로바이더 Batch API)
+
+인기 종목 야간 갱신용으로 cron 등에서 실행합니다. 결과는 배치 사용자 소유로 저장되며,
+같은 입력의 사용자 요청은 공유 분석 캐시로 재사용됩니다.
+
+사용법:
+   python run_batch_analysis.py AAPL MSFT 005930.KS --timeframe mid
+   python run_batch_analysis.py --file popular_stocks.txt --provider anthropic
+   (파일은 한 줄에 종목 하나, #으로 시작하는 줄은 무시)
+"""
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from app.core.database import close_db, init_db
+from app.services.batch_analysis import BatchAnalysisRunner
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def read_symbols(args) -> list[str]:
+    symbols = list(args.symbols)
+    if args.file:
+        for line in Path(args.file).read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                symbols.append(line)
+    return symbols
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch API 일괄 주식 분석")
+    parser.add_argument("symbols", nargs="*", help="종목코드 또는 회사명")
+    parser.add_argument("--file", help="종목 목록 파일")
+    parser.add_argument("--timeframe", nargs="+", default=["mid"], choices=("short", "mid", "long"))
+    parser.add_argument("--provider", choices=("openai", "anthropic"), help="기본값: LLM_PRIMARY_PROVIDER")
+    args = parser.parse_args()
+
+    symbols = read_symbols(args)
+    if not symbols:
+        parser.error("종목을 지정하세요")
+
+    await init_db()
+    try:
+        runner = BatchAnalysisRunner()
+        for timeframe in args.timeframe:
+            report = await runner.run(symbols, timeframe, provider=args.provider)
+            print(
+                f"[{timeframe}] 배치 {report.batch_id}: 저장 {len(report.insight_ids)}/{report.submitted}, "
+                f"데이터 없음 {report.not_found}"
+            )
+            for symbol, reason in report.failed.items():
+                print(f"  실패 {symbol}: {reason}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
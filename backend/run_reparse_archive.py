@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+아카이브된 LLM 응답 일괄 재파싱
+
+response_parser 변경/버그 수정 후 LLM을 다시 호출하지 않고 저장된 원본 응답으로
+분석 필드를 다시 만듭니다. 원본 응답이 저장된 분석(raw_response)만 대상입니다.
+
+사용법:
+   python run_reparse_archive.py --dry-run
+   python run_reparse_archive.py --prompt-version stock-analysis-v1 --since 2026-01-01
+   python run_reparse_archive.py --ids 12 15 20
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from app.core.database import close_db, init_db
+from app.services.response_archive import ArchiveReparser
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def parse_since(value: str) -> datetime:
+    since = datetime.fromisoformat(value)
+    return since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="아카이브된 LLM 응답 일괄 재파싱")
+    parser.add_argument("--prompt-version", help="해당 프롬프트 버전 분석만")
+    parser.add_argument("--since", type=parse_since, help="이 시각 이후 생성된 분석만 (ISO 8601, 기본 UTC)")
+    parser.add_argument("--ids", nargs="+", type=int, help="분석 ID")
+    parser.add_argument("--dry-run", action="store_true", help="변경 대상만 집계하고 저장하지 않음")
+    args = parser.parse_args()
+
+    await init_db()
+    try:
+        report = await ArchiveReparser().run(
+            prompt_version=args.prompt_version,
+            since=args.since,
+            ids=args.ids,
+            dry_run=args.dry_run,
+        )
+        print(
+            f"검사 {report.scanned}, 변경 {len(report.changed_ids)}, 실패 {len(report.failed_ids)}"
+            f"{' (dry run, 저장 안 함)' if args.dry_run else ''}"
+        )
+        if report.changed_ids:
+            print(f"  변경 ID: {report.changed_ids}")
+        if report.failed_ids:
+            print(f"  실패 ID: {report.failed_ids}")
+    finally:
+        await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+"""
+테스트용 로컬 가짜 Batch API 서버
+
+OpenAI(/v1/files, /v1/batches)와 Anthropic(/v1/messages/batches) 배치 엔드포인트를
+메모리에서 흉내 내며, 실제 SDK 클라이언트를 base_url로 연결하여 사용합니다.
+배치는 상태 조회 polls_until_done회 후 완료되며, responder가 요청별 응답 텍스트를 만듭니다.
+"""
+import json
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Callable, Dict, Iterator, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+# (custom_id, 사용자 프롬프트) -> 응답 텍스트 (None이면 요청 단위 오류)
+Responder = Callable[[str, str], Optional[str]]
+
+
+class FakeBatchServer:
+    """가짜 배치 서버 상태"""
+
+    def __init__(self, responder: Responder, polls_until_done: int = 1):
+        self.responder = responder
+        self.polls_until_done = polls_until_done
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, dict] = {}
+        self.base_url = ""
+        self.app = self._create_app()
+
+    def _usage(self, text: str) -> dict:
+        return {"prompt": 1200, "completion": max(len(text) // 2, 1), "cached": 1024}
+
+    def _create_app(self) -> FastAPI:
+        app = FastAPI()
+
+        # ---------------- OpenAI ----------------
+
+        @app.post("/v1/files")
+        async def create_file(request: Request):
+            # multipart/form-data 파싱 (python-multipart 없이 표준 라이브러리 사용)
+            header = f"Content-Type: {request.headers['content-type']}\r\n\r\n".encode()
+            message = BytesParser(policy=HTTP).parsebytes(header + await request.body())
+            fields = {
+                part.get_param("name", header="content-disposition"): part
+                for part in message.iter_parts()
+            }
+            file_id = f"file-{uuid.uuid4().hex[:8]}"
+            self.files[file_id] = fields["file"].get_payload(decode=True)
+            return {
+                "id": file_id, "object": "file", "bytes": len(self.files[file_id]),
+                "created_at": int(time.time()), "filename": fields["file"].get_filename(),
+                "purpose": fields["purpose"].get_payload(decode=True).decode(), "status": "processed",
+            }
+
+        @app.get("/v1/files/{file_id}/content")
+        async def file_content(file_id: str):
+            return PlainTextResponse(self.files[file_id].decode("utf-8"))
+
+        @app.post("/v1/batches")
+        async def create_openai_batch(request: Request):
+            body = await request.json()
+            batch_id = f"batch_{uuid.uuid4().hex[:8]}"
+            self.batches[batch_id] = {
+                "kind": "openai", "polls": 0,
+                "object": {
+                    "id": batch_id, "object": "batch", "endpoint": body["endpoint"],
+                    "input_file_id": body["input_file_id"],
+                    "completion_window": body["completion_window"],
+                    "status": "in_progress", "created_at": int(time.time()),
+                },
+            }
+            return self.batches[batch_id]["object"]
+
+        @app.get("/v1/batches/{batch_id}")
+        async def retrieve_openai_batch(batch_id: str):
+            batch = self.batches[batch_id]
+            if self._advance(batch) and batch["object"]["status"] != "completed":
+                self._complete_openai(batch)
+            return batch["object"]
+
+        # ---------------- Anthropic ----------------
+
+        @app.post("/v1/messages/batches")
+        async def create_anthropic_batch(request: Request):
+            body = await request.json()
+            batch_id = f"msgbatch_{uuid.uuid4().hex[:8]}"
+            self.batches[batch_id] = {
+                "kind": "anthropic", "polls": 0, "requests": body["requests"],
+                "object": {
+                    "id": batch_id, "type": "message_batch", "processing_status": "in_progress",
+                    "request_counts": {"processing": len(body["requests"]), "succeeded": 0,
+                                       "errored": 0, "canceled": 0, "expired": 0},
+                    "created_at": "2026-01-01T00:00:00Z", "expires_at": "2026-01-02T00:00:00Z",
+                    "archived_at": None, "cancel_initiated_at": None, "ended_at": None,
+                    "results_url": None,
+                },
+            }
+            return self.batches[batch_id]["object"]
+
+        @app.get("/v1/messages/batches/{batch_id}")
+        async def retrieve_anthropic_batch(batch_id: str):
+            batch = self.batches[batch_id]
+            if self._advance(batch):
+                batch["object"].update(
+                    processing_status="ended",
+                    ended_at="2026-01-01T00:10:00Z",
+                    results_url=f"{self.base_url}/v1/messages/batches/{batch_id}/results",
+                )
+            return batch["object"]
+
+        @app.get("/v1/messages/batches/{batch_id}/results")
+        async def anthropic_results(batch_id: str):
+            lines = []
+            for item in self.batches[batch_id]["requests"]:
+                params = item["params"]
+                text = self.responder(item["custom_id"], params["messages"][0]["content"])
+                if text is None:
+                    result = {"type": "errored", "error": {"type": "error", "error": {
+                        "type": "api_error", "message": "가짜 서버 오류"}}}
+                else:
+                    usage = self._usage(text)
+                    result = {"type": "succeeded", "message": {
+                        "id": f"msg_{uuid.uuid4().hex[:8]}", "type": "message", "role": "assistant",
+                        "model": params["model"], "content": [{"type": "text", "text": text}],
+                        "stop_reason": "end_turn", "stop_sequence": None,
+                        "usage": {"input_tokens": usage["prompt"] - usage["cached"],
+                                  "output_tokens": usage["completion"],
+                                  "cache_read_input_tokens": usage["cached"],
+                                  "cache_creation_input_tokens": 0},
+                    }}
+                lines.append(json.dumps({"custom_id": item["custom_id"], "result": result}, ensure_ascii=False))
+            return PlainTextResponse("\n".join(lines))
+
+        return app
+
+    def _advance(self, batch: dict) -> bool:
+        """상태 조회 횟수 증가, 완료 시점이면 True"""
+        batch["polls"] += 1
+        return batch["polls"] >= self.polls_until_done
+
+    def _complete_openai(self, batch: dict) -> None:
+        """입력 JSONL을 처리하여 출력/오류 파일 생성"""
+        outputs, errors = [], []
+        for line in self.files[batch["object"]["input_file_id"]].decode("utf-8").splitlines():
+            item = json.loads(line)
+            text = self.responder(item["custom_id"], item["body"]["messages"][-1]["content"])
+            if text is None:
+                errors.append({"id": "req", "custom_id": item["custom_id"], "response": {
+                    "status_code": 500, "body": {"error": {"message": "가짜 서버 오류"}}}, "error": None})
+                continue
+            usage = self._usage(text)
+            outputs.append({"id": "req", "custom_id": item["custom_id"], "error": None, "response": {
+                "status_code": 200, "body": {
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+                    "usage": {"prompt_tokens": usage["prompt"], "completion_tokens": usage["completion"],
+                              "prompt_tokens_details": {"cached_tokens": usage["cached"]}},
+                }}})
+
+        batch["object"]["status"] = "completed"
+        for key, rows in (("output_file_id", outputs), ("error_file_id", errors)):
+            if rows:
+                file_id = f"file-{uuid.uuid4().hex[:8]}"
+                self.files[file_id] = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows).encode("utf-8")
+                batch["object"][key] = file_id
+
+
+@contextmanager
+def run_fake_batch_server(responder: Responder, polls_until_done: int = 1) -> Iterator[FakeBatchServer]:
+    """가짜 배치 서버를 로컬 포트에서 실행 (별도 스레드)"""
+    server_state = FakeBatchServer(responder, polls_until_done)
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server_state.base_url = f"http://127.0.0.1:{port}"
+
+    server = uvicorn.Server(uvicorn.Config(server_state.app, log_level="warning"))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    try:
+        yield server_state
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+        sock.close()
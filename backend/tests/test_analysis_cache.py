@@ -0,0 +1,129 @@
+"""
+공유 분석 결과 캐시 테스트 (임시 SQLite DB 사용)
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.database import Base
+from app.models.stock_insight import StockInsight
+from app.services.analysis_cache import AnalysisResultCache, PLACEHOLDER_DEEP_RESEARCH, fingerprint_stock_data
+from app.services.prompts import PROMPT_VERSION
+from app.services.stock_data_service import StockData
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cache.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[StockInsight.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def make_stock_data(price: float = 200.0) -> StockData:
+    return StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=price, currency="USD", pe_ratio=30.123456)
+
+
+async def save_source(session_factory, fingerprint, created_at=None, processing_time_ms=9000, **overrides):
+    values = dict(
+        user_id="user-a",
+        stock_code="AAPL",
+        stock_name="Apple Inc.",
+        market="US",
+        timeframe="mid",
+        deep_research="분석",
+        recommendation="buy",
+        confidence_level="high",
+        risk_score=4,
+        key_summary=["요약"],
+        current_price=200.0,
+        ai_model="gpt-5-mini",
+        processing_time_ms=processing_time_ms,
+        prompt_version=PROMPT_VERSION,
+        input_fingerprint=fingerprint,
+    )
+    values.update(overrides)
+    insight = StockInsight(**values)
+    if created_at:
+        insight.created_at = created_at
+    async with session_factory() as session:
+        session.add(insight)
+        await session.commit()
+        await session.refresh(insight)
+    return insight
+
+
+class TestFingerprint:
+    """입력 지문 테스트"""
+
+    def test_fingerprint_inputs(self):
+        """같은 입력이면 같은 지문, 데이터/기간/프롬프트 버전이 다르면 다른 지문"""
+        base = fingerprint_stock_data(make_stock_data(), "mid")
+
+        assert fingerprint_stock_data(make_stock_data(), "mid") == base
+        assert fingerprint_stock_data(make_stock_data(200.00000001), "mid") == base
+        assert fingerprint_stock_data(make_stock_data(201.0), "mid") != base
+        assert fingerprint_stock_data(make_stock_data(), "long") != base
+        assert fingerprint_stock_data(make_stock_data(), "mid", prompt_version="v-next") != base
+
+
+class TestAnalysisResultCache:
+    """AnalysisResultCache 테스트"""
+
+    async def test_hit_and_clone(self, session_factory):
+        """TTL 이내 같은 입력 분석이 있으면 적중, 요청 사용자 소유로 복제"""
+        cache = AnalysisResultCache(session_factory, ttl_seconds=3600)
+        stock_data = make_stock_data()
+        fingerprint = fingerprint_stock_data(stock_data, "mid")
+        source = await save_source(session_factory, fingerprint)
+
+        assert await cache.lookup("AAPL", "mid", "other-fingerprint") is None
+        cached = await cache.lookup("AAPL", "mid", fingerprint)
+        assert cached.id == source.id
+
+        clone = cache.clone_for_user(cached, stock_data, "user-b", fingerprint, processing_time_ms=300)
+        assert clone.user_id == "user-b"
+        assert clone.id is None
+        assert clone.recommendation == "buy"
+        assert clone.key_summary == ["요약"]
+        assert clone.processing_time_ms == 300
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_ms"] == 8700
+
+    async def test_expired_and_disabled(self, session_factory):
+        """TTL이 지난 분석은 사용하지 않으며, TTL 0이면 비활성화"""
+        fingerprint = fingerprint_stock_data(make_stock_data(), "mid")
+        await save_source(
+            session_factory,
+            fingerprint,
+            created_at=datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=2),
+        )
+
+        assert await AnalysisResultCache(session_factory, ttl_seconds=3600).lookup("AAPL", "mid", fingerprint) is None
+        assert await AnalysisResultCache(session_factory, ttl_seconds=3 * 3600).lookup("AAPL", "mid", fingerprint) is not None
+        assert await AnalysisResultCache(session_factory, ttl_seconds=0).lookup("AAPL", "mid", fingerprint) is None
+
+    async def test_placeholder_never_served(self, session_factory):
+        """파싱 실패로 기본값이 저장된 분석은 지문이 같아도 공유하지 않음"""
+        cache = AnalysisResultCache(session_factory, ttl_seconds=3600)
+        fingerprint = fingerprint_stock_data(make_stock_data(), "mid")
+        await save_source(session_factory, fingerprint, deep_research=PLACEHOLDER_DEEP_RESEARCH, recommendation="hold")
+
+        assert await cache.lookup("AAPL", "mid", fingerprint) is None
+        assert await cache.latest("AAPL", "mid", max_age_seconds=3600) is None
+
+    async def test_delta_result_never_served(self, session_factory):
+        """이전 분석 섹션을 이어받은 델타 재분석은 다른 사용자에게 공유하지 않음"""
+        cache = AnalysisResultCache(session_factory, ttl_seconds=3600)
+        fingerprint = fingerprint_stock_data(make_stock_data(), "mid")
+        full = await save_source(session_factory, None)
+        await save_source(session_factory, fingerprint, delta_source_id=full.id)
+
+        assert await cache.lookup("AAPL", "mid", fingerprint) is None
+        assert (await cache.latest("AAPL", "mid", max_age_seconds=3600)).id == full.id
@@ -0,0 +1,169 @@
+"""
+비동기 분석 작업 큐 테스트 (임시 SQLite DB 사용)
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.database import Base
+from app.models.analysis_job import AnalysisJob
+from app.services import stock_insight_engine as engine_module
+from app.services.analysis_jobs import (
+    AnalysisJobQueue,
+    JOB_QUEUED,
+    JOB_FETCHING_DATA,
+    JOB_DONE,
+    JOB_FAILED,
+)
+
+USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[AnalysisJob.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+class TestAnalysisJobQueue:
+    """AnalysisJobQueue 테스트"""
+
+    async def test_claim_once_across_workers(self, session_factory):
+        """여러 큐(프로세스)가 동시에 점유해도 작업은 한 번만 점유됨"""
+        queues = [AnalysisJobQueue(session_factory, workers=0) for _ in range(3)]
+        for i in range(4):
+            await queues[0].enqueue(USER_ID, f"STOCK{i}", "mid")
+
+        claims = await asyncio.gather(*(q.claim_next() for q in queues for _ in range(3)))
+        claimed = [job.id for job in claims if job is not None]
+
+        assert len(claimed) == 4
+        assert len(set(claimed)) == 4
+        assert all(job.status == JOB_FETCHING_DATA for job in claims if job is not None)
+
+    async def test_run_job_records_stages(self, session_factory, monkeypatch):
+        """워커가 단계별 상태를 기록하고 완료 시 insight_id 저장"""
+        queue = AnalysisJobQueue(session_factory, workers=1, poll_interval=0.05)
+        stages = []
+
+        async def fake_generate(stock_code, timeframe, user_id, on_stage=None):
+            for stage in ("fetching_data", "calling_llm", "parsing"):
+                await on_stage(stage)
+                stages.append((await queue.get(job.id, USER_ID)).status)
+            return SimpleNamespace(id=42)
+
+        monkeypatch.setattr(engine_module.stock_insight_engine, "generate_insight", fake_generate)
+
+        job = await queue.enqueue(USER_ID, "AAPL", "mid")
+        queue.start()
+        try:
+            for _ in range(100):
+                current = await queue.get(job.id, USER_ID)
+                if current.status in (JOB_DONE, JOB_FAILED):
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await queue.stop()
+
+        assert stages == ["fetching_data", "calling_llm", "parsing"]
+        assert current.status == JOB_DONE
+        assert current.insight_id == 42
+        assert await queue.get(job.id, "other-user") is None
+
+    async def test_failed_job(self, session_factory, monkeypatch):
+        """종목을 찾지 못하면 failed 상태와 오류 메시지 기록"""
+        queue = AnalysisJobQueue(session_factory, workers=0)
+
+        async def fake_generate(stock_code, timeframe, user_id, on_stage=None):
+            return None
+
+        monkeypatch.setattr(engine_module.stock_insight_engine, "generate_insight", fake_generate)
+
+        job = await queue.enqueue(USER_ID, "UNKNOWN", "short")
+        await queue.run_job(await queue.claim_next())
+
+        current = await queue.get(job.id, USER_ID)
+        assert current.status == JOB_FAILED
+        assert "UNKNOWN" in current.error
+
+    async def test_requeue_stale(self, session_factory):
+        """멈춘 작업은 재시도 대기로 회수, 최대 횟수 초과 시 실패"""
+        queue = AnalysisJobQueue(session_factory, workers=0, stale_minutes=1, max_attempts=2)
+        job = await queue.enqueue(USER_ID, "AAPL", "mid")
+
+        async def stall():
+            async with session_factory() as session:
+                await session.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id == job.id)
+                    .values(heartbeat_at=datetime.utcnow() - timedelta(minutes=5))
+                )
+                await session.commit()
+
+        claimed = await queue.claim_next()
+        await stall()
+        assert await queue.requeue_stale() == 1
+        assert (await queue.get(job.id, USER_ID)).status == JOB_QUEUED
+
+        # 이전 워커의 늦은 갱신은 무시됨
+        assert await queue._update_owned(claimed, status=JOB_DONE) is False
+
+        await queue.claim_next()
+        await stall()
+        await queue.requeue_stale()
+        assert (await queue.get(job.id, USER_ID)).status == JOB_FAILED
+
+    async def test_heartbeat_during_long_llm_wait(self, session_factory, monkeypatch):
+        """단계 변경이 없는 긴 대기 중에도 heartbeat를 기록하여 회수되지 않음"""
+        queue = AnalysisJobQueue(session_factory, workers=0, heartbeat_seconds=0.02)
+        heartbeats = []
+
+        async def fake_generate(stock_code, timeframe, user_id, on_stage=None):
+            heartbeats.append((await queue.get(job.id, USER_ID)).heartbeat_at)
+            await asyncio.sleep(0.15)
+            heartbeats.append((await queue.get(job.id, USER_ID)).heartbeat_at)
+            return SimpleNamespace(id=42)
+
+        monkeypatch.setattr(engine_module.stock_insight_engine, "generate_insight", fake_generate)
+
+        job = await queue.enqueue(USER_ID, "AAPL", "mid")
+        await queue.run_job(await queue.claim_next())
+
+        assert heartbeats[1] > heartbeats[0]
+        assert (await queue.get(job.id, USER_ID)).status == JOB_DONE
+
+    async def test_abort_when_ownership_lost(self, session_factory, monkeypatch):
+        """회수되어 점유를 잃은 실행은 중단하고 결과를 기록하지 않음"""
+        queue = AnalysisJobQueue(session_factory, workers=0, heartbeat_seconds=0.02)
+        cancelled = []
+
+        async def fake_generate(stock_code, timeframe, user_id, on_stage=None):
+            # 다른 프로세스가 멈춘 작업으로 판단하여 회수
+            async with session_factory() as session:
+                await session.execute(
+                    update(AnalysisJob).where(AnalysisJob.id == job.id).values(status=JOB_QUEUED, worker_id=None)
+                )
+                await session.commit()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return SimpleNamespace(id=42)
+
+        monkeypatch.setattr(engine_module.stock_insight_engine, "generate_insight", fake_generate)
+
+        job = await queue.enqueue(USER_ID, "AAPL", "mid")
+        await asyncio.wait_for(queue.run_job(await queue.claim_next()), timeout=2)
+
+        assert cancelled == [True]
+        current = await queue.get(job.id, USER_ID)
+        assert current.status == JOB_QUEUED
+        assert current.insight_id is None
@@ -0,0 +1,126 @@
+"""
+오프라인 일괄 분석 테스트 (가짜 배치 서버 + 임시 SQLite DB)
+"""
+import json
+
+import pytest
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.stock_insight import StockInsight
+from app.services import batch_analysis as batch_module
+from app.services.batch_analysis import (
+    AnthropicBatchBackend,
+    BatchAnalysisRunner,
+    OpenAIBatchBackend,
+)
+from app.services.stock_data_service import StockData
+from tests.fake_batch_server import run_fake_batch_server
+
+SAMPLE_RESPONSE = json.dumps({
+    "deep_research": "배치 분석",
+    "recommendation": "hold",
+    "confidence_level": "medium",
+    "recommendation_reason": "밸류에이션 부담",
+    "risk_score": 5,
+    "market_sentiment": "neutral",
+    "key_summary": ["요약 1", "요약 2", "요약 3"],
+}, ensure_ascii=False)
+
+STOCKS = {
+    "AAPL": StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD"),
+    "MSFT": StockData(symbol="MSFT", name="Microsoft", market="US", current_price=400.0, currency="USD"),
+    "애플": StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD"),
+}
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[StockInsight.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def fake_stock_data(monkeypatch):
+    async def get_stock_data(symbol):
+        return STOCKS.get(symbol)
+
+    monkeypatch.setattr(batch_module.stock_data_service, "get_stock_data", get_stock_data)
+
+
+def responder(custom_id, user_prompt):
+    """MSFT는 요청 단위 오류, 나머지는 정상 응답"""
+    if "MSFT" in user_prompt:
+        return None
+    return SAMPLE_RESPONSE
+
+
+def make_backend(provider, server):
+    if provider == "openai":
+        client = AsyncOpenAI(api_key="test", base_url=f"{server.base_url}/v1", max_retries=0)
+        return OpenAIBatchBackend(client, "fake-openai")
+    client = AsyncAnthropic(api_key="test", base_url=server.base_url, max_retries=0)
+    return AnthropicBatchBackend(client, "fake-anthropic")
+
+
+class TestBatchAnalysisRunner:
+    """제출 → 폴링 → 파싱 → 일괄 저장 테스트"""
+
+    @pytest.mark.parametrize("provider", ["openai", "anthropic"])
+    async def test_run_batch(self, provider, session_factory):
+        """성공 결과만 배치 사용자 소유로 저장, 실패/데이터 없음은 보고서에 기록"""
+        runner = BatchAnalysisRunner(session_factory, poll_interval=0, user_id="batch-user")
+
+        with run_fake_batch_server(responder, polls_until_done=2) as server:
+            report = await runner.run(
+                ["AAPL", "애플", "MSFT", "UNKNOWN"], "long", backend=make_backend(provider, server)
+            )
+
+        assert report.submitted == 2  # 애플은 AAPL로 해석되어 중복 제거
+        assert report.not_found == ["UNKNOWN"]
+        assert list(report.failed) == ["MSFT"]
+        assert len(report.insight_ids) == 1
+
+        async with session_factory() as session:
+            insights = (await session.execute(select(StockInsight))).scalars().all()
+
+        assert len(insights) == 1
+        insight = insights[0]
+        assert (insight.stock_code, insight.timeframe, insight.user_id) == ("AAPL", "long", "batch-user")
+        assert insight.recommendation == "hold"
+        assert insight.input_fingerprint == batch_module.fingerprint_stock_data(STOCKS["AAPL"], "long")
+        assert insight.prompt_tokens == 1200
+        assert insight.cached_prompt_tokens == 1024
+
+    async def test_unparseable_response_not_saved(self, session_factory):
+        """파싱 불가 응답은 기본값으로 저장하지 않고 실패 처리"""
+        runner = BatchAnalysisRunner(session_factory, poll_interval=0)
+
+        with run_fake_batch_server(lambda custom_id, prompt: "응답 없음") as server:
+            report = await runner.run(["AAPL"], "mid", backend=make_backend("openai", server))
+
+        assert report.insight_ids == []
+        assert report.failed == {"AAPL": "응답 파싱 실패"}
+
+    async def test_failed_batch(self, session_factory, monkeypatch):
+        """배치 자체가 실패하면 BatchFailedError"""
+        runner = BatchAnalysisRunner(session_factory, poll_interval=0)
+
+        with run_fake_batch_server(responder) as server:
+            backend = make_backend("openai", server)
+
+            original_complete = server._complete_openai
+
+            def fail(batch):
+                original_complete(batch)
+                batch["object"]["status"] = "expired"
+
+            monkeypatch.setattr(server, "_complete_openai", fail)
+            with pytest.raises(batch_module.BatchFailedError):
+                await runner.run(["AAPL"], "mid", backend=backend)
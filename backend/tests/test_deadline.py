@@ -0,0 +1,158 @@
+"""
+요청 처리 시간 예산 전파 테스트 (남은 예산 타임아웃, 예산 부족 시 즉시 실패/생략)
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services import deadline as deadline_module
+from app.services import stock_insight_engine as engine_module
+from app.services.deadline import DeadlineExceeded, run_with_deadline, use_deadline
+from app.services.latency_spans import StageHistograms
+from app.services.stock_data_service import StockDataService
+from app.services.stock_insight_engine import StockInsightEngine
+
+SAMPLE_RESPONSE = '{"deep_research": "테스트 분석", "recommendation": "buy"}'
+
+
+@pytest.fixture
+def histograms(monkeypatch):
+    """테스트마다 새 히스토그램 (예상 소요 시간은 설정 최소값부터)"""
+    fresh = StageHistograms(buckets=(0.1, 1.0, 10.0, 60.0))
+    monkeypatch.setattr(deadline_module, "stage_histograms", fresh)
+    return fresh
+
+
+def make_engine(monkeypatch, call_provider) -> StockInsightEngine:
+    monkeypatch.setattr(engine_module.settings, "LLM_MAX_RETRIES", 0)
+    engine = StockInsightEngine()
+    engine.openai_client = object()
+    engine.openai_model = "fake-openai"
+    engine.primary_provider = "openai"
+    monkeypatch.setattr(engine, "_call_provider", call_provider)
+    return engine
+
+
+class TestDeadline:
+    """예산 계산 및 실행 테스트"""
+
+    def test_expected_seconds_from_histogram(self, histograms):
+        """표본이 충분하면 지연 중앙값 버킷 상한, 부족하면 최소값"""
+        assert deadline_module.expected_seconds("llm", minimum=5.0) == 5.0
+
+        for seconds in [0.5] * 5 + [30.0] * 20:
+            histograms.observe("llm", seconds)
+
+        assert histograms.quantile("llm", 0.5) == 60.0
+        assert histograms.quantile("llm", 0.1) == 1.0
+        assert histograms.quantile("llm", 0.5, min_samples=100) is None
+        assert deadline_module.expected_seconds("llm", minimum=5.0) == 60.0
+
+    async def test_run_with_deadline(self):
+        """예산이 없으면 그대로 실행, 예상 시간보다 적게 남으면 시작하지 않음, 실행 중 소진되면 취소"""
+        started = []
+
+        async def work(seconds: float) -> str:
+            started.append(seconds)
+            await asyncio.sleep(seconds)
+            return "완료"
+
+        assert await run_with_deadline(work(0), "data_fetch") == "완료"
+
+        with use_deadline(0.05):
+            with pytest.raises(DeadlineExceeded) as exc_info:
+                await run_with_deadline(work(0), "llm", expected=1.0)
+            assert exc_info.value.stage == "llm"
+            assert started == [0]
+
+            with pytest.raises(DeadlineExceeded):
+                await run_with_deadline(work(1.0), "data_fetch")
+
+            # 저장은 예산이 다 되어도 유예 시간 동안 실행
+            assert await run_with_deadline(work(0.01), "db_commit", grace=1.0) == "완료"
+
+    async def test_own_timeout_not_reported_as_deadline(self):
+        """하위 호출 자체의 타임아웃은 예산 초과로 바꾸지 않음"""
+        async def timeout():
+            raise asyncio.TimeoutError
+
+        with use_deadline(10.0):
+            with pytest.raises(asyncio.TimeoutError):
+                await run_with_deadline(timeout(), "data_fetch")
+
+
+class TestPipelineDeadline:
+    """파이프라인 단계별 예산 적용 테스트"""
+
+    async def test_llm_fails_fast_without_budget(self, monkeypatch, histograms):
+        """남은 예산이 LLM 최소 예상 시간보다 적으면 호출하지 않고, 예산 초과는 회로 차단기에 반영하지 않음"""
+        calls = []
+
+        async def slow_call(provider, system_prompt, user_prompt, max_tokens):
+            calls.append(provider)
+            await asyncio.sleep(1.0)
+            return SAMPLE_RESPONSE
+
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DEADLINE_LLM_MIN_SECONDS", 1.0)
+        engine = make_engine(monkeypatch, slow_call)
+
+        with use_deadline(0.5):
+            with pytest.raises(DeadlineExceeded):
+                await engine._call_llm("system", "user")
+        assert calls == []
+
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DEADLINE_LLM_MIN_SECONDS", 0.0)
+        with use_deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await engine._call_llm("system", "user")
+        assert calls == ["openai"]
+        assert engine.breakers["openai"].state == "closed"
+
+    async def test_kr_executor_bounded_by_deadline(self, monkeypatch):
+        """yfinance executor 조회가 예산을 넘기면 pykrx 폴백 없이 DeadlineExceeded"""
+        service = StockDataService()
+        fallbacks = []
+
+        def slow_yfinance(symbol):
+            time.sleep(0.2)
+            return None
+
+        async def pykrx_fallback(symbol):
+            fallbacks.append(symbol)
+            return None
+
+        monkeypatch.setattr(service, "_fetch_yfinance_sync", slow_yfinance)
+        monkeypatch.setattr(service, "_get_kr_stock_data_pykrx_fallback", pykrx_fallback)
+
+        with use_deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await service._get_kr_stock_data("005930.KS")
+        assert fallbacks == []
+
+    async def test_us_enrichment_skipped_without_budget(self, monkeypatch, histograms):
+        """남은 예산이 LLM 호출을 감당하지 못하면 현재가만 조회하고 캐시하지 않음"""
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DEADLINE_LLM_MIN_SECONDS", 10.0)
+        service = StockDataService()
+        endpoints = []
+
+        async def resolve(query):
+            return "AAPL", "US"
+
+        async def fetch(endpoint, params):
+            endpoints.append(endpoint)
+            return {"c": 200.0, "d": 1.0, "dp": 0.5}
+
+        monkeypatch.setattr(service, "resolve_stock_code", resolve)
+        monkeypatch.setattr(service, "_fetch_finnhub", fetch)
+
+        with use_deadline(5.0):
+            degraded = await service.get_stock_data("AAPL")
+        assert degraded.current_price == 200.0
+        assert endpoints == ["quote"]
+        assert "AAPL" not in service.cache
+
+        with use_deadline(60.0):
+            await service.get_stock_data("AAPL")
+        assert endpoints == ["quote", "quote", "stock/profile2", "stock/metric"]
+        assert "AAPL" in service.cache
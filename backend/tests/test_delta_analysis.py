@@ -0,0 +1,236 @@
+"""
+델타 재분석 테스트
+"""
+import json
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.stock_insight import StockInsight
+from app.services import stock_insight_engine as engine_module
+from app.services.delta_analysis import DELTA_FIELDS, DeltaAnalyzer
+from app.services.prompts import PROMPT_VERSION
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+STOCK = StockData(
+    symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD",
+    price_change_1d_pct=1.0, pe_ratio=30.0, sector="Technology",
+)
+
+
+def make_previous(stock_data: StockData = STOCK, age_days: float = 1, **overrides) -> StockInsight:
+    values = dict(
+        id=7,
+        user_id="user",
+        stock_code="AAPL",
+        stock_name="Apple Inc.",
+        market="US",
+        timeframe="mid",
+        deep_research="이전 딥리서치",
+        recommendation="hold",
+        confidence_level="medium",
+        recommendation_reason="이전 근거",
+        risk_score=6,
+        risk_analysis={"volatility": "이전"},
+        market_overview={"price_movement": "이전"},
+        market_sentiment="neutral",
+        sentiment_details={"overall": "이전"},
+        key_summary=["이전 요약"],
+        current_drivers={"technical": "이전"},
+        future_catalysts={"long_term": "이전"},
+        prompt_version=PROMPT_VERSION,
+        input_data=asdict(stock_data),
+        created_at=datetime.now(timezone.utc) - timedelta(days=age_days),
+    )
+    values.update(overrides)
+    return StockInsight(**values)
+
+
+class TestDeltaPlan:
+    """델타 재분석 가능 여부 판정 테스트"""
+
+    def test_market_changes_only(self):
+        """시세만 바뀌면 바뀐 입력 목록과 함께 델타 재분석"""
+        current = replace(STOCK, current_price=206.0, price_change_1d_pct=3.0, pe_ratio=30.9)
+
+        plan = DeltaAnalyzer.plan(make_previous(), current)
+
+        assert [change.name for change in plan.changes] == ["current_price", "price_change_1d_pct"]
+        assert plan.changes[0].previous == 200.0 and plan.changes[0].current == 206.0
+
+    @pytest.mark.parametrize("current, previous_overrides", [
+        (replace(STOCK, current_price=240.0), {}),  # 큰 가격 변동
+        (replace(STOCK, pe_ratio=20.0), {}),  # 펀더멘털 변경
+        (replace(STOCK, sector="Energy"), {}),  # 섹터 변경
+        (STOCK, {"input_data": None}),  # 입력 데이터 없는 이전 분석
+        (STOCK, {"prompt_version": "old"}),  # 프롬프트 버전 변경
+        (STOCK, {"created_at": datetime.now(timezone.utc) - timedelta(days=30)}),  # 오래된 분석
+    ])
+    def test_full_reanalysis(self, current, previous_overrides):
+        """입력 변화가 크거나 이전 분석을 쓸 수 없으면 전체 재분석"""
+        assert DeltaAnalyzer.plan(make_previous(**previous_overrides), current) is None
+
+    def test_merge(self):
+        """다시 생성된 섹션만 교체하고 나머지는 이전 분석 값 유지"""
+        plan = DeltaAnalyzer.plan(make_previous(), STOCK)
+
+        merged = plan.merge({"recommendation": "buy", "market_overview": {"price_movement": "상승"}, "risk_score": 1})
+
+        assert merged["recommendation"] == "buy"
+        assert merged["market_overview"] == {"price_movement": "상승"}
+        assert merged["current_drivers"] == {"technical": "이전"}
+        assert merged["risk_score"] == 6
+        assert merged["deep_research"] == "이전 딥리서치"
+
+    async def test_latest_for_user(self, tmp_path):
+        """같은 사용자의 같은 종목/투자 기간 최신 분석만 조회"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'delta.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[StockInsight.__table__])
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with session_factory() as session:
+            session.add(make_previous(id=1, age_days=2))
+            session.add(make_previous(id=2, age_days=1))
+            session.add(make_previous(id=3, user_id="other", age_days=0))
+            session.add(make_previous(id=4, timeframe="long", age_days=0))
+            await session.commit()
+
+        analyzer = DeltaAnalyzer(session_factory)
+        latest = await analyzer.latest_for_user("user", "AAPL", "mid")
+        await engine.dispose()
+
+        assert latest.id == 2
+
+    async def test_chained_deltas_measured_from_full_analysis(self, tmp_path, monkeypatch):
+        """델타 재분석이 이어지면 경과 시간과 펀더멘털 변화는 마지막 전체 분석 기준으로 판정"""
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DELTA_MAX_AGE_DAYS", 14.0)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'chain.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[StockInsight.__table__])
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        # 펀더멘털이 단계마다 허용 범위(20%) 이내로 바뀌는 델타 재분석 2단계
+        async with session_factory() as session:
+            session.add(make_previous(id=1, age_days=10))
+            session.add(make_previous(replace(STOCK, pe_ratio=34.0), id=2, age_days=5, delta_source_id=1))
+            session.add(make_previous(replace(STOCK, pe_ratio=38.0), id=3, age_days=1, delta_source_id=2))
+            await session.commit()
+
+        analyzer = DeltaAnalyzer(session_factory)
+        previous = await analyzer.latest_for_user("user", "AAPL", "mid")
+        base = await analyzer.full_source(previous)
+        await engine.dispose()
+
+        assert (previous.id, base.id) == (3, 1)
+        assert DeltaAnalyzer.plan(previous, replace(STOCK, pe_ratio=34.0), base=base) is not None
+        # 직전 분석 대비 10% 이내지만 전체 분석 대비 허용 범위 초과
+        assert DeltaAnalyzer.plan(previous, replace(STOCK, pe_ratio=41.0), base=base) is None
+        # 전체 분석을 찾지 못한 델타 결과는 이어받지 않음
+        assert DeltaAnalyzer.plan(previous, replace(STOCK, pe_ratio=38.0)) is None
+
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DELTA_MAX_AGE_DAYS", 7.0)
+        assert DeltaAnalyzer.plan(previous, replace(STOCK, pe_ratio=34.0), base=base) is None
+
+
+class TestEngineDelta:
+    """엔진 델타 재분석 연동 테스트"""
+
+    async def test_regenerates_only_delta_fields(self, monkeypatch):
+        """바뀐 입력과 이어받는 섹션을 프롬프트에 넣고 델타 필드만 교체하여 저장"""
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DELTA_ENABLED", True)
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DELTA_MAX_TOKENS", 900)
+        engine = StockInsightEngine()
+        engine.openai_client = object()
+        engine.openai_model = "fake-openai"
+        engine.primary_provider = "openai"
+        current = replace(STOCK, current_price=204.0)
+        requests = []
+
+        async def fake_get_stock_data(stock_code):
+            return current
+
+        async def no_cache(symbol, timeframe, fingerprint):
+            return None
+
+        async def latest_for_user(user_id, symbol, timeframe):
+            return make_previous()
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            requests.append((user_prompt, max_tokens))
+            return json.dumps({
+                "market_overview": {"price_movement": "소폭 상승"},
+                "current_drivers": {"technical": "돌파"},
+                "recommendation": "buy",
+                "confidence_level": "high",
+                "recommendation_reason": "모멘텀",
+            }, ensure_ascii=False)
+
+        async def fake_save(insight):
+            return insight
+
+        monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+        monkeypatch.setattr(engine_module.delta_analyzer, "latest_for_user", latest_for_user)
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        monkeypatch.setattr(engine, "_save_insight", fake_save)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        prompt, max_tokens = requests[0]
+        assert max_tokens == 900
+        assert "current_price: 200.0 -> 204.0" in prompt
+        assert prompt.splitlines()[-1] == ", ".join(DELTA_FIELDS)
+        assert insight.delta_source_id == 7
+        assert insight.recommendation == "buy"
+        assert insight.current_drivers["technical"] == "돌파"
+        assert insight.deep_research == "이전 딥리서치"
+        assert insight.key_summary == ["이전 요약"]
+        assert insight.input_data["current_price"] == 204.0
+        assert insight.input_fingerprint is None
+
+    async def test_unrecoverable_delta_falls_back_to_full(self, monkeypatch):
+        """델타 응답에서 복구된 섹션이 없으면 이전 분석을 복사하지 않고 전체 재분석"""
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DELTA_ENABLED", True)
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_DELTA_MAX_TOKENS", 900)
+        engine = StockInsightEngine()
+        engine.openai_client = object()
+        engine.openai_model = "fake-openai"
+        engine.primary_provider = "openai"
+        requests = []
+
+        async def fake_get_stock_data(stock_code):
+            return replace(STOCK, current_price=204.0)
+
+        async def no_cache(symbol, timeframe, fingerprint):
+            return None
+
+        async def latest_for_user(user_id, symbol, timeframe):
+            return make_previous()
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            requests.append(max_tokens)
+            if len(requests) == 1:
+                return "응답을 생성할 수 없습니다"
+            return json.dumps({"deep_research": "새 딥리서치", "recommendation": "sell"}, ensure_ascii=False)
+
+        async def fake_save(insight):
+            return insight
+
+        monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+        monkeypatch.setattr(engine_module.delta_analyzer, "latest_for_user", latest_for_user)
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        monkeypatch.setattr(engine, "_save_insight", fake_save)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert requests[0] == 900 and requests[1] > 900
+        assert insight.delta_source_id is None
+        assert insight.deep_research == "새 딥리서치"
+        assert insight.recommendation == "sell"
+        assert insight.input_fingerprint is not None
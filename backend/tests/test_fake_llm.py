@@ -0,0 +1,117 @@
+"""
+부하 테스트용 가짜 LLM 프로바이더 테스트
+"""
+import pytest
+
+from app.services import stock_insight_engine as engine_module
+from app.services.fake_llm import FakeLLMClient, FakeLLMError
+from app.services.llm_resilience import is_retryable
+from app.services.response_parser import is_valid_stock_analysis_response
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+
+def make_client(**overrides) -> FakeLLMClient:
+    """지연 없는 가짜 클라이언트"""
+    options = dict(seed=1, ttft_median=0.0, ttft_sigma=0.0, tokens_per_second=0.0, error_rate=0.0, malformed_rate=0.0)
+    options.update(overrides)
+    return FakeLLMClient(**options)
+
+
+class TestFakeLLMClient:
+    """가짜 클라이언트 응답/오류 분포 테스트"""
+
+    async def test_deterministic_valid_response(self):
+        """같은 프롬프트는 같은 스키마 유효 응답"""
+        client = make_client()
+
+        first, prompt_tokens, completion_tokens = await client.complete("system", "AAPL mid", 4000)
+        second, _, _ = await client.complete("system", "AAPL mid", 4000)
+
+        assert first == second
+        assert is_valid_stock_analysis_response(first)
+        assert prompt_tokens > 0 and completion_tokens > 0
+
+    async def test_error_rate(self):
+        """오류는 재시도 대상 일시적 오류"""
+        client = make_client(error_rate=1.0)
+
+        with pytest.raises(FakeLLMError) as exc_info:
+            await client.complete("system", "user", 4000)
+        assert is_retryable(exc_info.value)
+
+    async def test_malformed_and_truncated_output(self):
+        """잘못된 출력 비율 및 출력 토큰 상한 초과 시 잘린 JSON"""
+        malformed, _, _ = await make_client(malformed_rate=1.0).complete("system", "user", 4000)
+        truncated, _, completion_tokens = await make_client().complete("system", "user", 50)
+
+        assert not is_valid_stock_analysis_response(malformed)
+        assert not is_valid_stock_analysis_response(truncated)
+        assert completion_tokens <= 50
+
+    async def test_seeded_distribution_reproducible(self):
+        """같은 시드는 같은 오류 순서"""
+        async def outcomes(seed):
+            client = make_client(seed=seed, error_rate=0.5)
+            results = []
+            for _ in range(20):
+                try:
+                    await client.complete("system", "user", 4000)
+                    results.append(True)
+                except FakeLLMError:
+                    results.append(False)
+            return results
+
+        assert await outcomes(7) == await outcomes(7)
+
+    async def test_stream_reports_usage_on_last_chunk(self):
+        """스트리밍은 전체 응답을 조각으로 나누고 마지막 조각에 사용량 포함"""
+        client = make_client()
+        chunks = [chunk async for chunk in client.stream("system", "user", 4000)]
+
+        assert len(chunks) > 1
+        assert all(usage is None for _, usage in chunks[:-1])
+        assert chunks[-1][1] is not None
+        assert is_valid_stock_analysis_response("".join(text for text, _ in chunks))
+
+
+class TestFakeProviderEngine:
+    """LLM_PRIMARY_PROVIDER=fake 엔진 연동 테스트"""
+
+    async def test_generate_insight_with_fake_provider(self, monkeypatch):
+        """가짜 프로바이더만으로 분석 생성 (API 키 없이)"""
+        monkeypatch.setattr(engine_module.settings, "LLM_PRIMARY_PROVIDER", "fake")
+        monkeypatch.setattr(engine_module.settings, "LLM_FALLBACK_ORDER", "fake")
+        monkeypatch.setattr(engine_module.settings, "LLM_FAKE_TTFT_MEDIAN_SECONDS", 0.0)
+        monkeypatch.setattr(engine_module.settings, "LLM_FAKE_TOKENS_PER_SECOND", 0.0)
+
+        engine = StockInsightEngine()
+        stock_data = StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD")
+
+        async def fake_get_stock_data(stock_code):
+            return stock_data
+
+        async def no_cache(symbol, timeframe, fingerprint):
+            return None
+
+        async def fake_save(insight):
+            return insight
+
+        monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+        monkeypatch.setattr(engine, "_save_insight", fake_save)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert insight.ai_model == "fake-llm"
+        assert insight.completion_tokens > 0
+        assert "부하 테스트" in insight.deep_research
+
+    def test_fake_provider_disabled_in_production(self, monkeypatch):
+        """production 환경에서는 가짜 프로바이더를 만들지 않음"""
+        monkeypatch.setattr(engine_module.settings, "LLM_PRIMARY_PROVIDER", "fake")
+        monkeypatch.setattr(engine_module.settings, "ENVIRONMENT", "production")
+
+        engine = StockInsightEngine()
+
+        assert engine._provider_client("fake") == (None, None)
@@ -0,0 +1,118 @@
+"""
+분석 단계별 지연 시간 측정 테스트
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.services import latency_spans
+from app.services import stock_insight_engine as engine_module
+from app.services.latency_spans import SpanRecorder, StageHistograms, current_spans, span
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+SAMPLE_RESPONSE = json.dumps({
+    "deep_research": "테스트 분석",
+    "recommendation": "buy",
+    "confidence_level": "high",
+    "recommendation_reason": "실적 개선",
+    "risk_score": 4,
+    "market_sentiment": "bullish",
+    "key_summary": ["요약 1", "요약 2"],
+}, ensure_ascii=False)
+
+
+@pytest.fixture
+def histograms(monkeypatch):
+    """테스트마다 새 히스토그램"""
+    fresh = StageHistograms(buckets=(0.01, 0.1, 1.0))
+    monkeypatch.setattr(latency_spans, "stage_histograms", fresh)
+    return fresh
+
+
+class TestSpans:
+    """span 기록 및 히스토그램 테스트"""
+
+    def test_span_recorded_with_offsets(self, histograms):
+        """현재 기록 대상에 시작 시점/소요 시간을 기록하고 실패도 기록"""
+        recorder = SpanRecorder()
+        token = current_spans.set(recorder)
+        try:
+            with span("resolution"):
+                pass
+            with pytest.raises(ValueError):
+                with span("data_fetch"):
+                    raise ValueError()
+        finally:
+            current_spans.reset(token)
+
+        stages = recorder.as_json()
+        assert [s["stage"] for s in stages] == ["resolution", "data_fetch"]
+        assert stages[1]["start_ms"] >= stages[0]["start_ms"]
+        assert stages[1]["error"] is True
+        assert "error" not in stages[0]
+
+    def test_span_without_recorder(self, histograms):
+        """기록 대상이 없으면 (백그라운드 캐시 로드 등) 히스토그램에만 기록"""
+        with span("kr_cache_load"):
+            pass
+
+        assert histograms.snapshot()["kr_cache_load"]["count"] == 1
+
+    def test_histogram_buckets(self, histograms):
+        """누적 버킷과 Prometheus 텍스트 형식"""
+        for seconds in (0.005, 0.05, 0.5, 5.0):
+            histograms.observe("llm", seconds)
+
+        snapshot = histograms.snapshot()["llm"]
+        assert snapshot["buckets"] == [1, 2, 3, 4]
+        assert snapshot["count"] == 4
+
+        text = histograms.prometheus_text()
+        assert '# TYPE stock_analysis_stage_seconds histogram' in text
+        assert 'stock_analysis_stage_seconds_bucket{stage="llm",le="0.1"} 2' in text
+        assert 'stock_analysis_stage_seconds_bucket{stage="llm",le="+Inf"} 4' in text
+        assert 'stock_analysis_stage_seconds_count{stage="llm"} 4' in text
+
+
+class TestEngineStageTimings:
+    """generate_insight 단계별 소요 시간 기록 테스트"""
+
+    async def test_stage_timings_stored(self, monkeypatch, histograms):
+        """하위 서비스 단계(심볼 변환)를 포함해 StockInsight에 저장, 저장 단계는 히스토그램에만 기록"""
+        engine = StockInsightEngine()
+        engine.openai_client = object()
+        engine.openai_model = "fake-openai"
+        engine.primary_provider = "openai"
+        stock_data = StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD")
+
+        async def fake_get_stock_data(stock_code):
+            with span("resolution"):
+                await asyncio.sleep(0)
+            return stock_data
+
+        async def no_cache(symbol, timeframe, fingerprint):
+            return None
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            await asyncio.sleep(0.02)
+            return SAMPLE_RESPONSE
+
+        async def fake_save(insight):
+            return insight
+
+        monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        monkeypatch.setattr(engine, "_save_insight", fake_save)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        stages = {s["stage"]: s for s in insight.stage_timings}
+        assert list(stages) == ["data_fetch", "resolution", "cache_lookup", "llm", "parse"]
+        assert stages["llm"]["duration_ms"] >= 20
+        assert stages["llm"]["duration_ms"] == max(s["duration_ms"] for s in insight.stage_timings)
+        assert histograms.snapshot()["db_commit"]["count"] == 1
+        # 분석이 끝나면 기록 대상 해제
+        assert current_spans.get() is None
@@ -0,0 +1,167 @@
+"""
+LLM 입장 제어 테스트
+"""
+import asyncio
+
+import pytest
+
+from app.services.llm_admission import (
+    PRIORITY_DEMO,
+    PRIORITY_PAID,
+    PRIORITY_STANDARD,
+    AdmissionContext,
+    AdmissionRejected,
+    LLMAdmissionController,
+    PriorityLimiter,
+    _parse_concurrency,
+    admission_context,
+)
+
+
+class TestPriorityLimiter:
+    """우선순위 대기열 테스트"""
+
+    async def test_admits_immediately_under_limit(self):
+        """제한 미만이면 대기 없이 입장"""
+        limiter = PriorityLimiter("openai", limit=2)
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=0)
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=0)
+        assert limiter.stats()["in_use"] == 2
+
+    async def test_paid_waiter_admitted_before_demo(self):
+        """결제 요청이 먼저 대기한 데모 요청보다 먼저 입장"""
+        limiter = PriorityLimiter("openai", limit=1)
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=None)
+
+        order = []
+
+        async def waiter(name, priority):
+            await limiter.acquire(priority, max_wait=None)
+            order.append(name)
+            limiter.release()
+
+        demo = asyncio.create_task(waiter("demo", PRIORITY_DEMO))
+        await asyncio.sleep(0)
+        paid = asyncio.create_task(waiter("paid", PRIORITY_PAID))
+        await asyncio.sleep(0)
+
+        limiter.release()
+        await asyncio.gather(demo, paid)
+
+        assert order == ["paid", "demo"]
+        assert limiter.stats()["in_use"] == 0
+
+    async def test_rejects_when_estimated_wait_exceeds_budget(self):
+        """예상 대기가 예산을 넘으면 대기열에 넣지 않고 거절"""
+        limiter = PriorityLimiter("openai", limit=1)
+        limiter.record_service_time(20.0)
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=None)
+
+        with pytest.raises(AdmissionRejected) as exc_info:
+            await limiter.acquire(PRIORITY_STANDARD, max_wait=5.0)
+
+        assert exc_info.value.retry_after >= 5
+        assert limiter.queue_length == 0
+        assert limiter.stats()["rejected"] == 1
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """대기 중 취소된 요청은 슬롯을 차지하지 않음"""
+        limiter = PriorityLimiter("openai", limit=1)
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=None)
+
+        task = asyncio.create_task(limiter.acquire(PRIORITY_STANDARD, max_wait=None))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        limiter.release()
+        assert limiter.stats()["in_use"] == 0
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=0)
+
+
+class TestLLMAdmissionController:
+    """프로바이더별 입장 제어 테스트"""
+
+    def test_parse_concurrency(self):
+        """설정 문자열 파싱 (잘못된 항목 무시)"""
+        assert _parse_concurrency("openai=8, anthropic=4,bad,x=") == {"openai": 8, "anthropic": 4}
+
+    async def test_precheck_uses_request_priority(self):
+        """결제 요청은 데모 대기열이 길어도 조기 거절되지 않음"""
+        controller = LLMAdmissionController({"openai": 1})
+        limiter = controller.limiter("openai")
+        await limiter.acquire(PRIORITY_STANDARD, max_wait=None)
+        waiters = [
+            asyncio.create_task(limiter.acquire(PRIORITY_DEMO, max_wait=None))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+
+        token = admission_context.set(AdmissionContext(priority=PRIORITY_DEMO, max_wait=30.0))
+        try:
+            with pytest.raises(AdmissionRejected):
+                controller.precheck(["openai"])
+        finally:
+            admission_context.reset(token)
+
+        token = admission_context.set(AdmissionContext(priority=PRIORITY_PAID, max_wait=30.0))
+        try:
+            controller.precheck(["openai"])
+        finally:
+            admission_context.reset(token)
+
+        for task in waiters:
+            task.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+    async def test_unbounded_context_never_rejected(self):
+        """무제한 대기 조건(작업 큐)은 거절하지 않음"""
+        controller = LLMAdmissionController({"openai": 1})
+        await controller.limiter("openai").acquire(PRIORITY_STANDARD, max_wait=None)
+
+        token = admission_context.set(AdmissionContext(priority=PRIORITY_STANDARD, max_wait=-1))
+        try:
+            controller.precheck(["openai"])
+            task = asyncio.create_task(controller.slot("openai").__aenter__())
+            await asyncio.sleep(0)
+            assert not task.done()
+            controller.limiter("openai").release()
+            await task
+        finally:
+            admission_context.reset(token)
+
+
+class TestEngineAdmission:
+    """엔진 호출의 슬롯 점유 범위 테스트"""
+
+    async def test_slot_released_during_retry_backoff(self, monkeypatch):
+        """일시적 오류 후 재시도 대기 중에는 슬롯을 반환하여 다른 요청이 호출"""
+        from app.services import stock_insight_engine as engine_module
+        from app.services.stock_insight_engine import StockInsightEngine
+
+        monkeypatch.setattr(engine_module.settings, "LLM_MAX_RETRIES", 1)
+        monkeypatch.setattr(engine_module.settings, "LLM_RETRY_BASE_DELAY_SECONDS", 0.2)
+        monkeypatch.setattr(engine_module.settings, "LLM_RETRY_MAX_DELAY_SECONDS", 0.2)
+        monkeypatch.setattr(engine_module, "retry_delay", lambda attempt, base, maximum: base)
+        engine = StockInsightEngine()
+        engine.admission = LLMAdmissionController({"openai": 1})
+        calls = []
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            calls.append(user_prompt)
+            if user_prompt == "retrying" and calls.count("retrying") == 1:
+                raise TimeoutError()
+            return user_prompt
+
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+
+        retrying = asyncio.create_task(engine._call_with_retries("openai", "system", "retrying", 100))
+        await asyncio.sleep(0.05)
+        # 재시도 대기 중인 요청이 슬롯을 점유하지 않으므로 다른 요청이 바로 호출됨
+        other, _ = await asyncio.wait_for(engine._call_with_retries("openai", "system", "other", 100), timeout=0.1)
+        retried, _ = await retrying
+
+        assert (other, retried) == ("other", "retrying")
+        assert calls == ["retrying", "other", "retrying"]
+        assert engine.admission.limiter("openai").stats()["in_use"] == 0
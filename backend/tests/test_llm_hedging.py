@@ -0,0 +1,45 @@
+"""
+LLM 헤지 요청 정책 테스트
+"""
+from app.services import llm_hedging
+from app.services.llm_hedging import HedgePolicy, percentile
+
+
+class TestHedgePolicy:
+    """HedgePolicy 테스트"""
+
+    def test_percentile(self):
+        """선형 보간 백분위"""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50.5
+        assert percentile(values, 95) == 95.05
+        assert percentile([3.0], 99) == 3.0
+
+    def test_delay_uses_default_until_enough_samples(self, monkeypatch):
+        """표본이 부족하면 기본 지연, 충분하면 백분위 지연"""
+        monkeypatch.setattr(llm_hedging.settings, "LLM_HEDGE_MIN_SAMPLES", 10)
+        monkeypatch.setattr(llm_hedging.settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 30.0)
+        monkeypatch.setattr(llm_hedging.settings, "LLM_HEDGE_LATENCY_PERCENTILE", 90.0)
+        policy = HedgePolicy()
+
+        for seconds in range(1, 10):
+            policy.record_latency("openai", float(seconds))
+        assert policy.hedge_delay("openai") == 30.0
+
+        policy.record_latency("openai", 10.0)
+        assert policy.hedge_delay("openai") == percentile(range(1, 11), 90.0)
+        assert policy.hedge_delay("anthropic") == 30.0
+
+    def test_budget_caps_hedge_ratio(self, monkeypatch):
+        """보조 요청 비율은 LLM_HEDGE_MAX_RATIO를 넘지 않음"""
+        monkeypatch.setattr(llm_hedging.settings, "LLM_HEDGE_MAX_RATIO", 0.1)
+        policy = HedgePolicy()
+
+        hedges = 0
+        for _ in range(100):
+            policy.record_call()
+            if policy.try_acquire():
+                hedges += 1
+
+        assert hedges == 10
+        assert policy.stats()["hedge_ratio"] == 0.1
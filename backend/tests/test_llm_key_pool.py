@@ -0,0 +1,160 @@
+"""
+LLM API 키 풀 테스트 (최소 처리 중 요청 선택, rate limit 헤더, 429 제외)
+"""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from app.services import stock_insight_engine as engine_module
+from app.services import llm_key_pool as key_pool_module
+from app.services.llm_key_pool import (
+    KeyPool,
+    KeyPoolExhausted,
+    ProviderCredential,
+    build_key_pools,
+    parse_reset_seconds,
+)
+from app.services.stock_insight_engine import StockInsightEngine
+
+SAMPLE_RESPONSE = '{"deep_research": "테스트 분석", "recommendation": "buy"}'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_pool(*names: str, clock=None, deployments=None) -> KeyPool:
+    deployments = deployments or {}
+    credentials = [ProviderCredential("openai", name, deployment=deployments.get(name)) for name in names]
+    return KeyPool("openai", credentials, default_model="gpt-default", clock=clock or FakeClock())
+
+
+class TestKeyPool:
+    """키 선택 및 제외 테스트"""
+
+    def test_parse_reset_seconds(self):
+        """OpenAI 기간 문자열, Anthropic RFC 3339 시각, retry-after 초"""
+        now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        assert parse_reset_seconds("6m0s") == 360.0
+        assert parse_reset_seconds("1.5s") == 1.5
+        assert parse_reset_seconds("20ms") == 0.02
+        assert parse_reset_seconds("12") == 12.0
+        assert parse_reset_seconds((now + timedelta(seconds=30)).isoformat().replace("+00:00", "Z"), now) == 30.0
+        assert parse_reset_seconds("알 수 없음") is None
+
+    def test_least_outstanding(self):
+        """처리 중 요청 수가 가장 적은 키, 같으면 남은 한도가 많은 키"""
+        pool = make_pool("a", "b", "c")
+
+        with pool.lease() as first, pool.lease() as second:
+            assert {first.name, second.name} == {"a", "b"}
+            assert pool.choose().name == "c"
+
+        pool.credentials[0].record_headers(200, {"x-ratelimit-remaining-requests": "5"})
+        pool.credentials[1].record_headers(200, {"x-ratelimit-remaining-requests": "50"})
+        pool.credentials[2].record_headers(200, {"x-ratelimit-remaining-tokens": "10"})
+        assert pool.choose().name == "b"
+        assert [c.outstanding for c in pool.credentials] == [0, 0, 0]
+
+    def test_drain_on_429_and_exhausted_limit(self):
+        """429 키는 retry-after 동안, 한도 소진 키는 재설정 시각까지 제외"""
+        clock = FakeClock()
+        pool = make_pool("a", "b", clock=clock)
+
+        pool.credentials[0].record_headers(429, {"retry-after": "10"})
+        pool.credentials[1].record_headers(200, {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"})
+
+        with pytest.raises(KeyPoolExhausted):
+            pool.choose()
+        clock.now += 3
+        assert pool.choose().name == "b"
+        clock.now += 8
+        assert pool.choose().name == "a"
+        assert pool.snapshot()[0]["rate_limited"] == 1
+
+    def test_azure_deployment_serves_default_model(self):
+        """Azure 배포는 기본 모델 요청에만 사용하고 model 값은 배포 이름"""
+        pool = make_pool("azure", "openai", deployments={"azure": "prod-deployment"})
+
+        with pool.lease("gpt-default") as credential:
+            assert credential.request_model("gpt-default") == "prod-deployment"
+            assert pool.choose("gpt-top").name == "openai"
+
+    def test_no_fallback_to_other_model(self):
+        """요청 모델을 처리할 키가 없으면 다른 모델의 배포로 호출하지 않음"""
+        pool = make_pool("azure", deployments={"azure": "prod-deployment"})
+
+        assert pool.choose("gpt-default").name == "azure"
+        with pytest.raises(KeyPoolExhausted):
+            pool.choose("gpt-top")
+
+    def test_snapshot_hides_identifiers(self):
+        """지표에는 마스킹된 키 이름이나 Azure 엔드포인트/배포 이름을 노출하지 않음"""
+        pool = make_pool("openai:...abcd", "azure:https://example.openai.azure.com/prod", deployments={
+            "azure:https://example.openai.azure.com/prod": "prod",
+        })
+
+        snapshot = pool.snapshot()
+
+        assert [(entry["index"], entry["kind"]) for entry in snapshot] == [(0, "api_key"), (1, "azure")]
+        assert "abcd" not in str(snapshot) and "example" not in str(snapshot) and "prod" not in str(snapshot)
+
+
+    def test_clients_disable_sdk_retries(self, monkeypatch):
+        """키가 하나여도 SDK 자체 재시도는 끄고 요청 타임아웃을 지정 (엔진 재시도만 사용)"""
+        monkeypatch.setattr(key_pool_module.settings, "OPENAI_API_KEY", "sk-single")
+        monkeypatch.setattr(key_pool_module.settings, "OPENAI_API_KEYS", "")
+        monkeypatch.setattr(key_pool_module.settings, "ANTHROPIC_API_KEY", "sk-ant-single")
+        monkeypatch.setattr(key_pool_module.settings, "ANTHROPIC_API_KEYS", "")
+        monkeypatch.setattr(key_pool_module.settings, "AZURE_OPENAI_API_KEY", "")
+        monkeypatch.setattr(key_pool_module.settings, "AZURE_OPENAI_EXTRA_ENDPOINTS", "")
+        monkeypatch.setattr(key_pool_module.settings, "LLM_REQUEST_TIMEOUT_SECONDS", 42.0)
+
+        pools = build_key_pools()
+
+        for provider in ("openai", "anthropic"):
+            (credential,) = pools[provider].credentials
+            assert credential.client.max_retries == 0
+            assert credential.client.timeout == 42.0
+
+
+class TestEngineKeyPool:
+    """엔진 키 풀 연동 테스트"""
+
+    async def test_retry_moves_to_other_key(self, monkeypatch):
+        """429를 받은 키는 제외하고 재시도는 다른 키로 호출"""
+        monkeypatch.setattr(engine_module.settings, "LLM_RETRY_BASE_DELAY_SECONDS", 0.0)
+        engine = StockInsightEngine()
+        engine.openai_client = object()
+        engine.openai_model = "gpt-default"
+        pool = make_pool("a", "b")
+        engine.key_pools = {"openai": pool}
+        calls = []
+
+        def make_client(credential, status_code):
+            async def create(**kwargs):
+                calls.append((credential.name, kwargs["model"]))
+                credential.record_headers(status_code, {"retry-after": "30"})
+                if status_code == 429:
+                    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+                    raise openai.RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None)
+                message = SimpleNamespace(content=SAMPLE_RESPONSE)
+                return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+            return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        pool.credentials[0].client = make_client(pool.credentials[0], 429)
+        pool.credentials[1].client = make_client(pool.credentials[1], 200)
+
+        response, _ = await engine._call_with_retries("openai", "system", "user", 100)
+
+        assert response == SAMPLE_RESPONSE
+        assert calls == [("a", "gpt-default"), ("b", "gpt-default")]
+        assert not pool.credentials[0].available(pool._clock())
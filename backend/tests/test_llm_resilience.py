@@ -0,0 +1,106 @@
+"""
+LLM 호출 복원력 (재시도, 회로 차단기) 테스트
+"""
+import httpx
+import openai
+
+from app.services.llm_resilience import (
+    CircuitBreaker,
+    BREAKER_CLOSED,
+    BREAKER_OPEN,
+    BREAKER_HALF_OPEN,
+    is_retryable,
+    retry_delay,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_status_error(status_code: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    return openai.APIStatusError("오류", response=response, body=None)
+
+
+class TestRetryPolicy:
+    """재시도 판단 및 백오프 테스트"""
+
+    def test_is_retryable(self):
+        """429/5xx/타임아웃/연결 오류만 재시도"""
+        request = httpx.Request("POST", "https://api.openai.com")
+        assert is_retryable(make_status_error(429))
+        assert is_retryable(make_status_error(503))
+        assert is_retryable(openai.APITimeoutError(request=request))
+        assert is_retryable(TimeoutError())
+        assert not is_retryable(make_status_error(400))
+        assert not is_retryable(make_status_error(401))
+        assert not is_retryable(ValueError("파싱 오류"))
+
+    def test_retry_delay_bounds(self):
+        """지터 백오프는 0 이상, min(최대, 기본*2^(n-1)) 이하"""
+        for attempt in range(1, 8):
+            delay = retry_delay(attempt, base_delay=0.5, max_delay=4.0)
+            assert 0 <= delay <= min(4.0, 0.5 * 2 ** (attempt - 1))
+
+
+class TestCircuitBreaker:
+    """CircuitBreaker 테스트"""
+
+    def test_opens_after_threshold(self):
+        """연속 실패가 임계값에 도달하면 차단"""
+        breaker = CircuitBreaker("openai", failure_threshold=3, recovery_seconds=60, clock=FakeClock())
+
+        for _ in range(2):
+            assert breaker.allow_request()
+            breaker.record_failure()
+        assert breaker.state == BREAKER_CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == BREAKER_OPEN
+        assert breaker.allow_request() is False
+
+    def test_success_resets_failures(self):
+        """성공하면 연속 실패 횟수 초기화"""
+        breaker = CircuitBreaker("openai", failure_threshold=2, recovery_seconds=60, clock=FakeClock())
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == BREAKER_CLOSED
+
+    def test_half_open_single_probe(self):
+        """복구 시간 후 시험 요청 하나만 허용, 결과에 따라 복구/재차단"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("anthropic", failure_threshold=1, recovery_seconds=60, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 61
+        assert breaker.state == BREAKER_HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False  # 시험 요청 진행 중
+
+        breaker.record_failure()
+        assert breaker.state == BREAKER_OPEN
+        assert breaker.allow_request() is False
+
+        clock.now = 122
+        assert breaker.allow_request() is True
+        breaker.record_success()
+        assert breaker.state == BREAKER_CLOSED
+        assert breaker.allow_request() is True
+
+    def test_abandoned_probe(self):
+        """취소된 시험 요청은 슬롯을 반환"""
+        clock = FakeClock()
+        breaker = CircuitBreaker("openai", failure_threshold=1, recovery_seconds=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 11
+
+        assert breaker.allow_request() is True
+        breaker.abandon()
+        assert breaker.allow_request() is True
@@ -0,0 +1,41 @@
+"""
+/metrics* 조회 토큰 보호 테스트
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+
+METRICS_PATHS = ["/metrics", "/metrics/model-routing", "/metrics/llm-keys"]
+
+
+@pytest.fixture
+def client():
+    # lifespan(캐시 워밍업/DB 초기화)은 실행하지 않음
+    return TestClient(main.app)
+
+
+class TestMetricsAuth:
+    """메트릭 엔드포인트 토큰 검증 테스트"""
+
+    @pytest.mark.parametrize("path", METRICS_PATHS)
+    def test_disabled_without_token_setting(self, client, monkeypatch, path):
+        """METRICS_TOKEN이 비어 있으면 노출하지 않음"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+        assert client.get(path).status_code == 404
+        assert client.get(path, headers={"Authorization": "Bearer "}).status_code == 404
+
+    @pytest.mark.parametrize("path", METRICS_PATHS)
+    def test_rejects_missing_or_wrong_token(self, client, monkeypatch, path):
+        """토큰이 없거나 다르면 401"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert client.get(path, headers={"Authorization": "secret"}).status_code == 401
+
+    @pytest.mark.parametrize("path", METRICS_PATHS)
+    def test_accepts_bearer_token(self, client, monkeypatch, path):
+        """올바른 Bearer 토큰이면 조회 가능"""
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+        assert client.get(path, headers={"Authorization": "Bearer secret"}).status_code == 200
@@ -0,0 +1,137 @@
+"""
+복잡도 기반 모델 라우팅 테스트
+"""
+import asyncio
+import json
+
+from app.services import stock_insight_engine as engine_module
+from app.services.llm_usage import TokenUsage
+from app.services.model_router import ModelRouter, parse_model_prices, parse_model_tiers
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+TIERS = parse_model_tiers("light:openai=gpt-light;standard:openai=gpt-standard;top:openai=gpt-top,anthropic=claude-top")
+
+
+def make_stock_data(complete: bool = True) -> StockData:
+    stock_data = StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD")
+    if complete:
+        for name, value in vars(stock_data).items():
+            if value is None:
+                setattr(stock_data, name, 1.0)
+    return stock_data
+
+
+def make_response(recommendation: str, risk_score: int) -> str:
+    return json.dumps({
+        "deep_research": "테스트 분석",
+        "recommendation": recommendation,
+        "risk_score": risk_score,
+    })
+
+
+class TestModelRouter:
+    """티어 선택 및 리포트 테스트"""
+
+    def test_parse_config(self):
+        """티어/가격 설정 파싱 (낮은 티어부터)"""
+        assert [tier.name for tier in TIERS] == ["light", "standard", "top"]
+        assert TIERS[2].models == {"openai": "gpt-top", "anthropic": "claude-top"}
+        assert parse_model_prices("gpt-light=0.1/0.4, 잘못된 값") == {"gpt-light": (0.1, 0.4)}
+
+    def test_route_by_signals(self):
+        """투자 기간, 데이터 완성도, 최근 분석 여부로 티어 선택"""
+        router = ModelRouter(tiers=TIERS, prices={}, sample_rate=0)
+
+        assert router.route(make_stock_data(), "short", False).tier.name == "light"
+        assert router.route(make_stock_data(), "mid", False).tier.name == "standard"
+        assert router.route(make_stock_data(), "long", False).tier.name == "top"
+        # 데이터가 부족하면 한 단계 위, 최근 분석이 있으면 한 단계 아래
+        assert router.route(make_stock_data(complete=False), "short", False).tier.name == "standard"
+        assert router.route(make_stock_data(), "long", True).tier.name == "standard"
+        assert router.route(make_stock_data(complete=False), "long", False).tier.name == "top"
+
+    def test_disabled_without_tiers(self):
+        """티어 설정이 없으면 라우팅하지 않음"""
+        assert ModelRouter(tiers=[], prices={}).route(make_stock_data(), "mid", False) is None
+
+    def test_report_latency_and_cost(self):
+        """티어별 지연 시간 백분위와 가격 기반 비용"""
+        router = ModelRouter(tiers=TIERS, prices={"gpt-light": (1.0, 4.0)}, sample_rate=0)
+        for seconds in (1.0, 2.0, 3.0):
+            router.record(TIERS[0], "gpt-light", seconds, TokenUsage(prompt_tokens=1000, completion_tokens=500))
+
+        light = router.report()["tiers"]["light"]
+        assert light["requests"] == 3
+        assert light["latency_p50_seconds"] == 2.0
+        assert light["cost_usd"] == 0.009
+        assert light["cost_per_request_usd"] == 0.003
+        assert router.report()["tiers"]["top"]["requests"] == 0
+
+    async def test_quality_check(self):
+        """하위 티어 응답을 최상위 티어 응답과 비교 (상위 티어는 표본 제외)"""
+        router = ModelRouter(tiers=TIERS, prices={}, sample_rate=1.0)
+        assert not router.should_sample(TIERS[2])
+        assert router.should_sample(TIERS[0])
+
+        async def call_top():
+            return {"recommendation": "buy", "risk_score": 6}
+
+        router.schedule_quality_check(TIERS[0], {"recommendation": "buy", "risk_score": 4}, call_top)
+        router.schedule_quality_check(TIERS[0], {"recommendation": "sell", "risk_score": 6}, call_top)
+        await asyncio.gather(*router._checks)
+
+        light = router.report()["tiers"]["light"]
+        assert light["quality_samples"] == 2
+        assert light["recommendation_agreement"] == 0.5
+        assert light["mean_risk_score_diff"] == 1.0
+
+
+class TestEngineRouting:
+    """엔진 모델 라우팅 연동 테스트"""
+
+    async def test_routed_model_and_quality_sample(self, monkeypatch):
+        """선택된 티어 모델로 호출하고, 표본은 분석 사용량과 별도로 최상위 모델에 요청"""
+        engine = StockInsightEngine()
+        engine.openai_client = object()
+        engine.openai_model = "gpt-default"
+        engine.primary_provider = "openai"
+        engine.model_router = ModelRouter(tiers=TIERS, prices={}, sample_rate=1.0)
+        monkeypatch.setattr(engine_module.settings, "LLM_FALLBACK_ORDER", "openai")
+        stock_data = make_stock_data()
+        models = []
+
+        async def fake_get_stock_data(stock_code):
+            return stock_data
+
+        async def no_cache(symbol, timeframe, fingerprint):
+            return None
+
+        async def recent(symbol, timeframe, max_age_seconds):
+            return None
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            model = engine._model_for(provider)
+            models.append(model)
+            engine_module.record_usage(model, 100, 50)
+            return make_response("buy" if model == "gpt-light" else "hold", 5)
+
+        async def fake_save(insight):
+            return insight
+
+        monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "latest", recent)
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        monkeypatch.setattr(engine, "_save_insight", fake_save)
+
+        insight = await engine.generate_insight("AAPL", "short", "user")
+        await asyncio.gather(*engine.model_router._checks)
+
+        assert insight.ai_model == "gpt-light"
+        assert insight.prompt_tokens == 100
+        assert models == ["gpt-light", "gpt-top"]
+        report = engine.model_router.report()["tiers"]
+        assert report["light"]["requests"] == 1
+        assert report["light"]["recommendation_agreement"] == 0.0
+        assert report["top"]["requests"] == 0
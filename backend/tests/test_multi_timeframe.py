@@ -0,0 +1,116 @@
+"""
+투자 기간 일괄 생성 테스트 (임시 SQLite DB 사용)
+"""
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.stock_insight import StockInsight
+from app.services import stock_insight_engine as engine_module
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+STOCK = StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD")
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'multi.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[StockInsight.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def make_engine(monkeypatch, session_factory, response: str, requests: list) -> StockInsightEngine:
+    monkeypatch.setattr(engine_module.settings, "ANALYSIS_MULTI_TIMEFRAME_ENABLED", True)
+    monkeypatch.setattr(engine_module.settings, "ANALYSIS_MULTI_TIMEFRAME_MAX_TOKENS", 9000)
+    monkeypatch.setattr(engine_module, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(engine_module.analysis_result_cache, "_session_factory", session_factory)
+    engine = StockInsightEngine()
+    engine.openai_client = object()
+    engine.openai_model = "fake-openai"
+    engine.primary_provider = "openai"
+
+    async def fake_get_stock_data(stock_code):
+        return STOCK
+
+    async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+        requests.append((user_prompt, max_tokens))
+        return response
+
+    monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+    monkeypatch.setattr(engine, "_call_provider", fake_call)
+    return engine
+
+
+def analysis(recommendation: str) -> dict:
+    return {"deep_research": f"{recommendation} 분석", "recommendation": recommendation, "risk_score": 4}
+
+
+class TestMultiTimeframe:
+    """한 번의 호출로 세 투자 기간 생성"""
+
+    async def test_prefetched_timeframes_served_from_cache(self, monkeypatch, session_factory):
+        """요청 기간은 사용자 소유로, 나머지 기간은 공유 캐시 원본으로 저장하여 후속 요청은 LLM 호출 없이 응답"""
+        requests = []
+        response = json.dumps({"short": analysis("sell"), "mid": analysis("hold"), "long": analysis("buy")})
+        engine = make_engine(monkeypatch, session_factory, response, requests)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+        # 나머지 투자 기간은 응답 후 백그라운드로 저장
+        assert len(engine._background) == 1
+        await asyncio.gather(*engine._background)
+        follow_up = await engine.generate_insight("AAPL", "long", "user")
+
+        assert len(requests) == 1
+        prompt, max_tokens = requests[0]
+        assert max_tokens == 9000
+        assert '"short"' in prompt and '"long"' in prompt
+        assert insight.recommendation == "hold" and insight.prompt_tokens is not None
+        assert follow_up.recommendation == "buy" and follow_up.user_id == "user"
+
+        async with session_factory() as session:
+            rows = (await session.execute(select(StockInsight).order_by(StockInsight.id))).scalars().all()
+        owners = {(row.timeframe, row.user_id) for row in rows}
+        batch_user = engine_module.settings.ANALYSIS_BATCH_USER_ID
+        assert owners == {("mid", "user"), ("short", batch_user), ("long", batch_user), ("long", "user")}
+
+    async def test_falls_back_without_requested_timeframe(self, monkeypatch, session_factory):
+        """일괄 응답에 요청 기간이 없으면 단일 기간으로 다시 생성하고, 완성된 나머지 기간은 그대로 저장"""
+        requests = []
+        response = json.dumps({"mid": analysis("hold"), "long": analysis("sell")})
+        engine = make_engine(monkeypatch, session_factory, response, requests)
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            requests.append((user_prompt, max_tokens))
+            return response if len(requests) == 1 else json.dumps(analysis("buy"))
+
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+
+        insight = await engine.generate_insight("AAPL", "short", "user")
+        await asyncio.gather(*engine._background)
+
+        assert [max_tokens for _, max_tokens in requests] == [9000, engine._max_tokens("short")]
+        assert insight.recommendation == "buy"
+        assert engine.multi_timeframe_stats() == {"calls": 1, "misses": 1}
+        async with session_factory() as session:
+            rows = (await session.execute(select(StockInsight).order_by(StockInsight.id))).scalars().all()
+        batch_user = engine_module.settings.ANALYSIS_BATCH_USER_ID
+        assert {(row.timeframe, row.user_id, row.recommendation) for row in rows} == {
+            ("short", "user", "buy"), ("mid", batch_user, "hold"), ("long", batch_user, "sell"),
+        }
+
+    async def test_disabled_with_result_cache_off(self, monkeypatch, session_factory):
+        """공유 캐시가 꺼져 있으면 요청 기간만 생성"""
+        monkeypatch.setattr(engine_module.settings, "ANALYSIS_CACHE_TTL", 0)
+        requests = []
+        engine = make_engine(monkeypatch, session_factory, json.dumps(analysis("buy")), requests)
+
+        await engine.generate_insight("AAPL", "mid", "user")
+
+        assert len(requests) == 1 and '"short"' not in requests[0][0]
@@ -0,0 +1,153 @@
+"""
+LLM 원본 응답 아카이브 테스트 (재파싱, 재생 프로바이더)
+"""
+import json
+from dataclasses import asdict, replace
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models.stock_insight import StockInsight
+from app.services import stock_insight_engine as engine_module
+from app.services.prompts import PROMPT_VERSION
+from app.services.response_archive import (
+    ArchiveReparser,
+    ReplayLLMClient,
+    ReplayMiss,
+    compress_response,
+    decompress_response,
+)
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+STOCK = StockData(symbol="AAPL", name="Apple Inc.", market="US", current_price=200.0, currency="USD")
+
+RESPONSE = json.dumps({
+    "deep_research": "아카이브 분석",
+    "recommendation": "buy",
+    "confidence_level": "high",
+    "risk_score": 3,
+}, ensure_ascii=False)
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'archive.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[StockInsight.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def save(session_factory, raw: str, timeframe: str = "mid", **overrides) -> StockInsight:
+    values = dict(
+        user_id="user",
+        stock_code="AAPL",
+        stock_name="Apple Inc.",
+        market="US",
+        timeframe=timeframe,
+        deep_research="아카이브 분석",
+        recommendation="hold",
+        confidence_level="high",
+        risk_score=3,
+        prompt_version=PROMPT_VERSION,
+        input_data=asdict(STOCK),
+        raw_response=compress_response(raw),
+        prompt_tokens=120,
+        completion_tokens=60,
+    )
+    values.update(overrides)
+    insight = StockInsight(**values)
+    async with session_factory() as session:
+        session.add(insight)
+        await session.commit()
+    return insight
+
+
+class TestArchiveReparser:
+    """아카이브 일괄 재파싱 테스트"""
+
+    def test_compression_roundtrip(self):
+        """압축 저장 후 원문 복원"""
+        text = RESPONSE * 20
+        blob = compress_response(text)
+
+        assert decompress_response(blob) == text
+        assert len(blob) < len(text.encode("utf-8"))
+
+    async def test_reparse_updates_changed_fields(self, session_factory):
+        """저장된 값과 재파싱 결과가 다른 분석만 갱신, 파싱할 수 없는 아카이브는 실패로 집계"""
+        stale = await save(session_factory, RESPONSE)  # 파서 버그로 hold로 저장된 분석
+        current = await save(session_factory, RESPONSE, recommendation="buy", key_summary=None)
+        multi = await save(session_factory, json.dumps({"short": json.loads(RESPONSE)}), timeframe="long")
+        broken = await save(session_factory, "분석을 생성할 수 없습니다")
+        reparser = ArchiveReparser(session_factory)
+
+        dry_run = await reparser.run(dry_run=True)
+        async with session_factory() as session:
+            assert (await session.get(StockInsight, stale.id)).recommendation == "hold"
+
+        report = await reparser.run()
+
+        assert dry_run.changed_ids == report.changed_ids
+        assert stale.id in report.changed_ids
+        assert report.failed_ids == [multi.id, broken.id]
+        assert report.scanned == 4
+        async with session_factory() as session:
+            assert (await session.get(StockInsight, stale.id)).recommendation == "buy"
+            assert (await session.get(StockInsight, current.id)).key_summary is not None
+            # 기본값(placeholder)으로 덮어쓰지 않음
+            assert (await session.get(StockInsight, broken.id)).deep_research == "아카이브 분석"
+
+
+class TestEngineArchive:
+    """엔진 원본 응답 저장 및 재생 프로바이더 테스트"""
+
+    async def test_generate_archives_raw_response(self, monkeypatch):
+        """분석 저장 시 LLM 응답 원문을 압축하여 함께 저장"""
+        engine = StockInsightEngine()
+        engine.openai_client = object()
+        engine.openai_model = "fake-openai"
+        engine.primary_provider = "openai"
+
+        async def fake_get_stock_data(stock_code):
+            return STOCK
+
+        async def no_cache(symbol, timeframe, fingerprint):
+            return None
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            return RESPONSE
+
+        async def fake_save(insight):
+            return insight
+
+        monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        monkeypatch.setattr(engine, "_save_insight", fake_save)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert decompress_response(insight.raw_response) == RESPONSE
+        assert insight.input_data["current_price"] == 200.0
+
+    async def test_replay_provider(self, monkeypatch, session_factory):
+        """같은 입력의 프롬프트에는 아카이브 응답과 토큰 수를 반환, 없는 프롬프트는 ReplayMiss"""
+        monkeypatch.setattr(engine_module.settings, "LLM_PRIMARY_PROVIDER", "replay")
+        monkeypatch.setattr(engine_module.settings, "LLM_FALLBACK_ORDER", "replay")
+        source = await save(session_factory, RESPONSE)
+        # 델타 재분석의 부분 응답은 같은 입력이어도 재생하지 않음
+        await save(session_factory, '{"deep_research": "델타"}', delta_source_id=source.id)
+        engine = StockInsightEngine()
+        engine.replay_client = ReplayLLMClient(engine._build_user_prompt, session_factory)
+
+        with engine_module.track_usage() as usage:
+            text, model = await engine._call_llm("system", engine._build_user_prompt(STOCK, "mid"))
+
+        assert (text, model) == (RESPONSE, "replay")
+        assert (usage.prompt_tokens, usage.completion_tokens) == (120, 60)
+        with pytest.raises(ReplayMiss):
+            await engine._call_llm("system", engine._build_user_prompt(replace(STOCK, current_price=1.0), "mid"))
+        assert engine.breakers["replay"].state == "closed"
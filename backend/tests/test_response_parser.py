@@ -0,0 +1,153 @@
+"""
+AI 응답 파서 테스트
+"""
+import json
+
+from app.services.response_parser import (
+    IncrementalAnalysisParser,
+    close_truncated_json,
+    parse_multi_timeframe_response,
+    parse_stock_analysis_response,
+    repair_stock_analysis_response,
+)
+
+FULL_RESPONSE = json.dumps({
+    "deep_research": "따옴표 \"인용\"과 {중괄호}, [대괄호]를 포함한 분석",
+    "recommendation": "Strong Buy",
+    "confidence_level": "high",
+    "recommendation_reason": "실적 개선",
+    "risk_score": 14,
+    "risk_analysis": {"volatility": "높음"},
+    "market_sentiment": "bullish",
+    "key_summary": ["요약 1", "요약 2"],
+    "unknown_field": 1,
+}, ensure_ascii=False)
+
+
+def feed_all(parser: IncrementalAnalysisParser, text: str, size: int) -> list:
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i:i + size]))
+    return completed
+
+
+class TestParseStockAnalysisResponse:
+    """전체 응답 파싱 테스트"""
+
+    def test_validates_and_merges_defaults(self):
+        """값 검증, 중첩 객체 기본값 병합, 알 수 없는 필드 무시"""
+        result = parse_stock_analysis_response(f"분석 결과입니다.\n```json\n{FULL_RESPONSE}\n```")
+
+        assert result["recommendation"] == "strong_buy"
+        assert result["risk_score"] == 10
+        assert result["risk_analysis"]["volatility"] == "높음"
+        assert result["risk_analysis"]["macro"] == "분석 불가"
+        assert "unknown_field" not in result
+
+    def test_invalid_type_falls_back_to_default(self):
+        """문자열 필드 타입 오류는 기존과 같이 전체 기본값"""
+        result = parse_stock_analysis_response('{"deep_research": "분석", "recommendation": 3}')
+
+        assert result["deep_research"] == "분석 데이터를 처리할 수 없습니다."
+
+
+class TestIncrementalAnalysisParser:
+    """스트리밍 증분 파서 테스트"""
+
+    def test_chunked_matches_full_parse(self):
+        """조각 크기와 무관하게 전체 파싱과 같은 결과"""
+        expected = parse_stock_analysis_response(FULL_RESPONSE)
+
+        for size in (1, 3, 17, len(FULL_RESPONSE)):
+            parser = IncrementalAnalysisParser()
+            completed = feed_all(parser, "```json\n" + FULL_RESPONSE + "\n```", size)
+
+            assert parser.complete and not parser.errors
+            assert parser.result() == expected
+            assert [name for name, _ in completed] == [
+                "deep_research", "recommendation", "confidence_level", "recommendation_reason",
+                "risk_score", "risk_analysis", "market_sentiment", "key_summary",
+            ]
+
+    def test_field_emitted_when_complete(self):
+        """필드 값이 끝나는 조각에서 검증된 값 반환"""
+        parser = IncrementalAnalysisParser()
+
+        assert parser.feed('{"recommendation": "bu') == []
+        assert parser.feed('y", "risk_score": 7') == [("recommendation", "buy")]
+        assert parser.feed(', "key_summary": ["a", "b"') == [("risk_score", 7)]
+        assert parser.feed(']}') == [("key_summary", ["a", "b"])]
+        assert parser.complete
+
+    def test_invalid_field_detected_early(self):
+        """검증 실패 필드는 스트림 도중 errors에 기록"""
+        parser = IncrementalAnalysisParser()
+
+        parser.feed('{"recommendation": 3, "risk_score": 4, "deep_research": "아직 생성 중')
+
+        assert parser.errors == ["recommendation"]
+        assert parser.fields == ["risk_score"]
+        assert not parser.complete
+
+
+class TestTruncatedRepair:
+    """잘린 응답 복구 테스트"""
+
+    def test_close_truncated_json(self):
+        """끝나지 않은 값은 버리고 열린 배열/객체를 닫음"""
+        assert json.loads(close_truncated_json('{"a": "x", "b": "잘린 문')) == {"a": "x"}
+        assert json.loads(close_truncated_json('{"a": {"b": [1, 2')) == {"a": {"b": [1]}}
+        assert json.loads(close_truncated_json('{"a": {"b": "c"}, "d"')) == {"a": {"b": "c"}}
+        assert json.loads(close_truncated_json('{"a": "\\"}{[", "b": 1')) == {"a": '"}{['}
+
+    def test_truncated_response_recovers_completed_fields(self):
+        """완성된 필드는 살리고 잘린/생성되지 않은 필드는 missing"""
+        truncated = FULL_RESPONSE[:FULL_RESPONSE.index('"key_summary"') + 22]
+
+        repaired = repair_stock_analysis_response(truncated)
+
+        assert repaired.result["recommendation"] == "strong_buy"
+        assert repaired.result["risk_analysis"]["volatility"] == "높음"
+        assert "risk_score" in repaired.recovered
+        assert "key_summary" in repaired.missing
+        assert "recommendation" not in repaired.missing
+        # 잘린 응답도 기본값 대신 복구된 필드로 파싱
+        assert parse_stock_analysis_response(truncated)["recommendation"] == "strong_buy"
+
+    def test_trailing_prose(self):
+        """닫힌 객체 뒤의 설명은 무시하고 누락 없음"""
+        repaired = repair_stock_analysis_response(FULL_RESPONSE + "\n참고: {추가 설명}")
+
+        assert repaired.missing == []
+        assert repaired.result == parse_stock_analysis_response(FULL_RESPONSE)
+
+    def test_nothing_to_recover(self):
+        """복구할 필드가 없으면 None (기본값 사용)"""
+        assert repair_stock_analysis_response("응답 없음") is None
+        assert repair_stock_analysis_response('{"deep_resea') is None
+
+
+class TestMultiTimeframeResponse:
+    """투자 기간 일괄 응답 파싱 테스트"""
+
+    def test_parse_each_timeframe(self):
+        """투자 기간별 분석을 검증하고 필수 필드가 없는 기간은 제외"""
+        response = json.dumps({
+            "short": json.loads(FULL_RESPONSE),
+            "mid": {"deep_research": "중기 분석", "recommendation": "sell"},
+            "long": {"deep_research": "필수 필드 누락"},
+        }, ensure_ascii=False)
+
+        analyses = parse_multi_timeframe_response(response, ("short", "mid", "long"))
+
+        assert list(analyses) == ["short", "mid"]
+        assert analyses["short"] == parse_stock_analysis_response(FULL_RESPONSE)
+        assert analyses["mid"]["recommendation"] == "sell"
+
+    def test_truncated_drops_last_timeframe(self):
+        """잘린 응답은 완성된 투자 기간만 사용"""
+        response = json.dumps({"short": json.loads(FULL_RESPONSE), "mid": json.loads(FULL_RESPONSE)}, ensure_ascii=False)
+        truncated = response[:response.index('"mid"') + 60]
+
+        assert list(parse_multi_timeframe_response(truncated, ("short", "mid", "long"))) == ["short"]
+        assert parse_multi_timeframe_response("응답 없음", ("short",)) == {}
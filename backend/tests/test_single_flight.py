@@ -0,0 +1,170 @@
+"""
+동일 LLM 분석 중복 호출 방지 (single-flight) 테스트
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.database import Base
+from app.models.analysis_flight import AnalysisFlight
+from app.services.single_flight import SingleFlight, LocalFlightBackend, DatabaseFlightBackend
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'flights.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[AnalysisFlight.__table__])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def make_call(calls, release, result=None, error=None):
+    async def call():
+        calls.append(1)
+        await release.wait()
+        if error:
+            raise error
+        return result or {"response_text": "{}", "model_used": "fake"}
+    return call
+
+
+class TestSingleFlight:
+    """프로세스 내 공유 테스트"""
+
+    async def test_concurrent_calls_share_result(self):
+        """동시에 들어온 같은 key는 한 번만 실행하고 각자 사본을 받음"""
+        flight = SingleFlight(LocalFlightBackend())
+        calls, release = [], asyncio.Event()
+
+        tasks = [asyncio.create_task(flight.do("key", make_call(calls, release))) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert len(calls) == 1
+        assert [shared for _, shared in results].count(False) == 1
+        assert all(result == {"response_text": "{}", "model_used": "fake"} for result, _ in results)
+        assert len({id(result) for result, _ in results}) == 5
+        assert flight.stats()["shared_local"] == 4
+        assert flight.stats()["in_flight"] == 0
+
+    async def test_error_propagates_and_next_call_retries(self):
+        """실패는 대기자에게 전파되고, 이후 요청은 새로 실행"""
+        flight = SingleFlight(LocalFlightBackend())
+        calls, release = [], asyncio.Event()
+
+        tasks = [
+            asyncio.create_task(flight.do("key", make_call(calls, release, error=RuntimeError("API 오류"))))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        result, shared = await flight.do("key", make_call(calls, release))
+        assert shared is False
+        assert len(calls) == 2
+
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        """리더가 취소되어도 대기자는 취소되지 않고 다시 시도하여 그중 하나가 리더가 됨"""
+        flight = SingleFlight(LocalFlightBackend())
+        calls, release = [], asyncio.Event()
+
+        leader = asyncio.create_task(flight.do("key", make_call(calls, release)))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("key", make_call(calls, release))) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*followers)
+
+        assert leader.cancelled()
+        assert len(calls) == 2
+        assert sorted(shared for _, shared in results) == [False, True]
+        assert flight.stats()["in_flight"] == 0
+
+class TestDatabaseFlightBackend:
+    """프로세스 간 점유 테스트 (SingleFlight 인스턴스 2개로 프로세스 시뮬레이션)"""
+
+    async def test_remote_result_shared(self, session_factory, monkeypatch):
+        """다른 프로세스가 점유 중이면 결과를 기다려 공유"""
+        monkeypatch.setattr("app.services.single_flight.WAIT_POLL_INTERVAL_SECONDS", 0.01)
+        first = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        second = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        calls, release = [], asyncio.Event()
+
+        leader = asyncio.create_task(first.do("key", make_call(calls, release, {"response_text": "원본", "model_used": "m"})))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(second.do("key", make_call(calls, release)))
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert (await leader) == ({"response_text": "원본", "model_used": "m"}, False)
+        assert (await follower) == ({"response_text": "원본", "model_used": "m"}, True)
+        assert len(calls) == 1
+        assert second.stats()["shared_remote"] == 1
+
+    async def test_failed_leader_releases(self, session_factory, monkeypatch):
+        """점유한 프로세스가 실패하면 대기 프로세스가 직접 실행"""
+        monkeypatch.setattr("app.services.single_flight.WAIT_POLL_INTERVAL_SECONDS", 0.01)
+        first = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        second = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        leader_release, follower_release = asyncio.Event(), asyncio.Event()
+        calls = []
+
+        leader = asyncio.create_task(first.do("key", make_call(calls, leader_release, error=RuntimeError("실패"))))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(second.do("key", make_call(calls, follower_release)))
+        await asyncio.sleep(0.05)
+        leader_release.set()
+        follower_release.set()
+
+        with pytest.raises(RuntimeError):
+            await leader
+        result, shared = await follower
+        assert shared is False
+        assert len(calls) == 2
+
+    async def test_unshareable_result_not_published(self, session_factory, monkeypatch):
+        """공유 불가 결과(기본값이 남은 분석)는 다른 프로세스에 넘기지 않고 대기 프로세스가 직접 실행"""
+        monkeypatch.setattr("app.services.single_flight.WAIT_POLL_INTERVAL_SECONDS", 0.01)
+        first = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        second = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        release, calls = asyncio.Event(), []
+        partial = {"response_text": "부분", "model_used": "m", "incomplete": ["risk_analysis"]}
+
+        def shareable(result):
+            return not result.get("incomplete")
+
+        leader = asyncio.create_task(first.do("key", make_call(calls, release, partial), shareable))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(second.do("key", make_call(calls, release), shareable))
+        await asyncio.sleep(0.05)
+        release.set()
+
+        assert (await leader) == (partial, False)
+        result, shared = await follower
+        assert shared is False and result["response_text"] == "{}"
+        assert len(calls) == 2
+
+    async def test_completed_flight_not_reused(self, session_factory, monkeypatch):
+        """완료된 점유 행의 결과는 이후 요청에 재사용하지 않고, 유지 시간이 지나면 새로 점유"""
+        monkeypatch.setattr("app.services.single_flight.WAIT_POLL_INTERVAL_SECONDS", 0.01)
+        first = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        second = SingleFlight(DatabaseFlightBackend(session_factory, timeout_seconds=10))
+        release, calls = asyncio.Event(), []
+        release.set()
+
+        await first.do("key", make_call(calls, release, {"response_text": "원본", "model_used": "m"}))
+        # 유지 시간 안에 도착한 요청도 직접 실행 (점유는 못 했으므로 결과를 기록하지 않음)
+        result, shared = await second.do("key", make_call(calls, release))
+        assert shared is False and result["response_text"] == "{}"
+        assert len(calls) == 2
+
+        await asyncio.sleep(0.05)
+        assert await second.backend.acquire("key") is True
@@ -0,0 +1,579 @@
+"""
+주식 분석 엔진 테스트 (LLM/주식 데이터/DB 없이)
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import stock_insight_engine as engine_module
+from app.services.analysis_cache import PLACEHOLDER_DEEP_RESEARCH
+from app.services.response_archive import decompress_response
+from app.services.response_parser import (
+    NESTED_FIELDS,
+    is_valid_stock_analysis_response,
+    repair_stock_analysis_response,
+)
+from app.services.stock_data_service import StockData
+from app.services.stock_insight_engine import StockInsightEngine
+
+SAMPLE_RESPONSE = json.dumps({
+    "deep_research": "테스트 분석",
+    "recommendation": "buy",
+    "confidence_level": "high",
+    "recommendation_reason": "실적 개선",
+    "risk_score": 4,
+    "market_sentiment": "bullish",
+    "key_summary": ["요약 1", "요약 2"],
+}, ensure_ascii=False)
+# 출력 토큰 상한으로 market_sentiment 값 도중에 잘린 응답
+TRUNCATED_RESPONSE = SAMPLE_RESPONSE[:SAMPLE_RESPONSE.index('"market_sentiment"') + 10]
+
+
+def make_stock_data(symbol: str = "AAPL") -> StockData:
+    return StockData(symbol=symbol, name="Apple Inc.", market="US", current_price=200.0, currency="USD")
+
+
+def make_engine(monkeypatch, stock_data=None) -> StockInsightEngine:
+    """API 키 없이 동작하도록 클라이언트/데이터/저장을 대체한 엔진"""
+    engine = StockInsightEngine()
+    engine.openai_client = object()
+    engine.openai_model = "fake-openai"
+    engine.anthropic_client = object()
+    engine.anthropic_model = "fake-anthropic"
+    engine.primary_provider = "openai"
+
+    async def fake_get_stock_data(stock_code):
+        return stock_data
+
+    saved = []
+
+    async def fake_save(insight):
+        insight.id = len(saved) + 1
+        saved.append(insight)
+        return insight
+
+    async def no_cache(symbol, timeframe, fingerprint):
+        return None
+
+    monkeypatch.setattr(engine_module.stock_data_service, "get_stock_data", fake_get_stock_data)
+    monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", no_cache)
+    monkeypatch.setattr(engine, "_save_insight", fake_save)
+    engine.saved = saved
+    return engine
+
+
+def chunked(text: str, size: int = 7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestGenerateInsightStream:
+    """generate_insight_stream 테스트"""
+
+    async def test_stream_events(self, monkeypatch):
+        """단계 이벤트 → 부분 응답 → 저장 후 done 순서로 전달"""
+        engine = make_engine(monkeypatch, make_stock_data())
+
+        async def fake_stream(provider, system_prompt, user_prompt, max_tokens):
+            for piece in chunked(SAMPLE_RESPONSE):
+                yield piece
+
+        monkeypatch.setattr(engine, "_stream_provider", fake_stream)
+
+        events = [event async for event in engine.generate_insight_stream("AAPL", "mid", "user")]
+        kinds = [event["event"] for event in events]
+
+        assert kinds[0] == "stage" and events[0]["data"]["stage"] == "fetching_data"
+        assert events[1]["data"]["stage"] == "calling_llm"
+        assert kinds[-1] == "done"
+        assert "".join(e["data"]["text"] for e in events if e["event"] == "delta") == SAMPLE_RESPONSE
+        # 완성된 필드는 스트림 도중 검증된 값으로 전달
+        fields = {e["data"]["name"]: e["data"]["value"] for e in events if e["event"] == "field"}
+        assert fields["recommendation"] == "buy"
+        assert fields["risk_score"] == 4
+        first_field = next(i for i, e in enumerate(events) if e["event"] == "field")
+        assert first_field < kinds.index("done") and "delta" in kinds[first_field + 1:]
+
+        insight = events[-1]["data"]["insight"]
+        assert insight.recommendation == "buy"
+        assert insight.ai_model == "fake-openai"
+        assert engine.saved == [insight]
+
+    async def test_fallback_before_first_chunk(self, monkeypatch):
+        """첫 조각 전 실패 시 다음 프로바이더로 폴백"""
+        engine = make_engine(monkeypatch, make_stock_data())
+
+        async def fake_stream(provider, system_prompt, user_prompt, max_tokens):
+            if provider == "openai":
+                raise RuntimeError("연결 실패")
+            yield SAMPLE_RESPONSE
+
+        monkeypatch.setattr(engine, "_stream_provider", fake_stream)
+
+        events = [event async for event in engine.generate_insight_stream("AAPL")]
+        assert events[-1]["data"]["insight"].ai_model == "fake-anthropic"
+
+    async def test_truncated_stream_archives_original(self, monkeypatch):
+        """잘린 스트리밍 응답은 기본값을 채운 JSON이 아니라 받은 원문을 아카이브"""
+        monkeypatch.setattr(engine_module.settings, "LLM_CONTINUATION_ENABLED", False)
+        engine = make_engine(monkeypatch, make_stock_data())
+
+        async def fake_stream(provider, system_prompt, user_prompt, max_tokens):
+            for piece in chunked(TRUNCATED_RESPONSE):
+                yield piece
+
+        monkeypatch.setattr(engine, "_stream_provider", fake_stream)
+
+        events = [event async for event in engine.generate_insight_stream("AAPL", "mid", "user")]
+        insight = events[-1]["data"]["insight"]
+
+        assert insight.recommendation == "buy"
+        assert insight.input_fingerprint is None
+        assert decompress_response(insight.raw_response) == TRUNCATED_RESPONSE
+
+    async def test_no_fallback_after_partial_output(self, monkeypatch):
+        """이미 조각을 전송한 뒤 실패하면 예외 전파 (저장하지 않음)"""
+        engine = make_engine(monkeypatch, make_stock_data())
+
+        async def fake_stream(provider, system_prompt, user_prompt, max_tokens):
+            yield SAMPLE_RESPONSE[:10]
+            raise RuntimeError("스트림 끊김")
+
+        monkeypatch.setattr(engine, "_stream_provider", fake_stream)
+
+        with pytest.raises(RuntimeError):
+            async for _ in engine.generate_insight_stream("AAPL"):
+                pass
+        assert engine.saved == []
+
+    async def test_slow_consumer_releases_slot(self, monkeypatch):
+        """업스트림 응답이 끝나면 소비자가 남은 조각을 읽기 전에 슬롯 반환, 소비자가 중단하면 업스트림 취소"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        limiter = engine.admission.limiter("openai")
+        upstream_cancelled = asyncio.Event()
+
+        async def fake_stream(provider, system_prompt, user_prompt, max_tokens):
+            for piece in chunked(SAMPLE_RESPONSE):
+                yield piece
+            if user_prompt == "hang":
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    upstream_cancelled.set()
+                    raise
+
+        monkeypatch.setattr(engine, "_stream_provider", fake_stream)
+
+        stream = engine._stream_llm("system", "user")
+        assert await stream.__anext__() == ("fake-openai", chunked(SAMPLE_RESPONSE)[0])
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert limiter.stats()["in_use"] == 0
+        rest = [text async for _, text in stream]
+        assert "".join(chunked(SAMPLE_RESPONSE)[:1] + rest) == SAMPLE_RESPONSE
+
+        stream = engine._stream_llm("system", "hang")
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.wait_for(upstream_cancelled.wait(), timeout=1.0)
+        assert limiter.stats()["in_use"] == 0
+
+    async def test_stock_not_found(self, monkeypatch):
+        """종목 데이터가 없으면 error 이벤트로 종료"""
+        engine = make_engine(monkeypatch, None)
+
+        events = [event async for event in engine.generate_insight_stream("UNKNOWN")]
+        assert events[-1] == {"event": "error", "data": {"reason": "stock_not_found"}}
+
+
+class TestAnalysisCacheIntegration:
+    """공유 분석 캐시 연동 테스트"""
+
+    async def test_cache_hit_skips_llm(self, monkeypatch):
+        """같은 입력의 최근 분석이 있으면 LLM 호출 없이 새 분석으로 복제 저장"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        source = engine._build_insight(
+            make_stock_data(), "mid", "other-user", engine_module.parse_stock_analysis_response(SAMPLE_RESPONSE),
+            "fake-openai", 9000,
+        )
+        source.id = 99
+
+        async def cached_lookup(symbol, timeframe, fingerprint):
+            return source
+
+        async def fail_llm(system_prompt, user_prompt, max_tokens=None, validate=None):
+            raise AssertionError("LLM이 호출되면 안 됨")
+
+        monkeypatch.setattr(engine_module.analysis_result_cache, "lookup", cached_lookup)
+        monkeypatch.setattr(engine, "_call_llm", fail_llm)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert insight.user_id == "user"
+        assert insight.recommendation == "buy"
+        assert insight.input_fingerprint is not None
+        assert engine.saved == [insight]
+
+    async def test_placeholder_not_fingerprinted(self, monkeypatch):
+        """파싱할 수 없는 응답으로 기본값이 저장된 분석은 공유 캐시 원본이 되지 않음"""
+        monkeypatch.setattr(engine_module.settings, "LLM_CONTINUATION_ENABLED", False)
+        engine = make_engine(monkeypatch, make_stock_data())
+
+        async def broken_llm(system_prompt, user_prompt, max_tokens=None, validate=None):
+            return "분석을 생성할 수 없습니다", "fake-openai"
+
+        monkeypatch.setattr(engine, "_call_llm", broken_llm)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert insight.deep_research == PLACEHOLDER_DEEP_RESEARCH
+        assert insight.input_fingerprint is None
+
+
+class TestSingleFlightIntegration:
+    """동일 분석 중복 호출 방지 연동 테스트"""
+
+    async def test_concurrent_identical_requests(self, monkeypatch):
+        """동시에 들어온 같은 분석은 LLM을 한 번만 호출하고 사용자별로 저장"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        calls = []
+
+        async def slow_llm(system_prompt, user_prompt, max_tokens=None, validate=None):
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return SAMPLE_RESPONSE, "fake-openai"
+
+        monkeypatch.setattr(engine, "_call_llm", slow_llm)
+
+        insights = await asyncio.gather(
+            engine.generate_insight("AAPL", "mid", "user-a"),
+            engine.generate_insight("AAPL", "mid", "user-b"),
+            engine.generate_insight("AAPL", "long", "user-c"),
+        )
+
+        assert len(calls) == 2  # mid 1회 + long 1회
+        assert [insight.user_id for insight in insights] == ["user-a", "user-b", "user-c"]
+        assert len({insight.id for insight in insights}) == 3
+
+
+class TestProviderChain:
+    """재시도/회로 차단/폴백 체인 테스트"""
+
+    def make_chain_engine(self, monkeypatch, failures):
+        """프로바이더별 실패 목록을 순서대로 발생시키는 엔진"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        monkeypatch.setattr(engine_module.settings, "LLM_MAX_RETRIES", 2)
+        monkeypatch.setattr(engine_module.settings, "LLM_RETRY_BASE_DELAY_SECONDS", 0.0)
+        monkeypatch.setattr(engine_module.settings, "LLM_FALLBACK_ORDER", "openai,anthropic")
+        calls = []
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            calls.append(provider)
+            queue = failures.get(provider, [])
+            if queue:
+                raise queue.pop(0)
+            return SAMPLE_RESPONSE
+
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        return engine, calls
+
+    async def test_retry_transient_error(self, monkeypatch):
+        """일시적 오류는 같은 프로바이더로 재시도"""
+        engine, calls = self.make_chain_engine(monkeypatch, {"openai": [TimeoutError(), TimeoutError()]})
+
+        _, model = await engine._call_llm("system", "user")
+
+        assert model == "fake-openai"
+        assert calls == ["openai", "openai", "openai"]
+
+    async def test_fallback_on_permanent_error(self, monkeypatch):
+        """재시도 대상이 아닌 오류는 즉시 다음 프로바이더로 폴백"""
+        engine, calls = self.make_chain_engine(monkeypatch, {"openai": [ValueError("잘못된 요청")]})
+
+        _, model = await engine._call_llm("system", "user")
+
+        assert model == "fake-anthropic"
+        assert calls == ["openai", "anthropic"]
+
+    async def test_open_breaker_skipped(self, monkeypatch):
+        """회로가 차단된 프로바이더는 호출 없이 건너뜀, 모두 차단되면 LLMUnavailableError"""
+        engine, calls = self.make_chain_engine(monkeypatch, {})
+        for breaker in engine.breakers.values():
+            breaker.failure_threshold = 1
+        engine.breakers["openai"].record_failure()
+
+        _, model = await engine._call_llm("system", "user")
+        assert model == "fake-anthropic"
+        assert calls == ["anthropic"]
+
+        engine.breakers["anthropic"].record_failure()
+        with pytest.raises(engine_module.LLMUnavailableError):
+            await engine._call_llm("system", "user")
+
+
+class TestHedgedRequests:
+    """헤지 요청 테스트"""
+
+    def make_hedge_engine(self, monkeypatch, delays, responses=None):
+        engine = make_engine(monkeypatch, make_stock_data())
+        monkeypatch.setattr(engine_module.settings, "LLM_HEDGE_ENABLED", True)
+        monkeypatch.setattr(engine_module.settings, "LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+        monkeypatch.setattr(engine_module.settings, "LLM_HEDGE_MAX_RATIO", 1.0)
+        monkeypatch.setattr(engine_module.settings, "LLM_FALLBACK_ORDER", "openai,anthropic")
+        calls, cancelled = [], []
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            calls.append(provider)
+            try:
+                await asyncio.sleep(delays[provider])
+            except asyncio.CancelledError:
+                cancelled.append(provider)
+                raise
+            return (responses or {}).get(provider, SAMPLE_RESPONSE)
+
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        return engine, calls, cancelled
+
+    async def test_hedge_wins_when_primary_slow(self, monkeypatch):
+        """기본 요청이 지연되면 보조 요청을 보내고 먼저 온 응답 사용, 나머지 취소"""
+        engine, calls, cancelled = self.make_hedge_engine(monkeypatch, {"openai": 5.0, "anthropic": 0.01})
+
+        _, model = await engine._call_llm("system", "user")
+        await asyncio.sleep(0)
+
+        assert model == "fake-anthropic"
+        assert calls == ["openai", "anthropic"]
+        assert cancelled == ["openai"]
+        assert engine.hedge.stats()["hedge_wins"] == 1
+
+    async def test_no_hedge_when_primary_fast(self, monkeypatch):
+        """기본 요청이 지연 기준 이내면 보조 요청 없음"""
+        engine, calls, _ = self.make_hedge_engine(monkeypatch, {"openai": 0.0, "anthropic": 0.0})
+
+        _, model = await engine._call_llm("system", "user")
+
+        assert model == "fake-openai"
+        assert calls == ["openai"]
+
+    async def test_invalid_response_loses(self, monkeypatch):
+        """보조 요청이 먼저 와도 파싱 불가 응답이면 기본 요청의 유효 응답 사용"""
+        engine, _, _ = self.make_hedge_engine(
+            monkeypatch, {"openai": 0.1, "anthropic": 0.0}, responses={"anthropic": "잘린 응답 {"}
+        )
+
+        _, model = await engine._call_llm("system", "user", validate=is_valid_stock_analysis_response)
+
+        assert model == "fake-openai"
+
+    async def test_partial_prompt_accepts_first_success(self, monkeypatch):
+        """이어쓰기/델타처럼 전체 분석 형식이 아닌 호출은 먼저 성공한 응답을 바로 사용"""
+        continuation = json.dumps({"market_sentiment": "bearish"})
+        engine, _, cancelled = self.make_hedge_engine(
+            monkeypatch, {"openai": 5.0, "anthropic": 0.01}, responses={"anthropic": continuation}
+        )
+
+        text, model = await asyncio.wait_for(engine._call_llm("system", "continue"), timeout=1.0)
+        await asyncio.sleep(0)
+
+        assert (text, model) == (continuation, "fake-anthropic")
+        assert cancelled == ["openai"]
+
+    async def test_hedge_budget(self, monkeypatch):
+        """헤지 예산이 없으면 보조 요청 없이 기본 요청 대기"""
+        engine, calls, _ = self.make_hedge_engine(monkeypatch, {"openai": 0.1, "anthropic": 0.0})
+        monkeypatch.setattr(engine_module.settings, "LLM_HEDGE_MAX_RATIO", 0.1)
+
+        _, model = await engine._call_llm("system", "user")
+
+        assert model == "fake-openai"
+        assert calls == ["openai"]
+
+
+class TestTokenAccounting:
+    """토큰 사용량 기록 및 compact 프롬프트 테스트"""
+
+    def make_usage_engine(self, monkeypatch, failures=0):
+        """호출마다 고정 사용량을 기록하는 엔진 (처음 failures회는 일시적 오류)"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        monkeypatch.setattr(engine_module.settings, "LLM_RETRY_BASE_DELAY_SECONDS", 0.0)
+        requests = []
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            requests.append({"user_prompt": user_prompt, "max_tokens": max_tokens})
+            engine_module.record_usage("fake-openai", 100, 50)
+            if len(requests) <= failures:
+                raise TimeoutError()
+            return SAMPLE_RESPONSE
+
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        return engine, requests
+
+    async def test_usage_stored_on_insight(self, monkeypatch):
+        """재시도 호출을 포함한 토큰 사용량을 StockInsight에 기록"""
+        engine, _ = self.make_usage_engine(monkeypatch, failures=1)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert insight.prompt_tokens == 200
+        assert insight.completion_tokens == 100
+
+    async def test_compact_mode(self, monkeypatch):
+        """compact 모드는 빈 항목을 생략하고 투자 기간별 출력 토큰 상한 사용"""
+        engine, requests = self.make_usage_engine(monkeypatch)
+        monkeypatch.setattr(engine_module.settings, "LLM_PROMPT_MODE", "compact")
+        monkeypatch.setattr(engine_module.settings, "LLM_MAX_TOKENS_SHORT", 1234)
+
+        await engine.generate_insight("AAPL", "short", "user")
+
+        assert requests[0]["max_tokens"] == 1234
+        assert "N/A" not in requests[0]["user_prompt"]
+        assert "Current Price: 200.0 USD" in requests[0]["user_prompt"]
+
+    async def test_full_mode_default_max_tokens(self, monkeypatch):
+        """full 모드는 기존 프롬프트와 LLM_MAX_TOKENS 사용"""
+        engine, requests = self.make_usage_engine(monkeypatch)
+        monkeypatch.setattr(engine_module.settings, "LLM_PROMPT_MODE", "full")
+
+        await engine.generate_insight("AAPL", "short", "user")
+
+        assert requests[0]["max_tokens"] == engine_module.settings.LLM_MAX_TOKENS
+        assert "P/E Ratio: None" in requests[0]["user_prompt"]
+
+
+class TestTruncatedResponseRepair:
+    """잘린 응답 복구 및 이어쓰기 요청 테스트"""
+
+    def make_repair_engine(self, monkeypatch, continuation):
+        """첫 호출은 잘린 응답, 이후 호출은 continuation 응답"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        requests = []
+
+        async def fake_call(provider, system_prompt, user_prompt, max_tokens):
+            requests.append(user_prompt)
+            engine_module.record_usage("fake-openai", 100, 50)
+            return TRUNCATED_RESPONSE if len(requests) == 1 else continuation
+
+        monkeypatch.setattr(engine, "_call_provider", fake_call)
+        return engine, requests
+
+    async def test_continuation_fills_missing_fields(self, monkeypatch):
+        """완성된 필드는 유지하고 빠진 필드만 이어쓰기 요청으로 채움"""
+        continuation = json.dumps({"market_sentiment": "bearish", "key_summary": ["이어쓴 요약"]}, ensure_ascii=False)
+        engine, requests = self.make_repair_engine(monkeypatch, continuation)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert len(requests) == 2
+        assert "ONLY these missing fields" in requests[1]
+        missing_line = requests[1].splitlines()[-1]
+        assert "market_sentiment" in missing_line and "recommendation" not in missing_line
+        assert insight.recommendation == "buy"
+        assert insight.risk_score == 4
+        assert insight.market_sentiment == "bearish"
+        assert insight.key_summary == ["이어쓴 요약"]
+        # 이어쓰기 호출 토큰도 분석 사용량에 포함
+        assert insight.prompt_tokens == 200
+        # 이어쓰기로 채우지 못한 필드(risk_analysis 등)가 기본값이므로 공유 캐시 원본이 되지 않음
+        assert insight.input_fingerprint is None
+
+    async def test_fully_repaired_response_fingerprinted(self, monkeypatch):
+        """빠진 필드를 모두 채운 복구 응답만 공유 캐시 원본이 됨"""
+        missing = repair_stock_analysis_response(TRUNCATED_RESPONSE).missing
+        continuation = {name: "이어씀" for name in missing}
+        continuation.update({name: {"overall": "이어씀"} for name in missing if name in NESTED_FIELDS})
+        continuation.update(market_sentiment="bearish", key_summary=["이어쓴 요약"])
+        engine, requests = self.make_repair_engine(monkeypatch, json.dumps(continuation, ensure_ascii=False))
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert len(requests) == 2
+        assert insight.market_sentiment == "bearish"
+        assert insight.input_fingerprint is not None
+        assert decompress_response(insight.raw_response) == TRUNCATED_RESPONSE
+
+    async def test_continuation_disabled(self, monkeypatch):
+        """이어쓰기를 끄면 추가 호출 없이 복구된 필드만 사용"""
+        engine, requests = self.make_repair_engine(monkeypatch, SAMPLE_RESPONSE)
+        monkeypatch.setattr(engine_module.settings, "LLM_CONTINUATION_ENABLED", False)
+
+        insight = await engine.generate_insight("AAPL", "mid", "user")
+
+        assert len(requests) == 1
+        assert insight.recommendation == "buy"
+        assert insight.market_sentiment == "neutral"
+        assert insight.input_fingerprint is None
+        # 아카이브는 기본값을 채우기 전 프로바이더 응답 원문
+        assert decompress_response(insight.raw_response) == TRUNCATED_RESPONSE
+
+
+class TestPromptCaching:
+    """프로바이더 프롬프트 캐시 요청 형식 및 캐시 토큰 기록 테스트"""
+
+    def make_clients(self, engine):
+        """요청 인자를 기록하고 캐시 적중 usage를 반환하는 가짜 SDK 클라이언트"""
+        captured = {}
+
+        async def openai_create(**kwargs):
+            captured["openai"] = kwargs
+            usage = SimpleNamespace(
+                prompt_tokens=1500, completion_tokens=700,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=1024),
+            )
+            message = SimpleNamespace(content=SAMPLE_RESPONSE)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+        async def anthropic_create(**kwargs):
+            captured["anthropic"] = kwargs
+            usage = SimpleNamespace(
+                input_tokens=300, output_tokens=700,
+                cache_read_input_tokens=1200, cache_creation_input_tokens=0,
+            )
+            return SimpleNamespace(content=[SimpleNamespace(text=SAMPLE_RESPONSE)], usage=usage)
+
+        engine.openai_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=openai_create))
+        )
+        engine.anthropic_client = SimpleNamespace(messages=SimpleNamespace(create=anthropic_create))
+        return captured
+
+    async def test_anthropic_cache_control(self, monkeypatch):
+        """Anthropic 시스템 프롬프트는 cache_control 블록, 캐시 읽기 토큰 포함 기록"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        captured = self.make_clients(engine)
+        monkeypatch.setattr(engine_module.settings, "LLM_PROMPT_CACHE_ENABLED", True)
+
+        with engine_module.track_usage() as usage:
+            await engine._call_anthropic_api("system", "user", 100)
+
+        assert captured["anthropic"]["system"] == [
+            {"type": "text", "text": "system", "cache_control": {"type": "ephemeral"}}
+        ]
+        assert (usage.prompt_tokens, usage.cached_tokens) == (1500, 1200)
+
+    async def test_openai_stable_prefix(self, monkeypatch):
+        """OpenAI는 시스템 프롬프트가 첫 메시지, 같은 시스템 프롬프트는 같은 prompt_cache_key"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        captured = self.make_clients(engine)
+        monkeypatch.setattr(engine_module.settings, "LLM_PROMPT_CACHE_ENABLED", True)
+
+        with engine_module.track_usage() as usage:
+            await engine._call_openai_api("system", "user-a", 100)
+            first = captured["openai"]
+            await engine._call_openai_api("system", "user-b", 100)
+
+        assert first["messages"][0] == {"role": "system", "content": "system"}
+        assert first["extra_body"]["prompt_cache_key"] == captured["openai"]["extra_body"]["prompt_cache_key"]
+        assert usage.cached_tokens == 2048
+
+    async def test_cache_disabled(self, monkeypatch):
+        """캐시 비활성화 시 기존 요청 형식"""
+        engine = make_engine(monkeypatch, make_stock_data())
+        captured = self.make_clients(engine)
+        monkeypatch.setattr(engine_module.settings, "LLM_PROMPT_CACHE_ENABLED", False)
+
+        await engine._call_anthropic_api("system", "user", 100)
+        await engine._call_openai_api("system", "user", 100)
+
+        assert captured["anthropic"]["system"] == "system"
+        assert "extra_body" not in captured["openai"]
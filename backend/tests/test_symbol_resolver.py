@@ -0,0 +1,164 @@
+"""
+통합 심볼 리졸버 테스트
+"""
+from datetime import datetime
+
+from app.services.ticker_table import diff_tables
+
+from app.services.symbol_resolver import (
+    SymbolResolver,
+    SOURCE_SUFFIX,
+    SOURCE_KR_MAPPING,
+    SOURCE_US_MAPPING,
+    SOURCE_ALIAS,
+    SOURCE_KR_LISTING,
+    SOURCE_US_LISTING,
+    SOURCE_HEURISTIC,
+)
+
+
+class FakeKRCache:
+    """pykrx 없이 사용하는 KR 종목 테이블"""
+
+    def __init__(self, listing):
+        self.listing = listing
+        self.timestamp = datetime(2026, 1, 1)
+        self.calls = 0
+
+    async def get_snapshot(self):
+        self.calls += 1
+        return self.timestamp, self.listing
+
+    def subscribe(self, listener):
+        self.listener = listener
+        return lambda: None
+
+
+class FakeUSCache:
+    """Finnhub 없이 사용하는 미국 종목 목록"""
+
+    def __init__(self, listing):
+        self.listing = listing
+        self.timestamp = datetime(2026, 1, 1)
+
+    async def get_snapshot(self):
+        return self.timestamp, self.listing
+
+
+def make_resolver(listing=None):
+    cache = FakeKRCache(listing or {
+        "005930": ("삼성전자", "KOSPI"),
+        "086520": ("에코프로", "KOSDAQ"),
+        "086280": ("현대글로비스", "KOSPI"),
+        "003550": ("LG", "KOSPI"),
+        "030200": ("KT", "KOSPI"),
+    })
+    resolver = SymbolResolver(
+        kr_mapping={"삼성전자": "005930.KS"},
+        us_mapping={"애플": "AAPL"},
+        kr_cache=cache,
+        us_cache=FakeUSCache({"AAPL": "APPLE INC", "JPM": "JPMORGAN CHASE & CO", "KT": "KT CORP-SP ADR"}),
+    )
+    return resolver, cache
+
+
+class TestSymbolResolver:
+    """SymbolResolver 테스트"""
+
+    async def test_sources(self):
+        """각 소스에서 올바르게 변환되고 소스가 표시됨"""
+        resolver, _ = make_resolver()
+
+        cases = {
+            "005930.KS": ("005930.KS", "KR", SOURCE_SUFFIX),
+            "삼성전자": ("005930.KS", "KR", SOURCE_KR_MAPPING),
+            "애플": ("AAPL", "US", SOURCE_US_MAPPING),
+            "현대글로비스": ("086280.KS", "KR", SOURCE_KR_LISTING),
+            "86520": ("086520.KQ", "KR", SOURCE_KR_LISTING),
+            "Samsung Electronics": ("005930.KS", "KR", SOURCE_ALIAS),
+            "페이스북": ("META", "US", SOURCE_ALIAS),
+            "FB": ("META", "US", SOURCE_ALIAS),
+            "LG": ("003550.KS", "KR", SOURCE_KR_LISTING),
+            "KT": ("030200.KS", "KR", SOURCE_KR_LISTING),
+            "TSLA": ("TSLA", "US", SOURCE_HEURISTIC),
+            "999999": ("999999.KS", "KR", SOURCE_HEURISTIC),
+            "msft": ("MSFT", "US", SOURCE_HEURISTIC),
+            "jpm": ("JPM", "US", SOURCE_US_LISTING),
+            "JPMorgan Chase & Co": ("JPM", "US", SOURCE_US_LISTING),
+        }
+
+        for query, (symbol, market, source) in cases.items():
+            resolved = await resolver.resolve(query)
+            assert (resolved.symbol, resolved.market, resolved.source) == (symbol, market, source), query
+
+    async def test_normalized_lookup(self):
+        """공백/대소문자 차이를 무시하고 조회"""
+        resolver, _ = make_resolver()
+
+        resolved = await resolver.resolve("  samsung   electronics ")
+        assert resolved.symbol == "005930.KS"
+
+        resolved = await resolver.resolve("aapl")
+        assert resolved.symbol == "AAPL"
+        assert resolved.source == SOURCE_US_MAPPING
+
+    async def test_memoization(self):
+        """같은 쿼리는 메모에서 응답"""
+        resolver, _ = make_resolver()
+
+        await resolver.resolve("현대글로비스")
+        await resolver.resolve("현대글로비스")
+
+        stats = resolver.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    async def test_reindex_on_table_refresh(self):
+        """KR 종목 테이블이 갱신되면 인덱스 재구축 및 메모 초기화"""
+        resolver, cache = make_resolver()
+
+        resolved = await resolver.resolve("신규상장")
+        assert resolved.source == SOURCE_HEURISTIC
+
+        cache.listing = {**cache.listing, "123450": ("신규상장", "KOSDAQ")}
+        cache.timestamp = datetime(2026, 1, 2)
+
+        resolved = await resolver.resolve("신규상장")
+        assert resolved.symbol == "123450.KQ"
+        assert resolved.source == SOURCE_KR_LISTING
+
+    async def test_incremental_diff(self):
+        """변경분 구독: 변경된 종목만 인덱스/메모 갱신, 재구축 없음"""
+        resolver, cache = make_resolver()
+
+        await resolver.resolve("현대글로비스")
+        await resolver.resolve("에코프로")
+        await resolver.resolve("신규상장")
+
+        new_listing = {
+            **{code: info for code, info in cache.listing.items() if code != "086280"},
+            "086520": ("에코프로", "KOSPI"),  # 시장 이전
+            "005930": ("삼성전자우", "KOSPI"),  # 종목명 변경 (테스트용)
+            "123450": ("신규상장", "KOSDAQ"),
+        }
+        diff = diff_tables(cache.listing, new_listing, generation=datetime(2026, 1, 2))
+        assert set(diff.delisted) == {"086280"}
+        assert set(diff.listed) == {"123450"}
+        assert diff.market_moved == {"086520": ("KOSDAQ", "KOSPI")}
+        assert diff.renamed == {"005930": ("삼성전자", "삼성전자우")}
+
+        cache.listing = new_listing
+        cache.timestamp = datetime(2026, 1, 2)
+        cache.listener(diff)
+
+        assert resolver.stats()["memo_size"] == 0
+        assert (await resolver.resolve("에코프로")).symbol == "086520.KS"
+        assert (await resolver.resolve("신규상장")).symbol == "123450.KQ"
+        assert (await resolver.resolve("현대글로비스")).source == SOURCE_HEURISTIC
+        assert (await resolver.resolve("삼성전자우")).symbol == "005930.KS"
+        # 하드코딩 매핑은 KR 테이블 변경과 무관하게 유지
+        assert (await resolver.resolve("삼성전자")).source == SOURCE_KR_MAPPING
+        # 세대가 일치하므로 전체 재구축 없이 메모 유지
+        await resolver.resolve("LG")
+        await resolver.resolve("LG")
+        assert resolver.stats()["hits"] >= 1
@@ -0,0 +1,125 @@
+"""
+컬럼형 한국 종목 테이블 및 스냅샷 공유 테스트
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.kr_stock_cache import KRStockCacheService
+from app.services.ticker_table import TickerTable
+
+
+STOCKS = {
+    "005930": ("삼성전자", "KOSPI"),
+    "000660": ("SK하이닉스", "KOSPI"),
+    "086520": ("에코프로", "KOSDAQ"),
+    "247540": ("에코프로비엠", "KOSDAQ"),
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    """테스트용 스냅샷 경로"""
+    path = tmp_path / "kr_ticker_table.bin"
+    monkeypatch.setattr(settings, "KR_TICKER_SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(settings, "KR_TICKER_SNAPSHOT_PATH", str(path))
+    return path
+
+
+class TestTickerTable:
+    """TickerTable 테스트"""
+
+    @pytest.fixture(params=["memory", "mmap"])
+    def table(self, request, tmp_path):
+        table = TickerTable.from_mapping(STOCKS)
+        if request.param == "mmap":
+            path = tmp_path / "table.bin"
+            table.write(str(path))
+            return TickerTable.open(str(path))
+        return table
+
+    def test_mapping_interface(self, table):
+        """code -> (name, market) 매핑"""
+        assert len(table) == 4
+        assert table["005930"] == ("삼성전자", "KOSPI")
+        assert table.get("999999") is None
+        assert "086520" in table
+        assert dict(table) == STOCKS
+
+    def test_find_name(self, table):
+        """종목명 정확히 일치 조회"""
+        assert table.find_name("에코프로") == "086520"
+        assert table.find_name("에코프로비엠") == "247540"
+        assert table.find_name("없는종목") is None
+
+    def test_search_rows(self, table):
+        """종목명 부분 일치 (대소문자 무시)"""
+        assert [table.code_at(r) for r in table.search_rows("에코프로", 10)] == ["086520", "247540"]
+        assert [table.code_at(r) for r in table.search_rows("sk", 10)] == ["000660"]
+        assert len(table.search_rows("에코프로", 1)) == 1
+
+    def test_invalid_rows_skipped(self):
+        """6자리가 아닌 코드 또는 알 수 없는 시장은 제외"""
+        table = TickerTable.from_mapping({"12345": ("잘못된코드", "KOSPI"), "111111": ("코넥스", "KONEX")})
+        assert len(table) == 0
+
+    def test_corrupted_snapshot_rejected(self, tmp_path):
+        """손상된 스냅샷 파일 거부"""
+        path = tmp_path / "broken.bin"
+        path.write_bytes(b"KRTT" + b"\x00" * 40)
+        with pytest.raises(ValueError):
+            TickerTable.open(str(path))
+
+
+class TestKRStockCacheSnapshot:
+    """스냅샷 파일 공유 테스트"""
+
+    async def test_first_worker_builds_snapshot(self, snapshot_path, monkeypatch):
+        """pykrx 로드 후 스냅샷 저장, 다른 워커는 pykrx 없이 mmap 사용"""
+        first = KRStockCacheService()
+        monkeypatch.setattr(first, "_load_stocks_sync", lambda: dict(STOCKS))
+
+        assert await first.warm_up() is True
+        assert snapshot_path.exists()
+
+        second = KRStockCacheService()
+
+        def fail_load():
+            raise AssertionError("스냅샷이 있으면 pykrx를 호출하지 않아야 함")
+
+        monkeypatch.setattr(second, "_load_stocks_sync", fail_load)
+
+        assert await second.warm_up() is True
+        assert await second.resolve_code("에코프로") == ("086520.KQ", "KR")
+        assert (await second.get_snapshot())[0] == (await first.get_snapshot())[0]
+
+        first.shutdown()
+        second.shutdown()
+
+    async def test_stale_snapshot_reloaded(self, snapshot_path, monkeypatch):
+        """TTL이 지난 스냅샷은 무시하고 다시 로드, 변경분 발행"""
+        stale = TickerTable.from_mapping(STOCKS, built_at=datetime.now() - timedelta(days=2))
+        stale.write(str(snapshot_path))
+
+        cache = KRStockCacheService()
+        calls = []
+
+        def load():
+            calls.append(1)
+            return {**STOCKS, "123450": ("신규상장", "KOSDAQ")}
+
+        monkeypatch.setattr(cache, "_load_stocks_sync", load)
+        cache._table = stale
+        diffs = []
+        cache.subscribe(diffs.append)
+
+        await cache.warm_up()
+
+        assert calls == [1]
+        assert cache.stock_count == 5
+        assert len(diffs) == 1
+        assert diffs[0].listed == {"123450": ("신규상장", "KOSDAQ")}
+        assert diffs[0].summary() == {"listed": 1, "delisted": 0, "renamed": 0, "market_moved": 0}
+        assert cache.diffs_since(stale.built_at) == diffs
+        cache.shutdown()
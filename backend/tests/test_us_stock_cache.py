@@ -0,0 +1,70 @@
+"""
+미국 종목 목록 로컬 스냅샷 테스트
+"""
+import json
+
+import pytest
+
+from app.services.us_stock_cache import USStockCacheService
+
+
+LISTING = [
+    {"symbol": "AAPL", "description": "APPLE INC", "type": "Common Stock"},
+    {"symbol": "APLE", "description": "APPLE HOSPITALITY REIT INC", "type": "REIT"},
+    {"symbol": "MSFT", "description": "MICROSOFT CORP", "type": "Common Stock"},
+    {"symbol": "BRK.B", "description": "BERKSHIRE HATHAWAY INC-CL B", "type": "Common Stock"},
+    {"symbol": "PAPL", "description": "PINEAPPLE ENERGY INC", "type": "Common Stock"},
+]
+
+
+@pytest.fixture
+def listing_file(tmp_path):
+    """Finnhub stock/symbol 응답 형식의 스냅샷 파일"""
+    path = tmp_path / "us_listing.json"
+    path.write_text(json.dumps(LISTING), encoding="utf-8")
+    return str(path)
+
+
+class TestUSStockCache:
+    """USStockCacheService 테스트"""
+
+    async def test_load_from_file(self, listing_file):
+        """파일 스냅샷 로드 (. 포함 심볼 제외)"""
+        cache = USStockCacheService(listing_file=listing_file)
+
+        assert await cache.warm_up() is True
+        assert cache.stock_count == 4
+
+    async def test_search_exact_symbol_first(self, listing_file):
+        """심볼 정확히 일치가 가장 먼저 반환"""
+        cache = USStockCacheService(listing_file=listing_file)
+
+        results = await cache.search("aapl")
+
+        assert results[0] == {"symbol": "AAPL", "name": "APPLE INC", "market": "US"}
+
+    async def test_search_name_substring(self, listing_file):
+        """종목명 부분 일치 검색"""
+        cache = USStockCacheService(listing_file=listing_file)
+
+        results = await cache.search("apple")
+        symbols = [r["symbol"] for r in results]
+
+        assert set(symbols) == {"AAPL", "APLE", "PAPL"}
+        assert len(symbols) == len(set(symbols))
+
+    async def test_search_limit(self, listing_file):
+        """최대 결과 수 제한"""
+        cache = USStockCacheService(listing_file=listing_file)
+
+        results = await cache.search("inc", limit=2)
+
+        assert len(results) == 2
+
+    async def test_missing_file_backs_off(self, tmp_path):
+        """로드 실패 시 빈 결과 + 재시도 대기"""
+        cache = USStockCacheService(listing_file=str(tmp_path / "missing.json"))
+
+        assert await cache.search("aapl") == []
+        assert cache.is_healthy is False
+        assert cache._in_failure_backoff() is True
@@ -0,0 +1,88 @@
+"""
+시작 시 워밍업 및 레디니스 테스트
+"""
+import asyncio
+
+from app.services.warmup import WarmupService, STEP_DONE, STEP_FAILED
+
+
+class TestWarmupService:
+    """WarmupService 테스트"""
+
+    async def test_not_ready_until_steps_finish(self):
+        """워밍업 단계가 끝나기 전에는 not-ready"""
+        service = WarmupService()
+        release = asyncio.Event()
+
+        async def slow_step():
+            await release.wait()
+            return True
+
+        service.register("slow", slow_step)
+        service.start()
+        await asyncio.sleep(0)
+
+        assert service.is_ready is False
+
+        release.set()
+        await service.wait()
+
+        assert service.is_ready is True
+        assert service.status()["steps"]["slow"]["status"] == STEP_DONE
+
+    async def test_failed_step_marks_degraded(self):
+        """실패한 단계가 있어도 ready, 단 degraded 표시"""
+        service = WarmupService()
+
+        async def broken_step():
+            raise RuntimeError("pykrx 연결 실패")
+
+        async def empty_step():
+            return False
+
+        service.register("broken", broken_step)
+        service.register("empty", empty_step)
+        service.start()
+        await service.wait()
+
+        status = service.status()
+        assert status["ready"] is True
+        assert status["degraded"] is True
+        assert status["steps"]["broken"]["status"] == STEP_FAILED
+        assert status["steps"]["empty"]["status"] == STEP_FAILED
+
+    async def test_timeout_marks_pending_steps_failed(self):
+        """시간 초과 시 미완료 단계 실패 처리 후 ready"""
+        service = WarmupService()
+
+        async def hanging_step():
+            await asyncio.sleep(10)
+            return True
+
+        service.register("hanging", hanging_step)
+        service.start(timeout=0.05)
+        await service.wait()
+
+        assert service.is_ready is True
+        assert service.status()["steps"]["hanging"]["status"] == STEP_FAILED
+
+    async def test_no_steps_is_ready(self):
+        """워밍업 비활성화 (단계 없음) 시 즉시 ready"""
+        service = WarmupService()
+        service.start()
+        await service.wait()
+
+        assert service.is_ready is True
+        assert service.is_degraded is False
+
+    def test_duplicate_registration_ignored(self):
+        """같은 이름의 단계는 한 번만 등록"""
+        service = WarmupService()
+
+        async def step():
+            return True
+
+        service.register("kr_stock_cache", step)
+        service.register("kr_stock_cache", step)
+
+        assert list(service.status()["steps"].keys()) == ["kr_stock_cache"]